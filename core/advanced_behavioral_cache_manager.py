@@ -44,12 +44,17 @@ except ImportError:
     structlog.get_logger().warning("⚠️ Redis not available, using memory cache fallback")
 
 # Additional imports
-import pickle
-import zlib
-import threading
 import statistics
 from concurrent.futures import ThreadPoolExecutor
 
+from core.cache_generations import NamespaceGenerations, OrphanReaper, split_versioned, versioned
+from core.smart_cache_manager import (
+    CacheManagerFactory,
+    CachePolicy,
+    CacheStrategy as EngineStrategy,
+    SmartCacheManager,
+)
+
 logger = structlog.get_logger("advanced_behavioral_cache")
 
 class CacheLevel(Enum):
@@ -154,6 +159,7 @@ class AdvancedCacheConfig:
     
     # Multi-tier cache settings
     l1_cache_size: int = 1000  # L1 memory cache size
+    l1_max_bytes: int = 64 * 1024 * 1024  # L1 byte bütçesi
     l2_redis_max_memory_mb: int = 1024  # L2 Redis max memory
     
     # Dynamic TTL settings
@@ -180,6 +186,12 @@ class AdvancedCacheConfig:
     # Key settings
     key_prefix: str = "behavioral_v2:"
     namespace_separator: str = ":"
+    
+    # Namespace generation'ları ve yetim key temizliği
+    generation_refresh_seconds: float = 5.0  # Başka süreçlerin artırdığı generation'ı görme gecikmesi (bus yoksa)
+    reaper_interval_seconds: int = 300
+    reaper_scan_count: int = 500
+    reaper_max_keys_per_second: int = 2000
 
 class AdvancedBehavioralCacheManager:
     """
@@ -201,9 +213,36 @@ class AdvancedBehavioralCacheManager:
         self.redis_client: Optional[aioredis.Redis] = None
         self.redis_pool: Optional[aioredis.ConnectionPool] = None
         
-        # L1 Memory cache
-        self.l1_cache: Dict[str, CacheEntry] = {}
-        self.l1_cache_lock = threading.RLock()
+        # L1 + L2 ortak cache engine'i (single-flight, byte bütçesi, invalidation bus)
+        self.engine: SmartCacheManager = CacheManagerFactory.create(
+            "advanced_behavioral",
+            CachePolicy(
+                strategy=self._engine_strategy(self.config.eviction_strategy),
+                ttl=self.config.base_ttl_seconds,
+                max_size=self.config.l1_cache_size,
+                max_bytes=self.config.l1_max_bytes,
+                compression=self.config.compression_enabled,
+                persistence=True,
+                shared_l2=True
+            ),
+            key_prefix="",
+            unique=True
+        )
+        
+        # Namespace invalidation = generation artırma; eski key'ler reaper/TTL ile silinir
+        self.generations = NamespaceGenerations(
+            f"{self.config.key_prefix.rstrip(self.config.namespace_separator)}:generations",
+            refresh_interval=self.config.generation_refresh_seconds
+        )
+        self.reaper = OrphanReaper(
+            self.generations,
+            match=self._generate_cache_key("*", "*"),
+            parse_key=self._parse_key_generation,
+            interval=self.config.reaper_interval_seconds,
+            scan_count=self.config.reaper_scan_count,
+            max_keys_per_second=self.config.reaper_max_keys_per_second
+        )
+        self._generations_bus_name = f"{self.engine.shared_name}:generations"
         
         # Access tracking for intelligent TTL
         self.access_patterns: Dict[str, List[datetime]] = defaultdict(list)
@@ -227,6 +266,7 @@ class AdvancedBehavioralCacheManager:
         
         if not self.is_redis_available:
             logger.warning("⚠️ Redis kullanılamıyor, sadece L1 memory cache aktif")
+            await self.engine.start()
             return True
         
         try:
@@ -253,6 +293,14 @@ class AdvancedBehavioralCacheManager:
             # Background tasks başlat
             await self._start_background_tasks()
             
+            # Engine L2 olarak bu bağlantıyı kullanır (invalidation bus dahil)
+            self.engine.redis = self.redis_client
+            self.generations.redis = self.redis_client
+            await self.engine.start()
+            await self.engine.invalidation_bus.register(
+                self._generations_bus_name, self._apply_remote_generations, redis=self.redis_client
+            )
+            
             logger.info("✅ Advanced Redis cache system başlatıldı",
                        l1_size=self.config.l1_cache_size,
                        l2_memory_mb=self.config.l2_redis_max_memory_mb)
@@ -262,6 +310,8 @@ class AdvancedBehavioralCacheManager:
             logger.error(f"❌ Redis bağlantı hatası: {e}")
             logger.info("🔄 Sadece L1 memory cache aktif")
             self.redis_client = None
+            self.engine.redis = None
+            await self.engine.start()
             return True
     
     async def _configure_redis(self):
@@ -299,15 +349,52 @@ class AdvancedBehavioralCacheManager:
         metrics_task = asyncio.create_task(self._update_metrics())
         self.background_tasks.add(metrics_task)
         metrics_task.add_done_callback(self.background_tasks.discard)
+        
+        # Eski generation key'lerini hız sınırlı SCAN ile temizle
+        reaper_task = asyncio.create_task(self.reaper.run())
+        self.background_tasks.add(reaper_task)
+        reaper_task.add_done_callback(self.background_tasks.discard)
+    
+    @staticmethod
+    def _engine_strategy(strategy: CacheStrategy) -> EngineStrategy:
+        """Bu modülün eviction stratejisinin engine karşılığı"""
+        if strategy == CacheStrategy.LRU:
+            return EngineStrategy.LRU
+        if strategy == CacheStrategy.LFU:
+            return EngineStrategy.LFU
+        return EngineStrategy.ADAPTIVE
+    
+    @property
+    def l1_cache(self) -> Dict[str, Any]:
+        """Engine'in L1 tablosu (key -> engine CacheEntry)"""
+        return self.engine.l1_cache
     
     def _generate_cache_key(self, namespace: str, identifier: str, 
-                           data_hash: Optional[str] = None) -> str:
-        """Gelişmiş cache key oluştur"""
-        key_parts = [self.config.key_prefix, namespace, identifier]
+                           data_hash: Optional[str] = None, generation: int = 0) -> str:
+        """Gelişmiş cache key oluştur (namespace segmenti generation'ı taşır)"""
+        key_parts = [self.config.key_prefix, versioned(namespace, generation), identifier]
         if data_hash:
             key_parts.append(data_hash)
         return self.config.namespace_separator.join(key_parts)
     
+    async def _cache_key(self, namespace: str, identifier: str,
+                         data_hash: Optional[str] = None) -> str:
+        """Namespace'in güncel generation'ı ile cache key"""
+        generation = await self.generations.current(namespace)
+        return self._generate_cache_key(namespace, identifier, data_hash, generation)
+    
+    def _parse_key_generation(self, key: str) -> Optional[Tuple[str, int]]:
+        """Cache key'inden (namespace, generation); bu cache'e ait değilse None"""
+        head = self.config.key_prefix + self.config.namespace_separator
+        if not key.startswith(head):
+            return None
+        segment = key[len(head):].split(self.config.namespace_separator, 1)[0]
+        return split_versioned(segment)
+    
+    def _apply_remote_generations(self, keys: Set[str], namespaces: Set[str]) -> None:
+        """Başka süreç namespace generation'ı artırdı: yerel kopyayı bırak"""
+        self.generations.forget(namespaces)
+    
     def _hash_data(self, data: Any) -> str:
         """Optimize edilmiş data hash"""
         try:
@@ -378,115 +465,6 @@ class AdvancedBehavioralCacheManager:
         if len(self.access_patterns[cache_key]) >= 5:
             self.popular_keys.add(cache_key)
     
-    async def _serialize_data(self, data: Any) -> bytes:
-        """Gelişmiş data serialization"""
-        try:
-            # Pickle serialize
-            serialized = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
-            
-            # Compression if needed
-            if (self.config.compression_enabled and 
-                len(serialized) > self.config.compression_threshold):
-                
-                serialized = zlib.compress(serialized, level=6)
-                
-            return serialized
-            
-        except Exception as e:
-            logger.error(f"❌ Serialization hatası: {e}")
-            return pickle.dumps({"error": str(e)})
-    
-    async def _deserialize_data(self, data: bytes) -> Any:
-        """Data deserialization"""
-        try:
-            # Compression check (zlib header)
-            if data.startswith(b'\x78'):
-                data = zlib.decompress(data)
-            
-            return pickle.loads(data)
-            
-        except Exception as e:
-            logger.error(f"❌ Deserialization hatası: {e}")
-            return None
-    
-    async def _l1_get(self, cache_key: str) -> Optional[CacheEntry]:
-        """L1 memory cache'den get"""
-        with self.l1_cache_lock:
-            entry = self.l1_cache.get(cache_key)
-            if entry and not entry.is_expired:
-                # Access update
-                entry.last_accessed = datetime.now()
-                entry.access_count += 1
-                self.metrics.l1_hits += 1
-                return entry
-            elif entry:
-                # Expired entry cleanup
-                del self.l1_cache[cache_key]
-        return None
-    
-    async def _l1_set(self, cache_key: str, data: Any, ttl_seconds: int):
-        """L1 memory cache'e set"""
-        with self.l1_cache_lock:
-            # L1 cache size limit
-            if len(self.l1_cache) >= self.config.l1_cache_size:
-                await self._l1_evict()
-            
-            # Estimate data size
-            try:
-                data_size = len(pickle.dumps(data))
-            except:
-                data_size = 1000  # Default estimate
-            
-            entry = CacheEntry(
-                data=data,
-                created_at=datetime.now(),
-                last_accessed=datetime.now(),
-                access_count=1,
-                ttl_seconds=ttl_seconds,
-                data_size=data_size,
-                cache_level=CacheLevel.L1_MEMORY
-            )
-            
-            self.l1_cache[cache_key] = entry
-    
-    async def _l1_evict(self):
-        """L1 cache eviction (LRU strategy)"""
-        with self.l1_cache_lock:
-            if not self.l1_cache:
-                return
-            
-            # Strategy'ye göre eviction
-            if self.config.eviction_strategy == CacheStrategy.LRU:
-                # En az recently used'ı bul
-                oldest_key = min(
-                    self.l1_cache.keys(),
-                    key=lambda k: self.l1_cache[k].last_accessed
-                )
-                del self.l1_cache[oldest_key]
-                
-            elif self.config.eviction_strategy == CacheStrategy.LFU:
-                # En az frequently used'ı bul
-                least_freq_key = min(
-                    self.l1_cache.keys(),
-                    key=lambda k: self.l1_cache[k].access_count
-                )
-                del self.l1_cache[least_freq_key]
-                
-            elif self.config.eviction_strategy == CacheStrategy.ADAPTIVE:
-                # Adaptive eviction - access frequency + recency
-                scores = {}
-                now = datetime.now()
-                
-                for key, entry in self.l1_cache.items():
-                    recency_score = 1.0 / max(entry.time_since_access / 3600, 0.1)
-                    frequency_score = entry.access_frequency
-                    scores[key] = recency_score * 0.6 + frequency_score * 0.4
-                
-                worst_key = min(scores.keys(), key=lambda k: scores[k])
-                del self.l1_cache[worst_key]
-            
-            self.metrics.evictions += 1
-    
     async def get(self, namespace: str, identifier: str, 
                   data_hash: Optional[str] = None) -> Optional[Any]:
         """
@@ -501,37 +479,22 @@ class AdvancedBehavioralCacheManager:
             Cached data or None
         """
         start_time = time.time()
-        cache_key = self._generate_cache_key(namespace, identifier, data_hash)
+        cache_key = None
         
         try:
+            cache_key = await self._cache_key(namespace, identifier, data_hash)
+            
             # Track access
             self._track_access(cache_key)
             
-            # L1 Memory cache check
-            l1_entry = await self._l1_get(cache_key)
-            if l1_entry:
+            # L1 -> L2 lookup (L2 miss'leri key başına tek Redis çağrısı)
+            data = await self.engine.get(cache_key)
+            if data is not None:
                 response_time = time.time() - start_time
                 self.metrics.response_times.append(response_time)
-                return l1_entry.data
-            
-            # L2 Redis cache check
-            if self.redis_client:
-                redis_data = await self.redis_client.get(cache_key)
-                if redis_data:
-                    # Deserialize
-                    data = await self._deserialize_data(redis_data)
-                    if data is not None:
-                        # Promote to L1 cache
-                        dynamic_ttl = self._calculate_dynamic_ttl(cache_key)
-                        await self._l1_set(cache_key, data, dynamic_ttl)
-                        
-                        self.metrics.l2_hits += 1
-                        response_time = time.time() - start_time
-                        self.metrics.response_times.append(response_time)
-                        return data
+                return data
             
             # Cache miss
-            self.metrics.misses += 1
             response_time = time.time() - start_time
             self.metrics.response_times.append(response_time)
             
@@ -562,23 +525,16 @@ class AdvancedBehavioralCacheManager:
         Returns:
             True if successful
         """
-        cache_key = self._generate_cache_key(namespace, identifier, data_hash)
+        cache_key = None
         
         try:
+            cache_key = await self._cache_key(namespace, identifier, data_hash)
+            
             # Dynamic TTL calculation
             dynamic_ttl = ttl_seconds or self._calculate_dynamic_ttl(cache_key)
             
-            # L1 Memory cache set
-            await self._l1_set(cache_key, data, dynamic_ttl)
-            
-            # L2 Redis cache set
-            if self.redis_client:
-                serialized_data = await self._serialize_data(data)
-                await self.redis_client.setex(
-                    cache_key, 
-                    dynamic_ttl, 
-                    serialized_data
-                )
+            # L1 + L2 set (diğer süreçlerin L1 kopyaları bus ile düşer)
+            await self.engine.set(cache_key, data, ttl=dynamic_ttl)
             
             self.metrics.sets += 1
             return True
@@ -596,45 +552,26 @@ class AdvancedBehavioralCacheManager:
             identifier: Specific identifier or "*" for all
             
         Returns:
-            Number of invalidated entries
+            Number of invalidated entries ("*" için sadece L1; L2 key'leri
+            generation artışıyla erişilmez olur ve arka planda silinir)
         """
         try:
-            invalidated_count = 0
-            
             if identifier == "*":
-                # Namespace-wide invalidation
-                pattern = f"{self.config.key_prefix}{namespace}{self.config.namespace_separator}*"
+                # Namespace-wide invalidation: tek HINCRBY, keyspace taranmaz.
+                # Eski generation L2 key'lerine artık erişilmez; reaper/TTL siler.
+                await self.generations.bump(namespace)
+                self.engine.invalidation_bus.publish(self._generations_bus_name, namespaces=(namespace,))
                 
-                # L1 cache invalidation
-                with self.l1_cache_lock:
-                    keys_to_remove = [
-                        key for key in self.l1_cache.keys()
-                        if key.startswith(f"{self.config.key_prefix}{namespace}{self.config.namespace_separator}")
-                    ]
-                    for key in keys_to_remove:
-                        del self.l1_cache[key]
-                        invalidated_count += 1
-                
-                # L2 Redis invalidation
-                if self.redis_client:
-                    redis_keys = await self.redis_client.keys(pattern)
-                    if redis_keys:
-                        await self.redis_client.delete(*redis_keys)
-                        invalidated_count += len(redis_keys)
+                # L1 (tüm generation'lar): "ns:" generation 0, "ns@" sonrakiler
+                sep = self.config.namespace_separator
+                head = self.config.key_prefix + sep + namespace
+                invalidated_count = 0
+                for prefix in (head + sep, head + "@"):
+                    invalidated_count += await self.engine.invalidate_prefix(prefix, l2=False)
             else:
                 # Specific key invalidation
-                cache_key = self._generate_cache_key(namespace, identifier)
-                
-                # L1 invalidation
-                with self.l1_cache_lock:
-                    if cache_key in self.l1_cache:
-                        del self.l1_cache[cache_key]
-                        invalidated_count += 1
-                
-                # L2 invalidation
-                if self.redis_client:
-                    result = await self.redis_client.delete(cache_key)
-                    invalidated_count += result
+                cache_key = await self._cache_key(namespace, identifier)
+                invalidated_count = int(await self.engine.delete(cache_key))
             
             self.metrics.invalidations += invalidated_count
             logger.info(f"🗑️ Cache invalidated", 
@@ -693,17 +630,9 @@ class AdvancedBehavioralCacheManager:
                 await asyncio.sleep(self.cleanup_interval)
                 
                 # L1 cleanup
-                expired_keys = []
-                with self.l1_cache_lock:
-                    for key, entry in self.l1_cache.items():
-                        if entry.is_expired:
-                            expired_keys.append(key)
-                    
-                    for key in expired_keys:
-                        del self.l1_cache[key]
-                
-                if expired_keys:
-                    logger.info(f"🧹 L1 cleanup: {len(expired_keys)} expired entries")
+                expired_count = await self.engine.purge_expired()
+                if expired_count:
+                    logger.info(f"🧹 L1 cleanup: {expired_count} expired entries")
                 
                 # Access patterns cleanup
                 cutoff = datetime.now() - timedelta(hours=24)
@@ -728,10 +657,8 @@ class AdvancedBehavioralCacheManager:
             try:
                 await asyncio.sleep(60)  # 1 minute
                 
-                # L1 memory usage
-                with self.l1_cache_lock:
-                    total_size = sum(entry.data_size for entry in self.l1_cache.values())
-                    self.metrics.memory_usage_mb = total_size / (1024 * 1024)
+                # L1 sayaçları ve memory usage engine'den
+                self._sync_metrics()
                 
                 # Redis memory usage
                 if self.redis_client:
@@ -747,8 +674,18 @@ class AdvancedBehavioralCacheManager:
             except Exception as e:
                 logger.error(f"❌ Metrics update error: {e}")
     
+    def _sync_metrics(self):
+        """Hit/miss/eviction/memory sayaçlarını engine'den al"""
+        stats = self.engine.stats
+        self.metrics.l1_hits = stats["hits"]["l1"]
+        self.metrics.l2_hits = stats["hits"]["l2"]
+        self.metrics.misses = stats["misses"]
+        self.metrics.evictions = stats["evictions"]
+        self.metrics.memory_usage_mb = self.engine.l1_bytes / (1024 * 1024)
+    
     async def get_advanced_metrics(self) -> Dict[str, Any]:
         """Gelişmiş cache metrics"""
+        self._sync_metrics()
         
         # Popular keys analysis
         popular_keys_info = []
@@ -788,6 +725,7 @@ class AdvancedBehavioralCacheManager:
             "popular_keys": popular_keys_info,
             "access_patterns": len(self.access_patterns),
             "background_tasks": len(self.background_tasks),
+            "engine": self.engine.get_stats(),
             "cache_warming": {
                 "enabled": self.config.cache_warming_enabled,
                 "requests": self.metrics.cache_warming_requests,
@@ -813,13 +751,15 @@ class AdvancedBehavioralCacheManager:
             # Increase L1 cache size
             if self.config.l1_cache_size < 2000:
                 old_size = self.config.l1_cache_size
-                self.config.l1_cache_size = min(old_size * 1.5, 2000)
+                self.config.l1_cache_size = int(min(old_size * 1.5, 2000))
+                await self.engine.update_policy(max_size=self.config.l1_cache_size)
                 changes_made.append(f"L1 cache size: {old_size} → {self.config.l1_cache_size}")
             
             # Increase base TTL
             if self.config.base_ttl_seconds < 7200:
                 old_ttl = self.config.base_ttl_seconds
-                self.config.base_ttl_seconds = min(old_ttl * 1.2, 7200)
+                self.config.base_ttl_seconds = int(min(old_ttl * 1.2, 7200))
+                await self.engine.update_policy(ttl=self.config.base_ttl_seconds)
                 changes_made.append(f"Base TTL: {old_ttl}s → {self.config.base_ttl_seconds}s")
             
             recommendations.append("Increase cache warming frequency")
@@ -829,7 +769,8 @@ class AdvancedBehavioralCacheManager:
             # Can reduce cache size to save memory
             if self.config.l1_cache_size > 500:
                 old_size = self.config.l1_cache_size
-                self.config.l1_cache_size = max(old_size * 0.8, 500)
+                self.config.l1_cache_size = int(max(old_size * 0.8, 500))
+                await self.engine.update_policy(max_size=self.config.l1_cache_size)
                 changes_made.append(f"L1 cache size optimized: {old_size} → {self.config.l1_cache_size}")
         
         # Memory optimization
@@ -863,6 +804,10 @@ class AdvancedBehavioralCacheManager:
     async def close(self):
         """Cache sistemini kapat"""
         try:
+            self.engine.invalidation_bus.unregister(self._generations_bus_name, self._apply_remote_generations)
+            await self.engine.stop()
+            CacheManagerFactory.release(self.engine)
+            
             # Background tasks'ı iptal et
             for task in self.background_tasks:
                 task.cancel()
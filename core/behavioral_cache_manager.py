@@ -38,7 +38,8 @@ except ImportError:
 
 # Cache data structures
 from dataclasses import dataclass, field
-import pickle
+
+from core.smart_cache_manager import CacheManagerFactory, CachePolicy, CacheStrategy, SmartCacheManager
 
 logger = structlog.get_logger("behavioral_cache")
 
@@ -76,6 +77,10 @@ class CacheConfig:
     key_prefix: str = "behavioral:"
     compression: bool = True
     max_memory_mb: int = 512
+    
+    # L1 (process içi) limitleri
+    l1_max_entries: int = 5000
+    l1_max_mb: int = 32
 
 class BehavioralCacheManager:
     """
@@ -88,9 +93,24 @@ class BehavioralCacheManager:
         self.config = config or CacheConfig()
         self.metrics = CacheMetrics()
         self.redis_client: Optional[aioredis.Redis] = None
-        self.fallback_cache: Dict[str, Dict] = {}  # Memory fallback
         self.is_redis_available = REDIS_AVAILABLE
         
+        # L1 + L2 ortak cache engine'i; Redis yoksa sadece L1 çalışır
+        self.engine: SmartCacheManager = CacheManagerFactory.create(
+            "behavioral",
+            CachePolicy(
+                strategy=CacheStrategy.LRU,
+                ttl=self.config.predictive_ttl,
+                max_size=self.config.l1_max_entries,
+                max_bytes=self.config.l1_max_mb * 1024 * 1024,
+                compression=self.config.compression,
+                persistence=True,
+                shared_l2=True
+            ),
+            key_prefix="",
+            unique=True
+        )
+        
         logger.info("🗄️ Behavioral Cache Manager başlatılıyor...")
     
     async def initialize(self) -> bool:
@@ -98,6 +118,7 @@ class BehavioralCacheManager:
         
         if not self.is_redis_available:
             logger.warning("⚠️ Redis kullanılamıyor, memory cache kullanılacak")
+            await self.engine.start()
             return True
         
         try:
@@ -128,6 +149,9 @@ class BehavioralCacheManager:
             except Exception as e:
                 logger.warning(f"⚠️ Redis memory config ayarlanamadı: {e}")
             
+            self.engine.redis = self.redis_client
+            await self.engine.start()
+            
             logger.info("✅ Redis cache bağlantısı başarılı")
             return True
             
@@ -135,6 +159,8 @@ class BehavioralCacheManager:
             logger.error(f"❌ Redis bağlantı hatası: {e}")
             logger.info("🔄 Memory cache fallback aktif")
             self.redis_client = None
+            self.engine.redis = None
+            await self.engine.start()
             return True
     
     def _generate_cache_key(self, 
@@ -158,32 +184,6 @@ class BehavioralCacheManager:
         except Exception:
             return hashlib.md5(str(data).encode()).hexdigest()[:16]
     
-    async def _serialize_data(self, data: Any) -> bytes:
-        """Data serialization"""
-        try:
-            if self.config.compression:
-                import zlib
-                serialized = pickle.dumps(data)
-                return zlib.compress(serialized)
-            else:
-                return pickle.dumps(data)
-        except Exception as e:
-            logger.error(f"❌ Serialization hatası: {e}")
-            return pickle.dumps({"error": str(e)})
-    
-    async def _deserialize_data(self, data: bytes) -> Any:
-        """Data deserialization"""
-        try:
-            if self.config.compression:
-                import zlib
-                decompressed = zlib.decompress(data)
-                return pickle.loads(decompressed)
-            else:
-                return pickle.loads(data)
-        except Exception as e:
-            logger.error(f"❌ Deserialization hatası: {e}")
-            return None
-    
     async def set_big_five_cache(self, 
                                 user_id: int, 
                                 messages: List[str], 
@@ -205,20 +205,7 @@ class BehavioralCacheManager:
                 "data_hash": data_hash
             }
             
-            serialized_data = await self._serialize_data(cache_data)
-            
-            if self.redis_client:
-                await self.redis_client.setex(
-                    cache_key, 
-                    self.config.big_five_ttl, 
-                    serialized_data
-                )
-            else:
-                # Memory fallback
-                self.fallback_cache[cache_key] = {
-                    "data": cache_data,
-                    "expires": time.time() + self.config.big_five_ttl
-                }
+            await self.engine.set(cache_key, cache_data, ttl=self.config.big_five_ttl)
             
             # Metrics
             self.metrics.sets += 1
@@ -243,20 +230,7 @@ class BehavioralCacheManager:
             data_hash = self._hash_data(messages)
             cache_key = self._generate_cache_key("big_five", user_id, data_hash)
             
-            cached_data = None
-            
-            if self.redis_client:
-                cached_bytes = await self.redis_client.get(cache_key)
-                if cached_bytes:
-                    cached_data = await self._deserialize_data(cached_bytes)
-            else:
-                # Memory fallback
-                fallback_item = self.fallback_cache.get(cache_key)
-                if fallback_item and fallback_item["expires"] > time.time():
-                    cached_data = fallback_item["data"]
-                elif fallback_item:
-                    # Expired, remove
-                    del self.fallback_cache[cache_key]
+            cached_data = await self.engine.get(cache_key)
             
             # Metrics
             response_time = time.time() - start_time
@@ -292,19 +266,7 @@ class BehavioralCacheManager:
                 "profile_hash": profile_hash
             }
             
-            serialized_data = await self._serialize_data(cache_data)
-            
-            if self.redis_client:
-                await self.redis_client.setex(
-                    cache_key,
-                    self.config.predictive_ttl,
-                    serialized_data
-                )
-            else:
-                self.fallback_cache[cache_key] = {
-                    "data": cache_data,
-                    "expires": time.time() + self.config.predictive_ttl
-                }
+            await self.engine.set(cache_key, cache_data, ttl=self.config.predictive_ttl)
             
             self.metrics.sets += 1
             logger.debug(f"✅ Predictive cache set: {user_id}")
@@ -323,18 +285,7 @@ class BehavioralCacheManager:
             profile_hash = self._hash_data(profile_data)
             cache_key = self._generate_cache_key("predictive", user_id, profile_hash)
             
-            cached_data = None
-            
-            if self.redis_client:
-                cached_bytes = await self.redis_client.get(cache_key)
-                if cached_bytes:
-                    cached_data = await self._deserialize_data(cached_bytes)
-            else:
-                fallback_item = self.fallback_cache.get(cache_key)
-                if fallback_item and fallback_item["expires"] > time.time():
-                    cached_data = fallback_item["data"]
-                elif fallback_item:
-                    del self.fallback_cache[cache_key]
+            cached_data = await self.engine.get(cache_key)
             
             if cached_data:
                 self.metrics.hits += 1
@@ -355,21 +306,10 @@ class BehavioralCacheManager:
         try:
             pattern = f"{self.config.key_prefix}*:{user_id}:*"
             
-            if self.redis_client:
-                # Redis'de pattern matching ile sil
-                keys = await self.redis_client.keys(pattern)
-                if keys:
-                    deleted = await self.redis_client.delete(*keys)
-                    self.metrics.deletes += deleted
-                    logger.info(f"🗑️ User cache invalidated: {user_id} ({deleted} keys)")
-            else:
-                # Memory fallback
-                keys_to_delete = [k for k in self.fallback_cache.keys() 
-                                if k.startswith(f"{self.config.key_prefix}") and f":{user_id}:" in k]
-                for key in keys_to_delete:
-                    del self.fallback_cache[key]
-                self.metrics.deletes += len(keys_to_delete)
-                logger.info(f"🗑️ User memory cache invalidated: {user_id} ({len(keys_to_delete)} keys)")
+            # L1 + L2 (SCAN) pattern silme; diğer süreçlerin L1 kopyaları da düşer
+            deleted = await self.engine.invalidate_pattern(pattern)
+            self.metrics.deletes += deleted
+            logger.info(f"🗑️ User cache invalidated: {user_id} ({deleted} keys)")
             
             return True
             
@@ -407,7 +347,8 @@ class BehavioralCacheManager:
                     "avg_response_time": self.metrics.avg_response_time
                 },
                 "redis_info": redis_info,
-                "memory_cache_size": len(self.fallback_cache),
+                "memory_cache_size": len(self.engine.l1_cache),
+                "engine": self.engine.get_stats(),
                 "last_updated": self.metrics.last_updated.isoformat()
             }
             
@@ -417,8 +358,9 @@ class BehavioralCacheManager:
     
     def _update_avg_response_time(self, response_time: float):
         """Average response time güncelle"""
+        # get yolunda hit/miss bu çağrıdan sonra sayılır
         total_ops = self.metrics.hits + self.metrics.misses + self.metrics.sets
-        if total_ops == 1:
+        if total_ops <= 1:
             self.metrics.avg_response_time = response_time
         else:
             # Moving average
@@ -427,23 +369,12 @@ class BehavioralCacheManager:
             )
     
     async def cleanup_expired(self) -> int:
-        """Expired entries temizle (memory cache için)"""
-        
-        if self.redis_client:
-            return 0  # Redis kendi expired key'leri temizler
+        """Expired entries temizle (L1 için; Redis kendi expired key'lerini temizler)"""
         
         try:
-            current_time = time.time()
-            expired_keys = [
-                key for key, item in self.fallback_cache.items()
-                if item["expires"] < current_time
-            ]
-            
-            for key in expired_keys:
-                del self.fallback_cache[key]
-            
-            logger.debug(f"🧹 Cleaned up {len(expired_keys)} expired cache entries")
-            return len(expired_keys)
+            expired_count = await self.engine.purge_expired()
+            logger.debug(f"🧹 Cleaned up {expired_count} expired cache entries")
+            return expired_count
             
         except Exception as e:
             logger.error(f"❌ Cache cleanup hatası: {e}")
@@ -451,6 +382,8 @@ class BehavioralCacheManager:
     
     async def close(self):
         """Cache bağlantısını kapat"""
+        await self.engine.stop()
+        CacheManagerFactory.release(self.engine)
         if self.redis_client:
             await self.redis_client.close()
             logger.info("📦 Redis cache bağlantısı kapatıldı")
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# core/cache_generations.py - Namespace Generation'ları ve Orphan Reaper
+
+"""
+Namespace Generations
+=====================
+
+Wildcard invalidation (KEYS/SCAN + DELETE) büyük bir Redis'te sunucuyu
+bloklar. Bunun yerine her namespace'in bir generation sayacı vardır ve
+sayaç key'in içine gömülür (``ns`` -> ``ns@3``). Namespace'i invalidate
+etmek tek bir HINCRBY'dir; eski generation'daki key'lere artık erişilmez.
+
+- Generation 0 eski (versiyonsuz) key düzenini kullanır; geçişte cache
+  soğumaz.
+- Sayaçlar süreç içinde ``refresh_interval`` kadar tutulur, her get için
+  Redis'e gidilmez.
+- Yetim (eski generation) key'ler TTL ile veya ``OrphanReaper`` ile hız
+  sınırlı SCAN + UNLINK kullanılarak temizlenir.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger("gavatcore.cache_generations")
+
+GENERATION_MARK = "@"
+
+
+def versioned(namespace: str, generation: int) -> str:
+    """Key'e gömülen namespace segmenti (generation 0: versiyonsuz)"""
+    if generation == 0:
+        return namespace
+    return f"{namespace}{GENERATION_MARK}{generation}"
+
+
+def split_versioned(segment: str) -> Tuple[str, int]:
+    """``versioned`` tersi: ``"ns@3"`` -> ``("ns", 3)``, ``"ns"`` -> ``("ns", 0)``"""
+    namespace, mark, generation = segment.rpartition(GENERATION_MARK)
+    if not mark or not generation.isdigit():
+        return segment, 0
+    return namespace, int(generation)
+
+
+def _decode(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class NamespaceGenerations:
+    """Namespace başına generation sayacı (Redis hash + kısa süreli yerel kopya)"""
+    
+    def __init__(self, hash_key: str, redis: Any = None, refresh_interval: float = 5.0):
+        self.hash_key = hash_key
+        self.redis = redis
+        self.refresh_interval = refresh_interval
+        self._local: Dict[str, Tuple[int, float]] = {}  # namespace -> (generation, okunma zamanı)
+    
+    async def current(self, namespace: str) -> int:
+        """Namespace'in güncel generation'ı"""
+        cached = self._local.get(namespace)
+        now = time.monotonic()
+        
+        # Redis yoksa yerel sayaç tek kaynak
+        if cached is not None and (self.redis is None or now - cached[1] < self.refresh_interval):
+            return cached[0]
+        
+        generation = cached[0] if cached is not None else 0
+        if self.redis is not None:
+            try:
+                value = await self.redis.hget(self.hash_key, namespace)
+                generation = int(value) if value is not None else 0
+            except Exception as e:
+                # Son bilinen değerle devam et
+                logger.warning(f"Generation okunamadı: {e}", namespace=namespace)
+        
+        self._local[namespace] = (generation, now)
+        return generation
+    
+    async def bump(self, namespace: str) -> int:
+        """Namespace'i invalidate et: generation'ı artır (tek HINCRBY)"""
+        if self.redis is not None:
+            generation = int(await self.redis.hincrby(self.hash_key, namespace, 1))
+        else:
+            cached = self._local.get(namespace)
+            generation = (cached[0] if cached is not None else 0) + 1
+        
+        self._local[namespace] = (generation, time.monotonic())
+        return generation
+    
+    def forget(self, namespaces: Iterable[str]) -> None:
+        """Yerel kopyaları düşür (başka süreç generation artırdığında)"""
+        for namespace in namespaces:
+            self._local.pop(namespace, None)
+    
+    async def snapshot(self) -> Dict[str, int]:
+        """Tüm namespace generation'ları"""
+        if self.redis is None:
+            return {namespace: generation for namespace, (generation, _) in self._local.items()}
+        
+        raw = await self.redis.hgetall(self.hash_key)
+        return {_decode(namespace): int(generation) for namespace, generation in raw.items()}
+
+
+async def scan_delete(
+    redis: Any,
+    match: str,
+    predicate: Optional[Callable[[str], bool]] = None,
+    scan_count: int = 500,
+    max_keys_per_second: int = 5000,
+) -> Tuple[int, int]:
+    """Pattern'e (ve ``predicate``'e) uyan key'leri SCAN + UNLINK ile sil
+    
+    Her SCAN sayfası en fazla ``scan_count`` key inceler; sayfalar arasında
+    beklenerek incelenen key hızı ``max_keys_per_second`` ile sınırlanır.
+    UNLINK belleği Redis'in arka plan thread'inde serbest bırakır.
+    
+    Returns:
+        (incelenen, silinen) key sayıları
+    """
+    pause = scan_count / max(max_keys_per_second, 1)
+    scanned = deleted = 0
+    cursor = 0
+    
+    while True:
+        cursor, keys = await redis.scan(cursor, match=match, count=scan_count)
+        scanned += len(keys)
+        
+        if predicate is not None:
+            keys = [key for key in keys if predicate(_decode(key))]
+        if keys:
+            deleted += await redis.unlink(*keys)
+        
+        if int(cursor) == 0:
+            return scanned, deleted
+        await asyncio.sleep(pause)
+
+
+class OrphanReaper:
+    """Eski generation'lardaki key'leri arka planda, hız sınırlı silen görev
+    
+    ``parse_key`` key'den ``(namespace, generation)`` çıkarır; bu cache'e
+    ait olmayan key'ler için None döner. Generation'lar son geçişten beri
+    değişmediyse keyspace taranmaz.
+    """
+    
+    def __init__(
+        self,
+        generations: NamespaceGenerations,
+        match: str,
+        parse_key: Callable[[str], Optional[Tuple[str, int]]],
+        interval: float = 300.0,
+        scan_count: int = 500,
+        max_keys_per_second: int = 2000,
+    ):
+        self.generations = generations
+        self.match = match
+        self.parse_key = parse_key
+        self.interval = interval
+        self.scan_count = scan_count
+        self.max_keys_per_second = max_keys_per_second
+        
+        self._reaped_snapshot: Optional[Dict[str, int]] = None
+        self.stats = {"passes": 0, "scanned": 0, "reaped": 0, "errors": 0}
+    
+    def _is_orphan(self, key: str, current: Dict[str, int]) -> bool:
+        parsed = self.parse_key(key)
+        if parsed is None:
+            return False
+        namespace, generation = parsed
+        return generation < current.get(namespace, 0)
+    
+    async def reap_once(self, force: bool = False) -> int:
+        """Tek tarama geçişi; silinen key sayısını döndürür"""
+        redis = self.generations.redis
+        if redis is None:
+            return 0
+        
+        current = await self.generations.snapshot()
+        if not force and current == self._reaped_snapshot:
+            return 0
+        
+        scanned, deleted = await scan_delete(
+            redis,
+            self.match,
+            lambda key: self._is_orphan(key, current),
+            scan_count=self.scan_count,
+            max_keys_per_second=self.max_keys_per_second,
+        )
+        
+        self._reaped_snapshot = current
+        self.stats["passes"] += 1
+        self.stats["scanned"] += scanned
+        self.stats["reaped"] += deleted
+        if deleted:
+            logger.info(f"🧹 Orphan reaper: {deleted} eski generation key silindi", scanned=scanned)
+        return deleted
+    
+    async def run(self) -> None:
+        """Periyodik reaper döngüsü"""
+        while True:
+            try:
+                await self.reap_once()
+                await asyncio.sleep(self.interval)
+            
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Orphan reaper hatası: {e}")
+                await asyncio.sleep(self.interval)
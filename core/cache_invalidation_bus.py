@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# core/cache_invalidation_bus.py - Süreçler Arası L1 Cache Invalidation
+
+"""
+Cache Invalidation Bus
+======================
+
+Birden fazla launcher süreci aynı Redis'i paylaşırken her biri kendi L1
+(memory) cache'ini tutar. Bir süreçte yapılan set/delete/invalidate, diğer
+süreçlerdeki L1 kopyalarını TTL dolana kadar bayat bırakır.
+
+Bu modül Redis pub/sub üzerinden key ve namespace tombstone'ları yayınlar:
+- Yayınlar cache başına toplanır ve ``flush_interval`` boyunca debounce
+  edilir; yazma patlamaları tek mesajda gider.
+- ``max_batch`` tombstone birikince beklemeden gönderilir.
+- Her süreç kendi mesajlarını ``node_id`` ile ayırt edip yok sayar.
+"""
+
+import asyncio
+import json
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import structlog
+
+logger = structlog.get_logger("gavatcore.cache_invalidation")
+
+# Tüm namespace'ler (cache'in tamamı) için tombstone
+ALL = "*"
+
+# handler(keys, namespaces) - L1 kopyalarını düşürür
+InvalidationHandler = Callable[[Set[str], Set[str]], None]
+
+
+class CacheInvalidationBus:
+    """Redis pub/sub invalidation bus (batched + debounced)"""
+    
+    CHANNEL = "gavatcore:cache_invalidation"
+    
+    def __init__(
+        self,
+        redis: Any = None,
+        channel: str = CHANNEL,
+        flush_interval: float = 0.05,
+        max_batch: int = 500,
+    ):
+        self.redis = redis
+        self.channel = channel
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.node_id = uuid.uuid4().hex
+        
+        # Aynı veriyi paylaşan birden çok engine aynı isimle kayıt olabilir
+        self._handlers: Dict[str, List[InvalidationHandler]] = defaultdict(list)
+        self._pending_keys: Dict[str, Set[str]] = defaultdict(set)
+        self._pending_namespaces: Dict[str, Set[str]] = defaultdict(set)
+        self._pending_count = 0
+        self._flush_task: Optional[asyncio.Task] = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._pubsub = None
+        
+        self.stats = {
+            "published_messages": 0,
+            "published_tombstones": 0,
+            "received_messages": 0,
+            "applied_tombstones": 0,
+            "errors": 0,
+        }
+    
+    @property
+    def is_running(self) -> bool:
+        return self._listener_task is not None and not self._listener_task.done()
+    
+    def _resolve_redis(self) -> Any:
+        """Açıkça verilmediyse paylaşılan utilities.redis_client'ı kullan"""
+        if self.redis is None:
+            try:
+                from utilities import redis_client as shared
+                self.redis = shared.redis_client
+            except ImportError:
+                self.redis = None
+        return self.redis
+    
+    async def start(self, redis: Any = None) -> bool:
+        """Kanala abone ol; Redis yoksa bus pasif kalır"""
+        if self.is_running:
+            return True
+        
+        if redis is not None:
+            self.redis = redis
+        if self._resolve_redis() is None:
+            return False
+        
+        try:
+            self._pubsub = self.redis.pubsub()
+            await self._pubsub.subscribe(self.channel)
+        except Exception as e:
+            logger.warning(f"Invalidation bus başlatılamadı: {e}")
+            self._pubsub = None
+            return False
+        
+        self._stopping = False
+        self._listener_task = asyncio.create_task(self._listen())
+        logger.info("Cache invalidation bus başlatıldı", channel=self.channel, node_id=self.node_id)
+        return True
+    
+    async def stop(self) -> None:
+        """Bekleyen tombstone'ları gönder ve aboneliği kapat"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        
+        if self._listener_task:
+            # get_message iptali mesajla yarışırsa yutabilir; bayrak döngüyü
+            # en geç bir get_message timeout'unda bitirir
+            self._stopping = True
+            self._listener_task.cancel()
+            await asyncio.gather(self._listener_task, return_exceptions=True)
+            self._listener_task = None
+        
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(self.channel)
+                await self._pubsub.close()
+            except Exception as e:
+                logger.debug(f"Pubsub kapatma hatası: {e}")
+            self._pubsub = None
+    
+    async def register(self, cache_name: str, handler: InvalidationHandler, redis: Any = None) -> None:
+        """Cache'i bus'a bağla; bus henüz çalışmıyorsa başlatmayı dene"""
+        if handler not in self._handlers[cache_name]:
+            self._handlers[cache_name].append(handler)
+        if not self.is_running:
+            await self.start(redis)
+    
+    def unregister(self, cache_name: str, handler: Optional[InvalidationHandler] = None) -> None:
+        """Handler'ı (verilmezse isimdeki tüm handler'ları) çıkar"""
+        handlers = self._handlers.get(cache_name, [])
+        if handler is not None and handler in handlers:
+            handlers.remove(handler)
+        if handler is None or not handlers:
+            self._handlers.pop(cache_name, None)
+    
+    def publish(
+        self,
+        cache_name: str,
+        keys: Iterable[str] = (),
+        namespaces: Iterable[str] = (),
+    ) -> None:
+        """Tombstone'ları kuyruğa al; debounce sonrası tek mesajda gönderilir"""
+        if not self.is_running:
+            return
+        
+        before = len(self._pending_keys[cache_name]) + len(self._pending_namespaces[cache_name])
+        self._pending_keys[cache_name].update(keys)
+        self._pending_namespaces[cache_name].update(namespaces)
+        after = len(self._pending_keys[cache_name]) + len(self._pending_namespaces[cache_name])
+        self._pending_count += after - before
+        
+        if self._pending_count >= self.max_batch:
+            asyncio.create_task(self.flush())
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+    
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+    
+    async def flush(self) -> int:
+        """Bekleyen tombstone'ları tek pub/sub mesajıyla gönder"""
+        if not self._pending_count:
+            return 0
+        
+        caches = {}
+        for cache_name in set(self._pending_keys) | set(self._pending_namespaces):
+            keys = self._pending_keys.get(cache_name) or set()
+            namespaces = self._pending_namespaces.get(cache_name) or set()
+            if not keys and not namespaces:
+                continue
+            
+            # Namespace ALL tekil key'leri kapsar
+            caches[cache_name] = {
+                "keys": [] if ALL in namespaces else sorted(keys),
+                "namespaces": sorted(namespaces),
+            }
+        
+        count = self._pending_count
+        self._pending_keys.clear()
+        self._pending_namespaces.clear()
+        self._pending_count = 0
+        
+        if not caches:
+            return 0
+        
+        message = json.dumps({"node": self.node_id, "caches": caches}, separators=(",", ":"))
+        try:
+            await self.redis.publish(self.channel, message)
+            self.stats["published_messages"] += 1
+            self.stats["published_tombstones"] += count
+        except Exception as e:
+            # Kaçan tombstone'ları TTL zaten kapatır; sadece kaydet
+            self.stats["errors"] += 1
+            logger.warning(f"Invalidation publish hatası: {e}")
+        
+        return count
+    
+    async def _listen(self) -> None:
+        """Kanal dinleyicisi"""
+        while not self._stopping:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is not None:
+                    self.apply(message.get("data"))
+            
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Invalidation listener hatası: {e}")
+                await asyncio.sleep(1.0)
+    
+    def apply(self, payload: Any) -> int:
+        """Gelen mesajı ilgili cache handler'larına uygula"""
+        if isinstance(payload, bytes):
+            payload = payload.decode()
+        
+        try:
+            message = json.loads(payload)
+        except (TypeError, ValueError):
+            return 0
+        
+        if message.get("node") == self.node_id:
+            return 0
+        
+        self.stats["received_messages"] += 1
+        applied = 0
+        for cache_name, tombstones in message.get("caches", {}).items():
+            keys = set(tombstones.get("keys", ()))
+            namespaces = set(tombstones.get("namespaces", ()))
+            for handler in list(self._handlers.get(cache_name, ())):
+                try:
+                    handler(keys, namespaces)
+                    applied += len(keys) + len(namespaces)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.error(f"Invalidation handler hatası: {e}", cache=cache_name)
+        
+        self.stats["applied_tombstones"] += applied
+        return applied
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.is_running,
+            "node_id": self.node_id,
+            "registered_caches": sorted(self._handlers),
+            "pending_tombstones": self._pending_count,
+            **self.stats,
+        }
+
+
+_bus: Optional[CacheInvalidationBus] = None
+
+
+def get_invalidation_bus() -> CacheInvalidationBus:
+    """Süreç genelindeki invalidation bus"""
+    global _bus
+    if _bus is None:
+        _bus = CacheInvalidationBus()
+    return _bus
@@ -21,14 +21,14 @@ oranlarını analiz eden sistem monitoring.
 """
 
 import asyncio
+import atexit
 import time
 import json
 import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
-from collections import defaultdict, deque
-import statistics
+from collections import Counter, deque
 import threading
 from pathlib import Path
 
@@ -83,14 +83,45 @@ class CachePerformanceMonitor:
     Real-time cache metrics tracking ve analiz.
     """
     
-    def __init__(self, log_file: str = "logs/cache_performance.json"):
+    def __init__(self,
+                 log_file: str = "logs/cache_performance.json",
+                 flush_interval: float = 1.0,
+                 ring_size: int = 10000,
+                 max_pending: int = 100000,
+                 max_tracked_keys: int = 200,
+                 raw_log: bool = False):
         self.log_file = Path(log_file)
         self.log_file.parent.mkdir(exist_ok=True)
         
-        # Metrics storage
-        self.metrics: deque = deque(maxlen=10000)  # Son 10k metric
-        self.hourly_stats: Dict[str, Dict] = defaultdict(dict)
-        self.daily_stats: Dict[str, Dict] = defaultdict(dict)
+        # Metrics storage - son ring_size metric (ring buffer)
+        self.metrics: deque = deque(maxlen=ring_size)
+        
+        # Aggregated rollups (raporlar bunları okur)
+        self.minute_stats: Dict[str, Dict] = {}
+        self.hourly_stats: Dict[str, Dict] = {}
+        self.daily_stats: Dict[str, Dict] = {}
+        self.max_tracked_keys = max_tracked_keys
+        self._rollup_lock = threading.Lock()
+        
+        # Batched writer: hot path sadece kuyruğa ekler, arka plan thread'i
+        # flush_interval'da bir toplu yazar ve rollup'ları günceller
+        self.flush_interval = flush_interval
+        self.raw_log = raw_log
+        self._pending: deque = deque(maxlen=max_pending)
+        self._flush_lock = threading.Lock()
+        self._writer_thread: Optional[threading.Thread] = None
+        self._writer_stop = threading.Event()
+        # writer_stats ve alert'ler hem request thread'lerinden hem writer
+        # thread'inden güncellenir; kısa kritik bölgeler için ayrı kilit
+        # (_rollup_lock tüm batch boyunca tutulduğundan hot path'te kullanılmaz)
+        self._stats_lock = threading.Lock()
+        self.writer_stats = {
+            'recorded': 0,
+            'flushed': 0,
+            'dropped': 0,
+            'flushes': 0,
+            'write_errors': 0
+        }
         
         # Performance thresholds
         self.thresholds = {
@@ -105,6 +136,7 @@ class CachePerformanceMonitor:
         self.alerts: deque = deque(maxlen=1000)
         self.last_alert_time: Dict[str, datetime] = {}
         self.alert_cooldown_minutes = 5
+        self._hit_rate_window = {'hits': 0, 'total': 0}
         
         # Background monitoring
         self.monitoring_active = False
@@ -124,6 +156,10 @@ class CachePerformanceMonitor:
         """
         Cache operation'ı kaydet.
         
+        Hot path'te dosya I/O'su yoktur: metric ring buffer'a ve yazma
+        kuyruğuna eklenir; JSON log ve rollup'lar writer thread'inde
+        toplu güncellenir.
+        
         Args:
             operation: hit, miss, set, delete, expire
             cache_key: Cache anahtarı
@@ -148,108 +184,163 @@ class CachePerformanceMonitor:
             # Memory storage
             self.metrics.append(metric)
             
-            # JSON log'a yaz
-            self._write_metric_to_log(metric)
+            # Writer kuyruğu (doluysa en eski metric düşer)
+            with self._stats_lock:
+                if len(self._pending) == self._pending.maxlen:
+                    self.writer_stats['dropped'] += 1
+                self._pending.append(metric)
+                self.writer_stats['recorded'] += 1
             
-            # Real-time analysis
-            self._update_real_time_stats(metric)
+            if self._writer_thread is None:
+                self._start_writer()
             
-            # Alert checking
+            # Alert checking (response time; hit rate flush sırasında)
             self._check_performance_alerts(metric)
             
-            logger.debug("📝 Cache metric recorded",
-                        operation=operation,
-                        key=cache_key,
-                        response_time=response_time_ms)
-            
         except Exception as e:
             logger.error("❌ Failed to record cache metric",
                         error=str(e),
                         operation=operation,
                         cache_key=cache_key)
     
-    def _write_metric_to_log(self, metric: CacheMetric) -> None:
-        """Metric'i JSON log dosyasına yaz."""
+    def _start_writer(self) -> None:
+        """Batched writer thread'ini başlat (ilk kayıtta)"""
+        with self._flush_lock:
+            if self._writer_thread is not None:
+                return
+            self._writer_stop.clear()
+            self._writer_thread = threading.Thread(
+                target=self._writer_loop, name="cache-monitor-writer", daemon=True
+            )
+            self._writer_thread.start()
+        atexit.register(self.close)
+    
+    def _writer_loop(self) -> None:
+        """Writer loop: flush_interval'da bir kuyruğu boşalt"""
+        while not self._writer_stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+    
+    def flush(self) -> int:
+        """Bekleyen metric'leri tek seferde log'a ekle ve rollup'lara işle"""
+        with self._flush_lock:
+            batch = []
+            while self._pending:
+                batch.append(self._pending.popleft())
+            if not batch:
+                return 0
+            
+            if self.raw_log:
+                self._write_metrics_to_log(batch)
+            self._update_rollups(batch)
+            self._check_hit_rate_alerts(batch)
+            
+            with self._stats_lock:
+                self.writer_stats['flushed'] += len(batch)
+                self.writer_stats['flushes'] += 1
+            return len(batch)
+    
+    def close(self) -> None:
+        """Writer thread'ini durdur; kalan metric'ler yazılır"""
+        thread = self._writer_thread
+        if thread is not None:
+            self._writer_stop.set()
+            thread.join(timeout=5)
+            self._writer_thread = None
+        self.flush()
+    
+    def _write_metrics_to_log(self, batch: List[CacheMetric]) -> None:
+        """Metric'leri JSON log dosyasına tek append ile yaz."""
         try:
-            log_entry = {
-                'timestamp': metric.timestamp.isoformat(),
-                'operation': metric.operation,
-                'cache_key': metric.cache_key,
-                'response_time_ms': metric.response_time_ms,
-                'cache_size_kb': metric.cache_size_kb,
-                'ttl_seconds': metric.ttl_seconds,
-                'user_id': metric.user_id,
-                'endpoint': metric.endpoint
-            }
+            lines = []
+            for metric in batch:
+                log_entry = {
+                    'timestamp': metric.timestamp.isoformat(),
+                    'operation': metric.operation,
+                    'cache_key': metric.cache_key,
+                    'response_time_ms': metric.response_time_ms,
+                    'cache_size_kb': metric.cache_size_kb,
+                    'ttl_seconds': metric.ttl_seconds,
+                    'user_id': metric.user_id,
+                    'endpoint': metric.endpoint
+                }
+                lines.append(json.dumps(log_entry) + '\n')
             
             with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(log_entry) + '\n')
+                f.write(''.join(lines))
                 
         except Exception as e:
-            logger.error("❌ Failed to write metric to log",
+            with self._stats_lock:
+                self.writer_stats['write_errors'] += 1
+            logger.error("❌ Failed to write metrics to log",
                         error=str(e),
                         log_file=str(self.log_file))
     
-    def _update_real_time_stats(self, metric: CacheMetric) -> None:
-        """Real-time istatistikleri güncelle."""
+    @staticmethod
+    def _new_rollup(start: datetime) -> Dict[str, Any]:
+        return {
+            'start': start,
+            'total_operations': 0,
+            'hits': 0,
+            'misses': 0,
+            'response_time_sum': 0.0,
+            'response_time_max': 0.0,
+            'operations_by_type': Counter(),
+            'top_keys': Counter(),
+            'cache_size_kb': None
+        }
+    
+    def _update_rollups(self, batch: List[CacheMetric]) -> None:
+        """Dakikalık, saatlik ve günlük rollup'ları güncelle."""
         try:
-            now = datetime.now()
-            hour_key = now.strftime('%Y-%m-%d %H:00')
-            day_key = now.strftime('%Y-%m-%d')
-            
-            # Hourly stats
-            if hour_key not in self.hourly_stats:
-                self.hourly_stats[hour_key] = {
-                    'total_operations': 0,
-                    'hits': 0,
-                    'misses': 0,
-                    'response_times': [],
-                    'operations_by_type': defaultdict(int),
-                    'top_keys': defaultdict(int)
-                }
-            
-            hour_stats = self.hourly_stats[hour_key]
-            hour_stats['total_operations'] += 1
-            hour_stats['response_times'].append(metric.response_time_ms)
-            hour_stats['operations_by_type'][metric.operation] += 1
-            hour_stats['top_keys'][metric.cache_key] += 1
-            
-            if metric.operation == 'hit':
-                hour_stats['hits'] += 1
-            elif metric.operation == 'miss':
-                hour_stats['misses'] += 1
-            
-            # Daily stats (similar structure)
-            if day_key not in self.daily_stats:
-                self.daily_stats[day_key] = {
-                    'total_operations': 0,
-                    'hits': 0,
-                    'misses': 0,
-                    'response_times': [],
-                    'operations_by_type': defaultdict(int),
-                    'top_keys': defaultdict(int)
-                }
-            
-            day_stats = self.daily_stats[day_key]
-            day_stats['total_operations'] += 1
-            day_stats['response_times'].append(metric.response_time_ms)
-            day_stats['operations_by_type'][metric.operation] += 1
-            day_stats['top_keys'][metric.cache_key] += 1
-            
-            if metric.operation == 'hit':
-                day_stats['hits'] += 1
-            elif metric.operation == 'miss':
-                day_stats['misses'] += 1
+            touched = {}
+            with self._rollup_lock:
+                for metric in batch:
+                    ts = metric.timestamp
+                    buckets = (
+                        (self.minute_stats, ts.strftime('%Y-%m-%d %H:%M'), ts.replace(second=0, microsecond=0)),
+                        (self.hourly_stats, ts.strftime('%Y-%m-%d %H:00'), ts.replace(minute=0, second=0, microsecond=0)),
+                        (self.daily_stats, ts.strftime('%Y-%m-%d'), ts.replace(hour=0, minute=0, second=0, microsecond=0)),
+                    )
+                    for stats, key, start in buckets:
+                        rollup = stats.get(key)
+                        if rollup is None:
+                            rollup = stats[key] = self._new_rollup(start)
+                        touched[id(rollup)] = rollup
+                        
+                        rollup['total_operations'] += 1
+                        rollup['response_time_sum'] += metric.response_time_ms
+                        if metric.response_time_ms > rollup['response_time_max']:
+                            rollup['response_time_max'] = metric.response_time_ms
+                        rollup['operations_by_type'][metric.operation] += 1
+                        rollup['top_keys'][metric.cache_key] += 1
+                        if metric.cache_size_kb is not None:
+                            rollup['cache_size_kb'] = metric.cache_size_kb
+                        
+                        if metric.operation == 'hit':
+                            rollup['hits'] += 1
+                        elif metric.operation == 'miss':
+                            rollup['misses'] += 1
+                
+                # Key sayaçları sınırlı kalsın
+                for rollup in touched.values():
+                    if len(rollup['top_keys']) > self.max_tracked_keys:
+                        rollup['top_keys'] = Counter(
+                            dict(rollup['top_keys'].most_common(self.max_tracked_keys))
+                        )
+                
+                # Dakikalık rollup'lar 2 saat tutulur
+                if len(self.minute_stats) > 120:
+                    for key in sorted(self.minute_stats)[:-120]:
+                        del self.minute_stats[key]
                 
         except Exception as e:
-            logger.error("❌ Failed to update real-time stats",
+            logger.error("❌ Failed to update rollups",
                         error=str(e))
     
     def _check_performance_alerts(self, metric: CacheMetric) -> None:
-        """Performance alert'lerini kontrol et."""
+        """Response time alert'lerini kontrol et."""
         try:
-            now = datetime.now()
-            
             # Response time alerts
             if metric.response_time_ms > self.thresholds['response_time_critical']:
                 self._create_alert(
@@ -269,39 +360,48 @@ class CachePerformanceMonitor:
                     self.thresholds['response_time_warning'],
                     "Monitor cache performance"
                 )
-            
-            # Check hit rate alerts (every 100 operations)
-            if len(self.metrics) % 100 == 0 and len(self.metrics) > 0:
-                recent_metrics = list(self.metrics)[-100:]
-                hits = sum(1 for m in recent_metrics if m.operation == 'hit')
-                total_cache_ops = sum(1 for m in recent_metrics if m.operation in ['hit', 'miss'])
-                
-                if total_cache_ops > 0:
-                    hit_rate = (hits / total_cache_ops) * 100
-                    
-                    if hit_rate < self.thresholds['hit_rate_critical']:
-                        self._create_alert(
-                            'critical',
-                            f"Critical hit rate: {hit_rate:.1f}%",
-                            'hit_rate',
-                            hit_rate,
-                            self.thresholds['hit_rate_critical'],
-                            "Review cache strategy and TTL values"
-                        )
-                    elif hit_rate < self.thresholds['hit_rate_warning']:
-                        self._create_alert(
-                            'warning',
-                            f"Low hit rate: {hit_rate:.1f}%",
-                            'hit_rate',
-                            hit_rate,
-                            self.thresholds['hit_rate_warning'],
-                            "Consider increasing cache TTL"
-                        )
                         
         except Exception as e:
             logger.error("❌ Failed to check performance alerts",
                         error=str(e))
     
+    def _check_hit_rate_alerts(self, batch: List[CacheMetric]) -> None:
+        """Flush edilen metric'lerle hit rate alert'lerini kontrol et."""
+        try:
+            window = self._hit_rate_window
+            window['hits'] += sum(1 for m in batch if m.operation == 'hit')
+            window['total'] += sum(1 for m in batch if m.operation in ('hit', 'miss'))
+            
+            # En az 100 hit/miss biriktikten sonra değerlendir
+            if window['total'] < 100:
+                return
+            
+            hit_rate = (window['hits'] / window['total']) * 100
+            window['hits'] = window['total'] = 0
+            
+            if hit_rate < self.thresholds['hit_rate_critical']:
+                self._create_alert(
+                    'critical',
+                    f"Critical hit rate: {hit_rate:.1f}%",
+                    'hit_rate',
+                    hit_rate,
+                    self.thresholds['hit_rate_critical'],
+                    "Review cache strategy and TTL values"
+                )
+            elif hit_rate < self.thresholds['hit_rate_warning']:
+                self._create_alert(
+                    'warning',
+                    f"Low hit rate: {hit_rate:.1f}%",
+                    'hit_rate',
+                    hit_rate,
+                    self.thresholds['hit_rate_warning'],
+                    "Consider increasing cache TTL"
+                )
+                        
+        except Exception as e:
+            logger.error("❌ Failed to check hit rate alerts",
+                        error=str(e))
+    
     def _create_alert(self,
                      severity: str,
                      message: str,
@@ -315,11 +415,6 @@ class CachePerformanceMonitor:
             alert_key = f"{severity}_{metric_type}"
             now = datetime.now()
             
-            if alert_key in self.last_alert_time:
-                time_since_last = (now - self.last_alert_time[alert_key]).total_seconds() / 60
-                if time_since_last < self.alert_cooldown_minutes:
-                    return  # Skip duplicate alert
-            
             alert = CacheAlert(
                 timestamp=now,
                 severity=severity,
@@ -330,8 +425,14 @@ class CachePerformanceMonitor:
                 action_required=action_required
             )
             
-            self.alerts.append(alert)
-            self.last_alert_time[alert_key] = now
+            # Cooldown kontrolü ve kayıt tek kritik bölgede (aynı alert iki
+            # thread'den aynı anda gelirse biri atlanır)
+            with self._stats_lock:
+                last = self.last_alert_time.get(alert_key)
+                if last is not None and (now - last).total_seconds() / 60 < self.alert_cooldown_minutes:
+                    return  # Skip duplicate alert
+                self.alerts.append(alert)
+                self.last_alert_time[alert_key] = now
             
             # Log alert
             logger.warning("⚠️ Cache performance alert",
@@ -356,6 +457,9 @@ class CachePerformanceMonitor:
         """
         Performance raporu oluştur.
         
+        Rapor ham metric'ler yerine rollup'lardan hesaplanır: son saat için
+        dakikalık, gün/hafta için saatlik rollup'lar kullanılır.
+        
         Args:
             time_period: "last_hour", "last_day", "last_week"
             
@@ -365,53 +469,57 @@ class CachePerformanceMonitor:
         try:
             now = datetime.now()
             
+            # Kuyruktaki metric'ler de rapora girsin
+            self.flush()
+            
             # Time period filtering
-            if time_period == "last_hour":
-                cutoff_time = now - timedelta(hours=1)
-            elif time_period == "last_day":
+            if time_period == "last_day":
                 cutoff_time = now - timedelta(days=1)
             elif time_period == "last_week":
                 cutoff_time = now - timedelta(weeks=1)
             else:
                 cutoff_time = now - timedelta(hours=1)
             
-            # Filter metrics
-            relevant_metrics = [
-                m for m in self.metrics 
-                if m.timestamp >= cutoff_time
-            ]
+            if time_period in ("last_day", "last_week"):
+                source = self.hourly_stats
+                cutoff_bucket = cutoff_time.replace(minute=0, second=0, microsecond=0)
+            else:
+                source = self.minute_stats
+                cutoff_bucket = cutoff_time.replace(second=0, microsecond=0)
+            
+            # Aggregate rollups
+            with self._rollup_lock:
+                rollups = sorted(
+                    (r for r in source.values() if r['start'] >= cutoff_bucket),
+                    key=lambda r: r['start']
+                )
+                total_operations = sum(r['total_operations'] for r in rollups)
+                cache_hits = sum(r['hits'] for r in rollups)
+                cache_misses = sum(r['misses'] for r in rollups)
+                response_time_sum = sum(r['response_time_sum'] for r in rollups)
+                peak_response_time = max((r['response_time_max'] for r in rollups), default=0.0)
+                cache_size_trends = [
+                    (r['start'], r['cache_size_kb']) for r in rollups
+                    if r['cache_size_kb'] is not None
+                ]
+                key_counts = Counter()
+                for r in rollups:
+                    key_counts.update(r['top_keys'])
             
-            if not relevant_metrics:
+            if not total_operations:
                 return self._create_empty_report(time_period)
             
             # Calculate statistics
-            total_operations = len(relevant_metrics)
-            cache_hits = sum(1 for m in relevant_metrics if m.operation == 'hit')
-            cache_misses = sum(1 for m in relevant_metrics if m.operation == 'miss')
-            
             total_cache_ops = cache_hits + cache_misses
             hit_rate = (cache_hits / max(total_cache_ops, 1)) * 100
-            
-            response_times = [m.response_time_ms for m in relevant_metrics]
-            avg_response_time = statistics.mean(response_times)
-            peak_response_time = max(response_times)
+            avg_response_time = response_time_sum / total_operations
             
             # Operations per second
             time_span_seconds = (now - cutoff_time).total_seconds()
             ops_per_second = total_operations / max(time_span_seconds, 1)
             
-            # Cache size trends
-            cache_size_trends = []
-            for m in relevant_metrics:
-                if m.cache_size_kb is not None:
-                    cache_size_trends.append((m.timestamp, m.cache_size_kb))
-            
             # Top accessed keys
-            key_counts = defaultdict(int)
-            for m in relevant_metrics:
-                key_counts[m.cache_key] += 1
-            
-            top_keys = sorted(key_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+            top_keys = key_counts.most_common(10)
             
             # Performance grade
             performance_grade = self._calculate_performance_grade(
@@ -571,6 +679,11 @@ class CachePerformanceMonitor:
             hourly_report = self.generate_performance_report("last_hour")
             daily_report = self.generate_performance_report("last_day")
             
+            # Writer thread'i yazarken tutarlı bir kopya al
+            with self._stats_lock:
+                alerts = list(self.alerts)
+                writer = dict(self.writer_stats, pending=len(self._pending))
+            
             # Recent alerts
             recent_alerts = [
                 {
@@ -581,7 +694,7 @@ class CachePerformanceMonitor:
                     'current_value': alert.current_value,
                     'action_required': alert.action_required
                 }
-                for alert in list(self.alerts)[-10:]  # Last 10 alerts
+                for alert in alerts[-10:]  # Last 10 alerts
             ]
             
             return {
@@ -591,8 +704,9 @@ class CachePerformanceMonitor:
                 'recent_alerts': recent_alerts,
                 'system_health': {
                     'monitoring_active': self.monitoring_active,
-                    'total_metrics_recorded': len(self.metrics),
-                    'alert_count_24h': len([a for a in self.alerts 
+                    'total_metrics_recorded': writer['recorded'],
+                    'writer': writer,
+                    'alert_count_24h': len([a for a in alerts 
                                           if (datetime.now() - a.timestamp).days < 1])
                 },
                 'thresholds': self.thresholds
@@ -620,6 +734,7 @@ class CachePerformanceMonitor:
         self.monitoring_active = False
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
+        self.flush()
         
         logger.info("🛑 Background cache monitoring stopped")
     
@@ -633,14 +748,14 @@ class CachePerformanceMonitor:
                 self.metrics.clear()
                 self.metrics.extend(metrics_to_keep)
                 
-                # Cleanup old hourly stats (keep last week)
+                # Cleanup old rollups (hourly: last week, daily: last 30 days)
                 week_ago = datetime.now() - timedelta(weeks=1)
-                keys_to_remove = [
-                    k for k in self.hourly_stats.keys()
-                    if datetime.strptime(k, '%Y-%m-%d %H:00') < week_ago
-                ]
-                for key in keys_to_remove:
-                    del self.hourly_stats[key]
+                month_ago = datetime.now() - timedelta(days=30)
+                with self._rollup_lock:
+                    for stats, cutoff in ((self.hourly_stats, week_ago), (self.daily_stats, month_ago)):
+                        keys_to_remove = [k for k, r in stats.items() if r['start'] < cutoff]
+                        for key in keys_to_remove:
+                            del stats[key]
                 
                 # Sleep for 5 minutes
                 time.sleep(300)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# core/cache_prefetch.py - Erişim Dizisine Dayalı Predictive Prefetch
+
+"""
+Markov Prefetcher
+=================
+
+Aynı kimliğe (ör. user id) ait key'ler genellikle sabit bir sırayla okunur:
+``profile:42`` -> ``persona:42`` -> ``conversation:42``. Bu modül namespace
+geçişleri üzerinde birinci dereceden bir Markov modeli tutar; A key'inde hit
+olduğunda aynı kimliğin en olası sonraki key'lerini önerir.
+
+- Geçişler kimlik başına son erişimden öğrenilir; ``session_gap``
+  saniyeden eski erişimler zinciri koparır.
+- Satır toplamı ``max_row_total``'ı aşınca sayaçlar yarıya iner; model
+  değişen trafiğe uyum sağlar.
+- Prefetch'ler token bucket (``budget_per_second``) ile sınırlıdır.
+- ``adapt`` son penceredeki isabet oranına göre olasılık eşiğini ayarlar.
+"""
+
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+
+@dataclass
+class PrefetchConfig:
+    """Prefetch ayarları"""
+    top_k: int = 2  # Hit başına en fazla önerilen key
+    min_probability: float = 0.3  # Geçiş olasılığı eşiği
+    min_observations: int = 5  # Satır bu kadar geçiş görmeden öneri yapılmaz
+    session_gap: float = 30.0  # Saniye; daha eski erişim zinciri koparır
+    budget_per_second: float = 20.0  # Token bucket: saniyede prefetch
+    max_inflight: int = 4  # Aynı anda çalışan prefetch
+    max_tracked_ids: int = 10000  # Son erişimi tutulan kimlik sayısı
+    max_row_total: int = 1000  # Aşılınca satır sayaçları yarıya iner
+    separator: str = ":"
+
+
+def split_key(key: str, separator: str = ":") -> Tuple[str, str]:
+    """``"profile:42"`` -> ``("profile", "42")``; separator yoksa kimlik boş"""
+    namespace, _, identifier = key.partition(separator)
+    return namespace, identifier
+
+
+class MarkovPrefetcher:
+    """Namespace geçişleri üzerinde birinci dereceden Markov modeli"""
+    
+    def __init__(self, config: PrefetchConfig = None):
+        self.config = config or PrefetchConfig()
+        self.min_probability = self.config.min_probability
+        
+        self._transitions: Dict[str, Counter] = {}
+        self._last: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()  # kimlik -> (namespace, zaman)
+        
+        self._tokens = self.config.budget_per_second
+        self._refilled_at = time.monotonic()
+        
+        self.stats = {
+            "observed": 0,
+            "transitions": 0,
+            "issued": 0,
+            "useful": 0,
+            "wasted": 0,
+            "budget_skips": 0,
+        }
+        self._window = {"issued": 0, "useful": 0}
+    
+    def observe(self, key: str, now: float = None) -> None:
+        """Erişimi kaydet; aynı kimliğin önceki namespace'inden geçişi say"""
+        namespace, identifier = split_key(key, self.config.separator)
+        if not identifier:
+            return
+        
+        now = time.monotonic() if now is None else now
+        self.stats["observed"] += 1
+        
+        previous = self._last.pop(identifier, None)
+        if previous is not None:
+            previous_namespace, seen_at = previous
+            if previous_namespace != namespace and now - seen_at <= self.config.session_gap:
+                self._count(previous_namespace, namespace)
+        
+        self._last[identifier] = (namespace, now)
+        if len(self._last) > self.config.max_tracked_ids:
+            self._last.popitem(last=False)
+    
+    def _count(self, source: str, target: str) -> None:
+        row = self._transitions.setdefault(source, Counter())
+        row[target] += 1
+        self.stats["transitions"] += 1
+        
+        if sum(row.values()) > self.config.max_row_total:
+            for namespace in list(row):
+                row[namespace] //= 2
+                if not row[namespace]:
+                    del row[namespace]
+    
+    def predict(self, key: str) -> List[Tuple[str, float]]:
+        """Hit alan key'den sonra en olası key'ler: [(key, olasılık)]"""
+        namespace, identifier = split_key(key, self.config.separator)
+        row = self._transitions.get(namespace)
+        if not identifier or not row:
+            return []
+        
+        total = sum(row.values())
+        if total < self.config.min_observations:
+            return []
+        
+        separator = self.config.separator
+        return [
+            (f"{target}{separator}{identifier}", count / total)
+            for target, count in row.most_common(self.config.top_k)
+            if count / total >= self.min_probability
+        ]
+    
+    def acquire(self) -> bool:
+        """Prefetch bütçesinden bir token al"""
+        now = time.monotonic()
+        rate = self.config.budget_per_second
+        self._tokens = min(rate, self._tokens + (now - self._refilled_at) * rate)
+        self._refilled_at = now
+        
+        if self._tokens < 1:
+            self.stats["budget_skips"] += 1
+            return False
+        
+        self._tokens -= 1
+        return True
+    
+    def record_issued(self) -> None:
+        self.stats["issued"] += 1
+        self._window["issued"] += 1
+    
+    def record_useful(self) -> None:
+        self.stats["useful"] += 1
+        self._window["useful"] += 1
+    
+    def record_wasted(self) -> None:
+        self.stats["wasted"] += 1
+    
+    def adapt(self, min_samples: int = 20) -> float:
+        """Son penceredeki isabet oranına göre olasılık eşiğini ayarla"""
+        issued = self._window["issued"]
+        if issued < min_samples:
+            return self.min_probability
+        
+        precision = self._window["useful"] / issued
+        if precision < 0.3:
+            self.min_probability = min(0.9, self.min_probability + 0.1)
+        elif precision > 0.7:
+            self.min_probability = max(0.1, self.min_probability - 0.05)
+        
+        self._window = {"issued": 0, "useful": 0}
+        return self.min_probability
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Model ve isabet istatistikleri"""
+        issued = self.stats["issued"]
+        return {
+            **self.stats,
+            "precision": self.stats["useful"] / issued if issued else 0.0,
+            "min_probability": self.min_probability,
+            "tracked_ids": len(self._last),
+            "model": {
+                source: {
+                    target: round(count / sum(row.values()), 3)
+                    for target, count in row.most_common(self.config.top_k)
+                }
+                for source, row in self._transitions.items()
+            },
+        }
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# core/cache_trace.py - Cache Erişim Trace Kaydı ve Offline Simülatör
+
+"""
+Cache Trace
+===========
+
+TTL ve boyut ayarlarını tahminle değil gerçek trafikle yapmak için:
+
+- ``CacheTraceRecorder`` her erişimi 17 byte'lık sabit kayıt olarak
+  (zaman, key hash, op, priority, boyut) ikili dosyaya yazar. Kayıtlar
+  bellekte biriktirilip ``buffer_bytes`` dolunca tek ``write`` ile eklenir.
+- Örnekleme key hash'ine göre yapılır (``sample_rate``); seçilen key'lerin
+  tüm erişimleri kaydedilir, bu yüzden örneklenmiş trace'te de reuse
+  mesafeleri korunur.
+- ``TraceSimulator`` trace'i SmartCacheManager'ın LRU/LFU/ADAPTIVE/PRIORITY
+  eviction kurallarıyla, trace'in kendi saatini kullanarak yeniden oynatır.
+
+Dosya düzeni: 8 byte magic + başlangıç zamanı (float64), ardından kayıtlar
+``<IQBI``: başlangıçtan beri milisaniye, blake2b-64 key hash,
+``op | priority << 4``, boyut (byte).
+"""
+
+import hashlib
+import heapq
+import itertools
+import os
+import struct
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+import structlog
+
+logger = structlog.get_logger("gavatcore.cache_trace")
+
+MAGIC = b"GCTRACE1"
+HEADER = struct.Struct("<8sd")
+RECORD = struct.Struct("<IQBI")
+
+OP_HIT = 1
+OP_MISS = 2
+OP_SET = 3
+OP_DELETE = 4
+OP_CLEAR = 5
+
+OP_NAMES = {OP_HIT: "hit", OP_MISS: "miss", OP_SET: "set", OP_DELETE: "delete", OP_CLEAR: "clear"}
+
+_MAX_U32 = 2 ** 32 - 1
+_SAMPLE_SPACE = 2 ** 24
+
+
+class TraceRecord(NamedTuple):
+    """Okunan trace kaydı (``timestamp`` trace başından beri saniye)"""
+    timestamp: float
+    key_hash: int
+    op: int
+    size: int
+    priority: int
+
+
+def key_hash(key: str) -> int:
+    """Süreçten bağımsız 64 bit key hash'i (Python ``hash`` salt'lıdır)"""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+
+class CacheTraceRecorder:
+    """Düşük maliyetli, opt-in ikili erişim trace'i"""
+    
+    def __init__(
+        self,
+        path: Union[str, Path],
+        sample_rate: float = 1.0,
+        buffer_bytes: int = 64 * 1024,
+        max_file_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.path = Path(path)
+        self.sample_rate = sample_rate
+        self.buffer_bytes = buffer_bytes
+        self.max_file_bytes = max_file_bytes
+        self._sample_below = int(sample_rate * _SAMPLE_SPACE)
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab")
+        self._written = self._file.tell()
+        
+        # Var olan trace'e ekleniyorsa zaman tabanı onun başlangıcıdır
+        if self._written >= HEADER.size:
+            with open(self.path, "rb") as existing:
+                magic, self._started = HEADER.unpack(existing.read(HEADER.size))
+            if magic != MAGIC:
+                self._file.close()
+                raise ValueError(f"Not a cache trace file: {self.path}")
+        else:
+            self._started = time.time()
+            self._file.write(HEADER.pack(MAGIC, self._started))
+            self._written = HEADER.size
+        
+        self._buffer = bytearray()
+        self.closed = False
+        self.stats = {"records": 0, "sampled_out": 0, "dropped": 0, "flushes": 0}
+    
+    def record(self, op: int, key: str, size: int = 0, priority: int = 0) -> None:
+        """Erişimi kaydet (event loop'ta, I/O sadece buffer dolunca)"""
+        if self.closed:
+            return
+        
+        hashed = key_hash(key) if key else 0
+        if self._sample_below < _SAMPLE_SPACE and hashed % _SAMPLE_SPACE >= self._sample_below:
+            self.stats["sampled_out"] += 1
+            return
+        
+        elapsed_ms = int((time.time() - self._started) * 1000)
+        if elapsed_ms > _MAX_U32 or self._written + len(self._buffer) >= self.max_file_bytes:
+            self.stats["dropped"] += 1
+            return
+        
+        self._buffer += RECORD.pack(
+            max(elapsed_ms, 0), hashed, op | (min(priority, 15) << 4), min(size, _MAX_U32)
+        )
+        self.stats["records"] += 1
+        
+        if len(self._buffer) >= self.buffer_bytes:
+            self.flush()
+    
+    def flush(self) -> None:
+        """Buffer'daki kayıtları dosyaya ekle"""
+        if not self._buffer or self.closed:
+            return
+        
+        try:
+            self._file.write(self._buffer)
+            self._file.flush()
+            self._written += len(self._buffer)
+            self.stats["flushes"] += 1
+        except OSError as e:
+            # Trace tanılama amaçlı; cache'i asla bozmamalı
+            logger.warning(f"Cache trace yazılamadı, kayıt durduruldu: {e}", path=str(self.path))
+            self.closed = True
+        self._buffer.clear()
+    
+    def close(self) -> None:
+        """Kalan kayıtları yaz ve dosyayı kapat"""
+        if self.closed:
+            return
+        self.flush()
+        self.closed = True
+        self._file.close()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "sample_rate": self.sample_rate,
+            "bytes_written": self._written,
+            "buffered_bytes": len(self._buffer),
+            **self.stats,
+        }
+
+
+def read_trace(path: Union[str, Path], chunk_records: int = 65536) -> Iterator[TraceRecord]:
+    """İkili trace'i kayıt kayıt oku"""
+    with open(path, "rb") as trace:
+        magic, _started = HEADER.unpack(trace.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"Not a cache trace file: {path}")
+        
+        while True:
+            chunk = trace.read(RECORD.size * chunk_records)
+            usable = len(chunk) - len(chunk) % RECORD.size  # Yarım kalmış son kayıt atlanır
+            if not usable:
+                return
+            
+            for elapsed_ms, hashed, op_byte, size in RECORD.iter_unpack(chunk[:usable]):
+                yield TraceRecord(elapsed_ms / 1000, hashed, op_byte & 0x0F, size, op_byte >> 4)
+
+
+def trace_path(directory: Union[str, Path], cache_name: str) -> Path:
+    """Cache'in trace dosyası (ad dosya sistemi için temizlenir)"""
+    safe_name = "".join(char if char.isalnum() or char in "._-" else "_" for char in cache_name)
+    return Path(directory) / f"{safe_name}.{os.getpid()}.trace"
+
+
+class _SimEntry:
+    __slots__ = ("size", "priority", "timestamp", "access_count")
+    
+    def __init__(self, size: int, priority: int, timestamp: float):
+        self.size = size
+        self.priority = priority
+        self.timestamp = timestamp
+        self.access_count = 0
+
+
+class TraceSimulator:
+    """Trace'i tek seviyeli (L1) cache üzerinde yeniden oynat
+    
+    Eviction kuralları SmartCacheManager ile aynıdır: LRU erişim sırası,
+    LFU en düşük frekansın en eskisi, ADAPTIVE en düşük
+    ``access_count / max(age, 1)`` skoru, PRIORITY en düşük priority'nin ilk
+    ekleneni. Yaşlar trace zamanından hesaplanır. Üretimde L2'den gelen hit
+    (simülasyonda miss) L1'e promote edilir; gerçek miss'lerde değer
+    uygulamanın sonraki SET'i ile gelir.
+    """
+    
+    STRATEGIES = ("lru", "lfu", "adaptive", "priority")
+    
+    def __init__(
+        self,
+        strategy: str,
+        max_size: int,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        priority_levels: int = 3,
+    ):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy}")
+        
+        self.strategy = strategy
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.priority_levels = priority_levels
+        
+        self._entries: "OrderedDict[int, _SimEntry]" = OrderedDict()
+        self._bytes = 0
+        self._priority_queues: List["OrderedDict[int, None]"] = [OrderedDict() for _ in range(priority_levels)]
+        self._freq_buckets: Dict[int, "OrderedDict[int, None]"] = {}
+        self._score_heap: list = []
+        self._score_version: Dict[int, int] = {}
+        self._seq = itertools.count()
+        self._known_sizes: Dict[int, int] = {}
+        
+        self.stats = {
+            "gets": 0,
+            "hits": 0,
+            "bytes_requested": 0,
+            "bytes_hit": 0,
+            "sets": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "oversize_rejects": 0,
+            "peak_bytes": 0,
+        }
+    
+    def run(self, records: Iterable[TraceRecord]) -> Dict[str, Any]:
+        for record in records:
+            self.apply(record)
+        return self.result()
+    
+    def apply(self, record: TraceRecord) -> None:
+        op, hashed, now = record.op, record.key_hash, record.timestamp
+        
+        if op in (OP_HIT, OP_MISS):
+            self._get(hashed, record, now)
+        elif op == OP_SET:
+            self.stats["sets"] += 1
+            self._known_sizes[hashed] = record.size
+            self._insert(hashed, record.size, record.priority, now)
+        elif op == OP_DELETE:
+            self._remove(hashed)
+        elif op == OP_CLEAR:
+            for cached in list(self._entries):
+                self._remove(cached)
+    
+    def _get(self, hashed: int, record: TraceRecord, now: float) -> None:
+        self.stats["gets"] += 1
+        if record.size:
+            self._known_sizes[hashed] = record.size
+        size = self._known_sizes.get(hashed, 0)
+        self.stats["bytes_requested"] += size
+        
+        entry = self._entries.get(hashed)
+        if entry is not None and self.ttl is not None and now - entry.timestamp >= self.ttl:
+            self._remove(hashed)
+            self.stats["expirations"] += 1
+            entry = None
+        
+        if entry is not None:
+            self.stats["hits"] += 1
+            self.stats["bytes_hit"] += entry.size
+            self._touch(hashed, entry, now)
+        elif record.op == OP_HIT and record.size:
+            # Üretimde alt seviyeden geldi: L1'e promote (SmartCacheManager priority=2)
+            self._insert(hashed, record.size, 2, now)
+    
+    def _insert(self, hashed: int, size: int, priority: int, now: float) -> None:
+        self._remove(hashed)
+        
+        if self.max_bytes is not None and size > self.max_bytes:
+            self.stats["oversize_rejects"] += 1
+            return
+        
+        while self._entries and (
+            len(self._entries) >= self.max_size
+            or (self.max_bytes is not None and self._bytes + size > self.max_bytes)
+        ):
+            self._evict()
+        
+        entry = _SimEntry(size, min(priority, self.priority_levels - 1), now)
+        self._entries[hashed] = entry
+        self._bytes += size
+        self.stats["peak_bytes"] = max(self.stats["peak_bytes"], self._bytes)
+        self._priority_queues[entry.priority][hashed] = None
+        
+        if self.strategy == "lfu":
+            self._freq_buckets.setdefault(0, OrderedDict())[hashed] = None
+        elif self.strategy == "adaptive":
+            self._push_score(hashed, entry, now)
+    
+    def _touch(self, hashed: int, entry: _SimEntry, now: float) -> None:
+        old_count = entry.access_count
+        entry.access_count += 1
+        self._entries.move_to_end(hashed)
+        
+        if self.strategy == "lfu":
+            bucket = self._freq_buckets[old_count]
+            del bucket[hashed]
+            if not bucket:
+                del self._freq_buckets[old_count]
+            self._freq_buckets.setdefault(entry.access_count, OrderedDict())[hashed] = None
+        elif self.strategy == "adaptive":
+            self._push_score(hashed, entry, now)
+    
+    def _push_score(self, hashed: int, entry: _SimEntry, now: float) -> None:
+        version = next(self._seq)
+        self._score_version[hashed] = version
+        score = entry.access_count / max(now - entry.timestamp, 1)
+        heapq.heappush(self._score_heap, (score, now, version, hashed))
+    
+    def _evict(self) -> None:
+        if self.strategy == "lru":
+            victim = next(iter(self._entries))
+        elif self.strategy == "lfu":
+            victim = next(iter(self._freq_buckets[min(self._freq_buckets)]))
+        elif self.strategy == "adaptive":
+            while True:
+                _, _, version, victim = heapq.heappop(self._score_heap)
+                if self._score_version.get(victim) == version:
+                    break
+        else:
+            victim = next(iter(next(queue for queue in self._priority_queues if queue)))
+        
+        self._remove(victim)
+        self.stats["evictions"] += 1
+    
+    def _remove(self, hashed: int) -> None:
+        entry = self._entries.pop(hashed, None)
+        if entry is None:
+            return
+        
+        self._bytes -= entry.size
+        self._priority_queues[entry.priority].pop(hashed, None)
+        if self.strategy == "lfu":
+            bucket = self._freq_buckets.get(entry.access_count)
+            if bucket is not None:
+                bucket.pop(hashed, None)
+                if not bucket:
+                    del self._freq_buckets[entry.access_count]
+        elif self.strategy == "adaptive":
+            self._score_version.pop(hashed, None)
+            if len(self._score_heap) > 2 * len(self._entries) + 64:
+                self._score_heap = [item for item in self._score_heap if self._score_version.get(item[3]) == item[2]]
+                heapq.heapify(self._score_heap)
+    
+    def result(self) -> Dict[str, Any]:
+        gets = self.stats["gets"]
+        requested = self.stats["bytes_requested"]
+        return {
+            "strategy": self.strategy,
+            "max_size": self.max_size,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hit_ratio": self.stats["hits"] / gets if gets else 0.0,
+            "byte_hit_ratio": self.stats["bytes_hit"] / requested if requested else 0.0,
+            **self.stats,
+        }
+
+
+def observed_hit_ratio(records: Iterable[TraceRecord]) -> float:
+    """Trace'i kaydeden cache'in gerçek hit oranı (simülasyonla karşılaştırma için)"""
+    hits = misses = 0
+    for record in records:
+        if record.op == OP_HIT:
+            hits += 1
+        elif record.op == OP_MISS:
+            misses += 1
+    return hits / (hits + misses) if hits + misses else 0.0
@@ -242,7 +242,7 @@ class BabaGAVATCoinService:
                     return mongo_balance
             
             # 4. SQLite fallback
-            async with database_manager._get_connection() as db:
+            async with database_manager._get_connection(readonly=True) as db:
                 cursor = await db.execute(
                     "SELECT balance FROM babagavat_coin_balances WHERE user_id = ?",
                     (user_id,)
@@ -265,7 +265,7 @@ class BabaGAVATCoinService:
     async def get_user_stats(self, user_id: int) -> Dict[str, Any]:
         """Kullanıcının detaylı coin istatistikleri - BabaGAVAT analizi"""
         try:
-            async with database_manager._get_connection() as db:
+            async with database_manager._get_connection(readonly=True) as db:
                 cursor = await db.execute("""
                     SELECT balance, total_earned, total_spent, user_type, babagavat_tier,
                            daily_earn_count, daily_spend_count, last_daily_reset
@@ -509,7 +509,7 @@ class BabaGAVATCoinService:
         """BabaGAVAT günlük kazanç limit kontrolü"""
         try:
             today = datetime.now().date()
-            async with database_manager._get_connection() as db:
+            async with database_manager._get_connection(readonly=True) as db:
                 cursor = await db.execute("""
                     SELECT earned_today FROM babagavat_daily_limits 
                     WHERE user_id = ? AND limit_date = ?
@@ -527,7 +527,7 @@ class BabaGAVATCoinService:
         """BabaGAVAT günlük harcama limit kontrolü"""
         try:
             today = datetime.now().date()
-            async with database_manager._get_connection() as db:
+            async with database_manager._get_connection(readonly=True) as db:
                 cursor = await db.execute("""
                     SELECT spent_today FROM babagavat_daily_limits 
                     WHERE user_id = ? AND limit_date = ?
@@ -683,7 +683,7 @@ class BabaGAVATCoinService:
     async def get_babagavat_transaction_history(self, user_id: int, limit: int = 50) -> List[Dict[str, Any]]:
         """BabaGAVAT işlem geçmişi"""
         try:
-            async with database_manager._get_connection() as db:
+            async with database_manager._get_connection(readonly=True) as db:
                 cursor = await db.execute("""
                     SELECT amount, transaction_type, description, related_user_id, 
                            metadata, created_at
@@ -732,7 +732,7 @@ class BabaGAVATCoinService:
                     return mongo_leaderboard
             
             # SQLite fallback
-            async with database_manager._get_connection() as db:
+            async with database_manager._get_connection(readonly=True) as db:
                 cursor = await db.execute("""
                     SELECT user_id, balance, tier 
                     FROM babagavat_coin_leaderboard 
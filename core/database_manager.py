@@ -18,6 +18,8 @@ import structlog
 from pathlib import Path
 import aiosqlite
 
+from core.sqlite_pool import SQLitePool, WriteBehindQueue
+
 logger = structlog.get_logger("gavatcore.database")
 
 class BroadcastStatus(Enum):
@@ -68,17 +70,31 @@ class UserAnalytics:
 class DatabaseManager:
     """Veritabanı Yöneticisi"""
     
-    def __init__(self, db_path: str = "gavatcore_v2.db"):
+    # Activity score penceresi (user_activity_daily bucket sayısı)
+    ACTIVITY_WINDOW_DAYS = 30
+    
+    def __init__(self, db_path: str = "gavatcore_v2.db", readers: int = 4,
+                 write_batch_ms: float = 50, write_batch_rows: int = 1000,
+                 max_pending_writes: int = 50000):
         self.db_path = db_path
-        self.connection_pool = {}
+        # Uzun ömürlü bağlantılar: tek writer + N reader (WAL)
+        self.pool = SQLitePool(db_path, readers=readers)
+        # Log tablolarına group-commit (etkileşim + broadcast geçmişi)
+        self.write_queue = WriteBehindQueue(
+            self.pool,
+            flush_interval=write_batch_ms / 1000,
+            max_batch=write_batch_rows,
+            max_pending=max_pending_writes,
+        )
         logger.info(f"🗄️ Database Manager başlatılıyor: {db_path}")
     
     async def initialize(self) -> None:
         """Veritabanını başlat ve tabloları oluştur"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.writer() as db:
                 await self._create_tables(db)
                 await self._create_indexes(db)
+                await self._backfill_activity_buckets(db)
                 await db.commit()
             
             logger.info("✅ Database Manager hazır")
@@ -87,9 +103,18 @@ class DatabaseManager:
             logger.error(f"❌ Database başlatma hatası: {e}")
             raise
     
-    def _get_connection(self):
-        """Database bağlantısı al"""
-        return aiosqlite.connect(self.db_path)
+    def _get_connection(self, readonly: bool = False):
+        """Havuzdan bağlantı al (``async with`` ile kullanılır)"""
+        return self.pool.reader() if readonly else self.pool.writer()
+    
+    async def flush_writes(self) -> int:
+        """Kuyruktaki log satırlarını hemen yaz"""
+        return await self.write_queue.flush()
+    
+    async def close(self) -> None:
+        """Kuyruğu boşalt ve havuzdaki bağlantıları kapat"""
+        await self.write_queue.close()
+        await self.pool.close()
     
     async def _create_tables(self, db: aiosqlite.Connection) -> None:
         """Tabloları oluştur"""
@@ -168,6 +193,40 @@ class DatabaseManager:
             )
         """)
         
+        # User Activity Daily tablosu (activity score için günlük rollup)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS user_activity_daily (
+                user_id TEXT NOT NULL,
+                day TEXT NOT NULL, -- YYYY-MM-DD (UTC, created_at ile aynı)
+                interactions INTEGER NOT NULL DEFAULT 0,
+                duration_seconds INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, day)
+            ) WITHOUT ROWID
+        """)
+        
+        # Rollup'ı her insert/delete yolunda tutarlı tut (group-commit batch'leri dahil)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_user_interactions_daily_insert
+            AFTER INSERT ON user_interactions
+            BEGIN
+                INSERT INTO user_activity_daily (user_id, day, interactions, duration_seconds)
+                VALUES (NEW.user_id, date(NEW.created_at), 1, COALESCE(NEW.duration_seconds, 0))
+                ON CONFLICT(user_id, day) DO UPDATE SET
+                    interactions = interactions + 1,
+                    duration_seconds = duration_seconds + excluded.duration_seconds;
+            END
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_user_interactions_daily_delete
+            AFTER DELETE ON user_interactions
+            BEGIN
+                UPDATE user_activity_daily
+                SET interactions = interactions - 1,
+                    duration_seconds = duration_seconds - COALESCE(OLD.duration_seconds, 0)
+                WHERE user_id = OLD.user_id AND day = date(OLD.created_at);
+            END
+        """)
+        
         # Group Analytics tablosu
         await db.execute("""
             CREATE TABLE IF NOT EXISTS group_analytics (
@@ -213,6 +272,22 @@ class DatabaseManager:
             )
         """)
     
+    async def _backfill_activity_buckets(self, db: aiosqlite.Connection) -> None:
+        """Rollup tablosu boşsa son 30 günü user_interactions'tan doldur"""
+        async with db.execute("SELECT 1 FROM user_activity_daily LIMIT 1") as cursor:
+            if await cursor.fetchone():
+                return
+        
+        cursor = await db.execute(f"""
+            INSERT INTO user_activity_daily (user_id, day, interactions, duration_seconds)
+            SELECT user_id, date(created_at), COUNT(*), COALESCE(SUM(duration_seconds), 0)
+            FROM user_interactions
+            WHERE created_at >= date('now', '-{self.ACTIVITY_WINDOW_DAYS} days')
+            GROUP BY user_id, date(created_at)
+        """)
+        if cursor.rowcount > 0:
+            logger.info(f"📊 Activity rollup dolduruldu: {cursor.rowcount} gün/kullanıcı")
+    
     async def _create_indexes(self, db: aiosqlite.Connection) -> None:
         """İndeksleri oluştur"""
         indexes = [
@@ -222,6 +297,7 @@ class DatabaseManager:
             "CREATE INDEX IF NOT EXISTS idx_user_analytics_engagement ON user_analytics(engagement_level)",
             "CREATE INDEX IF NOT EXISTS idx_user_interactions_type ON user_interactions(interaction_type)",
             "CREATE INDEX IF NOT EXISTS idx_user_interactions_user ON user_interactions(user_id)",
+            "CREATE INDEX IF NOT EXISTS idx_user_activity_daily_day ON user_activity_daily(day)",
             "CREATE INDEX IF NOT EXISTS idx_group_analytics_activity ON group_analytics(activity_level)",
             "CREATE INDEX IF NOT EXISTS idx_ai_analysis_type ON ai_analysis_results(analysis_type)"
         ]
@@ -234,7 +310,7 @@ class DatabaseManager:
     async def add_broadcast_target(self, target: BroadcastTarget) -> bool:
         """Broadcast hedefi ekle"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.writer() as db:
                 await db.execute("""
                     INSERT OR REPLACE INTO broadcast_targets 
                     (target_id, target_type, bot_username, is_accessible, last_success, failure_count, notes)
@@ -255,7 +331,7 @@ class DatabaseManager:
     async def get_broadcast_targets(self, target_type: Optional[str] = None, accessible_only: bool = True) -> List[BroadcastTarget]:
         """Broadcast hedeflerini al"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.reader() as db:
                 query = "SELECT * FROM broadcast_targets WHERE 1=1"
                 params = []
                 
@@ -293,101 +369,83 @@ class DatabaseManager:
     async def log_broadcast_attempt(self, broadcast_id: str, target_id: str, target_type: str, 
                                   bot_username: str, message_type: str, message_content: str,
                                   status: BroadcastStatus, error_message: str = None) -> None:
-        """Broadcast denemesini kaydet"""
+        """Broadcast denemesini kaydet (group-commit kuyruğu üzerinden)"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute("""
-                    INSERT INTO broadcast_history 
-                    (broadcast_id, target_id, target_type, bot_username, message_type, 
-                     message_content, status, sent_at, error_message)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    broadcast_id, target_id, target_type, bot_username, message_type,
-                    message_content, status.value, 
-                    datetime.now() if status == BroadcastStatus.SENT else None,
-                    error_message
-                ))
-                
-                # Target'ın durumunu güncelle
-                if status == BroadcastStatus.SENT:
-                    await db.execute("""
-                        UPDATE broadcast_targets 
-                        SET last_success = ?, failure_count = 0, updated_at = ?
-                        WHERE target_id = ? AND target_type = ? AND bot_username = ?
-                    """, (datetime.now(), datetime.now(), target_id, target_type, bot_username))
-                elif status == BroadcastStatus.FAILED:
-                    await db.execute("""
-                        UPDATE broadcast_targets 
-                        SET failure_count = failure_count + 1, updated_at = ?
-                        WHERE target_id = ? AND target_type = ? AND bot_username = ?
-                    """, (datetime.now(), target_id, target_type, bot_username))
-                
-                await db.commit()
+            now = datetime.now()
+            await self.write_queue.put("broadcast_history", """
+                INSERT INTO broadcast_history 
+                (broadcast_id, target_id, target_type, bot_username, message_type, 
+                 message_content, status, sent_at, error_message)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                broadcast_id, target_id, target_type, bot_username, message_type,
+                message_content, status.value, 
+                now if status == BroadcastStatus.SENT else None,
+                error_message
+            ))
+            
+            # Target'ın durumunu güncelle (aynı lane: SENT/FAILED sırası korunur)
+            if status == BroadcastStatus.SENT:
+                await self.write_queue.put("broadcast_targets", """
+                    UPDATE broadcast_targets 
+                    SET last_success = ?, failure_count = 0, updated_at = ?
+                    WHERE target_id = ? AND target_type = ? AND bot_username = ?
+                """, (now, now, target_id, target_type, bot_username))
+            elif status == BroadcastStatus.FAILED:
+                await self.write_queue.put("broadcast_targets", """
+                    UPDATE broadcast_targets 
+                    SET failure_count = failure_count + 1, updated_at = ?
+                    WHERE target_id = ? AND target_type = ? AND bot_username = ?
+                """, (now, target_id, target_type, bot_username))
             
         except Exception as e:
             logger.error(f"❌ Broadcast log hatası: {e}")
     
     # ==================== USER ANALYTICS ====================
     
+    # Tek statement: yeni kullanıcıyı ekler, varsa sayaçları artırır.
+    # ?2 (username) ve ?8 (favorite_character) NULL ise mevcut değer korunur.
+    _USER_ANALYTICS_UPSERT = """
+        INSERT INTO user_analytics 
+        (user_id, username, first_seen, last_activity, total_messages, voice_minutes,
+         quests_completed, events_joined, favorite_character, updated_at)
+        VALUES (?1, COALESCE(?2, 'user_' || ?1), ?3, ?3, ?4, ?5, ?6, ?7, ?8, ?3)
+        ON CONFLICT(user_id) DO UPDATE SET
+            username = COALESCE(?2, username),
+            last_activity = ?3,
+            updated_at = ?3,
+            total_messages = total_messages + ?4,
+            voice_minutes = voice_minutes + ?5,
+            quests_completed = quests_completed + ?6,
+            events_joined = events_joined + ?7,
+            favorite_character = COALESCE(?8, favorite_character)
+    """
+    
+    @staticmethod
+    def _user_analytics_params(user_id: str, username: Optional[str],
+                               interaction_data: Optional[Dict[str, Any]], now: datetime) -> Tuple:
+        """UPSERT parametreleri (increment değerleri)"""
+        data = interaction_data or {}
+        return (
+            user_id,
+            username or None,
+            now,
+            data.get("message_count") or 0,
+            data.get("voice_minutes") or 0,
+            1 if data.get("quest_completed") else 0,
+            1 if data.get("event_joined") else 0,
+            data.get("favorite_character") or None,
+        )
+    
     async def update_user_analytics(self, user_id: str, username: str = None, 
                                   interaction_data: Dict[str, Any] = None) -> None:
         """Kullanıcı analitiğini güncelle"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # Mevcut kullanıcıyı kontrol et
-                async with db.execute("SELECT * FROM user_analytics WHERE user_id = ?", (user_id,)) as cursor:
-                    existing = await cursor.fetchone()
-                
-                now = datetime.now()
-                
-                if existing:
-                    # Güncelle
-                    updates = ["last_activity = ?", "updated_at = ?"]
-                    params = [now, now]
-                    
-                    if username:
-                        updates.append("username = ?")
-                        params.append(username)
-                    
-                    if interaction_data:
-                        if interaction_data.get("message_count"):
-                            updates.append("total_messages = total_messages + ?")
-                            params.append(interaction_data["message_count"])
-                        
-                        if interaction_data.get("voice_minutes"):
-                            updates.append("voice_minutes = voice_minutes + ?")
-                            params.append(interaction_data["voice_minutes"])
-                        
-                        if interaction_data.get("quest_completed"):
-                            updates.append("quests_completed = quests_completed + 1")
-                        
-                        if interaction_data.get("event_joined"):
-                            updates.append("events_joined = events_joined + 1")
-                        
-                        if interaction_data.get("favorite_character"):
-                            updates.append("favorite_character = ?")
-                            params.append(interaction_data["favorite_character"])
-                    
-                    params.append(user_id)
-                    
-                    await db.execute(f"""
-                        UPDATE user_analytics 
-                        SET {', '.join(updates)}
-                        WHERE user_id = ?
-                    """, params)
-                else:
-                    # Yeni kullanıcı oluştur
-                    await db.execute("""
-                        INSERT INTO user_analytics 
-                        (user_id, username, first_seen, last_activity, total_messages, voice_minutes)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    """, (
-                        user_id, username or f"user_{user_id}", now, now,
-                        interaction_data.get("message_count", 0) if interaction_data else 0,
-                        interaction_data.get("voice_minutes", 0) if interaction_data else 0
-                    ))
-                
-                await db.commit()
+            async with self.pool.writer() as db:
+                await db.execute(
+                    self._USER_ANALYTICS_UPSERT,
+                    self._user_analytics_params(user_id, username, interaction_data, datetime.now())
+                )
                 
                 # Activity score hesapla
                 await self._calculate_user_activity_score(db, user_id)
@@ -395,21 +453,51 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"❌ User analytics güncelleme hatası: {e}")
     
+    async def update_user_analytics_many(self, rows: List[Dict[str, Any]]) -> int:
+        """Bir mesaj patlamasındaki analytics güncellemelerini tek transaction'da uygula
+        
+        ``rows``: ``update_user_analytics`` argümanları ile aynı anahtarlar
+        (``user_id``, opsiyonel ``username`` ve ``interaction_data``).
+        Aynı kullanıcı birden fazla kez geçebilir; artışlar toplanır.
+        """
+        if not rows:
+            return 0
+        
+        try:
+            now = datetime.now()
+            params = [
+                self._user_analytics_params(
+                    row["user_id"], row.get("username"), row.get("interaction_data"), now
+                )
+                for row in rows
+            ]
+            
+            async with self.pool.writer() as db:
+                await db.executemany(self._USER_ANALYTICS_UPSERT, params)
+                
+                # Skor kullanıcı başına bir kez
+                for user_id in dict.fromkeys(param[0] for param in params):
+                    await self._calculate_user_activity_score(db, user_id)
+            
+            return len(params)
+            
+        except Exception as e:
+            logger.error(f"❌ Toplu user analytics güncelleme hatası: {e}")
+            return 0
+    
     async def log_user_interaction(self, user_id: str, interaction_type: UserInteractionType,
                                  character_id: str = None, group_id: str = None,
                                  duration_seconds: int = None, metadata: Dict[str, Any] = None) -> None:
-        """Kullanıcı etkileşimini kaydet"""
+        """Kullanıcı etkileşimini kaydet (group-commit kuyruğu üzerinden)"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute("""
-                    INSERT INTO user_interactions 
-                    (user_id, interaction_type, character_id, group_id, duration_seconds, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    user_id, interaction_type.value, character_id, group_id,
-                    duration_seconds, json.dumps(metadata) if metadata else None
-                ))
-                await db.commit()
+            await self.write_queue.put("user_interactions", """
+                INSERT INTO user_interactions 
+                (user_id, interaction_type, character_id, group_id, duration_seconds, metadata)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (
+                user_id, interaction_type.value, character_id, group_id,
+                duration_seconds, json.dumps(metadata) if metadata else None
+            ))
             
         except Exception as e:
             logger.error(f"❌ User interaction log hatası: {e}")
@@ -417,15 +505,13 @@ class DatabaseManager:
     async def _calculate_user_activity_score(self, db: aiosqlite.Connection, user_id: str) -> None:
         """Kullanıcı aktivite skorunu hesapla"""
         try:
-            # Son 30 günlük aktiviteyi al
-            thirty_days_ago = datetime.now() - timedelta(days=30)
-            
-            async with db.execute("""
-                SELECT COUNT(*) as interaction_count,
+            # Son 30 günlük aktivite: ham tablo yerine en fazla 30 rollup satırı
+            async with db.execute(f"""
+                SELECT SUM(interactions) as interaction_count,
                        SUM(duration_seconds) as total_duration
-                FROM user_interactions 
-                WHERE user_id = ? AND created_at > ?
-            """, (user_id, thirty_days_ago)) as cursor:
+                FROM user_activity_daily 
+                WHERE user_id = ? AND day > date('now', '-{self.ACTIVITY_WINDOW_DAYS} days')
+            """, (user_id,)) as cursor:
                 result = await cursor.fetchone()
                 
                 interaction_count = result[0] or 0
@@ -453,13 +539,42 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"❌ Activity score hesaplama hatası: {e}")
     
+    async def trim_activity_buckets(self, keep_days: int = None) -> int:
+        """Pencere dışında kalan günlük activity bucket'larını sil"""
+        keep_days = keep_days or self.ACTIVITY_WINDOW_DAYS
+        try:
+            async with self.pool.writer() as db:
+                cursor = await db.execute(
+                    "DELETE FROM user_activity_daily WHERE day <= date('now', ?) OR interactions <= 0",
+                    (f"-{int(keep_days)} days",)
+                )
+                deleted = cursor.rowcount
+            
+            logger.info(f"🧹 Activity bucket'ları temizlendi: {deleted}")
+            return deleted
+            
+        except Exception as e:
+            logger.error(f"❌ Activity bucket temizleme hatası: {e}")
+            return 0
+    
+    async def run_nightly_maintenance(self, hour: int = 4) -> None:
+        """Her gece ``hour``'da bakım işlerini çalıştır (background task)"""
+        while True:
+            now = datetime.now()
+            next_run = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+            if next_run <= now:
+                next_run += timedelta(days=1)
+            
+            await asyncio.sleep((next_run - now).total_seconds())
+            await self.trim_activity_buckets()
+    
     # ==================== GROUP ANALYTICS ====================
     
     async def update_group_analytics(self, group_id: str, group_name: str = None,
                                    member_count: int = None, bot_accessible: bool = None) -> None:
         """Grup analitiğini güncelle"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.writer() as db:
                 # Mevcut grubu kontrol et
                 async with db.execute("SELECT * FROM group_analytics WHERE group_id = ?", (group_id,)) as cursor:
                     existing = await cursor.fetchone()
@@ -508,7 +623,7 @@ class DatabaseManager:
     async def get_users_for_ai_analysis(self, limit: int = 100) -> List[Dict[str, Any]]:
         """AI analizi için kullanıcı verilerini al"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.reader() as db:
                 async with db.execute("""
                     SELECT ua.*, 
                            COUNT(ui.id) as recent_interactions,
@@ -552,7 +667,7 @@ class DatabaseManager:
                                     recommendations: Dict[str, Any], confidence_score: float = 0.0) -> None:
         """AI analiz sonucunu kaydet"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.writer() as db:
                 await db.execute("""
                     INSERT INTO ai_analysis_results 
                     (analysis_type, target_id, analysis_data, insights, recommendations, confidence_score)
@@ -571,7 +686,7 @@ class DatabaseManager:
                                description: str = "") -> bool:
         """CRM segmenti oluştur"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.writer() as db:
                 # Kriterlere göre kullanıcı sayısını hesapla
                 user_count = await self._count_users_by_criteria(db, criteria)
                 
@@ -624,7 +739,10 @@ class DatabaseManager:
     async def get_broadcast_stats(self, days: int = 7) -> Dict[str, Any]:
         """Broadcast istatistiklerini al"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            # Kuyruktaki denemeler de sayılsın
+            await self.write_queue.flush()
+            
+            async with self.pool.reader() as db:
                 since_date = datetime.now() - timedelta(days=days)
                 
                 async with db.execute("""
@@ -658,7 +776,7 @@ class DatabaseManager:
     async def get_user_engagement_report(self) -> Dict[str, Any]:
         """Kullanıcı engagement raporu"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.reader() as db:
                 async with db.execute("""
                     SELECT engagement_level, COUNT(*) as count, AVG(activity_score) as avg_score
                     FROM user_analytics
@@ -6,6 +6,7 @@ from infrastructure.config.logger import get_logger
 import asyncio
 import time
 import json
+from bisect import bisect_left
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Tuple, Union, Callable, AsyncContextManager
 from dataclasses import dataclass, field
@@ -55,7 +56,10 @@ class PoolConfig:
     health_check_interval: int = 60
     connection_lifetime: int = 7200  # 2 saat
     idle_timeout: int = 300  # 5 dakika
-    
+    # STATIC: max_size'da sabit, küçülmez | DYNAMIC/ADAPTIVE: LIFO checkout, overflow'a
+    # kadar büyür, boşta kalanlar kapanır | LOAD_BALANCED: en az kullanılan connection
+    strategy: PoolStrategy = PoolStrategy.DYNAMIC
+
 @dataclass
 class ConnectionMetrics:
     """Connection metrikleri"""
@@ -65,6 +69,7 @@ class ConnectionMetrics:
     error_count: int = 0
     total_time: float = 0.0
     is_healthy: bool = True
+    last_checked: float = 0.0  # son başarılı ping/kullanım
     
     @property
     def age(self) -> float:
@@ -78,8 +83,68 @@ class ConnectionMetrics:
     def avg_response_time(self) -> float:
         return self.total_time / max(self.usage_count, 1)
 
+class PoolExhaustedError(Exception):
+    """pool_timeout içinde connection alınamadı"""
+
+class WaitTimeHistogram:
+    """Checkout bekleme süresi histogramı (log bucket'lar, sabit bellek)"""
+    
+    BOUNDS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+    
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+    
+    def record(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.counts[bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+    
+    def percentile(self, p: float) -> float:
+        """p. yüzdelik (ms) - düştüğü bucket'ın üst sınırı"""
+        if not self.count:
+            return 0.0
+        
+        rank = p / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                bound = self.BOUNDS_MS[index] if index < len(self.BOUNDS_MS) else self.max_ms
+                return min(bound, self.max_ms)
+        return self.max_ms
+    
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound}ms" for bound in self.BOUNDS_MS] + [f">{self.BOUNDS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "avg_ms": self.total_ms / max(self.count, 1),
+            "max_ms": self.max_ms,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "buckets": {label: count for label, count in zip(labels, self.counts) if count}
+        }
+
 class SmartConnectionPool:
-    """Akıllı connection pool"""
+    """Akıllı connection pool
+    
+    - Checkout'ta sorgu yok: boşta connection varsa strategy'ye göre seçilir
+      (LIFO ya da en az kullanılan), yaş/sağlık kontrolü bellekten yapılır.
+      ``pool_pre_ping`` sadece ``health_check_interval``'dan uzun süredir
+      doğrulanmamış connection'lar için ping atar.
+    - Health check'ler boşta duran connection'lar üzerinde background'da
+      çalışır.
+    - Pool doluysa acquire eden FIFO kuyruğa girer; release edilen connection
+      doğrudan sıradaki bekleyene devredilir (sıra atlama yok),
+      ``pool_timeout`` dolunca ``PoolExhaustedError``.
+    - Bekleme süreleri pool başına histogramda tutulur.
+    """
     
     def __init__(self, name: str, db_type: DatabaseType, config: PoolConfig, connection_string: str):
         self.name = name
@@ -89,10 +154,16 @@ class SmartConnectionPool:
         
         # Pool state
         self._pool = None
+        # Driver pool'unun (asyncpg) kurulduğu max_size; yoksa None
+        self._backend_max_size: Optional[int] = None
         self._connections: Dict[str, Any] = {}
         self._metrics: Dict[str, ConnectionMetrics] = {}
-        self._available_connections = asyncio.Queue()
+        self._idle: deque = deque()  # sağ uç = en son bırakılan
+        self._waiters: deque = deque()  # FIFO bekleyen future'lar
         self._active_connections = set()
+        self._opening = 0  # açılmakta olan connection sayısı (kapasiteye dahil)
+        self._opening_tasks = set()
+        self._connection_seq = 0
         
         # Statistics
         self.stats = {
@@ -104,11 +175,15 @@ class SmartConnectionPool:
             "failed_queries": 0,
             "avg_response_time": 0.0,
             "pool_hits": 0,
-            "pool_misses": 0
+            "pool_misses": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "health_checks": 0,
+            "recycled": 0
         }
+        self.wait_histogram = WaitTimeHistogram()
         
         # Locks
-        self._lock = asyncio.Lock()
         self._health_check_lock = asyncio.Lock()
         
         # Background tasks
@@ -118,8 +193,21 @@ class SmartConnectionPool:
         
         # Load balancing
         self._connection_weights = defaultdict(float)
-        self._last_used_index = 0
+    
+    @property
+    def capacity(self) -> int:
+        """Açık + açılmakta olan connection üst sınırı"""
+        if self.config.strategy == PoolStrategy.STATIC:
+            capacity = self.config.max_size
+        else:
+            capacity = self.config.max_size + self.config.max_overflow
         
+        # Alttaki driver pool'u sabit boyutlu; onu aşan acquire'lar bizim
+        # FIFO kuyruğumuz yerine driver'ın kuyruğunda beklerdi
+        if self._backend_max_size is not None:
+            return min(capacity, self._backend_max_size)
+        return capacity
+    
     async def initialize(self) -> None:
         """Pool'u başlat"""
         try:
@@ -138,17 +226,19 @@ class SmartConnectionPool:
             self._monitoring_task = asyncio.create_task(self._monitoring_loop())
             
             logger.info(f"Connection pool başlatıldı: {self.name} ({self.db_type.value})")
-            
+        
         except Exception as e:
             logger.error(f"Pool initialization error: {e}")
             raise
     
     async def _init_postgresql(self) -> None:
         """PostgreSQL pool başlat"""
+        # Overflow dahil tüm kapasite driver pool'unda olmalı
+        self._backend_max_size = self.capacity
         self._pool = await asyncpg.create_pool(
             self.connection_string,
             min_size=self.config.min_size,
-            max_size=self.config.max_size,
+            max_size=self._backend_max_size,
             command_timeout=self.config.pool_timeout,
             server_settings={
                 'application_name': f'gavatcore_{self.name}',
@@ -158,13 +248,13 @@ class SmartConnectionPool:
         
         # Initial connections oluştur
         for _ in range(self.config.min_size):
-            await self._create_connection()
+            self._idle.append(await self._create_connection())
     
     async def _init_sqlite(self) -> None:
         """SQLite pool başlat"""
         # SQLite için custom pool implementation
         for _ in range(self.config.min_size):
-            await self._create_sqlite_connection()
+            self._idle.append(await self._create_connection())
     
     async def _init_mongodb(self) -> None:
         """MongoDB pool başlat"""
@@ -186,12 +276,19 @@ class SmartConnectionPool:
         )
     
     async def _create_connection(self) -> str:
-        """Yeni connection oluştur"""
-        connection_id = f"{self.name}_{len(self._connections)}_{time.time()}"
+        """Yeni connection oluştur ve kaydet (idle'a koymaz)"""
+        self._connection_seq += 1
+        connection_id = f"{self.name}_{self._connection_seq}_{time.time()}"
         
         try:
             if self.db_type == DatabaseType.POSTGRESQL:
-                conn = await self._pool.acquire()
+                try:
+                    conn = await self._pool.acquire(timeout=self.config.pool_timeout)
+                except asyncio.TimeoutError:
+                    self.stats["timeouts"] += 1
+                    raise PoolExhaustedError(
+                        f"Driver pool exhausted: {self.name} ({self.config.pool_timeout}s)"
+                    )
             elif self.db_type == DatabaseType.SQLITE:
                 conn = await self._create_sqlite_connection()
             elif self.db_type == DatabaseType.MONGODB:
@@ -199,17 +296,17 @@ class SmartConnectionPool:
             elif self.db_type == DatabaseType.REDIS:
                 conn = redis.Redis(connection_pool=self._pool)
             
+            now = time.time()
             self._connections[connection_id] = conn
             self._metrics[connection_id] = ConnectionMetrics(
-                created_at=time.time(),
-                last_used=time.time()
+                created_at=now,
+                last_used=now,
+                last_checked=now
             )
-            
-            await self._available_connections.put(connection_id)
             self.stats["total_connections"] += 1
             
             return connection_id
-            
+        
         except Exception as e:
             logger.error(f"Connection creation error: {e}")
             self.stats["failed_connections"] += 1
@@ -229,77 +326,177 @@ class SmartConnectionPool:
     
     async def _acquire_connection_internal(self) -> Tuple[str, Any]:
         """Internal connection acquire"""
-        async with self._lock:
-            # Available connection var mı?
-            try:
-                connection_id = await asyncio.wait_for(
-                    self._available_connections.get(),
-                    timeout=self.config.pool_timeout
-                )
-                
-                # Connection health check
-                if not await self._check_connection_health(connection_id):
-                    await self._recreate_connection(connection_id)
-                
-                # Metrics güncelle
-                metrics = self._metrics[connection_id]
-                metrics.last_used = time.time()
-                metrics.usage_count += 1
-                
-                self._active_connections.add(connection_id)
-                self.stats["active_connections"] += 1
-                self.stats["pool_hits"] += 1
-                
-                return connection_id, self._connections[connection_id]
-                
-            except asyncio.TimeoutError:
-                # Pool timeout - yeni connection oluştur
-                if len(self._connections) < self.config.max_size + self.config.max_overflow:
-                    connection_id = await self._create_connection()
-                    connection_id = await self._available_connections.get()
-                    
-                    self._active_connections.add(connection_id)
-                    self.stats["active_connections"] += 1
-                    self.stats["pool_misses"] += 1
-                    
-                    return connection_id, self._connections[connection_id]
-                else:
-                    raise Exception("Pool exhausted")
+        start = time.perf_counter()
+        
+        # Bekleyen varken boşta connection olmaz (release doğrudan devreder)
+        connection_id = self._checkout_idle() if not self._waiters else None
+        if connection_id is not None:
+            self.stats["pool_hits"] += 1
+        elif len(self._connections) + self._opening < self.capacity:
+            connection_id = await self._open_connection()
+            self.stats["pool_misses"] += 1
+        else:
+            connection_id = await self._wait_for_connection()
+            self.stats["pool_hits"] += 1
+        
+        try:
+            connection_id = await self._validate_connection(connection_id)
+        except BaseException:
+            if connection_id in self._connections:
+                self._return_to_pool(connection_id)
+            else:
+                self._release_slot()
+            raise
+        
+        metrics = self._metrics[connection_id]
+        metrics.last_used = time.time()
+        metrics.usage_count += 1
+        
+        self._active_connections.add(connection_id)
+        self.stats["active_connections"] = len(self._active_connections)
+        self.wait_histogram.record(time.perf_counter() - start)
+        
+        return connection_id, self._connections[connection_id]
+    
+    def _checkout_idle(self) -> Optional[str]:
+        """Strategy'ye göre boşta connection seç"""
+        if not self._idle:
+            return None
+        
+        if self.config.strategy == PoolStrategy.LOAD_BALANCED:
+            connection_id = min(self._idle, key=lambda cid: self._metrics[cid].usage_count)
+            self._idle.remove(connection_id)
+            return connection_id
+        
+        # LIFO: sıcak connection'lar tekrar kullanılır, soğuklar idle_timeout'la kapanır
+        return self._idle.pop()
     
-    async def _release_connection_internal(self, connection_id: str, error: Optional[Exception] = None) -> None:
+    async def _open_connection(self) -> str:
+        """Kapasite ayırarak yeni connection aç"""
+        self._opening += 1
+        try:
+            return await self._create_connection()
+        finally:
+            self._opening -= 1
+    
+    async def _wait_for_connection(self) -> str:
+        """FIFO kuyrukta release edilecek connection'ı bekle"""
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        self.stats["waits"] += 1
+        timer = loop.call_later(self.config.pool_timeout, self._expire_waiter, waiter)
+        
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            # Connection devredildikten hemen sonra iptal edildiysek geri ver
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self._return_to_pool(waiter.result())
+            raise
+        finally:
+            timer.cancel()
+    
+    def _expire_waiter(self, waiter: asyncio.Future) -> None:
+        if waiter.done():
+            return
+        
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        self.stats["timeouts"] += 1
+        waiter.set_exception(PoolExhaustedError(
+            f"Pool exhausted: {self.name} ({self.config.pool_timeout}s, {len(self._waiters)} waiting)"
+        ))
+    
+    def _return_to_pool(self, connection_id: str) -> None:
+        """Connection'ı sıradaki bekleyene devret, yoksa idle'a koy"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(connection_id)
+                return
+        self._idle.append(connection_id)
+    
+    def _release_slot(self) -> None:
+        """Kapanan connection'ın boşalttığı yere bekleyen için yeni connection aç"""
+        if self._waiters and len(self._connections) + self._opening < self.capacity:
+            task = asyncio.get_running_loop().create_task(self._open_for_waiter())
+            self._opening_tasks.add(task)
+            task.add_done_callback(self._opening_tasks.discard)
+    
+    async def _open_for_waiter(self) -> None:
+        try:
+            self._return_to_pool(await self._open_connection())
+        except Exception as e:
+            logger.error(f"Connection open for waiter failed: {e}")
+    
+    async def _validate_connection(self, connection_id: str) -> str:
+        """Checkout öncesi kontrol: sorgusuz; sadece uzun süre doğrulanmamışsa ping"""
+        metrics = self._metrics[connection_id]
+        
+        if not metrics.is_healthy or metrics.age > self.config.connection_lifetime:
+            return await self._replace_connection(connection_id)
+        
+        if (self.config.pool_pre_ping and
+                time.time() - metrics.last_checked > self.config.health_check_interval):
+            if not await self._check_connection_health(connection_id):
+                return await self._replace_connection(connection_id)
+        
+        return connection_id
+    
+    async def _replace_connection(self, connection_id: str) -> str:
+        """Connection'ı kapatıp yerine yenisini aç (kapasite korunur)"""
+        self._opening += 1
+        try:
+            await self._close_connection(connection_id)
+            new_connection_id = await self._create_connection()
+        finally:
+            self._opening -= 1
+        
+        self.stats["recycled"] += 1
+        logger.debug(f"Connection recycled: {connection_id} -> {new_connection_id}")
+        return new_connection_id
+    
+    async def _release_connection_internal(self, connection_id: str, error: Optional[BaseException] = None) -> None:
         """Internal connection release"""
-        async with self._lock:
-            if connection_id in self._active_connections:
-                self._active_connections.remove(connection_id)
-                self.stats["active_connections"] -= 1
-                
-                # Error handling
-                if error:
-                    self._metrics[connection_id].error_count += 1
-                    self.stats["failed_queries"] += 1
-                    
-                    # Connection'ı yeniden oluştur
-                    if self._metrics[connection_id].error_count > 3:
-                        await self._recreate_connection(connection_id)
-                        return
-                
-                # Connection'ı available pool'a geri koy
-                await self._available_connections.put(connection_id)
+        if connection_id not in self._active_connections:
+            return
+        
+        self._active_connections.remove(connection_id)
+        self.stats["active_connections"] = len(self._active_connections)
+        
+        metrics = self._metrics[connection_id]
+        metrics.last_used = time.time()
+        
+        # Error handling
+        if error:
+            metrics.error_count += 1
+            self.stats["failed_queries"] += 1
+            
+            # Connection'ı yeniden oluştur
+            if metrics.error_count > 3:
+                await self._recreate_connection(connection_id)
+                return
+        else:
+            # Başarılı kullanım ping yerine geçer
+            metrics.last_checked = metrics.last_used
+        
+        # Connection'ı sıradaki bekleyene ya da idle'a ver
+        self._return_to_pool(connection_id)
     
     async def _check_connection_health(self, connection_id: str) -> bool:
         """Connection health check"""
         try:
             conn = self._connections[connection_id]
             metrics = self._metrics[connection_id]
+            self.stats["health_checks"] += 1
             
             # Age check
             if metrics.age > self.config.connection_lifetime:
                 return False
             
-            # Idle timeout check
-            if metrics.idle_time > self.config.idle_timeout:
-                return False
-            
             # Database specific health check
             if self.db_type == DatabaseType.POSTGRESQL:
                 await conn.execute("SELECT 1")
@@ -311,32 +508,33 @@ class SmartConnectionPool:
                 await conn.ping()
             
             metrics.is_healthy = True
+            metrics.last_checked = time.time()
             return True
-            
+        
         except Exception as e:
             logger.warning(f"Health check failed for {connection_id}: {e}")
             self._metrics[connection_id].is_healthy = False
             return False
     
     async def _recreate_connection(self, connection_id: str) -> None:
-        """Connection'ı yeniden oluştur"""
+        """Connection'ı yeniden oluştur ve pool'a geri ver"""
         try:
-            # Eski connection'ı kapat
-            await self._close_connection(connection_id)
-            
-            # Yeni connection oluştur
-            new_connection_id = await self._create_connection()
+            new_connection_id = await self._replace_connection(connection_id)
+            self._return_to_pool(new_connection_id)
             
             logger.info(f"Connection recreated: {connection_id} -> {new_connection_id}")
-            
+        
         except Exception as e:
             logger.error(f"Connection recreation error: {e}")
+            self._release_slot()
     
     async def _close_connection(self, connection_id: str) -> None:
         """Connection'ı kapat"""
         if connection_id in self._connections:
             try:
-                conn = self._connections[connection_id]
+                conn = self._connections.pop(connection_id)
+                self._metrics.pop(connection_id, None)
+                self._connection_weights.pop(connection_id, None)
                 
                 if self.db_type == DatabaseType.POSTGRESQL:
                     await self._pool.release(conn)
@@ -344,10 +542,7 @@ class SmartConnectionPool:
                     await conn.close()
                 elif self.db_type == DatabaseType.REDIS:
                     await conn.close()
-                
-                del self._connections[connection_id]
-                del self._metrics[connection_id]
-                
+            
             except Exception as e:
                 logger.error(f"Connection close error: {e}")
     
@@ -356,23 +551,35 @@ class SmartConnectionPool:
         while True:
             try:
                 await asyncio.sleep(self.config.health_check_interval)
-                
-                async with self._health_check_lock:
-                    unhealthy_connections = []
-                    
-                    for connection_id in list(self._connections.keys()):
-                        if not await self._check_connection_health(connection_id):
-                            unhealthy_connections.append(connection_id)
-                    
-                    # Unhealthy connections'ları yeniden oluştur
-                    for connection_id in unhealthy_connections:
-                        await self._recreate_connection(connection_id)
-                
+                await self._check_idle_connections()
+            
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Health check loop error: {e}")
     
+    async def _check_idle_connections(self) -> int:
+        """Boşta duran ve uzun süredir doğrulanmamış connection'ları kontrol et"""
+        async with self._health_check_lock:
+            now = time.time()
+            stale = [
+                connection_id for connection_id in self._idle
+                if now - self._metrics[connection_id].last_checked >= self.config.health_check_interval
+            ]
+            
+            for connection_id in stale:
+                # Bu arada checkout edilmiş olabilir
+                if connection_id not in self._idle:
+                    continue
+                
+                self._idle.remove(connection_id)
+                if await self._check_connection_health(connection_id):
+                    self._return_to_pool(connection_id)
+                else:
+                    await self._recreate_connection(connection_id)
+            
+            return len(stale)
+    
     async def _cleanup_loop(self) -> None:
         """Cleanup loop"""
         while True:
@@ -384,32 +591,30 @@ class SmartConnectionPool:
                 
                 # Metrics temizle
                 await self._cleanup_metrics()
-                
+            
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Cleanup loop error: {e}")
     
     async def _cleanup_idle_connections(self) -> None:
-        """Idle connections'ları temizle"""
-        async with self._lock:
-            idle_connections = []
-            min_connections = self.config.min_size
-            
-            for connection_id, metrics in self._metrics.items():
-                if (metrics.idle_time > self.config.idle_timeout and 
-                    len(self._connections) > min_connections):
-                    idle_connections.append(connection_id)
-            
-            for connection_id in idle_connections:
+        """min_size üstündeki, idle_timeout'u geçmiş boşta connection'ları kapat"""
+        if self.config.strategy == PoolStrategy.STATIC:
+            return
+        
+        # LIFO sayesinde en uzun süre boşta kalanlar deque'nin başında
+        excess = len(self._connections) - self.config.min_size
+        for connection_id in list(self._idle):
+            if excess <= 0:
+                break
+            if self._metrics[connection_id].idle_time > self.config.idle_timeout:
+                self._idle.remove(connection_id)
                 await self._close_connection(connection_id)
+                excess -= 1
                 logger.debug(f"Cleaned up idle connection: {connection_id}")
     
     async def _cleanup_metrics(self) -> None:
         """Metrics temizle"""
-        # Eski metrics'leri temizle
-        cutoff_time = time.time() - 3600  # 1 saat öncesi
-        
         for connection_id in list(self._metrics.keys()):
             if connection_id not in self._connections:
                 del self._metrics[connection_id]
@@ -425,7 +630,7 @@ class SmartConnectionPool:
                 
                 # Performance metrics hesapla
                 await self._calculate_performance_metrics()
-                
+            
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -433,7 +638,7 @@ class SmartConnectionPool:
     
     async def _update_statistics(self) -> None:
         """Statistics güncelle"""
-        self.stats["idle_connections"] = len(self._connections) - len(self._active_connections)
+        self.stats["idle_connections"] = len(self._idle)
         
         # Average response time hesapla
         if self._metrics:
@@ -459,7 +664,14 @@ class SmartConnectionPool:
         if self._monitoring_task:
             self._monitoring_task.cancel()
         
+        # Bekleyenleri uyandır
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(PoolExhaustedError(f"Pool closed: {self.name}"))
+        
         # Tüm connections'ları kapat
+        self._idle.clear()
         for connection_id in list(self._connections.keys()):
             await self._close_connection(connection_id)
         
@@ -482,16 +694,19 @@ class SmartConnectionPool:
             "config": {
                 "min_size": self.config.min_size,
                 "max_size": self.config.max_size,
-                "max_overflow": self.config.max_overflow
+                "max_overflow": self.config.max_overflow,
+                "strategy": self.config.strategy.value
             },
             "connections": {
                 "total": len(self._connections),
                 "active": len(self._active_connections),
-                "idle": len(self._connections) - len(self._active_connections),
+                "idle": len(self._idle),
                 "healthy": healthy_connections,
-                "unhealthy": len(self._connections) - healthy_connections
+                "unhealthy": len(self._connections) - healthy_connections,
+                "waiting": len(self._waiters)
             },
             "performance": dict(self.stats),
+            "wait_time": self.wait_histogram.to_dict(),
             "metrics": {
                 "avg_connection_age": sum(m.age for m in self._metrics.values()) / max(len(self._metrics), 1),
                 "avg_usage_count": sum(m.usage_count for m in self._metrics.values()) / max(len(self._metrics), 1),
@@ -509,15 +724,15 @@ class SmartConnectionContext:
         self.start_time = None
     
     async def __aenter__(self):
-        self.start_time = time.time()
         self.connection_id, self.connection = await self.pool._acquire_connection_internal()
+        self.start_time = time.time()
         return self.connection
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         # Execution time kaydet
-        if self.start_time and self.connection_id:
+        metrics = self.pool._metrics.get(self.connection_id)
+        if self.start_time and metrics:
             execution_time = time.time() - self.start_time
-            metrics = self.pool._metrics[self.connection_id]
             metrics.total_time += execution_time
             
             # Query stats güncelle
@@ -431,7 +431,7 @@ class BabaGAVATErkoAnalyzer:
             
             # SQLite'den backup veri al
             try:
-                async with database_manager._get_connection() as db:
+                async with database_manager._get_connection(readonly=True) as db:
                     # Transaction sayısını al
                     cursor = await db.execute("""
                         SELECT COUNT(*), SUM(CASE WHEN amount < 0 THEN ABS(amount) ELSE 0 END)
@@ -485,7 +485,7 @@ class BabaGAVATErkoAnalyzer:
                     return stats
             
             # SQLite fallback
-            async with database_manager._get_connection() as db:
+            async with database_manager._get_connection(readonly=True) as db:
                 cursor = await db.execute("""
                     SELECT segment, COUNT(*) as count
                     FROM babagavat_erko_profiles 
@@ -531,7 +531,7 @@ class BabaGAVATErkoAnalyzer:
                 return high_risk_users
             
             # SQLite fallback
-            async with database_manager._get_connection() as db:
+            async with database_manager._get_connection(readonly=True) as db:
                 cursor = await db.execute("""
                     SELECT user_id, segment, risk_level, babagavat_score, risk_indicators
                     FROM babagavat_erko_profiles 
@@ -176,6 +176,11 @@ class IntegratedOptimizer:
             await get_log_cache()
             await get_session_cache()
             
+            # Prefetch burada açılmaz: veri sahibi modül register_prefetch_loader
+            # çağırdığında açılır, _predictive_cache_loop eşiğini ayarlar.
+            # Bu cache'leri okuyan modül henüz olmadığından loader kaydı yok;
+            # prefetch şimdilik kapalı kalır.
+            
             logger.info("Cache managers başlatıldı")
             
         except Exception as e:
@@ -532,48 +537,34 @@ class IntegratedOptimizer:
             return {"success": False, "error": str(e)}
     
     async def _analyze_access_patterns(self) -> None:
-        """Access pattern analizi"""
+        """Access pattern analizi: cache'lerin prefetch modellerini topla"""
         try:
-            # Cache access patterns'ları analiz et
             for name, manager in self.cache_factory._instances.items():
-                if hasattr(manager, 'access_patterns'):
-                    patterns = manager.access_patterns
-                    
-                    # Pattern prediction model güncelle
-                    for key, accesses in patterns.items():
-                        if len(accesses) >= 5:
-                            intervals = []
-                            for i in range(1, len(accesses)):
-                                intervals.append(accesses[i] - accesses[i-1])
-                            
-                            avg_interval = sum(intervals) / len(intervals)
-                            self._predictive_cache_model[f"{name}:{key}"] = {
-                                "avg_interval": avg_interval,
-                                "next_predicted": time.time() + avg_interval,
-                                "confidence": min(len(accesses) / 10, 1.0)
-                            }
+                if manager.prefetcher is not None:
+                    self._predictive_cache_model[name] = manager.prefetcher.get_stats()
             
         except Exception as e:
             logger.error(f"Access pattern analysis error: {e}")
     
     async def _apply_predictive_caching(self) -> None:
-        """Predictive caching uygula"""
+        """Predictive caching uygula: prefetch eşiğini isabet oranına göre ayarla
+        
+        Prefetch'lerin kendisi cache hit'lerinde engine içinde tetiklenir;
+        burada boşa giden yüklemeler çoksa eşik yükseltilir, azsa düşürülür.
+        """
         try:
-            current_time = time.time()
-            
-            for cache_key, prediction in self._predictive_cache_model.items():
-                if (prediction["next_predicted"] <= current_time and 
-                    prediction["confidence"] > 0.7):
-                    
-                    # Cache'i preload et
-                    cache_name, key = cache_key.split(":", 1)
-                    
-                    if cache_name in self.cache_factory._instances:
-                        manager = self.cache_factory._instances[cache_name]
-                        
-                        # Auto refresh trigger
-                        if hasattr(manager, '_auto_refresh'):
-                            await manager._auto_refresh(key)
+            for name, manager in self.cache_factory._instances.items():
+                prefetcher = manager.prefetcher
+                if prefetcher is None:
+                    continue
+                
+                previous = prefetcher.min_probability
+                threshold = prefetcher.adapt()
+                if threshold != previous:
+                    logger.info(
+                        f"Prefetch threshold for {name}: {previous:.2f} -> {threshold:.2f}",
+                        precision=prefetcher.get_stats()["precision"],
+                    )
             
         except Exception as e:
             logger.error(f"Predictive caching error: {e}")
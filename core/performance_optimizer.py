@@ -30,7 +30,7 @@ logger = structlog.get_logger("gavatcore.performance")
 
 from core.dynamic_delivery_optimizer import DynamicDeliveryOptimizer
 from core.cache_performance_monitor import CachePerformanceMonitor
-from core.smart_cache_manager import SmartCacheManager
+from core.smart_cache_manager import CacheManagerFactory, CachePolicy, CacheStrategy, SmartCacheManager
 from core.analytics_logger import log_analytics
 from core.metrics_collector import MetricsCollector
 
@@ -58,110 +58,70 @@ class CacheConfig:
     cleanup_threshold: float = 0.8  # %80 dolduğunda temizle
     compression: bool = True
     persistence: bool = False
+    max_bytes: Optional[int] = None  # L1 byte bütçesi
 
 class AdvancedCache:
-    """Gelişmiş cache sistemi"""
+    """Gelişmiş cache sistemi
+    
+    Ortak cache engine'ine (SmartCacheManager) ince bir adaptör; eviction,
+    TTL, byte bütçesi, L2 ve süreçler arası invalidation engine'dedir.
+    """
     
     def __init__(self, name: str, config: CacheConfig):
         self.name = name
         self.config = config
-        self._cache: Dict[str, Tuple[Any, float, int]] = {}  # key: (value, timestamp, access_count)
-        self._access_order = deque()  # LRU için
-        self._lock = asyncio.Lock()
-        self._stats = {
-            "hits": 0,
-            "misses": 0,
-            "evictions": 0,
-            "memory_usage": 0
-        }
+        self._engine: SmartCacheManager = CacheManagerFactory.create(
+            f"optimizer.{name}",
+            CachePolicy(
+                strategy=CacheStrategy.LRU,
+                ttl=config.ttl,
+                max_size=config.max_size,
+                max_bytes=config.max_bytes,
+                compression=config.compression,
+                persistence=config.persistence
+            ),
+            key_prefix=f"cache:{name}:"
+        )
+    
+    async def start(self) -> None:
+        """Engine'i başlat (maintenance + invalidation bus)"""
+        await self._engine.start()
+    
+    async def stop(self) -> None:
+        await self._engine.stop()
     
     async def get(self, key: str) -> Optional[Any]:
         """Cache'den değer al"""
-        async with self._lock:
-            if key in self._cache:
-                value, timestamp, access_count = self._cache[key]
-                
-                # TTL kontrolü
-                if time.time() - timestamp < self.config.ttl:
-                    # Access count ve order güncelle
-                    self._cache[key] = (value, timestamp, access_count + 1)
-                    self._access_order.append(key)
-                    self._stats["hits"] += 1
-                    return value
-                else:
-                    # Expired
-                    del self._cache[key]
-            
-            self._stats["misses"] += 1
-            return None
+        return await self._engine.get(key)
     
     async def set(self, key: str, value: Any) -> None:
         """Cache'e değer kaydet"""
-        async with self._lock:
-            current_time = time.time()
-            
-            # Boyut kontrolü ve temizlik
-            if len(self._cache) >= self.config.max_size * self.config.cleanup_threshold:
-                await self._cleanup()
-            
-            self._cache[key] = (value, current_time, 1)
-            self._access_order.append(key)
-            
-            # Redis'e persist et
-            if self.config.persistence and redis_client:
-                try:
-                    cache_key = f"cache:{self.name}:{key}"
-                    if self.config.compression:
-                        import pickle
-                        import zlib
-                        compressed_value = zlib.compress(pickle.dumps(value))
-                        await redis_client.set(cache_key, compressed_value, ex=self.config.ttl)
-                    else:
-                        await redis_client.set(cache_key, json.dumps(value), ex=self.config.ttl)
-                except Exception as e:
-                    logger.warning(f"Cache persistence hatası: {e}")
-    
-    async def _cleanup(self) -> None:
-        """LRU temizlik"""
-        target_size = int(self.config.max_size * 0.7)  # %70'e düşür
-        
-        # Access count ve timestamp'e göre sırala
-        sorted_items = sorted(
-            self._cache.items(),
-            key=lambda x: (x[1][2], x[1][1])  # access_count, timestamp
-        )
-        
-        # En az kullanılanları sil
-        for key, _ in sorted_items[:len(self._cache) - target_size]:
-            del self._cache[key]
-            self._stats["evictions"] += 1
-        
-        # Access order'ı temizle
-        self._access_order.clear()
+        await self._engine.set(key, value)
+    
+    async def delete(self, key: str) -> bool:
+        """Cache'den sil (diğer süreçlerin L1 kopyaları da düşer)"""
+        return await self._engine.delete(key)
+    
+    async def clear(self) -> None:
+        """Cache'i temizle ve diğer süreçlere bildir"""
+        await self._engine.clear()
     
     def get_stats(self) -> Dict[str, Any]:
         """Cache istatistikleri"""
-        total_requests = self._stats["hits"] + self._stats["misses"]
-        hit_ratio = self._stats["hits"] / max(total_requests, 1)
+        stats = self._engine.get_stats()
+        operations = stats["operations"]
         
         return {
             "name": self.name,
-            "size": len(self._cache),
+            "size": stats["levels"]["l1_size"],
             "max_size": self.config.max_size,
-            "hit_ratio": hit_ratio,
-            "hits": self._stats["hits"],
-            "misses": self._stats["misses"],
-            "evictions": self._stats["evictions"],
-            "memory_usage": self._estimate_memory_usage()
+            "hit_ratio": stats["performance"]["hit_ratio"],
+            "hits": sum(operations["hits"].values()),
+            "misses": operations["misses"],
+            "evictions": operations["evictions"],
+            "memory_usage": stats["memory"]["l1_bytes"],
+            "engine": stats
         }
-    
-    def _estimate_memory_usage(self) -> int:
-        """Tahmini memory kullanımı (bytes)"""
-        import sys
-        total_size = 0
-        for key, (value, _, _) in self._cache.items():
-            total_size += sys.getsizeof(key) + sys.getsizeof(value)
-        return total_size
 
 class DatabaseOptimizer:
     """Veritabanı optimizasyon sistemi"""
@@ -573,6 +533,10 @@ class PerformanceOptimizer:
         
         self._monitoring_active = True
         
+        # Cache engine'lerini başlat (maintenance + süreçler arası invalidation)
+        for cache in self._caches():
+            await cache.start()
+        
         # Background tasks
         self._optimization_tasks = [
             asyncio.create_task(self._memory_monitor()),
@@ -591,8 +555,22 @@ class PerformanceOptimizer:
             task.cancel()
         
         await asyncio.gather(*self._optimization_tasks, return_exceptions=True)
+        
+        for cache in self._caches():
+            await cache.stop()
+        
         logger.info("🛑 Performance monitoring durduruldu")
     
+    def _caches(self) -> List[AdvancedCache]:
+        """Tüm optimizer cache'leri"""
+        return [
+            self.db_optimizer.query_cache,
+            self.gpt_optimizer.response_cache,
+            self.log_optimizer.log_cache,
+            self.config_optimizer.profile_cache,
+            self.config_optimizer.config_cache
+        ]
+    
     async def _memory_monitor(self) -> None:
         """Memory monitoring"""
         while self._monitoring_active:
@@ -14,15 +14,21 @@ from typing import Dict, List, Any, Optional, Union
 from datetime import datetime, timedelta
 import structlog
 
+from core.cache_generations import NamespaceGenerations, scan_delete, versioned
+
 logger = structlog.get_logger("babagavat.redis")
 
 class BabaGAVATRedisManager:
     """BabaGAVAT Redis Manager - Sokak tecrübesi ile Cache yönetimi"""
     
+    # batch_invalidate'in tek HINCRBY ile temizlediği namespace'ler
+    GENERATIONAL_NAMESPACES = ("coin", "daily", "erko", "leaderboard", "session")
+    
     def __init__(self, redis_url: str = "redis://localhost:6379"):
         self.redis_url = redis_url
         self.redis_client: Optional[redis.Redis] = None
         self.is_initialized = False
+        self.generations = NamespaceGenerations("babagavat:generations", refresh_interval=1.0)
         
     async def initialize(self) -> None:
         """Redis bağlantısını başlat"""
@@ -38,6 +44,7 @@ class BabaGAVATRedisManager:
             
             # Bağlantı testi
             await self.redis_client.ping()
+            self.generations.redis = self.redis_client
             self.is_initialized = True
             
             logger.info("🔥 BabaGAVAT Redis Manager başlatıldı - Sokak cache sistemi aktif!")
@@ -53,6 +60,11 @@ class BabaGAVATRedisManager:
         if self.redis_client:
             await self.redis_client.close()
     
+    async def _key(self, namespace: str, suffix: str) -> str:
+        """Namespace generation'lı key (generation 0: eski key düzeni)"""
+        generation = await self.generations.current(namespace)
+        return f"babagavat:{versioned(namespace, generation)}:{suffix}"
+    
     # COIN BALANCE CACHE METHODS
     async def get_coin_balance(self, user_id: int) -> Optional[float]:
         """Kullanıcı coin bakiyesini Redis'ten al"""
@@ -60,7 +72,7 @@ class BabaGAVATRedisManager:
             if not self.redis_client:
                 return None
                 
-            key = f"babagavat:coin:balance:{user_id}"
+            key = await self._key("coin", f"balance:{user_id}")
             balance = await self.redis_client.get(key)
             
             if balance is not None:
@@ -79,7 +91,7 @@ class BabaGAVATRedisManager:
             if not self.redis_client:
                 return False
                 
-            key = f"babagavat:coin:balance:{user_id}"
+            key = await self._key("coin", f"balance:{user_id}")
             await self.redis_client.setex(key, expire_seconds, str(balance))
             
             logger.info(f"💰 BabaGAVAT Redis cache set: user_id={user_id}, balance={balance}")
@@ -95,7 +107,7 @@ class BabaGAVATRedisManager:
             if not self.redis_client:
                 return False
                 
-            key = f"babagavat:coin:balance:{user_id}"
+            key = await self._key("coin", f"balance:{user_id}")
             await self.redis_client.delete(key)
             
             logger.info(f"🗑️ BabaGAVAT Redis cache invalidated: user_id={user_id}")
@@ -112,7 +124,7 @@ class BabaGAVATRedisManager:
             if not self.redis_client:
                 return None
                 
-            key = f"babagavat:daily:limits:{user_id}"
+            key = await self._key("daily", f"limits:{user_id}")
             data = await self.redis_client.get(key)
             
             if data:
@@ -130,7 +142,7 @@ class BabaGAVATRedisManager:
             if not self.redis_client:
                 return False
                 
-            key = f"babagavat:daily:limits:{user_id}"
+            key = await self._key("daily", f"limits:{user_id}")
             
             # Günün sonuna kadar expire et
             now = datetime.now()
@@ -153,7 +165,7 @@ class BabaGAVATRedisManager:
             if not self.redis_client:
                 return None
                 
-            key = f"babagavat:erko:profile:{user_id}"
+            key = await self._key("erko", f"profile:{user_id}")
             data = await self.redis_client.get(key)
             
             if data:
@@ -171,7 +183,7 @@ class BabaGAVATRedisManager:
             if not self.redis_client:
                 return False
                 
-            key = f"babagavat:erko:profile:{user_id}"
+            key = await self._key("erko", f"profile:{user_id}")
             await self.redis_client.setex(key, expire_seconds, json.dumps(profile_data))
             
             logger.info(f"🔍 BabaGAVAT ErkoAnalyzer profile cache set: user_id={user_id}")
@@ -188,7 +200,7 @@ class BabaGAVATRedisManager:
             if not self.redis_client:
                 return None
                 
-            key = f"babagavat:leaderboard:top{limit}"
+            key = await self._key("leaderboard", f"top{limit}")
             data = await self.redis_client.get(key)
             
             if data:
@@ -206,7 +218,7 @@ class BabaGAVATRedisManager:
             if not self.redis_client:
                 return False
                 
-            key = f"babagavat:leaderboard:top{limit}"
+            key = await self._key("leaderboard", f"top{limit}")
             await self.redis_client.setex(key, expire_seconds, json.dumps(leaderboard_data))
             
             logger.info(f"🏆 BabaGAVAT Leaderboard cache set: {len(leaderboard_data)} entries")
@@ -224,7 +236,7 @@ class BabaGAVATRedisManager:
                 return f"fallback_session_{user_id}"
                 
             session_id = f"babagavat_session_{user_id}_{datetime.now().timestamp()}"
-            key = f"babagavat:session:{session_id}"
+            key = await self._key("session", f"{session_id}")
             
             session_data.update({
                 "user_id": user_id,
@@ -247,7 +259,7 @@ class BabaGAVATRedisManager:
             if not self.redis_client:
                 return None
                 
-            key = f"babagavat:session:{session_id}"
+            key = await self._key("session", f"{session_id}")
             data = await self.redis_client.get(key)
             
             if data:
@@ -265,7 +277,7 @@ class BabaGAVATRedisManager:
             if not self.redis_client:
                 return False
                 
-            key = f"babagavat:session:{session_id}"
+            key = await self._key("session", f"{session_id}")
             await self.redis_client.delete(key)
             
             logger.info(f"🗑️ BabaGAVAT session invalidated: {session_id}")
@@ -311,18 +323,24 @@ class BabaGAVATRedisManager:
     
     # BATCH OPERATIONS
     async def batch_invalidate(self, pattern: str) -> int:
-        """Pattern'e uyan tüm cache'leri temizle"""
+        """Pattern'e uyan tüm cache'leri temizle
+        
+        Cache namespace'lerinde (GENERATIONAL_NAMESPACES) keyspace taranmaz:
+        generation tek HINCRBY ile artırılır, eski key'ler TTL ile düşer ve 0
+        döner. Diğer pattern'ler hız sınırlı SCAN + UNLINK ile silinir.
+        """
         try:
             if not self.redis_client:
                 return 0
-                
-            keys = await self.redis_client.keys(f"babagavat:{pattern}:*")
-            if keys:
-                count = await self.redis_client.delete(*keys)
-                logger.info(f"🗑️ BabaGAVAT batch invalidate: {count} keys deleted")
-                return count
             
-            return 0
+            if pattern in self.GENERATIONAL_NAMESPACES:
+                generation = await self.generations.bump(pattern)
+                logger.info(f"🗑️ BabaGAVAT namespace invalidate: {pattern} → generation {generation}")
+                return 0
+            
+            _, count = await scan_delete(self.redis_client, f"babagavat:{pattern}:*")
+            logger.info(f"🗑️ BabaGAVAT batch invalidate: {count} keys deleted")
+            return count
             
         except Exception as e:
             logger.warning(f"⚠️ Redis batch invalidate hatası: {e}")
@@ -336,15 +354,17 @@ class BabaGAVATRedisManager:
                 
             info = await self.redis_client.info()
             
-            # BabaGAVAT cache keys sayısı
-            babagavat_keys = await self.redis_client.keys("babagavat:*")
+            # BabaGAVAT cache keys sayısı (SCAN: KEYS sunucuyu bloklar)
+            babagavat_keys_count = 0
+            async for _ in self.redis_client.scan_iter(match="babagavat:*", count=1000):
+                babagavat_keys_count += 1
             
             return {
                 "status": "connected",
                 "redis_version": info.get("redis_version", "unknown"),
                 "connected_clients": info.get("connected_clients", 0),
                 "used_memory_human": info.get("used_memory_human", "0B"),
-                "babagavat_keys_count": len(babagavat_keys),
+                "babagavat_keys_count": babagavat_keys_count,
                 "babagavat_cache_active": True
             }
             
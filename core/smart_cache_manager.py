@@ -4,22 +4,35 @@ from infrastructure.config.logger import get_logger
 # core/smart_cache_manager.py - Akıllı Cache Yönetim Sistemi
 
 import asyncio
+import heapq
+import itertools
 import time
 import json
 import pickle
 import zlib
 import hashlib
+import inspect
+import os
+import sys
+import fnmatch
+import re
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Tuple, Union, Callable, TypeVar, Generic
-from dataclasses import dataclass, field
-from collections import defaultdict, deque
+from dataclasses import dataclass, field, replace
+from collections import OrderedDict, deque
 from enum import Enum
 import weakref
 import threading
+from functools import partial
 
 # Database imports
 from utilities.redis_client import redis_client
 from utilities.log_utils import log_event
+from core.cache_invalidation_bus import ALL, CacheInvalidationBus, get_invalidation_bus
+from core.cache_prefetch import MarkovPrefetcher, PrefetchConfig, split_key
+from core.cache_trace import (
+    OP_CLEAR, OP_DELETE, OP_HIT, OP_MISS, OP_SET, CacheTraceRecorder, trace_path
+)
 
 # Performance monitoring
 import structlog
@@ -27,6 +40,52 @@ logger = structlog.get_logger("gavatcore.cache")
 
 T = TypeVar('T')
 
+# L2'de değer bulunamadı işareti (None da geçerli bir cache değeri olabilir)
+_MISSING = object()
+
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None))
+
+
+def deep_sizeof(value: Any, max_depth: int = 32) -> int:
+    """Recursive bellek tahmini (byte)
+    
+    sys.getsizeof sadece dış container'ı ölçer; bu fonksiyon dict/list/set
+    içeriklerini ve nesne attribute'larını da sayar. Paylaşılan nesneler bir
+    kez sayılır, döngüler güvenlidir.
+    """
+    seen = set()
+    stack = [(value, 0)]
+    total = 0
+    
+    while stack:
+        obj, depth = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        
+        if depth >= max_depth or isinstance(obj, _ATOMIC_TYPES):
+            continue
+        
+        depth += 1
+        if isinstance(obj, dict):
+            for item_key, item_value in obj.items():
+                stack.append((item_key, depth))
+                stack.append((item_value, depth))
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend((item, depth) for item in obj)
+        else:
+            attrs = getattr(obj, "__dict__", None)
+            if attrs is not None:
+                stack.append((attrs, depth))
+            
+            slots = getattr(type(obj), "__slots__", ())
+            for slot in (slots,) if isinstance(slots, str) else slots:
+                if hasattr(obj, slot):
+                    stack.append((getattr(obj, slot), depth))
+    
+    return total
+
 class CacheStrategy(Enum):
     """Cache stratejileri"""
     LRU = "lru"  # Least Recently Used
@@ -48,11 +107,15 @@ class CachePolicy:
     strategy: CacheStrategy = CacheStrategy.ADAPTIVE
     ttl: int = 300  # 5 dakika
     max_size: int = 1000
+    max_bytes: Optional[int] = None  # L1 byte bütçesi (None: sadece entry sayısı)
     compression: bool = True
     persistence: bool = True
     auto_refresh: bool = False
     refresh_threshold: float = 0.8  # %80 TTL'de refresh
     priority_levels: int = 3
+    stale_ttl: int = 0  # TTL sonrası get_or_load'un eski değeri sunabileceği süre
+    refresh_concurrency: int = 4  # Aynı anda çalışan arka plan yenileme sayısı
+    shared_l2: bool = False  # L2'yi başka süreçler de yazar: her L1 miss'te Redis'e bak
     
 @dataclass
 class CacheEntry(Generic[T]):
@@ -66,6 +129,8 @@ class CacheEntry(Generic[T]):
     size: int = 0
     compressed: bool = False
     dirty: bool = False  # Write-back için
+    ttl: Optional[int] = None  # None ise policy.ttl
+    stale_ttl: int = 0
     
     @property
     def age(self) -> float:
@@ -81,14 +146,42 @@ class CacheEntry(Generic[T]):
         self.last_access = time.time()
 
 class SmartCacheManager:
-    """Akıllı cache yönetim sistemi"""
+    """Akıllı cache yönetim sistemi
+    
+    Projedeki tüm in-process cache'lerin ortak motoru: namespace (key prefix)
+    invalidation, TTL/stale penceresi, byte bütçesi, L2 (Redis) ve
+    single-flight. Diğer cache sınıfları kendi API'lerini koruyup bu sınıfa
+    delege eder; hepsi CacheManagerFactory'de kayıtlı olduğundan metrikler
+    karşılaştırılabilir ve ayarlar tek yerden değiştirilebilir.
+    """
     
-    def __init__(self, name: str, policy: CachePolicy):
+    def __init__(
+        self,
+        name: str,
+        policy: CachePolicy,
+        invalidation_bus: Optional[CacheInvalidationBus] = None,
+        redis: Any = None,
+        key_prefix: Optional[str] = None,
+        shared_name: Optional[str] = None,
+    ):
         self.name = name
         self.policy = policy
+        # Aynı veriyi paylaşan engine'lerin ortak adı (L2 prefix'i ve bus kanalı);
+        # ``name`` ise kayıt ve stats için süreç içinde tekildir
+        self.shared_name = shared_name or name
+        
+        # L2 client (None ise paylaşılan utilities.redis_client) ve Redis key prefix'i
+        self.redis = redis
+        self.key_prefix = f"smartcache:{self.shared_name}:" if key_prefix is None else key_prefix
+        
+        # Süreçler arası L1 invalidation
+        self.invalidation_bus = invalidation_bus or get_invalidation_bus()
+        self._bus_name = f"smart:{self.shared_name}"
         
         # Multi-level cache
-        self.l1_cache: Dict[str, CacheEntry] = {}  # Memory cache
+        self._l1_bytes = 0  # L1 entry boyutlarının toplamı
+        # L1 sırası = erişim sırası (en eski başta), LRU eviction O(1)
+        self.l1_cache: "OrderedDict[str, CacheEntry]" = OrderedDict()  # Memory cache
         self.l2_keys: set = set()  # Redis'te olan key'ler
         
         # Cache statistics
@@ -99,23 +192,57 @@ class SmartCacheManager:
             "compressions": 0,
             "refreshes": 0,
             "writes": 0,
-            "errors": 0
+            "errors": 0,
+            "coalesced": 0,
+            "stale_hits": 0,
+            "loads": 0,
+            "loader_errors": 0,
+            "oversize_rejects": 0,
+            "invalidations": 0,
+            "remote_invalidations": 0
         }
         
-        # Locks
+        # Locks - sadece L1 yapılarını korur, Redis I/O sırasında tutulmaz
         self._lock = asyncio.Lock()
         self._refresh_lock = asyncio.Lock()
         
+        # Single-flight: key başına devam eden L2 okuması
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._invalidated_flights: set = set()
+        
+        # Read-through: key başına senkron yükleme ve arka plan yenilemesi
+        self._loads: Dict[str, asyncio.Task] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._refresh_semaphore = asyncio.Semaphore(max(1, policy.refresh_concurrency))
+        self._loader_latencies: deque = deque(maxlen=1000)  # ms
+        
         # Background tasks
         self._maintenance_task = None
         self._write_back_task = None
         
-        # Priority queues
-        self.priority_queues = [deque() for _ in range(policy.priority_levels)]
+        # Priority queues (priority başına ekleme sıralı key kümesi)
+        self.priority_queues: List["OrderedDict[str, None]"] = [
+            OrderedDict() for _ in range(policy.priority_levels)
+        ]
+        
+        # LFU index: access_count -> key'ler (en eski başta)
+        self._freq_buckets: Dict[int, "OrderedDict[str, None]"] = {}
+        self._min_freq = 0
+        
+        # ADAPTIVE index: (score, last_access, version, key) min-heap.
+        # Eski kayıtlar yerinde silinmez; version eşleşmiyorsa atlanır.
+        self._score_heap: List[Tuple[float, float, int, str]] = []
+        self._score_version: Dict[str, int] = {}
+        self._score_seq = itertools.count()
+        
+        # Predictive prefetch (enable_prefetch ile açılır)
+        self.prefetcher: Optional[MarkovPrefetcher] = None
+        self._prefetch_loaders: Dict[str, Callable[[str], Any]] = {}  # namespace -> loader(key)
+        self._prefetching: set = set()  # Yüklemesi süren prefetch key'leri
+        self._prefetched: set = set()  # L1'de, henüz okunmamış prefetch key'leri
         
-        # Adaptive learning
-        self.access_patterns = defaultdict(list)
-        self.prediction_model = {}
+        # Erişim trace'i (start_trace ile açılır)
+        self.tracer: Optional[CacheTraceRecorder] = None
         
     async def start(self) -> None:
         """Cache manager'ı başlat"""
@@ -124,6 +251,10 @@ class SmartCacheManager:
             
         if self.policy.strategy == CacheStrategy.WRITE_BACK and self._write_back_task is None:
             self._write_back_task = asyncio.create_task(self._write_back_loop())
+        
+        await self.invalidation_bus.register(
+            self._bus_name, self._apply_remote_invalidation, redis=self.redis
+        )
             
         logger.info(f"Smart cache manager başlatıldı: {self.name}")
     
@@ -134,161 +265,645 @@ class SmartCacheManager:
             
         if self._write_back_task:
             self._write_back_task.cancel()
+        
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        
+        self.invalidation_bus.unregister(self._bus_name, self._apply_remote_invalidation)
             
         # Dirty entries'leri flush et
         await self._flush_dirty_entries()
+        self.stop_trace()
         
         logger.info(f"Smart cache manager durduruldu: {self.name}")
     
     async def get(self, key: str, default: T = None) -> Optional[T]:
-        """Cache'den değer al"""
-        async with self._lock:
-            # L1 Cache (Memory)
-            if key in self.l1_cache:
-                entry = self.l1_cache[key]
+        """Cache'den değer al
+        
+        L1 hit'leri lock almadan döner; L1 erişimi await içermediği için event
+        loop'ta atomiktir. L2 okuması lock dışında yapılır ve aynı key için
+        eşzamanlı miss'ler tek Redis çağrısını paylaşır (single-flight).
+        """
+        # L1 Cache (Memory)
+        entry = self.l1_cache.get(key)
+        if entry is not None:
+            # TTL kontrolü
+            if self._is_fresh(entry):
+                self._touch(key, entry)
+                self.stats["hits"]["l1"] += 1
                 
-                # TTL kontrolü
-                if entry.age < self.policy.ttl:
-                    entry.access()
-                    self.stats["hits"]["l1"] += 1
-                    
-                    # Auto refresh kontrolü
-                    if (self.policy.auto_refresh and 
-                        entry.age > self.policy.ttl * self.policy.refresh_threshold):
-                        asyncio.create_task(self._auto_refresh(key))
-                    
-                    # Access pattern learning
-                    self._learn_access_pattern(key)
-                    
-                    return entry.value
-                else:
-                    # Expired
-                    await self._evict_entry(key)
+                # Auto refresh kontrolü
+                if (self.policy.auto_refresh and 
+                    entry.age > self._entry_ttl(entry) * self.policy.refresh_threshold):
+                    asyncio.create_task(self._auto_refresh(key))
+                
+                self._on_access(key, hit=True)
+                
+                return await self._entry_value(entry)
             
-            # L2 Cache (Redis)
-            if key in self.l2_keys and redis_client:
-                try:
-                    redis_key = self._redis_key(key)
-                    cached_data = await redis_client.get(redis_key)
-                    
-                    if cached_data:
-                        value = await self._deserialize(cached_data)
-                        
-                        # L1'e promote et
-                        await self._set_l1(key, value, priority=2)
-                        
-                        self.stats["hits"]["l2"] += 1
-                        self._learn_access_pattern(key)
-                        
-                        return value
-                    else:
-                        self.l2_keys.discard(key)
-                        
-                except Exception as e:
-                    logger.error(f"L2 cache error: {e}")
-                    self.stats["errors"] += 1
+            # Expired (stale penceresi get_or_load için korunur)
+            await self._drop_if_dead(key, entry)
+        
+        # L2 Cache (Redis)
+        if self._in_l2(key):
+            value = await self._get_l2(key)
+            if value is not _MISSING:
+                self.stats["hits"]["l2"] += 1
+                self._on_access(key, hit=True)
+                return value
+        
+        # Cache miss
+        self.stats["misses"] += 1
+        self._on_access(key, hit=False)
+        return default
+    
+    async def _get_l2(self, key: str) -> Any:
+        """L2 okuması; aynı key için devam eden okuma varsa ona katıl"""
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = asyncio.create_task(self._fetch_l2(key))
+            self._inflight[key] = flight
+            flight.add_done_callback(lambda done: self._finish_flight(key, done))
+        else:
+            self.stats["coalesced"] += 1
+        
+        # Çağıran iptal edilse de okuma diğer bekleyenler için sürer
+        return await asyncio.shield(flight)
+    
+    async def _fetch_l2(self, key: str) -> Any:
+        """Redis'ten oku ve L1'e promote et"""
+        value = _MISSING
+        try:
+            cached_data = await self._l2_client().get(self._redis_key(key))
             
-            # Cache miss
-            self.stats["misses"] += 1
-            return default
+            if cached_data:
+                value = await self._deserialize(cached_data)
+            else:
+                self.l2_keys.discard(key)
+                
+        except Exception as e:
+            logger.error(f"L2 cache error: {e}")
+            self.stats["errors"] += 1
+        
+        if value is not _MISSING:
+            # L1'e promote et; okuma sürerken set/delete geldiyse eski değeri yazma
+            async with self._lock:
+                current = self.l1_cache.get(key)
+                if key not in self._invalidated_flights and (current is None or not self._is_fresh(current)):
+                    await self._set_l1(key, value, priority=2)
+        
+        return value
+    
+    def _finish_flight(self, key: str, flight: asyncio.Task) -> None:
+        """Biten L2 okumasını single-flight tablosundan çıkar"""
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+            self._invalidated_flights.discard(key)
+    
+    def _invalidate_flight(self, key: str) -> None:
+        """Devam eden L2 okumasının sonucunu L1'e yazılmaz olarak işaretle"""
+        if key in self._inflight:
+            self._invalidated_flights.add(key)
     
-    async def set(self, key: str, value: T, priority: int = 1, ttl: Optional[int] = None) -> None:
+    async def set(
+        self,
+        key: str,
+        value: T,
+        priority: int = 1,
+        ttl: Optional[int] = None,
+        stale_ttl: Optional[int] = None,
+    ) -> None:
         """Cache'e değer kaydet"""
+        effective_ttl = ttl or self.policy.ttl
+        effective_stale = self.policy.stale_ttl if stale_ttl is None else stale_ttl
+        
+        # L1 Cache'e kaydet
         async with self._lock:
-            effective_ttl = ttl or self.policy.ttl
-            
-            # L1 Cache'e kaydet
-            await self._set_l1(key, value, priority, effective_ttl)
-            
-            # L2 Cache'e kaydet (persistence enabled ise)
-            if self.policy.persistence and redis_client:
-                try:
-                    await self._set_l2(key, value, effective_ttl)
-                except Exception as e:
-                    logger.error(f"L2 cache set error: {e}")
-                    self.stats["errors"] += 1
-            
-            self.stats["writes"] += 1
+            await self._set_l1(key, value, priority, effective_ttl, effective_stale)
+        self._invalidate_flight(key)
+        if self.tracer is not None:
+            entry = self.l1_cache.get(key)
+            size = entry.size if entry is not None else self._estimate_size(value)
+            self.tracer.record(OP_SET, key, size, priority)
+        
+        # L2 Cache'e kaydet (persistence enabled ise) - lock dışında
+        if self.policy.persistence and self._l2_client():
+            try:
+                await self._set_l2(key, value, effective_ttl)
+            except Exception as e:
+                logger.error(f"L2 cache set error: {e}")
+                self.stats["errors"] += 1
+        
+        # Tombstone L2 yazıldıktan sonra: önce gitseydi diğer süreç L1'ini
+        # düşürüp L2'deki eski değeri yeniden okuyabilirdi
+        self.invalidation_bus.publish(self._bus_name, keys=(key,))
+        self.stats["writes"] += 1
     
-    async def _set_l1(self, key: str, value: T, priority: int = 1, ttl: int = None) -> None:
-        """L1 cache'e kaydet"""
-        # Boyut kontrolü
-        if len(self.l1_cache) >= self.policy.max_size:
-            await self._evict_by_strategy()
+    async def _set_l1(
+        self, key: str, value: T, priority: int = 1, ttl: int = None, stale_ttl: int = 0
+    ) -> None:
+        """L1 cache'e kaydet
         
+        Entry sayısı ``max_size`` ile, toplam boyut ``max_bytes`` ile sınırlı;
+        ikisi de aşılmayana kadar stratejiye göre eviction yapılır.
+        """
         # Entry oluştur
         entry = CacheEntry(
             key=key,
             value=value,
             timestamp=time.time(),
             priority=min(priority, self.policy.priority_levels - 1),
-            size=self._estimate_size(value)
+            size=self._estimate_size(value),
+            ttl=ttl,
+            stale_ttl=stale_ttl
         )
         
         # Compression
         if self.policy.compression and entry.size > 1024:  # 1KB üzeri compress
             try:
                 compressed_value = await self._compress(value)
-                if len(compressed_value) < entry.size * 0.8:  # %20 tasarruf varsa
+                compressed_size = sys.getsizeof(compressed_value)
+                if compressed_size < entry.size * 0.8:  # %20 tasarruf varsa
                     entry.value = compressed_value
                     entry.compressed = True
-                    entry.size = len(compressed_value)
+                    entry.size = compressed_size
                     self.stats["compressions"] += 1
             except Exception as e:
                 logger.warning(f"Compression failed: {e}")
         
-        self.l1_cache[key] = entry
+        # Aynı key güncelleniyorsa eski entry'yi index'lerden çıkar
+        self._unlink(key)
         
-        # Priority queue'ya ekle
-        self.priority_queues[entry.priority].append(key)
+        # Tek başına bütçeyi aşan değer L1'e alınmaz (L2'ye yine yazılır)
+        max_bytes = self.policy.max_bytes
+        if max_bytes is not None and entry.size > max_bytes:
+            self.stats["oversize_rejects"] += 1
+            return
+        
+        # Boyut kontrolü
+        while self.l1_cache and (
+            len(self.l1_cache) >= self.policy.max_size
+            or (max_bytes is not None and self._l1_bytes + entry.size > max_bytes)
+        ):
+            before = len(self.l1_cache)
+            await self._evict_by_strategy()
+            if len(self.l1_cache) == before:
+                break
+        
+        self.l1_cache[key] = entry
+        self._link(key, entry)
     
     async def _set_l2(self, key: str, value: T, ttl: int) -> None:
         """L2 cache'e kaydet"""
         redis_key = self._redis_key(key)
         serialized_value = await self._serialize(value)
         
-        await redis_client.set(redis_key, serialized_value, ex=ttl)
-        self.l2_keys.add(key)
+        await self._l2_client().set(redis_key, serialized_value, ex=ttl)
+        # Paylaşılan L2'de yerel key kümesi kullanılmaz (sınırsız büyürdü)
+        if not self.policy.shared_l2:
+            self.l2_keys.add(key)
+    
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[int] = None,
+        stale_ttl: Optional[int] = None,
+        priority: int = 1,
+    ) -> T:
+        """Read-through get: cache'te yoksa ``loader()`` ile yükle ve kaydet.
+        
+        TTL dolduktan sonra ``stale_ttl`` saniye boyunca eski değer hemen
+        döner ve key başına tek bir arka plan yenilemesi başlatılır
+        (stale-while-revalidate). Aynı key için eşzamanlı miss'ler tek loader
+        çağrısını paylaşır; loader hatası bekleyen herkese iletilir.
+        """
+        effective_ttl = ttl or self.policy.ttl
+        effective_stale = self.policy.stale_ttl if stale_ttl is None else stale_ttl
+        
+        entry = self.l1_cache.get(key)
+        if entry is not None:
+            entry_ttl = self._entry_ttl(entry)
+            age = entry.age
+            
+            if age < entry_ttl:
+                self._touch(key, entry)
+                self.stats["hits"]["l1"] += 1
+                
+                # Refresh-ahead: TTL dolmadan arka planda yenile
+                if self.policy.auto_refresh and age > entry_ttl * self.policy.refresh_threshold:
+                    self._schedule_refresh(key, loader, effective_ttl, effective_stale, priority)
+                
+                self._on_access(key, hit=True)
+                return await self._entry_value(entry)
+            
+            if age < entry_ttl + entry.stale_ttl:
+                self._touch(key, entry)
+                self.stats["stale_hits"] += 1
+                self._schedule_refresh(key, loader, effective_ttl, effective_stale, priority)
+                self._on_access(key, hit=True)
+                return await self._entry_value(entry)
+            
+            await self._drop_if_dead(key, entry)
+        
+        # L2 Cache (Redis)
+        if self._in_l2(key):
+            value = await self._get_l2(key)
+            if value is not _MISSING:
+                self.stats["hits"]["l2"] += 1
+                self._on_access(key, hit=True)
+                return value
+        
+        # Miss - tek loader çağrısı (süren bir prefetch'e de katılır)
+        self.stats["misses"] += 1
+        flight = self._loads.get(key)
+        if flight is None:
+            flight = asyncio.create_task(
+                self._load(key, loader, effective_ttl, effective_stale, priority)
+            )
+            self._loads[key] = flight
+            flight.add_done_callback(
+                lambda done: self._loads.pop(key, None) if self._loads.get(key) is done else None
+            )
+            self._on_access(key, hit=False)
+        else:
+            self.stats["coalesced"] += 1
+            self._on_access(key, hit=key in self._prefetching)
+        
+        return await asyncio.shield(flight)
+    
+    async def _load(self, key: str, loader: Callable[[], Any], ttl: int, stale_ttl: int, priority: int) -> Any:
+        """Loader'ı çağır ve sonucu cache'e yaz"""
+        value = await self._call_loader(loader)
+        await self.set(key, value, priority=priority, ttl=ttl, stale_ttl=stale_ttl)
+        return value
+    
+    async def _call_loader(self, loader: Callable[[], Any]) -> Any:
+        """Loader'ı çağır (sync veya async) ve gecikmesini kaydet"""
+        self.stats["loads"] += 1
+        start = time.perf_counter()
+        try:
+            value = loader()
+            if inspect.isawaitable(value):
+                value = await value
+            return value
+        except Exception:
+            self.stats["loader_errors"] += 1
+            raise
+        finally:
+            self._loader_latencies.append((time.perf_counter() - start) * 1000)
+    
+    def _schedule_refresh(
+        self, key: str, loader: Callable[[], Any], ttl: int, stale_ttl: int, priority: int
+    ) -> None:
+        """Key için arka plan yenilemesi başlat (key başına en fazla bir tane)"""
+        if key in self._refreshing or key in self._loads:
+            return
+        
+        task = asyncio.create_task(self._refresh(key, loader, ttl, stale_ttl, priority))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+    
+    async def _refresh(
+        self, key: str, loader: Callable[[], Any], ttl: int, stale_ttl: int, priority: int
+    ) -> None:
+        """Arka plan yenilemesi; eşzamanlılık refresh_concurrency ile sınırlı"""
+        async with self._refresh_semaphore:
+            # Beklerken silindiyse veya başkası tazelediyse gerek yok
+            entry = self.l1_cache.get(key)
+            if entry is None or entry.age < self._entry_ttl(entry) * self.policy.refresh_threshold:
+                return
+            
+            try:
+                value = await self._call_loader(loader)
+            except Exception as e:
+                # Eski değer stale penceresi boyunca sunulmaya devam eder
+                logger.warning(f"Background refresh failed for {key}: {e}")
+                return
+            
+            if key in self.l1_cache:
+                await self.set(key, value, priority=priority, ttl=ttl, stale_ttl=stale_ttl)
+                self.stats["refreshes"] += 1
+    
+    def enable_prefetch(self, config: Optional[PrefetchConfig] = None) -> MarkovPrefetcher:
+        """Erişim dizilerinden öğrenen predictive prefetch'i aç
+        
+        Model her get/get_or_load erişimini görür; ``key`` hit aldığında aynı
+        kimliğin en olası sonraki key'leri, ``register_prefetch_loader`` ile
+        loader'ı kayıtlı namespace'ler için arka planda yüklenir.
+        """
+        if self.prefetcher is None:
+            self.prefetcher = MarkovPrefetcher(config)
+        return self.prefetcher
+    
+    def register_prefetch_loader(self, namespace: str, loader: Callable[[str], Any]) -> None:
+        """Namespace için prefetch loader'ı: ``loader(key)`` (sync veya async)
+        
+        Prefetch henüz açık değilse varsayılan ayarlarla açılır; loader'sız
+        bir model erişimleri kaydeder ama hiçbir şey yükleyemez.
+        """
+        self._prefetch_loaders[namespace] = loader
+        if self.prefetcher is None:
+            self.enable_prefetch()
+    
+    def start_trace(self, path: Optional[str] = None, sample_rate: float = 1.0) -> CacheTraceRecorder:
+        """Erişim trace'ini ikili dosyaya kaydetmeye başla (bkz. core.cache_trace)"""
+        if self.tracer is None:
+            self.tracer = CacheTraceRecorder(
+                path or trace_path("logs/cache_traces", self.name), sample_rate=sample_rate
+            )
+            logger.info(f"Cache trace kaydı başladı: {self.name}", path=str(self.tracer.path))
+        return self.tracer
+    
+    def stop_trace(self) -> None:
+        """Trace kaydını durdur ve dosyayı kapat"""
+        if self.tracer is not None:
+            self.tracer.close()
+            self.tracer = None
+    
+    def _on_access(self, key: str, hit: bool) -> None:
+        """Erişimi trace'e ve prefetch modeline bildir; hit ise sonraki key'leri prefetch et"""
+        if self.tracer is not None:
+            entry = self.l1_cache.get(key) if hit else None
+            self.tracer.record(OP_HIT if hit else OP_MISS, key, entry.size if entry is not None else 0)
+        
+        prefetcher = self.prefetcher
+        if prefetcher is None:
+            return
+        
+        prefetcher.observe(key)
+        
+        if key in self._prefetched or key in self._prefetching:
+            self._prefetched.discard(key)
+            self._prefetching.discard(key)
+            if hit:
+                prefetcher.record_useful()
+        
+        if hit:
+            self._schedule_prefetch(key)
+    
+    def _schedule_prefetch(self, key: str) -> None:
+        """Tahmin edilen key'leri bütçe ve eşzamanlılık sınırı içinde yükle"""
+        prefetcher = self.prefetcher
+        
+        for next_key, _probability in prefetcher.predict(key):
+            if len(self._prefetching) >= prefetcher.config.max_inflight:
+                prefetcher.stats["budget_skips"] += 1
+                return
+            
+            entry = self.l1_cache.get(next_key)
+            if next_key in self._loads or (entry is not None and self._is_fresh(entry)):
+                continue
+            
+            namespace, _ = split_key(next_key, prefetcher.config.separator)
+            loader = self._prefetch_loaders.get(namespace)
+            if loader is None or not prefetcher.acquire():
+                continue
+            
+            prefetcher.record_issued()
+            task = asyncio.create_task(
+                self._load(
+                    next_key,
+                    partial(loader, next_key),
+                    self.policy.ttl,
+                    self.policy.stale_ttl,
+                    priority=0,
+                )
+            )
+            # get_or_load bu key için yeni loader başlatmaz, prefetch'e katılır
+            self._loads[next_key] = task
+            self._prefetching.add(next_key)
+            task.add_done_callback(partial(self._finish_prefetch, next_key))
+    
+    def _finish_prefetch(self, key: str, task: asyncio.Task) -> None:
+        """Biten prefetch'i single-flight tablosundan çıkar ve sonucunu kaydet"""
+        if self._loads.get(key) is task:
+            del self._loads[key]
+        
+        pending = key in self._prefetching
+        self._prefetching.discard(key)
+        if task.cancelled():
+            return
+        
+        # Hata her durumda okunur (kimse beklemiyorsa loglanmadan kalmasın)
+        error = task.exception()
+        if error is not None:
+            logger.debug(f"Prefetch failed for {key}: {error}")
+        elif pending and key in self.l1_cache:
+            # Yükleme sürerken okunmadıysa "henüz kullanılmadı" olarak izle
+            self._prefetched.add(key)
+    
+    def _apply_remote_invalidation(self, keys: set, namespaces: set) -> None:
+        """Başka süreçten gelen tombstone'lar: L1 kopyalarını düşür
+        
+        Namespace tombstone'ı key prefix'i olarak yorumlanır; ALL tüm L1'i
+        kapsar. L2 (Redis) zaten paylaşıldığı için dokunulmaz.
+        """
+        if ALL in namespaces:
+            targets = list(self.l1_cache)
+        else:
+            targets = [key for key in keys if key in self.l1_cache]
+            if namespaces:
+                prefixes = tuple(namespaces)
+                targets.extend(key for key in self.l1_cache if key.startswith(prefixes))
+        
+        for key in targets:
+            if self._unlink(key) is not None:
+                self.stats["remote_invalidations"] += 1
+        
+        for key in keys:
+            self._invalidate_flight(key)
+        if namespaces:
+            self._invalidated_flights.update(self._inflight)
+    
+    @property
+    def l1_bytes(self) -> int:
+        """L1 entry boyutlarının toplamı (byte)"""
+        return self._l1_bytes
+    
+    def _entry_ttl(self, entry: CacheEntry) -> int:
+        return entry.ttl or self.policy.ttl
+    
+    def _is_fresh(self, entry: CacheEntry) -> bool:
+        return entry.age < self._entry_ttl(entry)
+    
+    async def _entry_value(self, entry: CacheEntry) -> Any:
+        """Entry değerini döndür (L1'de sıkıştırılmışsa aç)"""
+        if entry.compressed:
+            return await self._decompress(entry.value)
+        return entry.value
+    
+    async def _drop_if_dead(self, key: str, entry: CacheEntry) -> None:
+        """Stale penceresi de geçmiş entry'yi L1'den çıkar"""
+        if entry.age < self._entry_ttl(entry) + entry.stale_ttl:
+            return
+        
+        async with self._lock:
+            if self.l1_cache.get(key) is entry:
+                await self._evict_entry(key)
     
     async def delete(self, key: str) -> bool:
         """Cache'den sil"""
+        deleted = False
+        
+        # L1'den sil
         async with self._lock:
-            deleted = False
-            
-            # L1'den sil
             if key in self.l1_cache:
                 await self._evict_entry(key)
                 deleted = True
-            
-            # L2'den sil
-            if key in self.l2_keys and redis_client:
-                try:
-                    redis_key = self._redis_key(key)
-                    await redis_client.delete(redis_key)
-                    self.l2_keys.discard(key)
+        self._invalidate_flight(key)
+        if self.tracer is not None:
+            self.tracer.record(OP_DELETE, key)
+        
+        # L2'den sil - lock dışında
+        if self._in_l2(key):
+            try:
+                redis_key = self._redis_key(key)
+                if await self._l2_client().delete(redis_key) or key in self.l2_keys:
                     deleted = True
-                except Exception as e:
-                    logger.error(f"L2 cache delete error: {e}")
-            
-            return deleted
+                self.l2_keys.discard(key)
+            except Exception as e:
+                logger.error(f"L2 cache delete error: {e}")
+        
+        self.invalidation_bus.publish(self._bus_name, keys=(key,))
+        return deleted
     
     async def clear(self) -> None:
         """Cache'i temizle"""
         async with self._lock:
             # L1 temizle
             self.l1_cache.clear()
+            self._l1_bytes = 0
             for queue in self.priority_queues:
                 queue.clear()
-            
-            # L2 temizle
-            if redis_client:
-                try:
-                    redis_keys = [self._redis_key(key) for key in self.l2_keys]
-                    if redis_keys:
-                        await redis_client.delete(*redis_keys)
-                    self.l2_keys.clear()
-                except Exception as e:
-                    logger.error(f"L2 cache clear error: {e}")
+            self._freq_buckets.clear()
+            self._min_freq = 0
+            self._score_heap.clear()
+            self._score_version.clear()
+            self._prefetched.clear()
+        self._invalidated_flights.update(self._inflight)
+        if self.tracer is not None:
+            self.tracer.record(OP_CLEAR, "")
+        
+        # L2 temizle - lock dışında
+        if self._l2_client():
+            try:
+                l2_keys = list(self.l2_keys)
+                await self._delete_l2_keys(l2_keys)
+                self.l2_keys.difference_update(l2_keys)
+            except Exception as e:
+                logger.error(f"L2 cache clear error: {e}")
+        
+        self.invalidation_bus.publish(self._bus_name, namespaces=(ALL,))
+    
+    async def invalidate_prefix(self, prefix: str, l2: bool = True) -> int:
+        """Namespace invalidation: ``prefix`` ile başlayan tüm key'leri sil
+        
+        Diğer süreçlere tek bir namespace tombstone'ı gider. Dönen değer
+        silinen farklı key sayısıdır (L1 ve L2 birlikte). ``l2=False`` ile
+        sadece L1 temizlenir; L2'deki key'leri çağıran taraf (ör. namespace
+        generation) erişilmez kılar.
+        """
+        l2_pattern = re.sub(r"([*?\[\]\\])", r"\\\1", prefix) + "*" if l2 else None
+        return await self._invalidate_where(
+            lambda key: key.startswith(prefix), l2_pattern, namespace=prefix
+        )
+    
+    async def invalidate_pattern(self, pattern: str) -> int:
+        """Glob pattern'e (ör. ``"ns:*:42:*"``) uyan key'leri sil
+        
+        Pattern prefix'e indirgenemediği için diğer süreçlere eşleşen
+        key'ler tek tek tombstone olarak gider.
+        """
+        return await self._invalidate_where(
+            lambda key: fnmatch.fnmatchcase(key, pattern), pattern
+        )
+    
+    async def _invalidate_where(
+        self, matches: Callable[[str], bool], l2_pattern: Optional[str], namespace: Optional[str] = None
+    ) -> int:
+        """L1 ve L2'de eşleşen key'leri sil, diğer süreçlere bildir"""
+        async with self._lock:
+            removed = {key for key in self.l1_cache if matches(key)}
+            for key in removed:
+                self._unlink(key)
+                if self.tracer is not None:
+                    self.tracer.record(OP_DELETE, key)
+        
+        l2_removed = []
+        if l2_pattern is not None and self._l2_client():
+            try:
+                l2_removed = await self._matching_l2_keys(matches, l2_pattern)
+                await self._delete_l2_keys(l2_removed)
+                self.l2_keys.difference_update(l2_removed)
+            except Exception as e:
+                logger.error(f"L2 cache invalidation error: {e}")
+                self.stats["errors"] += 1
+        removed.update(l2_removed)
+        self.stats["invalidations"] += len(removed)
+        
+        if namespace is not None:
+            self._invalidated_flights.update(self._inflight)
+            self.invalidation_bus.publish(self._bus_name, namespaces=(namespace,))
+        else:
+            for key in removed:
+                self._invalidate_flight(key)
+            self.invalidation_bus.publish(self._bus_name, keys=removed)
+        
+        return len(removed)
+    
+    async def _matching_l2_keys(self, matches: Callable[[str], bool], pattern: str) -> List[str]:
+        """L2'de eşleşen key'ler
+        
+        Paylaşılan L2'de başka süreçlerin yazdıkları da olduğundan SCAN
+        kullanılır (KEYS Redis'i bloklar); aksi halde yerel l2_keys yeterli.
+        """
+        if not self.policy.shared_l2:
+            return [key for key in self.l2_keys if matches(key)]
+        
+        keys = []
+        offset = len(self.key_prefix)
+        async for redis_key in self._l2_client().scan_iter(match=self._redis_key(pattern), count=500):
+            if isinstance(redis_key, bytes):
+                redis_key = redis_key.decode()
+            key = redis_key[offset:]
+            if matches(key):
+                keys.append(key)
+        return keys
+    
+    async def _delete_l2_keys(self, keys: List[str], chunk_size: int = 500) -> None:
+        """L2 key'lerini parça parça sil"""
+        redis = self._l2_client()
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            await redis.delete(*(self._redis_key(key) for key in chunk))
+    
+    async def update_policy(self, **changes: Any) -> CachePolicy:
+        """Policy'yi çalışırken değiştir; yeni limitlere inene kadar evict et
+        
+        Eviction index'leri stratejiye bağlı olduğu için ``strategy`` ve
+        ``priority_levels`` değiştirilemez.
+        """
+        fixed = {"strategy", "priority_levels"} & set(changes)
+        if fixed:
+            raise ValueError(f"Çalışırken değiştirilemez: {', '.join(sorted(fixed))}")
+        
+        self.policy = replace(self.policy, **changes)
+        if "refresh_concurrency" in changes:
+            self._refresh_semaphore = asyncio.Semaphore(max(1, self.policy.refresh_concurrency))
+        
+        max_bytes = self.policy.max_bytes
+        async with self._lock:
+            while self.l1_cache and (
+                len(self.l1_cache) > self.policy.max_size
+                or (max_bytes is not None and self._l1_bytes > max_bytes)
+            ):
+                before = len(self.l1_cache)
+                await self._evict_by_strategy()
+                if len(self.l1_cache) == before:
+                    break
+        
+        return self.policy
     
     async def _evict_by_strategy(self) -> None:
         """Strateji'ye göre eviction"""
@@ -302,64 +917,131 @@ class SmartCacheManager:
             await self._evict_priority()
     
     async def _evict_lru(self) -> None:
-        """LRU eviction"""
+        """LRU eviction - O(1), l1_cache erişim sırasında tutulur"""
         if not self.l1_cache:
             return
-            
-        oldest_key = min(self.l1_cache.keys(), 
-                        key=lambda k: self.l1_cache[k].last_access)
+        
+        oldest_key = next(iter(self.l1_cache))
         await self._evict_entry(oldest_key)
     
     async def _evict_lfu(self) -> None:
-        """LFU eviction"""
-        if not self.l1_cache:
+        """LFU eviction - O(1), en düşük frekans bucket'ının en eskisi"""
+        if not self._freq_buckets:
             return
-            
-        least_used_key = min(self.l1_cache.keys(),
-                           key=lambda k: self.l1_cache[k].access_count)
+        
+        # Silme/expire sonrası min bucket boşalmış olabilir
+        if self._min_freq not in self._freq_buckets:
+            self._min_freq = min(self._freq_buckets)
+        
+        least_used_key = next(iter(self._freq_buckets[self._min_freq]))
         await self._evict_entry(least_used_key)
     
     async def _evict_adaptive(self) -> None:
-        """Adaptive eviction"""
-        if not self.l1_cache:
-            return
-        
-        # Scoring function: access_count / age
-        def score(key: str) -> float:
-            entry = self.l1_cache[key]
-            return entry.access_count / max(entry.age, 1)
+        """Adaptive eviction - O(log n), en düşük access_count / age skoru
         
-        lowest_score_key = min(self.l1_cache.keys(), key=score)
-        await self._evict_entry(lowest_score_key)
+        Skor entry'ye son dokunulduğunda hesaplanır; heap compaction sırasında
+        tüm skorlar tazelenir.
+        """
+        while self._score_heap:
+            _, _, version, key = heapq.heappop(self._score_heap)
+            if self._score_version.get(key) == version:
+                await self._evict_entry(key)
+                return
     
     async def _evict_priority(self) -> None:
         """Priority-based eviction"""
         # En düşük priority'den başla
-        for priority in range(self.policy.priority_levels):
-            queue = self.priority_queues[priority]
-            while queue:
-                key = queue.popleft()
-                if key in self.l1_cache:
-                    await self._evict_entry(key)
-                    return
+        for queue in self.priority_queues:
+            if queue:
+                await self._evict_entry(next(iter(queue)))
+                return
     
     async def _evict_entry(self, key: str) -> None:
         """Entry'yi evict et"""
-        if key in self.l1_cache:
-            entry = self.l1_cache[key]
-            
-            # Write-back strategy için dirty check
-            if entry.dirty and self.policy.strategy == CacheStrategy.WRITE_BACK:
-                await self._write_back_entry(key, entry)
-            
-            del self.l1_cache[key]
-            self.stats["evictions"] += 1
-            
-            # Priority queue'dan da çıkar
-            for queue in self.priority_queues:
-                if key in queue:
-                    queue.remove(key)
-                    break
+        entry = self.l1_cache.get(key)
+        if entry is None:
+            return
+        
+        # Write-back strategy için dirty check
+        if entry.dirty and self.policy.strategy == CacheStrategy.WRITE_BACK:
+            await self._write_back_entry(key, entry)
+        
+        self._unlink(key)
+        self.stats["evictions"] += 1
+    
+    def _link(self, key: str, entry: CacheEntry) -> None:
+        """Yeni L1 entry'sini eviction index'lerine ekle"""
+        self._l1_bytes += entry.size
+        self.priority_queues[entry.priority][key] = None
+        
+        if self.policy.strategy == CacheStrategy.LFU:
+            self._freq_buckets.setdefault(entry.access_count, OrderedDict())[key] = None
+            self._min_freq = 0  # Yeni entry her zaman en düşük frekansta
+        elif self.policy.strategy == CacheStrategy.ADAPTIVE:
+            self._push_score(key, entry)
+    
+    def _unlink(self, key: str) -> Optional[CacheEntry]:
+        """Entry'yi L1'den ve tüm index'lerden çıkar - O(1)"""
+        entry = self.l1_cache.pop(key, None)
+        if entry is None:
+            return None
+        
+        self._l1_bytes -= entry.size
+        self.priority_queues[entry.priority].pop(key, None)
+        
+        # Hiç okunmadan çıkan prefetch boşa gitmiştir
+        if key in self._prefetched:
+            self._prefetched.discard(key)
+            self.prefetcher.record_wasted()
+        
+        if self.policy.strategy == CacheStrategy.LFU:
+            bucket = self._freq_buckets.get(entry.access_count)
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del self._freq_buckets[entry.access_count]
+        elif self.policy.strategy == CacheStrategy.ADAPTIVE:
+            self._score_version.pop(key, None)
+        
+        return entry
+    
+    def _touch(self, key: str, entry: CacheEntry) -> None:
+        """L1 hit: erişimi kaydet ve index'leri güncelle"""
+        old_count = entry.access_count
+        entry.access()
+        self.l1_cache.move_to_end(key)
+        
+        if self.policy.strategy == CacheStrategy.LFU:
+            bucket = self._freq_buckets[old_count]
+            del bucket[key]
+            if not bucket:
+                del self._freq_buckets[old_count]
+                if self._min_freq == old_count:
+                    self._min_freq = entry.access_count
+            self._freq_buckets.setdefault(entry.access_count, OrderedDict())[key] = None
+        elif self.policy.strategy == CacheStrategy.ADAPTIVE:
+            self._push_score(key, entry)
+    
+    def _push_score(self, key: str, entry: CacheEntry) -> None:
+        """ADAPTIVE heap'ine güncel skorla ekle"""
+        version = next(self._score_seq)
+        self._score_version[key] = version
+        score = entry.access_count / max(entry.age, 1)
+        heapq.heappush(self._score_heap, (score, entry.last_access, version, key))
+        
+        # Geçersiz kayıtlar birikince heap'i canlı entry'lerden yeniden kur
+        if len(self._score_heap) > 2 * len(self.l1_cache) + 64:
+            self._rebuild_score_heap()
+    
+    def _rebuild_score_heap(self) -> None:
+        """Heap'i sadece canlı entry'lerle, taze skorlarla yeniden kur - O(n)"""
+        self._score_heap = []
+        for key, entry in self.l1_cache.items():
+            version = next(self._score_seq)
+            self._score_version[key] = version
+            score = entry.access_count / max(entry.age, 1)
+            self._score_heap.append((score, entry.last_access, version, key))
+        heapq.heapify(self._score_heap)
     
     async def _auto_refresh(self, key: str) -> None:
         """Auto refresh"""
@@ -370,28 +1052,6 @@ class SmartCacheManager:
                 self.stats["refreshes"] += 1
                 logger.debug(f"Auto refreshed: {key}")
     
-    def _learn_access_pattern(self, key: str) -> None:
-        """Access pattern learning"""
-        now = time.time()
-        self.access_patterns[key].append(now)
-        
-        # Son 100 access'i tut
-        if len(self.access_patterns[key]) > 100:
-            self.access_patterns[key] = self.access_patterns[key][-100:]
-        
-        # Pattern prediction
-        if len(self.access_patterns[key]) >= 10:
-            intervals = []
-            accesses = self.access_patterns[key]
-            for i in range(1, len(accesses)):
-                intervals.append(accesses[i] - accesses[i-1])
-            
-            avg_interval = sum(intervals) / len(intervals)
-            self.prediction_model[key] = {
-                "avg_interval": avg_interval,
-                "next_predicted": now + avg_interval
-            }
-    
     async def _maintenance_loop(self) -> None:
         """Maintenance loop"""
         while True:
@@ -399,7 +1059,7 @@ class SmartCacheManager:
                 await asyncio.sleep(60)  # 1 dakika interval
                 
                 # TTL cleanup
-                await self._cleanup_expired()
+                await self.purge_expired()
                 
                 # Memory pressure check
                 await self._check_memory_pressure()
@@ -426,18 +1086,18 @@ class SmartCacheManager:
                 logger.error(f"Write-back loop error: {e}")
                 await asyncio.sleep(30)
     
-    async def _cleanup_expired(self) -> None:
-        """Expired entries'leri temizle"""
+    async def purge_expired(self) -> int:
+        """Stale penceresi de geçmiş L1 entry'lerini temizle"""
         async with self._lock:
-            expired_keys = []
-            now = time.time()
-            
-            for key, entry in self.l1_cache.items():
-                if entry.age > self.policy.ttl:
-                    expired_keys.append(key)
+            expired_keys = [
+                key for key, entry in self.l1_cache.items()
+                if entry.age > self._entry_ttl(entry) + entry.stale_ttl
+            ]
             
             for key in expired_keys:
                 await self._evict_entry(key)
+        
+        return len(expired_keys)
     
     async def _check_memory_pressure(self) -> None:
         """Memory pressure kontrolü"""
@@ -447,11 +1107,15 @@ class SmartCacheManager:
             memory_percent = psutil.virtual_memory().percent
             
             if memory_percent > 80:  # %80 üzeri memory kullanımı
-                # Agresif eviction
-                target_size = int(len(self.l1_cache) * 0.7)  # %30 azalt
+                # Agresif eviction: L1 byte kullanımını %30 azalt
+                target_bytes = int(self._l1_bytes * 0.7)
                 
-                while len(self.l1_cache) > target_size:
-                    await self._evict_by_strategy()
+                async with self._lock:
+                    while self.l1_cache and self._l1_bytes > target_bytes:
+                        before = len(self.l1_cache)
+                        await self._evict_by_strategy()
+                        if len(self.l1_cache) == before:
+                            break
                 
                 logger.warning(f"Memory pressure cleanup: {self.name}")
                 
@@ -488,24 +1152,40 @@ class SmartCacheManager:
             return pickle.dumps(value)
     
     async def _deserialize(self, data: bytes) -> Any:
-        """Deserialize value"""
-        if self.policy.compression:
-            return pickle.loads(zlib.decompress(data))
-        else:
-            return pickle.loads(data)
+        """Deserialize value
+        
+        zlib akışı 0x78, pickle (protocol 2+) 0x80 ile başlar; böylece
+        sıkıştırma ayarından bağımsız olarak iki format da okunur.
+        """
+        if data[:1] == b"\x78":
+            data = zlib.decompress(data)
+        return pickle.loads(data)
     
     async def _compress(self, value: Any) -> bytes:
         """Compress value"""
         return zlib.compress(pickle.dumps(value))
     
+    async def _decompress(self, data: bytes) -> Any:
+        """Decompress value"""
+        return pickle.loads(zlib.decompress(data))
+    
     def _estimate_size(self, value: Any) -> int:
-        """Estimate object size"""
-        import sys
-        return sys.getsizeof(value)
+        """Estimate object size (iç içe içerik dahil)"""
+        return deep_sizeof(value)
     
     def _redis_key(self, key: str) -> str:
         """Redis key oluştur"""
-        return f"smartcache:{self.name}:{key}"
+        return f"{self.key_prefix}{key}"
+    
+    def _l2_client(self) -> Any:
+        """L2 Redis client'ı (yoksa None)"""
+        return self.redis if self.redis is not None else redis_client
+    
+    def _in_l2(self, key: str) -> bool:
+        """Key için L2'ye bakmaya değer mi"""
+        if not self._l2_client():
+            return False
+        return self.policy.shared_l2 or key in self.l2_keys
     
     async def _update_statistics(self) -> None:
         """İstatistikleri güncelle"""
@@ -515,7 +1195,8 @@ class SmartCacheManager:
             hit_ratio = sum(self.stats["hits"].values()) / total_requests
             
             # Redis'e stats kaydet
-            if redis_client:
+            redis = self._l2_client()
+            if redis:
                 try:
                     stats_key = f"cache_stats:{self.name}"
                     stats_data = {
@@ -525,7 +1206,7 @@ class SmartCacheManager:
                         "l2_size": len(self.l2_keys),
                         "timestamp": time.time()
                     }
-                    await redis_client.hset(stats_key, mapping=stats_data)
+                    await redis.hset(stats_key, mapping=stats_data)
                 except Exception as e:
                     logger.error(f"Stats update error: {e}")
     
@@ -534,20 +1215,41 @@ class SmartCacheManager:
         total_requests = sum(self.stats["hits"].values()) + self.stats["misses"]
         hit_ratio = sum(self.stats["hits"].values()) / max(total_requests, 1)
         
-        l1_memory_usage = sum(entry.size for entry in self.l1_cache.values())
+        l1_memory_usage = self._l1_bytes
+        max_bytes = self.policy.max_bytes
+        
+        latencies = sorted(self._loader_latencies)
+        loader_stats = {
+            "calls": self.stats["loads"],
+            "errors": self.stats["loader_errors"],
+            "in_flight": len(self._loads),
+            "refreshing": len(self._refreshing),
+            "avg_ms": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p50_ms": latencies[len(latencies) // 2] if latencies else 0.0,
+            "p95_ms": latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+            "max_ms": latencies[-1] if latencies else 0.0,
+        }
         
         return {
             "name": self.name,
             "policy": {
                 "strategy": self.policy.strategy.value,
                 "ttl": self.policy.ttl,
-                "max_size": self.policy.max_size
+                "max_size": self.policy.max_size,
+                "max_bytes": max_bytes,
+                "shared_l2": self.policy.shared_l2
             },
             "levels": {
                 "l1_size": len(self.l1_cache),
                 "l2_size": len(self.l2_keys),
                 "l1_memory_mb": l1_memory_usage / 1024 / 1024
             },
+            "memory": {
+                "l1_bytes": l1_memory_usage,
+                "max_bytes": max_bytes,
+                "budget_used": l1_memory_usage / max_bytes if max_bytes else None,
+                "avg_entry_bytes": l1_memory_usage / max(len(self.l1_cache), 1)
+            },
             "performance": {
                 "hit_ratio": hit_ratio,
                 "l1_hit_ratio": self.stats["hits"]["l1"] / max(total_requests, 1),
@@ -555,27 +1257,79 @@ class SmartCacheManager:
                 "total_requests": total_requests
             },
             "operations": dict(self.stats),
-            "predictions": len(self.prediction_model)
+            "loader": loader_stats,
+            "prefetch": self.prefetcher.get_stats() if self.prefetcher else None,
+            "trace": self.tracer.get_stats() if self.tracer else None
         }
 
 class CacheManagerFactory:
-    """Cache manager factory"""
+    """Cache manager factory
+    
+    Tüm cache engine'lerinin kaydı; ``tune`` ile policy'ler tek yerden
+    ayarlanır (henüz oluşturulmamış cache'ler için de saklanır).
+    
+    ``unique=True`` ile oluşturulan engine'ler aynı isimde bir kayıt varsa
+    ``<name>#<n>`` adını alır; böylece aynı process'teki ikinci wrapper ilk
+    wrapper'ın kaydını ve stats'ını ezmez. L2 prefix'i ve invalidation
+    kanalı ise ``name`` ile kurulur (``shared_name``), diğer süreçlerle
+    ortak kalır. ``tune(name)`` bu kardeşlerin hepsine uygulanır.
+    """
     
     _instances: Dict[str, SmartCacheManager] = {}
+    _overrides: Dict[str, Dict[str, Any]] = {}
+    
+    @classmethod
+    def create(cls, name: str, policy: Optional[CachePolicy] = None, unique: bool = False,
+               **kwargs: Any) -> SmartCacheManager:
+        """Kayıtlı engine oluştur (başlatmaz); wrapper cache'ler sync constructor'da kullanır"""
+        base = name
+        if unique:
+            suffix = 1
+            while name in cls._instances:
+                suffix += 1
+                name = f"{base}#{suffix}"
+        overrides = dict(cls._overrides.get(base, {}), **cls._overrides.get(name, {}))
+        policy = replace(policy or CachePolicy(), **overrides)
+        manager = SmartCacheManager(name, policy, shared_name=base, **kwargs)
+        cls._instances[name] = manager
+        
+        # Opt-in erişim trace'i: GAVATCORE_CACHE_TRACE_DIR=logs/cache_traces
+        trace_dir = os.getenv("GAVATCORE_CACHE_TRACE_DIR")
+        if trace_dir:
+            sample_rate = float(os.getenv("GAVATCORE_CACHE_TRACE_SAMPLE", "1.0"))
+            manager.start_trace(trace_path(trace_dir, name), sample_rate=sample_rate)
+        return manager
     
     @classmethod
     async def get_cache_manager(cls, name: str, policy: Optional[CachePolicy] = None) -> SmartCacheManager:
         """Cache manager instance al"""
         if name not in cls._instances:
-            if policy is None:
-                policy = CachePolicy()
-            
-            manager = SmartCacheManager(name, policy)
+            manager = cls.create(name, policy)
             await manager.start()
-            cls._instances[name] = manager
         
         return cls._instances[name]
     
+    @classmethod
+    def release(cls, manager: SmartCacheManager) -> None:
+        """Engine'i kayıttan çıkar (aynı isimle yeniden kaydedilmişse dokunmaz)"""
+        if cls._instances.get(manager.name) is manager:
+            del cls._instances[manager.name]
+    
+    @classmethod
+    async def tune(cls, name: str, **changes: Any) -> Optional[CachePolicy]:
+        """Cache policy'sini değiştir (ör. ``max_bytes``, ``ttl``, ``max_size``)"""
+        cls._overrides.setdefault(name, {}).update(changes)
+        managers = [
+            manager for key, manager in list(cls._instances.items())
+            if key == name or key.startswith(f"{name}#")
+        ]
+        policy = None
+        for manager in managers:
+            updated = await manager.update_policy(**changes)
+            if manager.name == name or policy is None:
+                policy = updated
+        return policy
+    
     @classmethod
     async def shutdown_all(cls) -> None:
         """Tüm cache manager'ları kapat"""
@@ -590,6 +1344,7 @@ async def get_profile_cache() -> SmartCacheManager:
         strategy=CacheStrategy.ADAPTIVE,
         ttl=600,  # 10 dakika
         max_size=500,
+        max_bytes=32 * 1024 * 1024,
         compression=True,
         persistence=True,
         auto_refresh=True
@@ -602,6 +1357,7 @@ async def get_gpt_cache() -> SmartCacheManager:
         strategy=CacheStrategy.LRU,
         ttl=1800,  # 30 dakika
         max_size=2000,
+        max_bytes=64 * 1024 * 1024,
         compression=True,
         persistence=True,
         auto_refresh=False
@@ -614,6 +1370,7 @@ async def get_log_cache() -> SmartCacheManager:
         strategy=CacheStrategy.TTL,
         ttl=300,  # 5 dakika
         max_size=1000,
+        max_bytes=16 * 1024 * 1024,
         compression=False,
         persistence=False,
         auto_refresh=False
@@ -626,6 +1383,7 @@ async def get_session_cache() -> SmartCacheManager:
         strategy=CacheStrategy.WRITE_BACK,
         ttl=3600,  # 1 saat
         max_size=200,
+        max_bytes=16 * 1024 * 1024,
         compression=True,
         persistence=True,
         auto_refresh=True
@@ -643,6 +1401,17 @@ async def cached_set(cache_name: str, key: str, value, priority: int = 1, ttl: O
     manager = await CacheManagerFactory.get_cache_manager(cache_name)
     await manager.set(key, value, priority, ttl)
 
+async def cached_get_or_load(
+    cache_name: str,
+    key: str,
+    loader: Callable[[], Any],
+    ttl: Optional[int] = None,
+    stale_ttl: Optional[int] = None,
+):
+    """Cache'den al, yoksa loader ile yükle"""
+    manager = await CacheManagerFactory.get_cache_manager(cache_name)
+    return await manager.get_or_load(key, loader, ttl=ttl, stale_ttl=stale_ttl)
+
 async def get_all_cache_stats() -> Dict[str, Any]:
     """Tüm cache istatistikleri"""
     stats = {}
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+GavatCore V2 - SQLite Connection Pool
+Uzun ömürlü aiosqlite bağlantıları: tek writer, N reader
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+import aiosqlite
+import structlog
+
+logger = structlog.get_logger("gavatcore.database")
+
+
+class SQLitePool:
+    """SQLite bağlantı havuzu
+    
+    Her çağrıda ``aiosqlite.connect`` yeni bir thread açar ve şemayı yeniden
+    parse eder. Bu havuz bağlantıları süreç boyunca açık tutar:
+    
+    - Tek writer bağlantısı bir lock ile sıralanır (SQLite zaten tek yazara
+      izin verir); blok hatasız biterse commit, hata olursa rollback yapılır.
+    - ``readers`` adet okuma bağlantısı WAL sayesinde writer'ı beklemez.
+    - Tüm bağlantılarda WAL, ``synchronous=NORMAL``, mmap ve geniş prepared
+      statement cache'i (``cached_statements``) açıktır; aynı SQL metni aynı
+      bağlantıda tekrar derlenmez.
+    
+    ``:memory:`` veritabanında her bağlantı ayrı bir DB olacağından reader
+    açılmaz, okumalar da writer üzerinden yapılır.
+    """
+    
+    def __init__(
+        self,
+        db_path: str,
+        readers: int = 4,
+        mmap_size: int = 256 * 1024 * 1024,
+        cache_size_kb: int = 16 * 1024,
+        busy_timeout_ms: int = 30000,
+        cached_statements: int = 256,
+    ):
+        self.db_path = db_path
+        self.readers = 0 if db_path == ":memory:" else max(0, readers)
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._reader_queue: Optional[asyncio.Queue] = None
+        self._connections: List[aiosqlite.Connection] = []
+        self._open_lock = asyncio.Lock()
+        
+        self.stats = {"opened": 0, "writes": 0, "reads": 0, "rollbacks": 0}
+    
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None
+    
+    async def _connect(self) -> aiosqlite.Connection:
+        """Ayarlı yeni bağlantı aç"""
+        db = aiosqlite.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            cached_statements=self.cached_statements,
+        )
+        # Havuz bağlantıları süreç boyunca açık kalır; close() çağrılmasa da
+        # çıkışı bloklamasın (writer her blok sonunda commit eder)
+        db.daemon = True
+        await db
+        await db.execute("PRAGMA journal_mode=WAL")
+        await db.execute("PRAGMA synchronous=NORMAL")
+        await db.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        await db.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+        await db.execute("PRAGMA temp_store=MEMORY")
+        await db.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        
+        self._connections.append(db)
+        self.stats["opened"] += 1
+        return db
+    
+    async def open(self) -> None:
+        """Bağlantıları aç (ilk kullanımda otomatik çağrılır)"""
+        async with self._open_lock:
+            if self._writer is not None:
+                return
+            
+            # Writer önce açılır: WAL modu veritabanı dosyasına kalıcı yazılır
+            writer = await self._connect()
+            queue: asyncio.Queue = asyncio.Queue()
+            for _ in range(self.readers):
+                queue.put_nowait(await self._connect())
+            
+            self._reader_queue = queue
+            self._writer = writer
+            logger.info(f"🗄️ SQLite pool açıldı: {self.db_path}", readers=self.readers)
+    
+    async def close(self) -> None:
+        """Tüm bağlantıları kapat"""
+        async with self._open_lock:
+            async with self._write_lock:
+                connections, self._connections = self._connections, []
+                self._writer = None
+                self._reader_queue = None
+                
+                for db in connections:
+                    try:
+                        await db.close()
+                    except Exception as e:
+                        logger.warning(f"SQLite bağlantısı kapatılamadı: {e}")
+    
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Yazma bağlantısı (tek seferde tek kullanıcı)"""
+        if self._writer is None:
+            await self.open()
+        
+        async with self._write_lock:
+            db = self._writer
+            try:
+                yield db
+            except BaseException:
+                if db.in_transaction:
+                    await db.rollback()
+                    self.stats["rollbacks"] += 1
+                raise
+            else:
+                if db.in_transaction:
+                    await db.commit()
+            finally:
+                self.stats["writes"] += 1
+    
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Okuma bağlantısı (reader yoksa writer paylaşılır)"""
+        if self._writer is None:
+            await self.open()
+        
+        if not self.readers:
+            async with self.writer() as db:
+                self.stats["reads"] += 1
+                yield db
+            return
+        
+        queue = self._reader_queue
+        db = await queue.get()
+        try:
+            self.stats["reads"] += 1
+            yield db
+        finally:
+            # Okuma bağlantısında açık kalan transaction WAL checkpoint'ini bloklar
+            if db.in_transaction:
+                await db.rollback()
+            queue.put_nowait(db)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "db_path": self.db_path,
+            "open": self.is_open,
+            "readers": self.readers,
+            "idle_readers": self._reader_queue.qsize() if self._reader_queue else 0,
+            "writer_busy": self._write_lock.locked(),
+            **self.stats,
+        }
+
+
+class WriteBehindQueue:
+    """Group-commit yazma kuyruğu
+    
+    Log tarzı INSERT'ler (etkileşim, broadcast geçmişi) her satırda ayrı
+    commit/fsync ödemek yerine kuyruğa alınır ve ``flush_interval`` saniyede
+    bir ya da ``max_batch`` satır birikince tek transaction'da yazılır.
+    
+    - Her tablo ayrı bir "lane"dir; lane içinde sıra korunur, art arda gelen
+      aynı SQL'ler tek ``executemany`` olur. Farklı tablolar birbirini
+      beklemez.
+    - Kuyrukta ``max_pending`` satır varsa ``put`` flush'ı kendisi yapar
+      (backpressure): üretici diskten hızlı olamaz, bellek sınırlı kalır.
+    - Batch bir satır yüzünden hata verirse satırlar tek tek yazılır; sadece
+      bozuk satırlar düşer.
+    - Transaction açılamaz ya da ``OperationalError`` (busy, disk dolu, I/O)
+      alınırsa hiçbir satır düşmez; batch lane'lerinin başına geri konur ve
+      sonraki flush'ta tekrar denenir. Kuyruk ``max_pending``'i aşarsa en
+      eski satırlar düşer.
+    - ``close()`` kalan satırları yazar.
+    """
+    
+    def __init__(
+        self,
+        pool: SQLitePool,
+        flush_interval: float = 0.05,
+        max_batch: int = 1000,
+        max_pending: int = 50000,
+    ):
+        self.pool = pool
+        self.flush_interval = flush_interval
+        self.max_batch = max(1, max_batch)
+        self.max_pending = max(self.max_batch, max_pending)
+        
+        # table -> [[sql, [params, ...]], ...]
+        self._lanes: Dict[str, List[List[Any]]] = {}
+        self._pending_rows = 0
+        self._flush_lock = asyncio.Lock()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        
+        self.stats = {
+            "queued": 0,
+            "written": 0,
+            "failed": 0,
+            "requeued": 0,
+            "flushes": 0,
+            "backpressure_flushes": 0,
+        }
+    
+    @property
+    def pending(self) -> int:
+        return self._pending_rows
+    
+    def _ensure_task(self) -> None:
+        """Flush task'ını çalışan event loop'ta başlat"""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wake = asyncio.Event()
+            self._task = loop.create_task(self._run())
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # max_batch dolunca put() uyandırır, yoksa flush_interval sonra
+            timer = loop.call_later(self.flush_interval, self._wake.set)
+            try:
+                await self._wake.wait()
+            finally:
+                timer.cancel()
+            self._wake.clear()
+            # close() task'ı iptal ederken alınmış batch yarıda kalmasın
+            await asyncio.shield(self.flush())
+    
+    async def put(self, table: str, sql: str, params: Sequence[Any]) -> None:
+        """Satırı kuyruğa ekle (kuyruk doluysa önce flush edilir)"""
+        if self._pending_rows >= self.max_pending:
+            self.stats["backpressure_flushes"] += 1
+            await self.flush()
+        
+        lane = self._lanes.setdefault(table, [])
+        if lane and lane[-1][0] == sql:
+            lane[-1][1].append(params)
+        else:
+            lane.append([sql, [params]])
+        
+        self._pending_rows += 1
+        self.stats["queued"] += 1
+        
+        self._ensure_task()
+        if self._pending_rows >= self.max_batch:
+            self._wake.set()
+    
+    async def flush(self) -> int:
+        """Bekleyen satırları tek transaction'da yaz"""
+        async with self._flush_lock:
+            lanes, self._lanes = self._lanes, {}
+            runs = [run for lane in lanes.values() for run in lane]
+            rows = sum(len(params) for _, params in runs)
+            if not rows:
+                return 0
+            
+            # pending, satırlar gerçekten yazılana kadar düşürülmez
+            try:
+                written = await self._write_batch(runs, rows)
+            except Exception as e:
+                logger.error(f"❌ Kuyruk yazılamadı, {rows} satır tekrar denenecek: {e}")
+                self._requeue(lanes, rows)
+                return 0
+            
+            self._pending_rows -= rows
+            self.stats["written"] += written
+            self.stats["failed"] += rows - written
+            self.stats["flushes"] += 1
+            return written
+    
+    async def _write_batch(self, runs: List[List[Any]], rows: int) -> int:
+        """Batch'i tek transaction'da yaz; satır hatasında tek tek yazmaya geç
+        
+        Transaction açılamazsa ya da ``OperationalError`` alınırsa exception
+        yukarı çıkar (writer rollback yapmıştır, hiçbir satır yazılmamıştır).
+        """
+        opened = False
+        try:
+            async with self.pool.writer() as db:
+                opened = True
+                for sql, params in runs:
+                    await db.executemany(sql, params)
+            return rows
+        except aiosqlite.OperationalError:
+            raise
+        except Exception as e:
+            if not opened:
+                raise
+            logger.warning(f"⚠️ Toplu yazma başarısız, satır satır deneniyor: {e}", rows=rows)
+        
+        return await self._write_rows(runs)
+    
+    async def _write_rows(self, runs: List[List[Any]]) -> int:
+        """Satırları tek tek yaz; bozuk satırları atla"""
+        written = 0
+        async with self.pool.writer() as db:
+            for sql, params in runs:
+                for row in params:
+                    try:
+                        await db.execute(sql, row)
+                        written += 1
+                    except aiosqlite.OperationalError:
+                        raise
+                    except Exception as e:
+                        logger.error(f"❌ Kuyruktaki satır yazılamadı: {e}")
+        return written
+    
+    def _requeue(self, lanes: Dict[str, List[List[Any]]], rows: int) -> None:
+        """Yazılamayan batch'i lane'lerin başına geri koy (max_pending ile sınırlı)"""
+        overflow = self._pending_rows - self.max_pending
+        dropped = 0
+        if overflow > 0:
+            # En eski satırlar düşer
+            for lane in lanes.values():
+                while lane and dropped < overflow:
+                    params = lane[0][1]
+                    cut = min(len(params), overflow - dropped)
+                    del params[:cut]
+                    dropped += cut
+                    if not params:
+                        lane.pop(0)
+            
+            self._pending_rows -= dropped
+            self.stats["failed"] += dropped
+            logger.error(f"❌ Yazma kuyruğu dolu, en eski {dropped} satır düştü")
+        
+        for table, lane in lanes.items():
+            if lane:
+                self._lanes[table] = lane + self._lanes.get(table, [])
+        self.stats["requeued"] += rows - dropped
+    
+    async def close(self) -> None:
+        """Flush task'ını durdur ve kalan satırları yaz"""
+        task, self._task = self._task, None
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+        if self._pending_rows:
+            logger.error(f"❌ Yazma kuyruğu kapatılırken {self._pending_rows} satır yazılamadı")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {"pending": self._pending_rows, "lanes": len(self._lanes), **self.stats}
@@ -601,7 +601,7 @@ class BabaGAVATUserAnalyzer:
         """BabaGAVAT'ın özel istihbarat analizi"""
         try:
             # Yüksek potansiyelli kullanıcıları tespit et
-            async with database_manager._get_connection() as db:
+            async with database_manager._get_connection(readonly=True) as db:
                 cursor = await db.execute("""
                     SELECT user_id, username, trust_score, street_smart_score
                     FROM babagavat_user_profiles 
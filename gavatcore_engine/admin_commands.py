@@ -12,6 +12,7 @@ from pydantic import BaseModel
 from .config import get_settings
 from .logger import LoggerMixin
 from .redis_state import redis_state
+from .message_pool import message_pool
 from .scheduler_engine import scheduler_engine, ScheduledTask, TaskType
 
 
@@ -49,6 +50,8 @@ class AdminCommandHandler(LoggerMixin):
             "clear_queue": self._handle_clear_queue,
             "emergency_stop": self._handle_emergency_stop,
             "restart_scheduler": self._handle_restart_scheduler,
+            "reconcile_message_stats": self._handle_reconcile_message_stats,
+            "migrate_message_encoding": self._handle_migrate_message_encoding,
         }
         
         handler = handlers.get(command)
@@ -282,6 +285,33 @@ class AdminCommandHandler(LoggerMixin):
                 "message": "Scheduler restarted successfully",
             },
         }
+    
+    async def _handle_reconcile_message_stats(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle reconcile message stats command."""
+        before = await message_pool.get_message_stats()
+        after = await message_pool.reconcile_message_stats()
+        
+        return {
+            "success": True,
+            "data": {
+                "before": before,
+                "after": after,
+                "message": "Message status counters rebuilt from SCAN",
+            },
+        }
+    
+    async def _handle_migrate_message_encoding(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle migrate message encoding command."""
+        migrated = await message_pool.migrate_message_encoding()
+        
+        return {
+            "success": True,
+            "data": {
+                "encoding": message_pool.codec.name,
+                "migrated_messages": migrated,
+                "message": f"Rewrote {migrated} messages with {message_pool.codec.name} encoding",
+            },
+        }
 
 
 # Global admin command handler
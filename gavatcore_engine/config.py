@@ -35,6 +35,24 @@ class Settings(BaseSettings):
     max_message_retries: int = Field(default=3, env="MAX_MESSAGE_RETRIES")
     message_retry_delay: int = Field(default=60, env="MESSAGE_RETRY_DELAY")  # seconds
     worker_sleep_interval: float = Field(default=1.0, env="WORKER_SLEEP_INTERVAL")
+    worker_blocking_pop: bool = Field(default=True, env="WORKER_BLOCKING_POP")
+    worker_block_timeout: float = Field(default=5.0, env="WORKER_BLOCK_TIMEOUT")  # seconds
+    worker_pool_size: int = Field(default=4, env="WORKER_POOL_SIZE")
+    worker_session_concurrency: int = Field(default=2, env="WORKER_SESSION_CONCURRENCY")
+    worker_drain_timeout: float = Field(default=30.0, env="WORKER_DRAIN_TIMEOUT")  # seconds
+    # Messages parked locally for sessions at their concurrency limit
+    worker_max_deferred: int = Field(default=100, env="WORKER_MAX_DEFERRED")
+    
+    # Scheduler dispatch: tasks run concurrently up to the global limit, and
+    # at most scheduler_group_concurrency at a time per target group
+    scheduler_max_concurrency: int = Field(default=8, env="SCHEDULER_MAX_CONCURRENCY")
+    scheduler_group_concurrency: int = Field(default=1, env="SCHEDULER_GROUP_CONCURRENCY")
+    # Changed tasks are written back in batches every persist interval
+    scheduler_persist_interval: float = Field(default=1.0, env="SCHEDULER_PERSIST_INTERVAL")  # seconds
+    scheduler_persist_batch_size: int = Field(default=500, env="SCHEDULER_PERSIST_BATCH_SIZE")
+    
+    # Message storage encoding: "json" (one field per attribute) or "msgpack"
+    message_encoding: str = Field(default="json", env="MESSAGE_ENCODING")
     
     # Rate limiting
     rate_limit_messages_per_minute: int = Field(default=20, env="RATE_LIMIT_MESSAGES_PER_MINUTE")
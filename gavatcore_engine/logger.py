@@ -63,7 +63,7 @@ class LoggerMixin:
         """Log an event with additional context."""
         self.logger.info(event, **kwargs)
     
-    def log_error(self, error: str, exc_info: bool = True, **kwargs: Any) -> None:
+    def log_error(self, error: str, /, exc_info: bool = True, **kwargs: Any) -> None:
         """Log an error with exception info."""
         self.logger.error(error, exc_info=exc_info, **kwargs)
     
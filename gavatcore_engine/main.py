@@ -33,6 +33,7 @@ from .telegram_client import (
 from .scheduler_engine import scheduler_engine, ScheduledTask, TaskType, SpamProtection
 from .ai_blending import ai_blending
 from .admin_commands import admin_commands
+from .worker_pool import MessageWorkerPool
 
 # Pydantic models
 class SendMessageRequest(BaseModel):
@@ -69,6 +70,7 @@ class AdminCommandRequest(BaseModel):
 
 # Global variables
 background_tasks = set()
+message_worker_pool: Optional[MessageWorkerPool] = None
 logger = get_logger(__name__)
 
 
@@ -95,6 +97,7 @@ async def lifespan(app: FastAPI):
     # Initialize scheduler engine
     try:
         await scheduler_engine.initialize()
+        await scheduler_engine.start()
         logger.info("✅ Scheduler engine initialized")
     except Exception as e:
         logger.error(f"❌ Scheduler initialization failed: {e}")
@@ -119,13 +122,17 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("🛑 Shutting down GavatCore Engine...")
     
+    # Let in-flight messages finish before tearing anything down
+    if message_worker_pool:
+        await message_worker_pool.stop()
+    
     # Stop background tasks
     for task in background_tasks:
         task.cancel()
     
     # Shutdown modules
     try:
-        await scheduler_engine.shutdown()
+        await scheduler_engine.stop()
         await telegram_client_pool.shutdown()
         await message_pool.shutdown()
         await redis_state.disconnect()
@@ -241,11 +248,21 @@ async def load_existing_bots():
 
 async def start_background_workers():
     """Start all background worker tasks."""
+    global message_worker_pool
     main_app.log_event("Starting background workers")
     
-    # Message processing worker
-    task1 = asyncio.create_task(message_processing_worker())
-    background_tasks.add(task1)
+    # Message processing workers; the blocking-pop flag only picks how they fetch
+    settings = main_app.settings
+    message_worker_pool = MessageWorkerPool(
+        process_single_message,
+        concurrency=settings.worker_pool_size,
+        per_session_limit=settings.worker_session_concurrency,
+        block_timeout=settings.worker_block_timeout,
+        drain_timeout=settings.worker_drain_timeout,
+        max_deferred=settings.worker_max_deferred,
+        blocking_pop=settings.worker_blocking_pop,
+    )
+    await message_worker_pool.start()
     
     # Scheduler worker
     task2 = asyncio.create_task(scheduler_worker())
@@ -262,29 +279,6 @@ async def start_background_workers():
     main_app.log_event(f"✅ {len(background_tasks)} background workers started")
 
 
-async def message_processing_worker():
-    """Background worker for processing messages from the pool."""
-    main_app.log_event("Message processing worker started")
-    
-    while True:
-        try:
-            # Get next message from pool
-            message = await message_pool.get_next_message()
-            
-            if message:
-                await process_single_message(message)
-            else:
-                # No messages, short sleep
-                await asyncio.sleep(0.1)
-                
-        except asyncio.CancelledError:
-            main_app.log_event("Message processing worker cancelled")
-            break
-        except Exception as e:
-            main_app.log_error(f"Message processing worker error: {e}")
-            await asyncio.sleep(1)
-
-
 async def process_single_message(message: Message):
     """Process a single message."""
     try:
@@ -350,12 +344,15 @@ async def process_single_message(message: Message):
 
 
 async def scheduler_worker():
-    """Background worker for scheduler engine."""
+    """Background worker promoting delayed messages.
+    
+    Scheduled tasks run on the scheduler engine's own due-time driven loop.
+    """
     main_app.log_event("Scheduler worker started")
     
     while True:
         try:
-            await scheduler_engine.process_pending_tasks()
+            await message_pool.promote_due_messages()
             await asyncio.sleep(1)  # Check every second
             
         except asyncio.CancelledError:
@@ -404,6 +401,9 @@ async def health_check_worker():
             except Exception as e:
                 main_app.log_error(f"Redis health check failed: {e}")
             
+            # Recover messages a dead worker popped but never claimed
+            await message_pool.requeue_orphaned_messages()
+            
             # Sleep for 5 minutes
             await asyncio.sleep(300)
             
@@ -433,6 +433,7 @@ async def update_system_statistics():
             "telegram_clients": pool_stats,
             "message_pool": message_stats,
             "scheduler": scheduler_stats,
+            "workers": message_worker_pool.get_stats() if message_worker_pool else None,
             "uptime": (datetime.utcnow() - main_app.settings.start_time).total_seconds() if hasattr(main_app.settings, 'start_time') else 0
         }
         
@@ -604,9 +605,16 @@ async def get_statistics():
         if stats_data:
             if isinstance(stats_data, bytes):
                 stats_data = stats_data.decode()
-            return json.loads(stats_data)
+            if isinstance(stats_data, str):
+                stats_data = json.loads(stats_data)
         else:
-            return {"error": "No statistics available"}
+            stats_data = {"error": "No statistics available"}
+        
+        # Worker metrics are served live rather than from the 60 s snapshot
+        if message_worker_pool:
+            stats_data["workers"] = message_worker_pool.get_stats()
+        
+        return stats_data
             
     except Exception as e:
         main_app.log_error(f"Statistics error: {e}")
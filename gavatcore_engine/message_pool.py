@@ -8,9 +8,10 @@ priority handling, and comprehensive lifecycle management.
 
 import asyncio
 import json
+import sys
 import uuid
 from typing import Dict, List, Optional, Any, Callable, Awaitable
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 from dataclasses import dataclass, field
 from pydantic import BaseModel, Field
@@ -19,6 +20,20 @@ from .config import get_settings
 from .logger import LoggerMixin
 from .redis_state import redis_state
 
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+from .redis_scripts import (
+    CLAIM_MESSAGE,
+    DELETE_MESSAGE,
+    DEQUEUE_MESSAGE,
+    PROMOTE_DUE_MESSAGES,
+    RECOVER_UNCLAIMED,
+    SAVE_MESSAGE,
+)
+
 
 class MessageStatus(str, Enum):
     """Message processing status."""
@@ -45,7 +60,21 @@ class MessageType(str, Enum):
     SCHEDULED = "scheduled"
 
 
-@dataclass
+# __slots__ keeps per-message memory down; dataclass(slots=) needs 3.10+
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def _to_epoch(value: Optional[datetime]) -> Optional[float]:
+    """Epoch seconds for a naive UTC datetime."""
+    return value.replace(tzinfo=timezone.utc).timestamp() if value else None
+
+
+def _from_epoch(value: Optional[float]) -> Optional[datetime]:
+    """Naive UTC datetime for epoch seconds."""
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None) if value is not None else None
+
+
+@dataclass(**_SLOTS)
 class Message:
     """Message data structure."""
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
@@ -135,13 +164,158 @@ class Message:
             message.updated_at = datetime.fromisoformat(data["updated_at"])
         
         return message
+    
+    PACKED_VERSION = 1
+    
+    def to_packed(self) -> bytes:
+        """Encode as a positional msgpack array with epoch timestamps."""
+        return msgpack.packb([
+            self.PACKED_VERSION,
+            self.id,
+            self.type.value,
+            self.priority.value,
+            self.status.value,
+            self.content,
+            self.media_url,
+            self.media_type,
+            self.target_chat_id,
+            self.target_username,
+            self.target_group_id,
+            self.bot_id,
+            self.bot_username,
+            _to_epoch(self.scheduled_at),
+            _to_epoch(self.expires_at),
+            _to_epoch(self.created_at),
+            _to_epoch(self.updated_at),
+            self.attempts,
+            self.max_attempts,
+            self.context,
+        ], use_bin_type=True)
+    
+    @classmethod
+    def from_packed(cls, payload: bytes) -> "Message":
+        """Decode a payload produced by ``to_packed``."""
+        (
+            version, message_id, message_type, priority, status, content,
+            media_url, media_type, target_chat_id, target_username,
+            target_group_id, bot_id, bot_username, scheduled_at, expires_at,
+            created_at, updated_at, attempts, max_attempts, context,
+        ) = msgpack.unpackb(payload, raw=False)
+        
+        if version != cls.PACKED_VERSION:
+            raise ValueError(f"Unsupported packed message version: {version}")
+        
+        return cls(
+            id=message_id,
+            type=MessageType(message_type),
+            priority=MessagePriority(priority),
+            status=MessageStatus(status),
+            content=content,
+            media_url=media_url,
+            media_type=media_type,
+            target_chat_id=target_chat_id,
+            target_username=target_username,
+            target_group_id=target_group_id,
+            bot_id=bot_id,
+            bot_username=bot_username,
+            scheduled_at=_from_epoch(scheduled_at),
+            expires_at=_from_epoch(expires_at),
+            created_at=_from_epoch(created_at),
+            updated_at=_from_epoch(updated_at),
+            attempts=attempts,
+            max_attempts=max_attempts,
+            context=context or {},
+        )
+
+
+class JsonMessageCodec:
+    """One hash field per Message attribute, JSON-encoded (original layout)."""
+    
+    name = "json"
+    
+    def encode(self, message: Message) -> Dict[str, Any]:
+        return {
+            key: redis_state.serialize(value)
+            for key, value in message.to_dict().items()
+        }
+
+
+class MsgpackMessageCodec:
+    """Whole message packed into a single binary ``data`` field.
+    
+    ``status``, ``priority`` and ``expires_at`` stay as plain fields because
+    the queue Lua scripts read them server-side.
+    """
+    
+    name = "msgpack"
+    
+    def encode(self, message: Message) -> Dict[str, Any]:
+        return {
+            "status": message.status.value,
+            "priority": message.priority.value,
+            "expires_at": message.expires_at.isoformat() if message.expires_at else "null",
+            "data": message.to_packed(),
+        }
+
+
+def decode_message_fields(fields: Dict[str, Any]) -> Message:
+    """Decode a message hash written by either codec.
+    
+    Values may be bytes (raw client) or str; the presence of ``data`` marks
+    the packed layout, anything else is the per-field JSON layout.
+    """
+    if "data" in fields:
+        message = Message.from_packed(fields["data"])
+        
+        # Lua transitions only touch the plain fields, which therefore win
+        status = fields.get("status")
+        if status:
+            message.status = MessageStatus(status.decode() if isinstance(status, bytes) else status)
+        updated_at = fields.get("updated_at")
+        if updated_at:
+            message.updated_at = datetime.fromisoformat(
+                updated_at.decode() if isinstance(updated_at, bytes) else updated_at
+            )
+        
+        return message
+    
+    return Message.from_dict({
+        key: redis_state.deserialize(value.decode() if isinstance(value, bytes) else value)
+        for key, value in fields.items()
+    })
+
+
+def get_message_codec(name: Optional[str] = None):
+    """Resolve the configured message codec, falling back to JSON."""
+    name = name or get_settings().message_encoding
+    
+    if name == MsgpackMessageCodec.name:
+        if MSGPACK_AVAILABLE:
+            return MsgpackMessageCodec()
+        redis_state.log_warning("msgpack not installed, using JSON message encoding")
+    
+    return JsonMessageCodec()
 
 
 class MessagePool(LoggerMixin):
     """Async message pool for managing message queues."""
     
+    # Sorted set of delayed message ids scored by due time (epoch seconds)
+    DELAYED_KEY = "scheduled_messages:due"
+    # Legacy SET of delayed ids, migrated into DELAYED_KEY on startup
+    LEGACY_SCHEDULED_KEY = "scheduled_messages"
+    PROMOTE_BATCH_SIZE = 500
+    # Hash of message counts per status, maintained by every transition
+    STATUS_COUNTERS_KEY = "message_stats:status"
+    # Sorted set of ids a blocking pop took but no claim has finished yet,
+    # scored by pop time; the claim script removes them
+    CLAIMING_KEY = "messages:claiming"
+    # Age after which a popped id is treated as left behind by a dead worker
+    CLAIM_GRACE_SECONDS = 60.0
+    
     def __init__(self):
         self.redis = redis_state
+        self.codec = get_message_codec()
         self.processing_messages: Dict[str, Message] = {}
         self.message_handlers: Dict[MessageType, List[Callable]] = {
             MessageType.DIRECT_MESSAGE: [],
@@ -153,8 +327,32 @@ class MessagePool(LoggerMixin):
     async def initialize(self) -> None:
         """Initialize message pool."""
         await self.redis.connect()
+        await self._migrate_legacy_scheduled()
         self.log_event("Message pool initialized")
     
+    async def _migrate_legacy_scheduled(self) -> None:
+        """Move ids from the old scheduled_messages SET into the delayed ZSET."""
+        if not await self.redis.exists(self.LEGACY_SCHEDULED_KEY):
+            return
+        
+        message_ids = list(await self.redis.smembers(self.LEGACY_SCHEDULED_KEY))
+        hashes = await self.redis.hgetall_many(
+            [f"message:{message_id}" for message_id in message_ids], raw=True
+        )
+        
+        due = {}
+        for message_id, fields in zip(message_ids, hashes):
+            message = decode_message_fields(fields) if fields else None
+            if message and message.status == MessageStatus.PENDING and message.scheduled_at:
+                due[message_id] = _to_epoch(message.scheduled_at)
+        
+        migrated = len(due)
+        if due:
+            await self.redis.zadd(self.DELAYED_KEY, due)
+        
+        await self.redis.delete(self.LEGACY_SCHEDULED_KEY)
+        self.log_event("Legacy scheduled messages migrated", count=migrated)
+    
     async def shutdown(self) -> None:
         """Shutdown message pool."""
         # Cancel all processing messages
@@ -165,23 +363,33 @@ class MessagePool(LoggerMixin):
         self.log_event("Message pool shutdown")
     
     # Message Management
+    async def _save_message(self, message: Message) -> None:
+        """Write the message hash and its status counter in one atomic step."""
+        args = [message.status.value]
+        for field_name, value in self.codec.encode(message).items():
+            args.extend((field_name, value))
+        
+        await self.redis.run_script(
+            "save_message",
+            SAVE_MESSAGE,
+            keys=[f"message:{message.id}", self.STATUS_COUNTERS_KEY],
+            args=args,
+        )
+    
     async def add_message(self, message: Message) -> str:
         """Add message to pool."""
         message.updated_at = datetime.utcnow()
         
         # Store message data
-        await self.redis.hset(
-            f"message:{message.id}",
-            message.to_dict()
-        )
+        await self._save_message(message)
         
-        # Add to appropriate queue based on priority
-        queue_name = f"queue:{message.priority.value}"
-        await self.redis.add_to_message_queue(queue_name, {"message_id": message.id})
-        
-        # Add to scheduled queue if needed
         if message.scheduled_at and message.scheduled_at > datetime.utcnow():
-            await self.redis.sadd("scheduled_messages", message.id)
+            # Delayed: promote_due_messages() queues it once it is due
+            await self.redis.zadd(self.DELAYED_KEY, {message.id: _to_epoch(message.scheduled_at)})
+        else:
+            # Add to appropriate queue based on priority
+            queue_name = f"queue:{message.priority.value}"
+            await self.redis.add_to_message_queue(queue_name, {"message_id": message.id})
         
         self.log_event(
             "Message added to pool",
@@ -194,94 +402,238 @@ class MessagePool(LoggerMixin):
     
     async def get_message(self, message_id: str) -> Optional[Message]:
         """Get message by ID."""
-        data = await self.redis.hgetall(f"message:{message_id}")
+        data = await self.redis.hgetall_raw(f"message:{message_id}")
         
         if not data:
             return None
         
-        return Message.from_dict(data)
+        return decode_message_fields(data)
     
     async def update_message(self, message: Message) -> None:
         """Update message in pool."""
         message.updated_at = datetime.utcnow()
         
-        await self.redis.hset(
-            f"message:{message.id}",
-            message.to_dict()
-        )
+        await self._save_message(message)
         
         self.log_debug("Message updated", message_id=message.id)
     
     async def delete_message(self, message_id: str) -> bool:
         """Delete message from pool."""
         # Remove from Redis
-        deleted = await self.redis.delete(f"message:{message_id}")
+        deleted = await self.redis.run_script(
+            "delete_message",
+            DELETE_MESSAGE,
+            keys=[f"message:{message_id}", self.STATUS_COUNTERS_KEY],
+        )
         
         # Remove from processing if exists
         if message_id in self.processing_messages:
             del self.processing_messages[message_id]
         
         # Remove from scheduled messages
-        await self.redis.srem("scheduled_messages", message_id)
+        await self.redis.zrem(self.DELAYED_KEY, message_id)
         
         self.log_debug("Message deleted", message_id=message_id)
         return bool(deleted)
     
     # Queue Operations
-    async def get_next_message(self, priority: Optional[MessagePriority] = None) -> Optional[Message]:
-        """Get next message from queue."""
+    DEQUEUE_SCAN_BUDGET = 100
+    
+    def _queue_keys(self, priority: Optional[MessagePriority] = None) -> List[str]:
+        """Redis keys of the priority queues, highest priority first."""
         # Priority order: urgent -> high -> normal -> low
         priorities = [MessagePriority.URGENT, MessagePriority.HIGH, MessagePriority.NORMAL, MessagePriority.LOW]
         
         if priority:
             priorities = [priority]
         
-        for prio in priorities:
-            queue_name = f"queue:{prio.value}"
-            message_data = await self.redis.pop_from_message_queue(queue_name)
-            
-            if message_data:
-                message_id = message_data["message_id"]
-                message = await self.get_message(message_id)
-                
-                if message and message.status == MessageStatus.PENDING:
-                    # Check if message is expired
-                    if message.expires_at and message.expires_at < datetime.utcnow():
-                        await self.cancel_message(message_id)
-                        continue
-                    
-                    # Mark as processing
-                    message.status = MessageStatus.PROCESSING
-                    await self.update_message(message)
-                    
-                    self.processing_messages[message_id] = message
-                    
-                    self.log_debug("Message retrieved from queue", message_id=message_id)
-                    return message
-        
-        return None
+        return [
+            self.redis.message_queue_key(f"queue:{prio.value}")
+            for prio in priorities
+        ]
+    
+    def _accept_claim(self, result: List[Any]) -> Optional[Message]:
+        """Turn a dequeue/claim script result into a tracked Message."""
+        message_id, fields, expired_ids = result
+        
+        for expired_id in expired_ids:
+            expired_id = expired_id.decode()
+            self.processing_messages.pop(expired_id, None)
+            self.log_event("Message cancelled", message_id=expired_id, reason="expired")
+        
+        if not message_id:
+            return None
+        
+        message_id = message_id.decode()
+        data = {fields[i].decode(): fields[i + 1] for i in range(0, len(fields), 2)}
+        message = decode_message_fields(data)
+        
+        self.processing_messages[message_id] = message
+        
+        self.log_debug("Message retrieved from queue", message_id=message_id)
+        return message
+    
+    async def get_next_message(self, priority: Optional[MessagePriority] = None) -> Optional[Message]:
+        """Get next message from queue.
+        
+        Pops, expiry-checks and marks the message as PROCESSING in a single
+        server-side script, so the whole dequeue costs one round trip and two
+        workers can never claim the same message.
+        """
+        result = await self.redis.run_script(
+            "dequeue_message",
+            DEQUEUE_MESSAGE,
+            keys=[self.DELAYED_KEY, self.STATUS_COUNTERS_KEY, *self._queue_keys(priority)],
+            args=["message:", datetime.utcnow().isoformat(), self.DEQUEUE_SCAN_BUDGET],
+            raw=True,
+        )
+        
+        return self._accept_claim(result)
+    
+    async def wait_for_next_message(
+        self,
+        timeout: float = 5.0,
+        priority: Optional[MessagePriority] = None,
+    ) -> Optional[Message]:
+        """Get next message, blocking on the priority queues while they are empty.
+        
+        Returns None if nothing arrived within ``timeout`` seconds.
+        """
+        message = await self.get_next_message(priority)
+        if message:
+            return message
+        
+        popped = await self.redis.blpop(self._queue_keys(priority), timeout=timeout)
+        if not popped:
+            return None
+        
+        queue_key, entry = popped
+        message_id = entry["message_id"] if isinstance(entry, dict) else str(entry)
+        
+        # The claim runs to completion even if this task is cancelled, so a
+        # cancellation never leaves a popped message half claimed
+        claim = asyncio.ensure_future(self._claim_popped(message_id))
+        try:
+            result = await asyncio.shield(claim)
+        except asyncio.CancelledError:
+            await asyncio.shield(self._release_claim(claim, queue_key, message_id))
+            raise
+        
+        return self._accept_claim(result)
+    
+    async def _claim_popped(self, message_id: str) -> List[Any]:
+        """Record a popped id as unclaimed, then claim it.
+        
+        If the worker dies before the claim, the id stays in CLAIMING_KEY
+        and ``requeue_orphaned_messages`` puts it back on its queue.
+        """
+        await self.redis.zadd(self.CLAIMING_KEY, {message_id: _to_epoch(datetime.utcnow())})
+        return await self.redis.run_script(
+            "claim_message",
+            CLAIM_MESSAGE,
+            keys=[self.DELAYED_KEY, f"message:{message_id}", self.STATUS_COUNTERS_KEY, self.CLAIMING_KEY],
+            args=[message_id, datetime.utcnow().isoformat()],
+            raw=True,
+        )
+    
+    async def _release_claim(self, claim: "asyncio.Future", queue_key: str, message_id: str) -> None:
+        """Undo a claim whose waiter was cancelled.
+        
+        A message the claim took is reset to pending and put back at the
+        head of its queue. If the claim failed, the popped entry is pushed
+        back; dequeue skips it should the message not be pending after all.
+        """
+        try:
+            result = await claim
+        except (Exception, asyncio.CancelledError):
+            await self.redis.lpush(queue_key, {"message_id": message_id})
+            return
+        
+        message = self._accept_claim(result)
+        if message:
+            await self.requeue_message(message.id)
     
     async def get_scheduled_messages(self) -> List[Message]:
-        """Get messages ready for scheduling."""
-        scheduled_ids = await self.redis.smembers("scheduled_messages")
+        """Get delayed messages that are due but not yet promoted."""
+        due_ids = await self.redis.zrangebyscore(
+            self.DELAYED_KEY, "-inf", _to_epoch(datetime.utcnow())
+        )
+        hashes = await self.redis.hgetall_many(
+            [f"message:{message_id}" for message_id in due_ids], raw=True
+        )
         ready_messages = []
+        missing = []
         
-        for message_id in scheduled_ids:
-            message = await self.get_message(message_id)
-            
-            if not message:
-                await self.redis.srem("scheduled_messages", message_id)
+        for message_id, fields in zip(due_ids, hashes):
+            if not fields:
+                missing.append(message_id)
                 continue
             
-            # Check if message is ready to be sent
-            if (message.scheduled_at and 
-                message.scheduled_at <= datetime.utcnow() and 
-                message.status == MessageStatus.PENDING):
-                
+            message = decode_message_fields(fields)
+            if message.status == MessageStatus.PENDING:
                 ready_messages.append(message)
         
+        if missing:
+            await self.redis.zrem(self.DELAYED_KEY, *missing)
+        
         return ready_messages
     
+    async def promote_due_messages(self, limit: Optional[int] = None) -> List[str]:
+        """Move due delayed messages onto their priority queues.
+        
+        One range query over the due part of the sorted set, so the cost is
+        proportional to the number of due messages, not all scheduled ones.
+        """
+        promoted = await self.redis.run_script(
+            "promote_due_messages",
+            PROMOTE_DUE_MESSAGES,
+            keys=[self.DELAYED_KEY],
+            args=[
+                _to_epoch(datetime.utcnow()),
+                limit or self.PROMOTE_BATCH_SIZE,
+                "message:",
+                self.redis.message_queue_key("queue:"),
+            ],
+        )
+        
+        if promoted:
+            self.log_debug("Delayed messages promoted", count=len(promoted))
+        
+        return promoted
+    
+    async def reschedule_message(self, message_id: str, scheduled_at: datetime) -> bool:
+        """Put a message back into the delayed set for a later due time."""
+        message = await self.get_message(message_id)
+        
+        if not message:
+            return False
+        
+        message.status = MessageStatus.PENDING
+        message.scheduled_at = scheduled_at
+        await self.update_message(message)
+        
+        self.processing_messages.pop(message_id, None)
+        await self.redis.zadd(self.DELAYED_KEY, {message_id: _to_epoch(scheduled_at)})
+        
+        self.log_event("Message rescheduled", message_id=message_id, scheduled_at=scheduled_at.isoformat())
+        return True
+    
+    async def requeue_message(self, message_id: str) -> bool:
+        """Hand a claimed but unprocessed message back to the head of its queue."""
+        message = await self.get_message(message_id)
+        
+        if not message:
+            return False
+        
+        message.status = MessageStatus.PENDING
+        await self.update_message(message)
+        
+        self.processing_messages.pop(message_id, None)
+        await self.redis.lpush(self._queue_keys(message.priority)[0], {"message_id": message_id})
+        
+        self.log_debug("Message requeued", message_id=message_id)
+        return True
+    
     async def complete_message(self, message_id: str) -> bool:
         """Mark message as completed."""
         message = await self.get_message(message_id)
@@ -297,7 +649,7 @@ class MessagePool(LoggerMixin):
             del self.processing_messages[message_id]
         
         # Remove from scheduled if exists
-        await self.redis.srem("scheduled_messages", message_id)
+        await self.redis.zrem(self.DELAYED_KEY, message_id)
         
         self.log_event("Message completed", message_id=message_id)
         return True
@@ -360,7 +712,7 @@ class MessagePool(LoggerMixin):
             del self.processing_messages[message_id]
         
         # Remove from scheduled
-        await self.redis.srem("scheduled_messages", message_id)
+        await self.redis.zrem(self.DELAYED_KEY, message_id)
         
         self.log_event("Message cancelled", message_id=message_id)
         return True
@@ -368,29 +720,120 @@ class MessagePool(LoggerMixin):
     # Statistics and Monitoring
     async def get_queue_stats(self) -> Dict[str, Any]:
         """Get queue statistics."""
-        stats = {}
-        
-        for priority in MessagePriority:
-            queue_name = f"queue:{priority.value}"
-            stats[priority.value] = await self.redis.llen(queue_name)
+        async with self.redis.batch() as batch:
+            for priority in MessagePriority:
+                batch.llen(self._queue_keys(priority)[0])
+            batch.zcard(self.DELAYED_KEY)
+        
+        *queue_lengths, scheduled = batch.results
+        stats = {
+            priority.value: length
+            for priority, length in zip(MessagePriority, queue_lengths)
+        }
         
         stats["processing"] = len(self.processing_messages)
-        stats["scheduled"] = len(await self.redis.smembers("scheduled_messages"))
+        stats["scheduled"] = scheduled
         
         return stats
     
     async def get_message_stats(self) -> Dict[str, int]:
-        """Get message statistics by status."""
-        # This would require scanning all messages, which might be expensive
-        # For production, consider maintaining counters in Redis
+        """Get message statistics by status.
+        
+        Reads the counters maintained by every status transition, so this is
+        a single HGETALL regardless of how many messages exist.
+        """
+        counters = await self.redis.hgetall(self.STATUS_COUNTERS_KEY)
+        
         return {
-            "pending": 0,  # Would need to implement proper counting
-            "processing": len(self.processing_messages),
-            "completed": 0,
-            "failed": 0,
-            "cancelled": 0,
+            status.value: int(counters.get(status.value, 0))
+            for status in MessageStatus
         }
     
+    async def reconcile_message_stats(self, batch_size: int = 500) -> Dict[str, int]:
+        """Rebuild the status counters from a SCAN over all message hashes.
+        
+        Use when the counters have drifted (e.g. after manual key deletion).
+        Transitions that happen while the scan runs can still skew the result
+        by the number of in-flight changes.
+        """
+        counts = {status.value: 0 for status in MessageStatus}
+        keys: List[str] = []
+        
+        async def count_keys() -> None:
+            for fields in await self.redis.hmget_many(keys, ["status"]):
+                if fields["status"] in counts:
+                    counts[fields["status"]] += 1
+            keys.clear()
+        
+        async for key in self.redis.scan_iter("message:*", count=batch_size):
+            keys.append(key)
+            if len(keys) >= batch_size:
+                await count_keys()
+        if keys:
+            await count_keys()
+        
+        async with self.redis.pipeline() as pipe:
+            pipe.delete(self.STATUS_COUNTERS_KEY)
+            pipe.hset(self.STATUS_COUNTERS_KEY, counts)
+        
+        self.log_event("Message status counters reconciled", **counts)
+        return counts
+    
+    async def requeue_orphaned_messages(
+        self,
+        batch_size: int = 500,
+        min_age: Optional[float] = None,
+    ) -> List[str]:
+        """Put messages a dead worker popped but never claimed back on their queue.
+        
+        Only CLAIMING_KEY is swept, so the cost follows the number of
+        unfinished claims rather than the keyspace. Ids younger than
+        ``min_age`` seconds (CLAIM_GRACE_SECONDS by default) may still be
+        claimed by a live worker and are left alone; a duplicate entry from a
+        slow claim is harmless, dequeue skips ids that are no longer pending.
+        """
+        cutoff = _to_epoch(datetime.utcnow()) - (self.CLAIM_GRACE_SECONDS if min_age is None else min_age)
+        requeued: List[str] = []
+        
+        while True:
+            inspected, recovered = await self.redis.run_script(
+                "recover_unclaimed",
+                RECOVER_UNCLAIMED,
+                keys=[self.CLAIMING_KEY],
+                args=[cutoff, batch_size, "message:", self.redis.message_queue_key("queue:")],
+            )
+            requeued.extend(recovered)
+            if inspected < batch_size:
+                break
+        
+        if requeued:
+            self.log_warning("Unclaimed popped messages requeued", count=len(requeued))
+        
+        return requeued
+    
+    async def migrate_message_encoding(self, batch_size: int = 500) -> int:
+        """Rewrite every stored message hash with the configured codec.
+        
+        Reads accept both layouts, so this can run while workers are live;
+        messages are also converted lazily whenever they are next saved.
+        """
+        migrated = 0
+        
+        async for key in self.redis.scan_iter("message:*", count=batch_size):
+            fields = await self.redis.hgetall_raw(key)
+            if not fields:
+                continue
+            
+            is_packed = "data" in fields
+            if is_packed == (self.codec.name == MsgpackMessageCodec.name):
+                continue
+            
+            await self._save_message(decode_message_fields(fields))
+            migrated += 1
+        
+        self.log_event("Message encoding migrated", codec=self.codec.name, count=migrated)
+        return migrated
+    
     # Message Handlers
     def register_handler(self, message_type: MessageType, handler: Callable[[Message], Awaitable[bool]]) -> None:
         """Register message handler for specific type."""
@@ -0,0 +1,187 @@
+"""
+Redis Lua Scripts
+=================
+
+Server-side scripts used by the message pool for atomic queue transitions.
+"""
+
+# Pops the next pending message id across the priority queues (KEYS[3..]),
+# cancels expired entries, flips the winner to PROCESSING and returns its hash.
+# Status counters are adjusted in the same script.
+#
+# KEYS[1]    delayed messages sorted set
+# KEYS[2]    status counters hash
+# KEYS[3..]  priority queues, highest priority first
+# ARGV[1]    message hash key prefix
+# ARGV[2]    current UTC time (ISO-8601, compared lexicographically)
+# ARGV[3]    max queue entries to inspect before giving up
+#
+# Returns {message_id, {field, value, ...}, {expired_id, ...}}; message_id is
+# an empty string when no pending message was found.
+DEQUEUE_MESSAGE = """
+local prefix = ARGV[1]
+local now = ARGV[2]
+local budget = tonumber(ARGV[3])
+local expired = {}
+
+for i = 3, #KEYS do
+    while budget > 0 do
+        local raw = redis.call('LPOP', KEYS[i])
+        if not raw then
+            break
+        end
+        budget = budget - 1
+
+        local message_id = raw
+        local ok, entry = pcall(cjson.decode, raw)
+        if ok and type(entry) == 'table' and entry['message_id'] then
+            message_id = entry['message_id']
+        end
+
+        local key = prefix .. message_id
+        if redis.call('HGET', key, 'status') == 'pending' then
+            local expires_at = redis.call('HGET', key, 'expires_at')
+            redis.call('HINCRBY', KEYS[2], 'pending', -1)
+            if expires_at and expires_at ~= 'null' and expires_at < now then
+                redis.call('HSET', key, 'status', 'cancelled', 'updated_at', now)
+                redis.call('HINCRBY', KEYS[2], 'cancelled', 1)
+                redis.call('ZREM', KEYS[1], message_id)
+                table.insert(expired, message_id)
+            else
+                redis.call('HSET', key, 'status', 'processing', 'updated_at', now)
+                redis.call('HINCRBY', KEYS[2], 'processing', 1)
+                return {message_id, redis.call('HGETALL', key), expired}
+            end
+        end
+    end
+end
+
+return {'', {}, expired}
+"""
+
+# Claims a single message id that was already popped from its queue (e.g. by
+# a blocking BLPOP) and drops it from the popped-but-unclaimed set. Same
+# expiry handling and return shape as DEQUEUE_MESSAGE.
+#
+# KEYS[1]    delayed messages sorted set
+# KEYS[2]    message hash
+# KEYS[3]    status counters hash
+# KEYS[4]    popped-but-unclaimed sorted set
+# ARGV[1]    message id
+# ARGV[2]    current UTC time (ISO-8601)
+CLAIM_MESSAGE = """
+local message_id = ARGV[1]
+local now = ARGV[2]
+
+redis.call('ZREM', KEYS[4], message_id)
+
+if redis.call('HGET', KEYS[2], 'status') ~= 'pending' then
+    return {'', {}, {}}
+end
+
+redis.call('HINCRBY', KEYS[3], 'pending', -1)
+
+local expires_at = redis.call('HGET', KEYS[2], 'expires_at')
+if expires_at and expires_at ~= 'null' and expires_at < now then
+    redis.call('HSET', KEYS[2], 'status', 'cancelled', 'updated_at', now)
+    redis.call('HINCRBY', KEYS[3], 'cancelled', 1)
+    redis.call('ZREM', KEYS[1], message_id)
+    return {'', {}, {message_id}}
+end
+
+redis.call('HSET', KEYS[2], 'status', 'processing', 'updated_at', now)
+redis.call('HINCRBY', KEYS[3], 'processing', 1)
+return {message_id, redis.call('HGETALL', KEYS[2]), {}}
+"""
+
+# Puts popped-but-unclaimed ids older than the cutoff back at the head of
+# their priority queue. Ids whose message is no longer pending are dropped.
+#
+# KEYS[1]    popped-but-unclaimed sorted set (score = pop epoch seconds)
+# ARGV[1]    cutoff epoch seconds
+# ARGV[2]    max ids to recover in one call
+# ARGV[3]    message hash key prefix
+# ARGV[4]    priority queue key prefix
+#
+# Returns {ids inspected, {requeued_id, ...}}.
+RECOVER_UNCLAIMED = """
+local stale = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+local requeued = {}
+
+for _, message_id in ipairs(stale) do
+    redis.call('ZREM', KEYS[1], message_id)
+    local key = ARGV[3] .. message_id
+    if redis.call('HGET', key, 'status') == 'pending' then
+        local priority = redis.call('HGET', key, 'priority') or 'normal'
+        redis.call('LPUSH', ARGV[4] .. priority, cjson.encode({message_id = message_id}))
+        table.insert(requeued, message_id)
+    end
+end
+
+return {#stale, requeued}
+"""
+
+# Moves delayed messages whose due time has passed onto their priority queue.
+# Only the due range of the sorted set is touched, so cost is O(due).
+#
+# KEYS[1]    delayed messages sorted set (score = due epoch seconds)
+# ARGV[1]    current epoch seconds
+# ARGV[2]    max messages to promote in one call
+# ARGV[3]    message hash key prefix
+# ARGV[4]    priority queue key prefix
+#
+# Returns the promoted message ids.
+PROMOTE_DUE_MESSAGES = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+local promoted = {}
+
+for _, message_id in ipairs(due) do
+    redis.call('ZREM', KEYS[1], message_id)
+    local key = ARGV[3] .. message_id
+    if redis.call('HGET', key, 'status') == 'pending' then
+        local priority = redis.call('HGET', key, 'priority') or 'normal'
+        redis.call('RPUSH', ARGV[4] .. priority, cjson.encode({message_id = message_id}))
+        table.insert(promoted, message_id)
+    end
+end
+
+return promoted
+"""
+
+# Replaces the message hash with the given fields and moves the status
+# counter from the stored status to the new one atomically. The hash is
+# rewritten rather than patched so switching encodings leaves no stale fields.
+#
+# KEYS[1]    message hash
+# KEYS[2]    status counters hash
+# ARGV[1]    new status
+# ARGV[2..]  field, value pairs (must include the status field)
+SAVE_MESSAGE = """
+local previous = redis.call('HGET', KEYS[1], 'status')
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+
+if previous ~= ARGV[1] then
+    if previous then
+        redis.call('HINCRBY', KEYS[2], previous, -1)
+    end
+    redis.call('HINCRBY', KEYS[2], ARGV[1], 1)
+end
+
+return previous
+"""
+
+# Deletes a message hash and decrements the counter of its stored status.
+#
+# KEYS[1]    message hash
+# KEYS[2]    status counters hash
+DELETE_MESSAGE = """
+local previous = redis.call('HGET', KEYS[1], 'status')
+local deleted = redis.call('DEL', KEYS[1])
+
+if previous then
+    redis.call('HINCRBY', KEYS[2], previous, -1)
+end
+
+return deleted
+"""
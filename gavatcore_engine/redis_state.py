@@ -8,7 +8,7 @@ Async Redis operations for state management and caching.
 import aioredis
 import json
 import asyncio
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
 from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
 
@@ -16,6 +16,107 @@ from .config import get_settings
 from .logger import LoggerMixin
 
 
+def _decode_hash(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: RedisStateManager.deserialize(v) for k, v in data.items()} if data else {}
+
+
+def _decode_optional(value: Any) -> Any:
+    return None if value is None else RedisStateManager.deserialize(value)
+
+
+class RedisBatch:
+    """Commands queued on one pipeline and sent in a single round trip.
+    
+    Mirrors the serialization of RedisStateManager's single-key methods.
+    Results are available from ``results`` once the batch has executed.
+    """
+    
+    def __init__(self, pipe):
+        self._pipe = pipe
+        self._decoders: List[Optional[Callable[[Any], Any]]] = []
+        self.results: List[Any] = []
+    
+    def __len__(self) -> int:
+        return len(self._decoders)
+    
+    def _queue(self, decoder: Optional[Callable[[Any], Any]] = None) -> "RedisBatch":
+        self._decoders.append(decoder)
+        return self
+    
+    def set(self, key: str, value: Any, expire: Optional[int] = None) -> "RedisBatch":
+        self._pipe.set(key, RedisStateManager.serialize(value), ex=expire)
+        return self._queue()
+    
+    def get(self, key: str) -> "RedisBatch":
+        self._pipe.get(key)
+        return self._queue(_decode_optional)
+    
+    def delete(self, *keys: str) -> "RedisBatch":
+        self._pipe.delete(*keys)
+        return self._queue()
+    
+    def expire(self, key: str, seconds: int) -> "RedisBatch":
+        self._pipe.expire(key, seconds)
+        return self._queue()
+    
+    def hset(self, name: str, mapping: Dict[str, Any]) -> "RedisBatch":
+        self._pipe.hset(name, mapping={k: RedisStateManager.serialize(v) for k, v in mapping.items()})
+        return self._queue()
+    
+    def hget(self, name: str, key: str) -> "RedisBatch":
+        self._pipe.hget(name, key)
+        return self._queue(_decode_optional)
+    
+    def hmget(self, name: str, keys: List[str]) -> "RedisBatch":
+        self._pipe.hmget(name, keys)
+        return self._queue(lambda values: dict(zip(keys, map(_decode_optional, values))))
+    
+    def hgetall(self, name: str) -> "RedisBatch":
+        self._pipe.hgetall(name)
+        return self._queue(_decode_hash)
+    
+    def hincrby(self, name: str, key: str, amount: int = 1) -> "RedisBatch":
+        self._pipe.hincrby(name, key, amount)
+        return self._queue()
+    
+    def hdel(self, name: str, *keys: str) -> "RedisBatch":
+        self._pipe.hdel(name, *keys)
+        return self._queue()
+    
+    def rpush(self, name: str, *values: Any) -> "RedisBatch":
+        self._pipe.rpush(name, *[RedisStateManager.serialize(v) for v in values])
+        return self._queue()
+    
+    def llen(self, name: str) -> "RedisBatch":
+        self._pipe.llen(name)
+        return self._queue()
+    
+    def zadd(self, name: str, mapping: Dict[str, float]) -> "RedisBatch":
+        self._pipe.zadd(name, mapping)
+        return self._queue()
+    
+    def zrem(self, name: str, *values: str) -> "RedisBatch":
+        self._pipe.zrem(name, *values)
+        return self._queue()
+    
+    def zcard(self, name: str) -> "RedisBatch":
+        self._pipe.zcard(name)
+        return self._queue()
+    
+    async def execute(self) -> List[Any]:
+        """Send all queued commands and decode their replies."""
+        if not self._decoders:
+            return []
+        
+        replies = await self._pipe.execute()
+        self.results = [
+            decoder(reply) if decoder else reply
+            for decoder, reply in zip(self._decoders, replies)
+        ]
+        self._decoders = []
+        return self.results
+
+
 class RedisStateManager(LoggerMixin):
     """Async Redis state manager for application state and caching."""
     
@@ -23,6 +124,14 @@ class RedisStateManager(LoggerMixin):
         self.settings = get_settings()
         self.redis: Optional[aioredis.Redis] = None
         self._connection_pool: Optional[aioredis.ConnectionPool] = None
+        # Undecoded client for binary payloads (e.g. packed message hashes)
+        self.raw_redis: Optional[aioredis.Redis] = None
+        self._raw_connection_pool: Optional[aioredis.ConnectionPool] = None
+        # Separate client for blocking pops, which hold their connection for
+        # the whole block timeout and would otherwise starve the main pool
+        self.blocking_redis: Optional[aioredis.Redis] = None
+        self._blocking_connection_pool: Optional[aioredis.ConnectionPool] = None
+        self._scripts: Dict[tuple, Any] = {}
     
     async def connect(self) -> None:
         """Establish Redis connection."""
@@ -39,6 +148,29 @@ class RedisStateManager(LoggerMixin):
             
             self.redis = aioredis.Redis(connection_pool=self._connection_pool)
             
+            self._raw_connection_pool = aioredis.ConnectionPool.from_url(
+                self.settings.redis_url,
+                password=self.settings.redis_password,
+                db=self.settings.redis_db,
+                decode_responses=False,
+                max_connections=20,
+                retry_on_timeout=True,
+            )
+            self.raw_redis = aioredis.Redis(connection_pool=self._raw_connection_pool)
+            
+            # One connection per message worker, each blocked in at most one pop
+            self._blocking_connection_pool = aioredis.ConnectionPool.from_url(
+                self.settings.redis_url,
+                password=self.settings.redis_password,
+                db=self.settings.redis_db,
+                encoding="utf-8",
+                decode_responses=True,
+                max_connections=max(1, self.settings.worker_pool_size),
+                retry_on_timeout=True,
+            )
+            self.blocking_redis = aioredis.Redis(connection_pool=self._blocking_connection_pool)
+            self._scripts.clear()
+            
             # Test connection
             await self.redis.ping()
             self.log_event("Redis connection established", url=self.settings.redis_url)
@@ -49,22 +181,99 @@ class RedisStateManager(LoggerMixin):
     
     async def disconnect(self) -> None:
         """Close Redis connection."""
+        if self.blocking_redis:
+            await self.blocking_redis.close()
+        if self.raw_redis:
+            await self.raw_redis.close()
         if self.redis:
             await self.redis.close()
             self.log_event("Redis connection closed")
     
     @asynccontextmanager
-    async def get_connection(self):
-        """Get Redis connection context manager."""
+    async def get_connection(self, raw: bool = False, blocking: bool = False):
+        """Get Redis connection context manager.
+        
+        ``raw=True`` yields the client that returns undecoded bytes,
+        ``blocking=True`` the client reserved for blocking commands.
+        """
         if not self.redis:
             await self.connect()
         
+        if blocking:
+            client = self.blocking_redis or self.redis
+        else:
+            client = self.raw_redis if raw else self.redis
+        
         try:
-            yield self.redis
+            yield client
         except Exception as e:
             self.log_error("Redis operation failed", error=str(e))
             raise
     
+    @staticmethod
+    def serialize(value: Any) -> str:
+        """Encode a value the way every write in this manager stores it."""
+        return json.dumps(value) if not isinstance(value, str) else value
+    
+    @staticmethod
+    def deserialize(value: Any) -> Any:
+        """Decode a stored value, falling back to the raw string."""
+        try:
+            return json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return value
+    
+    # Batching
+    @asynccontextmanager
+    async def batch(self, transaction: bool = False):
+        """Queue commands and send them in one round trip when the block exits.
+        
+        ``transaction=True`` wraps them in MULTI/EXEC so they apply atomically.
+        """
+        async with self.get_connection() as redis:
+            batch = RedisBatch(redis.pipeline(transaction=transaction))
+            yield batch
+            await batch.execute()
+    
+    def pipeline(self, transaction: bool = True):
+        """Atomic (MULTI/EXEC) variant of ``batch()``."""
+        return self.batch(transaction=transaction)
+    
+    async def mget(self, *keys: str) -> List[Any]:
+        """Get many keys in one round trip; missing keys come back as None."""
+        if not keys:
+            return []
+        
+        async with self.get_connection() as redis:
+            return [_decode_optional(v) for v in await redis.mget(keys)]
+    
+    async def hmget_many(self, names: Iterable[str], keys: List[str]) -> List[Dict[str, Any]]:
+        """Get the same hash fields from many hashes in one round trip."""
+        async with self.batch() as batch:
+            for name in names:
+                batch.hmget(name, keys)
+        return batch.results
+    
+    async def hgetall_many(self, names: Iterable[str], raw: bool = False) -> List[Dict[str, Any]]:
+        """Get many whole hashes in one round trip.
+        
+        ``raw=True`` returns undecoded values (field names decoded), like
+        ``hgetall_raw``.
+        """
+        names = list(names)
+        if not names:
+            return []
+        
+        async with self.get_connection(raw=raw) as redis:
+            pipe = redis.pipeline(transaction=False)
+            for name in names:
+                pipe.hgetall(name)
+            replies = await pipe.execute()
+        
+        if raw:
+            return [{k.decode(): v for k, v in reply.items()} for reply in replies]
+        return [_decode_hash(reply) for reply in replies]
+    
     # Basic Operations
     async def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
         """Set a key-value pair with optional expiration."""
@@ -100,21 +309,48 @@ class RedisStateManager(LoggerMixin):
         async with self.get_connection() as redis:
             return bool(await redis.exists(key))
     
+    async def scan_iter(self, match: str, count: int = 500):
+        """Iterate keys matching a pattern without blocking the server."""
+        async with self.get_connection() as redis:
+            async for key in redis.scan_iter(match=match, count=count):
+                yield key
+    
     async def expire(self, key: str, seconds: int) -> bool:
         """Set expiration for a key."""
         async with self.get_connection() as redis:
             return await redis.expire(key, seconds)
     
     # Hash Operations
-    async def hset(self, name: str, mapping: Dict[str, Any]) -> int:
-        """Set hash fields."""
+    async def hset(self, name: str, mapping: Union[Dict[str, Any], str], value: Any = None) -> int:
+        """Set hash fields (a mapping, or a single ``key, value`` pair)."""
+        if isinstance(mapping, str):
+            mapping = {mapping: value}
+        
         async with self.get_connection() as redis:
-            serialized_mapping = {
-                k: json.dumps(v) if not isinstance(v, str) else v
-                for k, v in mapping.items()
-            }
+            serialized_mapping = {k: self.serialize(v) for k, v in mapping.items()}
             return await redis.hset(name, mapping=serialized_mapping)
     
+    async def hscan_chunks(self, name: str, count: int = 500):
+        """Yield a hash as HSCAN-sized dicts of stored (unparsed) values.
+        
+        Memory stays bounded by ``count`` instead of one HGETALL reply holding
+        the whole hash.
+        """
+        async with self.get_connection() as redis:
+            cursor = 0
+            while True:
+                cursor, chunk = await redis.hscan(name, cursor=cursor, count=count)
+                if chunk:
+                    yield chunk
+                if not cursor:
+                    break
+    
+    async def hgetall_raw(self, name: str) -> Dict[str, bytes]:
+        """Get all hash fields as undecoded bytes (field names decoded)."""
+        async with self.get_connection(raw=True) as redis:
+            data = await redis.hgetall(name)
+            return {k.decode(): v for k, v in data.items()}
+    
     async def hget(self, name: str, key: str, default: Any = None) -> Any:
         """Get hash field value."""
         async with self.get_connection() as redis:
@@ -142,6 +378,11 @@ class RedisStateManager(LoggerMixin):
                     
             return result
     
+    async def hincrby(self, name: str, key: str, amount: int = 1) -> int:
+        """Increment a hash field by an integer amount."""
+        async with self.get_connection() as redis:
+            return await redis.hincrby(name, key, amount)
+    
     async def hdel(self, name: str, *keys: str) -> int:
         """Delete hash fields."""
         async with self.get_connection() as redis:
@@ -193,6 +434,17 @@ class RedisStateManager(LoggerMixin):
                     
             return result
     
+    async def blpop(self, names: List[str], timeout: float = 0) -> Optional[tuple]:
+        """Block until one of the lists has a value; lists are checked in order."""
+        async with self.get_connection(blocking=True) as redis:
+            result = await redis.blpop(names, timeout=timeout)
+            
+            if result is None:
+                return None
+            
+            name, value = result
+            return name, self.deserialize(value)
+    
     async def llen(self, name: str) -> int:
         """Get list length."""
         async with self.get_connection() as redis:
@@ -237,6 +489,55 @@ class RedisStateManager(LoggerMixin):
             serialized_value = json.dumps(value) if not isinstance(value, str) else value
             return await redis.sismember(name, serialized_value)
     
+    # Sorted Set Operations
+    async def zadd(self, name: str, mapping: Dict[str, float]) -> int:
+        """Add members with scores to a sorted set."""
+        async with self.get_connection() as redis:
+            return await redis.zadd(name, mapping)
+    
+    async def zrem(self, name: str, *values: str) -> int:
+        """Remove members from a sorted set."""
+        async with self.get_connection() as redis:
+            return await redis.zrem(name, *values)
+    
+    async def zcard(self, name: str) -> int:
+        """Get sorted set size."""
+        async with self.get_connection() as redis:
+            return await redis.zcard(name)
+    
+    async def zrangebyscore(
+        self,
+        name: str,
+        min_score: Union[float, str],
+        max_score: Union[float, str],
+        start: Optional[int] = None,
+        num: Optional[int] = None,
+    ) -> List[str]:
+        """Get sorted set members with scores between min and max."""
+        async with self.get_connection() as redis:
+            return await redis.zrangebyscore(name, min_score, max_score, start=start, num=num)
+    
+    # Lua Scripts
+    async def run_script(
+        self,
+        name: str,
+        source: str,
+        keys: Optional[List[str]] = None,
+        args: Optional[List[Any]] = None,
+        raw: bool = False,
+    ) -> Any:
+        """Run a server-side Lua script, cached by name and invoked via EVALSHA.
+        
+        ``raw=True`` runs it on the undecoded client, so replies are bytes.
+        """
+        async with self.get_connection(raw=raw) as redis:
+            script = self._scripts.get((name, raw))
+            if script is None:
+                script = redis.register_script(source)
+                self._scripts[(name, raw)] = script
+            
+            return await script(keys=keys or [], args=args or [])
+    
     # Application-specific methods
     async def get_bot_state(self, bot_id: str) -> Dict[str, Any]:
         """Get bot state from Redis."""
@@ -248,17 +549,22 @@ class RedisStateManager(LoggerMixin):
         await self.hset(f"bot_state:{bot_id}", state)
         await self.expire(f"bot_state:{bot_id}", 86400)  # 24 hours
     
+    @staticmethod
+    def message_queue_key(queue_name: str) -> str:
+        """Get the Redis key backing a message queue."""
+        return f"queue:{queue_name}"
+    
     async def get_message_queue(self, queue_name: str) -> List[Dict[str, Any]]:
         """Get messages from queue."""
-        return await self.lrange(f"queue:{queue_name}")
+        return await self.lrange(self.message_queue_key(queue_name))
     
     async def add_to_message_queue(self, queue_name: str, message: Dict[str, Any]) -> None:
         """Add message to queue."""
-        await self.rpush(f"queue:{queue_name}", message)
+        await self.rpush(self.message_queue_key(queue_name), message)
     
     async def pop_from_message_queue(self, queue_name: str) -> Optional[Dict[str, Any]]:
         """Pop message from queue."""
-        return await self.lpop(f"queue:{queue_name}")
+        return await self.lpop(self.message_queue_key(queue_name))
     
     async def set_rate_limit(self, key: str, limit: int, window: int) -> bool:
         """Set rate limit counter."""
@@ -6,11 +6,13 @@ Advanced background task scheduler with dynamic spam protection and Redis state
 """
 
 import asyncio
+import heapq
+import itertools
 import json
 import random
 import uuid
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Callable
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any, Callable, Set, Tuple
 from enum import Enum
 from dataclasses import dataclass, asdict
 from croniter import croniter
@@ -19,6 +21,12 @@ from .config import get_settings
 from .logger import LoggerMixin
 from .redis_state import redis_state
 from .message_pool import message_pool, Message, MessageType, MessagePriority
+from .worker_pool import LatencyHistogram
+
+
+def _timestamp(value: datetime) -> float:
+    """Epoch seconds for a naive UTC datetime."""
+    return value.replace(tzinfo=timezone.utc).timestamp()
 
 
 class TaskType(Enum):
@@ -166,8 +174,7 @@ class SpamProtection:
         """Calculate dynamic delay with spam protection."""
         
         # Get current states
-        group_state = await self._get_group_state(group_id)
-        bot_state = await self._get_bot_state(bot_id)
+        group_state, bot_state = await self._get_states(group_id, bot_id)
         
         # Base delay from config
         if config.random_delay_enabled:
@@ -218,48 +225,48 @@ class SpamProtection:
         )
         
         cooldown_until = datetime.utcnow() + timedelta(seconds=cooldown_duration)
+        group_key = f"scheduler:group_state:{group_id}"
         
-        await redis_state.hset(
-            f"scheduler:group_state:{group_id}",
-            "cooldown_until",
-            cooldown_until.isoformat()
-        )
-        
-        await redis_state.expire(f"scheduler:group_state:{group_id}", 3600)  # 1 hour
+        async with redis_state.batch() as batch:
+            batch.hset(group_key, {"cooldown_until": cooldown_until.isoformat()})
+            batch.expire(group_key, 3600)  # 1 hour
     
     async def increment_message_count(
         self, 
         group_id: int, 
         bot_id: str
     ) -> None:
-        """Increment message counters."""
-        
-        # Group counter
-        await redis_state.hincrby(f"scheduler:group_state:{group_id}", "recent_messages", 1)
-        await redis_state.expire(f"scheduler:group_state:{group_id}", 3600)
-        
-        # Bot counter
-        await redis_state.hincrby(f"scheduler:bot_state:{bot_id}", "hourly_messages", 1)
-        await redis_state.expire(f"scheduler:bot_state:{bot_id}", 3600)
-        
-        # Store last message time
+        """Increment message counters (one round trip)."""
+        group_key = f"scheduler:group_state:{group_id}"
+        bot_key = f"scheduler:bot_state:{bot_id}"
         now = datetime.utcnow().isoformat()
-        await redis_state.hset(f"scheduler:group_state:{group_id}", "last_message_at", now)
-        await redis_state.hset(f"scheduler:bot_state:{bot_id}", "last_message_at", now)
+        
+        async with redis_state.batch() as batch:
+            # Group counter
+            batch.hincrby(group_key, "recent_messages", 1)
+            batch.hset(group_key, {"last_message_at": now})
+            batch.expire(group_key, 3600)
+            
+            # Bot counter
+            batch.hincrby(bot_key, "hourly_messages", 1)
+            batch.hset(bot_key, {"last_message_at": now})
+            batch.expire(bot_key, 3600)
+    
+    async def _get_states(self, group_id: int, bot_id: str) -> tuple:
+        """Get group and bot state from Redis in one round trip."""
+        group_state, bot_state = await redis_state.hgetall_many([
+            f"scheduler:group_state:{group_id}",
+            f"scheduler:bot_state:{bot_id}",
+        ])
+        return group_state, bot_state
     
     async def _get_group_state(self, group_id: int) -> Dict[str, Any]:
         """Get group state from Redis."""
-        state = await redis_state.hgetall(f"scheduler:group_state:{group_id}")
-        return {k.decode() if isinstance(k, bytes) else k: 
-                v.decode() if isinstance(v, bytes) else v 
-                for k, v in state.items()} if state else {}
+        return await redis_state.hgetall(f"scheduler:group_state:{group_id}")
     
     async def _get_bot_state(self, bot_id: str) -> Dict[str, Any]:
         """Get bot state from Redis."""
-        state = await redis_state.hgetall(f"scheduler:bot_state:{bot_id}")
-        return {k.decode() if isinstance(k, bytes) else k: 
-                v.decode() if isinstance(v, bytes) else v 
-                for k, v in state.items()} if state else {}
+        return await redis_state.hgetall(f"scheduler:bot_state:{bot_id}")
 
 
 class SchedulerEngine(LoggerMixin):
@@ -273,6 +280,33 @@ class SchedulerEngine(LoggerMixin):
         self.spam_protection = SpamProtection()
         self.background_tasks: List[asyncio.Task] = []
         
+        # Min-heap of (scheduled_at timestamp, seq, task_id) for PENDING tasks.
+        # Entries are never removed in place: an entry is live only while its
+        # seq matches _heap_seq[task_id] and the task is still PENDING.
+        self._ready_heap: List[Tuple[float, int, str]] = []
+        self._heap_seq: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self.max_idle_sleep = 60.0
+        
+        # Concurrent dispatch: a global cap plus one semaphore per target
+        # group (created on demand, dropped once the group has nothing queued)
+        self.max_concurrency = max(1, self.settings.scheduler_max_concurrency)
+        self.group_concurrency = max(1, self.settings.scheduler_group_concurrency)
+        self._dispatch_limit = asyncio.Semaphore(self.max_concurrency)
+        self._group_limits: Dict[int, asyncio.Semaphore] = {}
+        self._group_queued: Dict[int, int] = {}
+        self._dispatched: Dict[str, asyncio.Task] = {}
+        self._running_count = 0
+        self.lateness = LatencyHistogram()
+        
+        # Incremental persistence: only tasks touched since the last flush
+        # are written back, in batches of persist_batch_size
+        self.persist_interval = self.settings.scheduler_persist_interval
+        self.persist_batch_size = max(1, self.settings.scheduler_persist_batch_size)
+        self._dirty: Set[str] = set()
+        self._deleted: Set[str] = set()
+        
         # Task handlers
         self.task_handlers: Dict[TaskType, Callable] = {
             TaskType.SCHEDULED_MESSAGE: self._handle_scheduled_message,
@@ -307,6 +341,7 @@ class SchedulerEngine(LoggerMixin):
             asyncio.create_task(self._scheduler_loop()),
             asyncio.create_task(self._cleanup_loop()),
             asyncio.create_task(self._stats_update_loop()),
+            asyncio.create_task(self._persist_loop()),
         ]
         
         self.log_event("Scheduler engine started")
@@ -327,11 +362,56 @@ class SchedulerEngine(LoggerMixin):
         if self.background_tasks:
             await asyncio.gather(*self.background_tasks, return_exceptions=True)
         
+        # Let dispatched tasks finish before persisting their final state
+        await self._drain_dispatched(self.settings.worker_drain_timeout)
+        
         # Save tasks to Redis
         await self._save_tasks_to_redis()
         
         self.log_event("Scheduler engine stopped")
     
+    def _index_task(self, task: ScheduledTask) -> None:
+        """(Re)insert a PENDING task into the ready heap."""
+        if task.status != TaskStatus.PENDING:
+            return
+        
+        due = _timestamp(task.scheduled_at)
+        seq = next(self._seq)
+        self._heap_seq[task.id] = seq
+        heapq.heappush(self._ready_heap, (due, seq, task.id))
+        
+        # Wake the loop if this task is due before whatever it is sleeping on
+        if self._ready_heap[0][1] == seq:
+            self._wakeup.set()
+    
+    def _is_live(self, entry: Tuple[float, int, str]) -> bool:
+        _, seq, task_id = entry
+        task = self.tasks.get(task_id)
+        return (
+            task is not None
+            and self._heap_seq.get(task_id) == seq
+            and task.status == TaskStatus.PENDING
+        )
+    
+    def _pop_ready(self, now: float) -> List[ScheduledTask]:
+        """Pop every live heap entry due at or before ``now``."""
+        ready = []
+        while self._ready_heap and self._ready_heap[0][0] <= now:
+            entry = heapq.heappop(self._ready_heap)
+            if self._is_live(entry):
+                del self._heap_seq[entry[2]]
+                ready.append(self.tasks[entry[2]])
+        return ready
+    
+    def _next_due_in(self) -> Optional[float]:
+        """Seconds until the earliest live task is due (None if none)."""
+        while self._ready_heap and not self._is_live(self._ready_heap[0]):
+            heapq.heappop(self._ready_heap)
+        
+        if not self._ready_heap:
+            return None
+        return max(0.0, self._ready_heap[0][0] - _timestamp(datetime.utcnow()))
+    
     async def add_task(self, task: ScheduledTask) -> str:
         """Add a new scheduled task."""
         if isinstance(task, dict):
@@ -342,9 +422,10 @@ class SchedulerEngine(LoggerMixin):
             task.next_execution_at = task.calculate_next_execution()
         
         self.tasks[task.id] = task
+        self._index_task(task)
         
         # Save to Redis
-        await self._save_task_to_redis(task)
+        self._mark_dirty(task)
         
         self.log_event(
             "Task added",
@@ -364,7 +445,7 @@ class SchedulerEngine(LoggerMixin):
         task = self.tasks[task_id]
         task.status = TaskStatus.CANCELLED
         
-        await self._save_task_to_redis(task)
+        self._mark_dirty(task)
         
         self.log_event("Task cancelled", task_id=task_id)
         return True
@@ -377,7 +458,7 @@ class SchedulerEngine(LoggerMixin):
         task = self.tasks[task_id]
         task.status = TaskStatus.PAUSED
         
-        await self._save_task_to_redis(task)
+        self._mark_dirty(task)
         
         self.log_event("Task paused", task_id=task_id)
         return True
@@ -390,7 +471,8 @@ class SchedulerEngine(LoggerMixin):
         task = self.tasks[task_id]
         if task.status == TaskStatus.PAUSED:
             task.status = TaskStatus.PENDING
-            await self._save_task_to_redis(task)
+            self._index_task(task)
+            self._mark_dirty(task)
             
             self.log_event("Task resumed", task_id=task_id)
             return True
@@ -448,39 +530,129 @@ class SchedulerEngine(LoggerMixin):
             "status_counts": status_counts,
             "group_configs": len(self.group_configs),
             "background_tasks": len(self.background_tasks),
+            "dispatch": {
+                "max_concurrency": self.max_concurrency,
+                "group_concurrency": self.group_concurrency,
+                "running": self._running_count,
+                "queued": len(self._dispatched) - self._running_count,
+                "active_groups": len(self._group_queued),
+            },
+            "lateness": self.lateness.to_dict(),
+            "unsaved_tasks": len(self._dirty) + len(self._deleted),
         }
     
     async def _scheduler_loop(self) -> None:
-        """Main scheduler loop."""
+        """Main scheduler loop.
+        
+        Sleeps until the earliest task is due, or until _index_task signals
+        that an earlier task was added.
+        """
         while self.is_running:
             try:
+                # Cleared first so a task added while we run still wakes us
+                self._wakeup.clear()
                 await self._process_ready_tasks()
-                await asyncio.sleep(1.0)  # Check every second
+                
+                timeout = self._next_due_in()
+                if timeout is None or timeout > self.max_idle_sleep:
+                    timeout = self.max_idle_sleep
+                
+                if timeout > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
                 
             except Exception as e:
                 self.log_error("Scheduler loop error", error=str(e))
                 await asyncio.sleep(5.0)  # Wait before retrying
     
+    async def process_pending_tasks(self) -> None:
+        """Run every task that is due now (for callers driving their own loop)."""
+        await self._process_ready_tasks()
+        await self._drain_dispatched()
+    
     async def _process_ready_tasks(self) -> None:
-        """Process tasks that are ready to run."""
-        now = datetime.utcnow()
+        """Dispatch tasks that are ready to run.
         
-        ready_tasks = [
-            task for task in self.tasks.values()
-            if (task.status == TaskStatus.PENDING and 
-                task.scheduled_at <= now)
-        ]
+        Each ready task runs in its own asyncio task, bounded by the global
+        and per-group limits, so a slow handler no longer delays the rest.
+        """
+        ready_tasks = self._pop_ready(_timestamp(datetime.utcnow()))
         
         for task in ready_tasks:
+            # Already waiting for a slot (e.g. paused and resumed meanwhile)
+            if task.id in self._dispatched:
+                continue
+            
+            runner = asyncio.create_task(self._run_dispatched(task))
+            self._dispatched[task.id] = runner
+            runner.add_done_callback(
+                lambda _, task_id=task.id: self._dispatched.pop(task_id, None)
+            )
+    
+    async def _run_dispatched(self, task: ScheduledTask) -> None:
+        """Run one task once both its group slot and a global slot are free."""
+        group_id = task.group_id
+        group_limit = None
+        if group_id is not None:
+            group_limit = self._group_limits.get(group_id)
+            if group_limit is None:
+                group_limit = asyncio.Semaphore(self.group_concurrency)
+                self._group_limits[group_id] = group_limit
+            self._group_queued[group_id] = self._group_queued.get(group_id, 0) + 1
+        
+        try:
+            # Group slot first, so a busy group never parks global slots
+            if group_limit is not None:
+                await group_limit.acquire()
             try:
-                await self._execute_task(task)
-            except Exception as e:
-                self.log_error(
-                    "Task execution error",
-                    task_id=task.id,
-                    error=str(e),
-                )
-                await self._handle_task_failure(task, str(e))
+                async with self._dispatch_limit:
+                    # Cancelled or paused while waiting for a slot
+                    if task.status != TaskStatus.PENDING:
+                        return
+                    
+                    lateness = datetime.utcnow() - task.scheduled_at
+                    self.lateness.observe(max(0.0, lateness.total_seconds() * 1000))
+                    
+                    self._running_count += 1
+                    try:
+                        await self._execute_task(task)
+                    except Exception as e:
+                        self.log_error(
+                            "Task execution error",
+                            task_id=task.id,
+                            error=str(e),
+                        )
+                        await self._handle_task_failure(task, str(e))
+                    finally:
+                        self._running_count -= 1
+            finally:
+                if group_limit is not None:
+                    group_limit.release()
+        finally:
+            if group_id is not None:
+                self._group_queued[group_id] -= 1
+                if not self._group_queued[group_id]:
+                    del self._group_queued[group_id]
+                    del self._group_limits[group_id]
+    
+    async def _drain_dispatched(self, timeout: Optional[float] = None) -> None:
+        """Wait for dispatched tasks; cancel whatever is left after ``timeout``."""
+        if not self._dispatched:
+            return
+        
+        pending = list(self._dispatched.values())
+        _, still_running = await asyncio.wait(pending, timeout=timeout)
+        
+        if still_running:
+            self.log_warning(
+                "Cancelling scheduler tasks still running after drain timeout",
+                count=len(still_running),
+            )
+            for runner in still_running:
+                runner.cancel()
+            await asyncio.gather(*still_running, return_exceptions=True)
     
     async def _execute_task(self, task: ScheduledTask) -> None:
         """Execute a single task."""
@@ -504,6 +676,12 @@ class SchedulerEngine(LoggerMixin):
             # Execute task
             await handler(task)
             
+            # Handlers may push the task back to PENDING (e.g. spam delay)
+            if task.status == TaskStatus.PENDING:
+                self._index_task(task)
+                self._mark_dirty(task)
+                return
+            
             # Mark as completed
             task.status = TaskStatus.COMPLETED
             
@@ -511,7 +689,7 @@ class SchedulerEngine(LoggerMixin):
             if task.recurring:
                 await self._handle_recurring_task(task)
             
-            await self._save_task_to_redis(task)
+            self._mark_dirty(task)
             
             self.log_event(
                 "Task completed",
@@ -534,6 +712,7 @@ class SchedulerEngine(LoggerMixin):
             retry_delay = (2 ** task.retry_count) * 60  # 2, 4, 8 minutes
             task.scheduled_at = datetime.utcnow() + timedelta(seconds=retry_delay)
             task.status = TaskStatus.PENDING
+            self._index_task(task)
             
             self.log_event(
                 "Task scheduled for retry",
@@ -549,7 +728,7 @@ class SchedulerEngine(LoggerMixin):
                 retry_count=task.retry_count,
             )
         
-        await self._save_task_to_redis(task)
+        self._mark_dirty(task)
     
     async def _handle_recurring_task(self, task: ScheduledTask) -> None:
         """Handle recurring task completion."""
@@ -678,7 +857,8 @@ class SchedulerEngine(LoggerMixin):
         
         for task_id in tasks_to_remove:
             del self.tasks[task_id]
-            await redis_state.hdel("scheduler:tasks", task_id)
+            self._dirty.discard(task_id)
+            self._deleted.add(task_id)
         
         if tasks_to_remove:
             self.log_event("Cleaned up old tasks", count=len(tasks_to_remove))
@@ -699,63 +879,90 @@ class SchedulerEngine(LoggerMixin):
                 self.log_error("Stats update error", error=str(e))
                 await asyncio.sleep(60)
     
-    async def _load_tasks_from_redis(self) -> None:
-        """Load tasks from Redis."""
+    async def _persist_loop(self) -> None:
+        """Flush changed tasks to Redis every persist interval."""
+        while self.is_running:
+            try:
+                await asyncio.sleep(self.persist_interval)
+                await self._save_tasks_to_redis()
+                
+            except Exception as e:
+                self.log_error("Persist loop error", error=str(e))
+    
+    async def _load_tasks_from_redis(self, chunk_size: int = 1000) -> None:
+        """Load tasks from Redis.
+        
+        Streams the hash with HSCAN so only one chunk of raw JSON is held at
+        a time, yielding to the event loop between chunks.
+        """
+        loaded = 0
         try:
-            tasks_data = await redis_state.hgetall("scheduler:tasks")
-            
-            for task_id, task_json in tasks_data.items():
-                if isinstance(task_id, bytes):
-                    task_id = task_id.decode()
-                if isinstance(task_json, bytes):
-                    task_json = task_json.decode()
+            async for chunk in redis_state.hscan_chunks("scheduler:tasks", count=chunk_size):
+                for task_id, task_json in chunk.items():
+                    try:
+                        task = ScheduledTask.from_dict(json.loads(task_json))
+                        self.tasks[task_id] = task
+                        self._index_task(task)
+                        loaded += 1
+                    except Exception as e:
+                        self.log_error(
+                            "Failed to load task from Redis",
+                            task_id=task_id,
+                            error=str(e),
+                        )
                 
-                try:
-                    task_dict = json.loads(task_json)
-                    task = ScheduledTask.from_dict(task_dict)
-                    self.tasks[task_id] = task
-                except Exception as e:
-                    self.log_error(
-                        "Failed to load task from Redis",
-                        task_id=task_id,
-                        error=str(e),
-                    )
+                await asyncio.sleep(0)
             
-            self.log_event("Tasks loaded from Redis", count=len(self.tasks))
+            self.log_event("Tasks loaded from Redis", count=loaded)
             
         except Exception as e:
             self.log_error("Failed to load tasks from Redis", error=str(e))
     
-    async def _save_tasks_to_redis(self) -> None:
-        """Save all tasks to Redis."""
+    def _mark_dirty(self, task: ScheduledTask) -> None:
+        """Queue a task for the next incremental flush."""
+        self._deleted.discard(task.id)
+        self._dirty.add(task.id)
+    
+    async def _save_tasks_to_redis(self) -> int:
+        """Write changed and removed tasks to Redis in batched round trips.
+        
+        Returns the number of hash fields written or deleted. On failure the
+        unsaved ids are put back so the next flush retries them.
+        """
+        if not self._dirty and not self._deleted:
+            return 0
+        
+        dirty, self._dirty = self._dirty, set()
+        deleted, self._deleted = self._deleted, set()
+        
+        pending = [task_id for task_id in dirty if task_id in self.tasks]
+        flushed = 0
         try:
-            tasks_data = {
-                task_id: json.dumps(task.to_dict())
-                for task_id, task in self.tasks.items()
-            }
-            
-            if tasks_data:
-                await redis_state.hmset("scheduler:tasks", tasks_data)
+            for start in range(0, max(len(pending), 1), self.persist_batch_size):
+                chunk = pending[start:start + self.persist_batch_size]
+                async with redis_state.batch() as batch:
+                    mapping = {
+                        task_id: json.dumps(self.tasks[task_id].to_dict())
+                        for task_id in chunk
+                        if task_id in self.tasks
+                    }
+                    if mapping:
+                        batch.hset("scheduler:tasks", mapping)
+                    if deleted:
+                        batch.hdel("scheduler:tasks", *deleted)
+                
+                flushed += len(mapping) + len(deleted)
+                dirty.difference_update(chunk)
+                deleted.clear()
             
-            self.log_event("Tasks saved to Redis", count=len(tasks_data))
+            self.log_debug("Tasks saved to Redis", count=flushed)
             
         except Exception as e:
+            self._dirty |= {task_id for task_id in dirty if task_id in self.tasks}
+            self._deleted |= {task_id for task_id in deleted if task_id not in self.tasks}
             self.log_error("Failed to save tasks to Redis", error=str(e))
-    
-    async def _save_task_to_redis(self, task: ScheduledTask) -> None:
-        """Save single task to Redis."""
-        try:
-            await redis_state.hset(
-                "scheduler:tasks",
-                task.id,
-                json.dumps(task.to_dict())
-            )
-        except Exception as e:
-            self.log_error(
-                "Failed to save task to Redis",
-                task_id=task.id,
-                error=str(e),
-            )
+        
+        return flushed
     
     async def _load_group_configs(self) -> None:
         """Load group configurations from Redis."""
@@ -0,0 +1,335 @@
+"""
+Message Worker Pool
+===================
+
+N-way concurrent consumers for the message pool with per-session
+concurrency caps, bounded in-flight work and graceful drain on shutdown.
+"""
+
+import asyncio
+import bisect
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from .logger import LoggerMixin
+from .message_pool import Message, MessagePool, message_pool
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (milliseconds)."""
+    
+    BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+    
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+    
+    def observe(self, value_ms: float) -> None:
+        """Record a single observation."""
+        self.counts[bisect.bisect_left(self.BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+    
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add another histogram's observations into this one."""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+    
+    def percentile(self, pct: float) -> float:
+        """Upper bucket bound containing the given percentile."""
+        if not self.count:
+            return 0.0
+        
+        threshold = self.count * pct / 100.0
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= threshold:
+                if index < len(self.BUCKETS_MS):
+                    return float(self.BUCKETS_MS[index])
+                return self.max_ms
+        return self.max_ms
+    
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}ms" for bound in self.BUCKETS_MS] + ["le_inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class WorkerStats:
+    """Counters for a single pool worker."""
+    
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.started_at = time.monotonic()
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.queue_wait = LatencyHistogram()
+        self.processing_time = LatencyHistogram()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        uptime = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            "worker_id": self.worker_id,
+            "processed": self.processed,
+            "failed": self.failed,
+            "throughput_per_sec": round(self.processed / uptime, 3),
+            "utilization": round(min(self.busy_seconds / uptime, 1.0), 3),
+            "queue_wait": self.queue_wait.to_dict(),
+            "processing_time": self.processing_time.to_dict(),
+        }
+
+
+class MessageWorkerPool(LoggerMixin):
+    """Pool of concurrent workers fed from the message pool.
+    
+    Each worker runs at most one message at a time, and messages for the same
+    session (bot_id) run at most ``per_session_limit`` at a time. A message
+    dequeued for a session that is already at its limit is parked in that
+    session's local backlog and the worker moves on to the next message, so a
+    burst from one session cannot tie up the workers other sessions need.
+    Free workers take parked messages before dequeuing new ones.
+    
+    Once ``max_deferred`` messages are parked workers stop dequeuing until a
+    session slot frees, so the rest of the backlog stays in Redis (pops that
+    were already in progress can still park one message per worker). On
+    shutdown parked messages are handed back to the queue.
+    
+    ``blocking_pop`` selects how idle workers fetch: a blocking pop with
+    ``block_timeout``, or polling every ``poll_interval`` seconds.
+    """
+    
+    def __init__(
+        self,
+        handler: Callable[[Message], Awaitable[Any]],
+        concurrency: int = 4,
+        per_session_limit: int = 2,
+        block_timeout: float = 5.0,
+        drain_timeout: float = 30.0,
+        max_deferred: int = 100,
+        blocking_pop: bool = True,
+        poll_interval: float = 0.1,
+        pool: Optional[MessagePool] = None,
+    ):
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.per_session_limit = max(1, per_session_limit)
+        self.block_timeout = block_timeout
+        self.drain_timeout = drain_timeout
+        self.max_deferred = max(1, max_deferred)
+        self.blocking_pop = blocking_pop
+        self.poll_interval = poll_interval
+        self.pool = pool or message_pool
+        
+        self.is_running = False
+        self.in_flight = 0
+        self.deferred = 0
+        self.session_in_flight: Dict[str, int] = {}
+        self._backlogs: Dict[str, Deque[Message]] = {}
+        self._slot_freed = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        self._worker_stats: Dict[int, WorkerStats] = {}
+    
+    @property
+    def saturated(self) -> bool:
+        """True when every worker is busy with a message."""
+        return self.in_flight >= self.concurrency
+    
+    async def start(self) -> None:
+        """Start the worker tasks."""
+        if self.is_running:
+            return
+        
+        self.is_running = True
+        for worker_id in range(self.concurrency):
+            self._worker_stats[worker_id] = WorkerStats(worker_id)
+            self._workers.append(asyncio.create_task(self._worker_loop(worker_id)))
+        
+        self.log_event(
+            "Message worker pool started",
+            concurrency=self.concurrency,
+            per_session_limit=self.per_session_limit,
+            blocking_pop=self.blocking_pop,
+        )
+    
+    async def stop(self) -> None:
+        """Stop dequeuing, let in-flight messages finish and requeue parked ones."""
+        if not self.is_running:
+            return
+        
+        self.is_running = False
+        self._slot_freed.set()
+        self.log_event("Draining message worker pool", in_flight=self.in_flight, deferred=self.deferred)
+        
+        # Idle workers return after their current blocking pop times out
+        done, pending = await asyncio.wait(self._workers, timeout=self.drain_timeout)
+        
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            self.log_warning("Worker pool drain timed out", cancelled=len(pending))
+        
+        await self._return_deferred()
+        self._workers = []
+        self.log_event("Message worker pool stopped")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-worker throughput and queue-wait histograms."""
+        queue_wait = LatencyHistogram()
+        processing_time = LatencyHistogram()
+        for stats in self._worker_stats.values():
+            queue_wait.merge(stats.queue_wait)
+            processing_time.merge(stats.processing_time)
+        
+        return {
+            "is_running": self.is_running,
+            "concurrency": self.concurrency,
+            "per_session_limit": self.per_session_limit,
+            "blocking_pop": self.blocking_pop,
+            "in_flight": self.in_flight,
+            "deferred": self.deferred,
+            "max_deferred": self.max_deferred,
+            "saturated": self.saturated,
+            "session_in_flight": {k: v for k, v in self.session_in_flight.items() if v},
+            "session_deferred": {k: len(v) for k, v in self._backlogs.items()},
+            "processed": sum(s.processed for s in self._worker_stats.values()),
+            "failed": sum(s.failed for s in self._worker_stats.values()),
+            "queue_wait": queue_wait.to_dict(),
+            "processing_time": processing_time.to_dict(),
+            "workers": [s.to_dict() for s in self._worker_stats.values()],
+        }
+    
+    @staticmethod
+    def _session_key(message: Message) -> str:
+        return message.bot_id or "default"
+    
+    @staticmethod
+    def _ready_at(message: Message) -> datetime:
+        """When the message became eligible to run (its due time if delayed)."""
+        if message.scheduled_at and message.scheduled_at > message.created_at:
+            return message.scheduled_at
+        return message.created_at
+    
+    async def _worker_loop(self, worker_id: int) -> None:
+        """Dequeue and process messages until the pool is stopped."""
+        stats = self._worker_stats[worker_id]
+        
+        while self.is_running:
+            try:
+                message = self._take_deferred()
+                if message is None:
+                    if self.deferred >= self.max_deferred:
+                        # Backlog full: wait for a session slot instead of dequeuing
+                        self._slot_freed.clear()
+                        await self._slot_freed.wait()
+                        continue
+                    
+                    message = await self._fetch()
+                    if message is None or not self._admit(message):
+                        continue
+                
+                await self._run(message, stats)
+            
+            except Exception as e:
+                self.log_error("Message worker error", worker_id=worker_id, error=str(e))
+                await asyncio.sleep(1)
+    
+    async def _fetch(self) -> Optional[Message]:
+        """Next message from the pool, or None when nothing arrived."""
+        if self.blocking_pop:
+            return await self.pool.wait_for_next_message(timeout=self.block_timeout)
+        
+        message = await self.pool.get_next_message()
+        if message is None:
+            await asyncio.sleep(self.poll_interval)
+        return message
+    
+    def _admit(self, message: Message) -> bool:
+        """Reserve a session slot for a new message, or park it.
+        
+        Messages of a session with parked ones queue behind them, which keeps
+        per-session order.
+        """
+        session = self._session_key(message)
+        in_flight = self.session_in_flight.get(session, 0)
+        
+        if session in self._backlogs or in_flight >= self.per_session_limit:
+            self._backlogs.setdefault(session, deque()).append(message)
+            self.deferred += 1
+            return False
+        
+        self.session_in_flight[session] = in_flight + 1
+        return True
+    
+    def _take_deferred(self) -> Optional[Message]:
+        """Pop a parked message whose session has a free slot, reserving the slot."""
+        for session, backlog in self._backlogs.items():
+            in_flight = self.session_in_flight.get(session, 0)
+            if in_flight >= self.per_session_limit:
+                continue
+            
+            message = backlog.popleft()
+            # Rotate the session to the end so parked sessions take turns
+            del self._backlogs[session]
+            if backlog:
+                self._backlogs[session] = backlog
+            
+            self.deferred -= 1
+            self.session_in_flight[session] = in_flight + 1
+            return message
+        
+        return None
+    
+    async def _return_deferred(self) -> None:
+        """Hand parked messages back to the head of their queues."""
+        for backlog in self._backlogs.values():
+            # Reversed, so pushing each to the head keeps the original order
+            for message in reversed(backlog):
+                try:
+                    await self.pool.requeue_message(message.id)
+                except Exception as e:
+                    self.log_error("Failed to requeue parked message", message_id=message.id, error=str(e))
+        
+        if self.deferred:
+            self.log_event("Parked messages requeued", count=self.deferred)
+        self._backlogs.clear()
+        self.deferred = 0
+    
+    async def _run(self, message: Message, stats: WorkerStats) -> None:
+        """Process one message in the session slot reserved for it."""
+        session = self._session_key(message)
+        self.in_flight += 1
+        started = time.monotonic()
+        
+        waited = (datetime.utcnow() - self._ready_at(message)).total_seconds()
+        stats.queue_wait.observe(max(waited, 0.0) * 1000)
+        
+        try:
+            await self.handler(message)
+            stats.processed += 1
+        except Exception as e:
+            stats.failed += 1
+            self.log_error("Message handler failed", message_id=message.id, error=str(e))
+        finally:
+            elapsed = time.monotonic() - started
+            stats.busy_seconds += elapsed
+            stats.processing_time.observe(elapsed * 1000)
+            self.in_flight -= 1
+            self.session_in_flight[session] -= 1
+            self._slot_freed.set()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+🎞️ Cache Trace Replay Simulator
+==============================
+
+Replays binary access traces recorded by ``SmartCacheManager`` against every
+eviction strategy and a sweep of L1 sizes, and reports the hit ratio, byte
+hit ratio and eviction counts for each combination. The observed hit ratio
+of the recording cache is printed first, so it is easy to spot whether a
+bigger cache or a different strategy would have helped.
+
+Record a trace by starting the launcher with:
+    GAVATCORE_CACHE_TRACE_DIR=logs/cache_traces [GAVATCORE_CACHE_TRACE_SAMPLE=0.1]
+
+Usage:
+    python scripts/performance/cache_trace_simulator.py logs/cache_traces/profiles.*.trace
+    python scripts/performance/cache_trace_simulator.py trace --sizes 500 2000 --max-mb 8 32 --ttl 600
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from core.cache_trace import (  # noqa: E402
+    OP_NAMES,
+    TraceSimulator,
+    observed_hit_ratio,
+    read_trace,
+)
+
+
+def describe(path: Path) -> None:
+    counts = {}
+    first = last = None
+    for record in read_trace(path):
+        counts[record.op] = counts.get(record.op, 0) + 1
+        first = record.timestamp if first is None else first
+        last = record.timestamp
+
+    total = sum(counts.values())
+    duration = (last - first) if total else 0.0
+    ops = "  ".join(f"{OP_NAMES.get(op, op)}={count}" for op, count in sorted(counts.items()))
+    print(f"\n🎞️ {path}  ({total} records over {duration:.0f}s)")
+    print(f"   {ops}")
+    print(f"   observed hit_ratio={observed_hit_ratio(read_trace(path)):6.2%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cache trace replay simulator")
+    parser.add_argument("traces", type=Path, nargs="+", help="binary trace files")
+    parser.add_argument("--strategies", nargs="+", default=list(TraceSimulator.STRATEGIES),
+                        choices=TraceSimulator.STRATEGIES)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000, 5000, 20000],
+                        help="L1 max_size values (entries)")
+    parser.add_argument("--max-mb", type=float, nargs="+", default=[None],
+                        help="L1 byte budgets in MB (default: unbounded)")
+    parser.add_argument("--ttl", type=float, nargs="+", default=[None],
+                        help="entry TTLs in seconds (default: no expiry)")
+    args = parser.parse_args()
+
+    for path in args.traces:
+        describe(path)
+        print("-" * 96)
+        for strategy in args.strategies:
+            for max_mb in args.max_mb:
+                for ttl in args.ttl:
+                    for size in args.sizes:
+                        max_bytes = int(max_mb * 1024 * 1024) if max_mb else None
+                        simulator = TraceSimulator(strategy, size, max_bytes=max_bytes, ttl=ttl)
+                        start = time.perf_counter()
+                        result = simulator.run(read_trace(path))
+                        elapsed = time.perf_counter() - start
+
+                        budget = f"{max_mb:g}MB" if max_mb else "-"
+                        expiry = f"{ttl:g}s" if ttl else "-"
+                        print(
+                            f"   {strategy:<9} size={size:>7} bytes={budget:>7} ttl={expiry:>6}  "
+                            f"hit={result['hit_ratio']:6.2%}  byte_hit={result['byte_hit_ratio']:6.2%}  "
+                            f"evictions={result['evictions']:>8}  ({elapsed:.1f}s)"
+                        )
+
+
+if __name__ == "__main__":
+    main()
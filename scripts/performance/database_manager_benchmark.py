@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+🗄️ DatabaseManager Connection Benchmark
+=======================================
+
+Runs the same interaction workload through ``DatabaseManager`` twice on a
+temporary database file:
+
+- ``per-call``: a fresh ``aiosqlite.connect`` for every method call (the
+  behaviour before ``SQLitePool``), default journal mode.
+- ``pooled``: the long-lived writer/reader connections of ``SQLitePool``
+  (WAL, ``synchronous=NORMAL``, statement cache).
+
+Each simulated event logs a user interaction, updates the user's analytics
+row and, every ``--read-every`` events, reads the engagement report.
+
+A second section measures raw ``log_user_interaction`` throughput: one
+INSERT + COMMIT per row on the pooled writer versus the group-commit
+``WriteBehindQueue``.
+
+Usage:
+    python scripts/performance/database_manager_benchmark.py --events 5000 --concurrency 32
+    python scripts/performance/database_manager_benchmark.py --events 0 --inserts 200000
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import aiosqlite
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from core.database_manager import DatabaseManager, UserInteractionType  # noqa: E402
+
+
+class PerCallConnections:
+    """Old behaviour: one new connection per ``DatabaseManager`` call."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    @asynccontextmanager
+    async def writer(self):
+        async with aiosqlite.connect(self.db_path) as db:
+            yield db
+            await db.commit()
+
+    reader = writer
+
+    async def close(self) -> None:
+        pass
+
+
+async def run(mode: str, db_path: str, args: argparse.Namespace) -> float:
+    manager = DatabaseManager(db_path)
+    if mode == "per-call":
+        manager.pool = PerCallConnections(db_path)
+    await manager.initialize()
+
+    rng = random.Random(7)
+    events = [str(rng.randrange(args.users)) for _ in range(args.events)]
+    queue: asyncio.Queue = asyncio.Queue()
+    for index, user_id in enumerate(events):
+        queue.put_nowait((index, user_id))
+
+    async def worker() -> None:
+        while not queue.empty():
+            index, user_id = queue.get_nowait()
+            await manager.log_user_interaction(user_id, UserInteractionType.MESSAGE, character_id="geisha")
+            await manager.update_user_analytics(user_id, f"user_{user_id}", {"message_count": 1})
+            if args.read_every and index % args.read_every == 0:
+                await manager.get_user_engagement_report()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    await manager.close()
+    return elapsed
+
+
+async def compare_workload(args: argparse.Namespace) -> None:
+    print(f"🗄️ {args.events} events, {args.users} users, concurrency={args.concurrency}")
+    print("-" * 64)
+    results = {}
+    for mode in ("per-call", "pooled"):
+        with tempfile.TemporaryDirectory() as directory:
+            elapsed = await run(mode, str(Path(directory) / "bench.db"), args)
+        results[mode] = elapsed
+        print(f"   {mode:<9} {elapsed:7.2f}s  {args.events / elapsed:9.0f} events/s")
+
+    print(f"\n   speedup: {results['per-call'] / results['pooled']:.1f}x")
+
+
+INSERT_SQL = """
+    INSERT INTO user_interactions
+    (user_id, interaction_type, character_id, group_id, duration_seconds, metadata)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+async def run_inserts(mode: str, db_path: str, args: argparse.Namespace) -> float:
+    manager = DatabaseManager(db_path)
+    await manager.initialize()
+
+    async def direct(count: int) -> None:
+        for index in range(count):
+            async with manager.pool.writer() as db:
+                await db.execute(INSERT_SQL, (str(index), "message", "geisha", None, None, None))
+
+    async def queued(count: int) -> None:
+        for index in range(count):
+            await manager.log_user_interaction(str(index), UserInteractionType.MESSAGE, character_id="geisha")
+
+    per_worker = args.inserts // args.concurrency
+    producer = direct if mode == "commit-per-row" else queued
+    start = time.perf_counter()
+    await asyncio.gather(*(producer(per_worker) for _ in range(args.concurrency)))
+    await manager.close()
+    elapsed = time.perf_counter() - start
+    return per_worker * args.concurrency / elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="DatabaseManager connection benchmark")
+    parser.add_argument("--events", type=int, default=3000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--read-every", type=int, default=50, help="engagement report every N events (0 = never)")
+    parser.add_argument("--inserts", type=int, default=50000, help="rows for the insert throughput section (0 = skip)")
+    args = parser.parse_args()
+
+    if args.events:
+        await compare_workload(args)
+    if args.inserts:
+        print(f"\n🗄️ log_user_interaction throughput, {args.inserts} rows, concurrency={args.concurrency}")
+        print("-" * 64)
+        for mode in ("commit-per-row", "group-commit"):
+            with tempfile.TemporaryDirectory() as directory:
+                rate = await run_inserts(mode, str(Path(directory) / "bench.db"), args)
+            print(f"   {mode:<15} {rate:10.0f} rows/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+🏊 SmartConnectionPool Checkout Load Test
+========================================
+
+Starts ``--acquirers`` concurrent tasks against a ``SmartConnectionPool``
+on a temporary SQLite file, or on PostgreSQL when ``--dsn`` is given (the
+overflow connections then come from the asyncpg pool). Each task checks a
+connection out ``--checkouts`` times, runs ``SELECT 1`` and holds the
+connection for ``--hold-ms``. The script reports exact checkout latency
+percentiles next to the pool's own wait-time histogram, for every
+``PoolStrategy``.
+
+Usage:
+    python scripts/performance/db_pool_checkout_benchmark.py --acquirers 200
+    python scripts/performance/db_pool_checkout_benchmark.py --max-size 5 --overflow 0 --hold-ms 5
+    python scripts/performance/db_pool_checkout_benchmark.py --dsn postgresql://localhost/gavatcore
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from core.db_pool_manager import (  # noqa: E402
+    DatabaseType,
+    PoolConfig,
+    PoolExhaustedError,
+    PoolStrategy,
+    SmartConnectionPool,
+)
+
+
+def percentile(samples: List[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] if ordered else 0.0
+
+
+async def run(strategy: PoolStrategy, db_type: DatabaseType, connection_string: str,
+              args: argparse.Namespace) -> None:
+    config = PoolConfig(
+        min_size=args.min_size,
+        max_size=args.max_size,
+        max_overflow=args.overflow,
+        pool_timeout=args.timeout,
+        strategy=strategy,
+    )
+    pool = SmartConnectionPool(f"bench_{strategy.value}", db_type, config, connection_string)
+    await pool.initialize()
+
+    latencies: List[float] = []
+    timeouts = 0
+
+    async def acquirer() -> None:
+        nonlocal timeouts
+        for _ in range(args.checkouts):
+            start = time.perf_counter()
+            try:
+                async with await pool.acquire_connection() as conn:
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    await conn.execute("SELECT 1")
+                    await asyncio.sleep(args.hold_ms / 1000)
+            except PoolExhaustedError:
+                timeouts += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(acquirer() for _ in range(args.acquirers)))
+    elapsed = time.perf_counter() - start
+
+    stats = pool.get_stats()
+    histogram = stats["wait_time"]
+    await pool.close()
+
+    print(
+        f"   {strategy.value:<13} {len(latencies) / elapsed:8.0f} checkouts/s  "
+        f"p50={percentile(latencies, 50):7.2f}ms  p99={percentile(latencies, 99):7.2f}ms  "
+        f"max={max(latencies, default=0):7.2f}ms  hist_p99<={histogram['p99_ms']:g}ms  "
+        f"conns={stats['connections']['total']:>3}  timeouts={timeouts}  "
+        f"health_checks={stats['performance']['health_checks']}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="SmartConnectionPool checkout load test")
+    parser.add_argument("--acquirers", type=int, default=200)
+    parser.add_argument("--checkouts", type=int, default=20, help="checkouts per acquirer")
+    parser.add_argument("--hold-ms", type=float, default=1.0, help="time a connection is held")
+    parser.add_argument("--min-size", type=int, default=5)
+    parser.add_argument("--max-size", type=int, default=20)
+    parser.add_argument("--overflow", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--dsn", help="PostgreSQL DSN; defaults to a temporary SQLite file")
+    parser.add_argument("--strategies", nargs="+", default=[s.value for s in PoolStrategy],
+                        choices=[s.value for s in PoolStrategy])
+    args = parser.parse_args()
+
+    backend = "postgresql" if args.dsn else "sqlite"
+    print(f"🏊 {backend}: {args.acquirers} acquirers x {args.checkouts} checkouts, hold={args.hold_ms}ms, "
+          f"size={args.min_size}..{args.max_size}+{args.overflow}")
+    print("-" * 96)
+    for value in args.strategies:
+        if args.dsn:
+            await run(PoolStrategy(value), DatabaseType.POSTGRESQL, args.dsn, args)
+            continue
+        with tempfile.TemporaryDirectory() as directory:
+            await run(PoolStrategy(value), DatabaseType.SQLITE, str(Path(directory) / "bench.db"), args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
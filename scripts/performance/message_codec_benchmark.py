@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+📦 Message Codec Benchmark
+=========================
+
+Compares the per-field JSON message hash layout with the packed msgpack
+layout: payload bytes stored per message and encode/decode CPU time.
+Runs fully in-process, no Redis needed.
+
+Usage:
+    python scripts/performance/message_codec_benchmark.py --iterations 20000
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from gavatcore_engine.message_pool import (  # noqa: E402
+    Message,
+    MessagePriority,
+    decode_message_fields,
+    get_message_codec,
+)
+
+
+def sample_message() -> Message:
+    return Message(
+        priority=MessagePriority.HIGH,
+        content="Merhaba! Bugün yeni bir kampanya başlıyor 🚀 detaylar için yaz.",
+        target_chat_id=-1001234567890,
+        target_username="gavatcore_group",
+        bot_id="yayincilara",
+        bot_username="yayincilara_bot",
+        scheduled_at=datetime.utcnow() + timedelta(minutes=5),
+        expires_at=datetime.utcnow() + timedelta(hours=1),
+        context={"task_id": "0f8fad5b-d9cb-469f-a165-70867728950e", "execution_count": 3},
+    )
+
+
+def stored_bytes(fields) -> int:
+    """Approximate hash payload: field names plus encoded values."""
+    total = 0
+    for key, value in fields.items():
+        total += len(key.encode())
+        total += len(value if isinstance(value, bytes) else value.encode())
+    return total
+
+
+def to_wire(fields):
+    """What the raw Redis client hands back for this hash."""
+    return {key: value if isinstance(value, bytes) else value.encode() for key, value in fields.items()}
+
+
+def run(codec_name: str, iterations: int) -> None:
+    codec = get_message_codec(codec_name)
+    message = sample_message()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fields = codec.encode(message)
+    encode_us = (time.perf_counter() - start) / iterations * 1e6
+
+    wire = to_wire(fields)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode_message_fields(wire)
+    decode_us = (time.perf_counter() - start) / iterations * 1e6
+
+    print(
+        f"   {codec.name:<8} fields={len(fields):>2}  bytes={stored_bytes(fields):>4}  "
+        f"encode={encode_us:6.1f}µs  decode={decode_us:6.1f}µs"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Message codec benchmark")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"\n📦 Message codec benchmark ({args.iterations} iterations)")
+    print("-" * 70)
+    for codec_name in ("json", "msgpack"):
+        run(codec_name, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
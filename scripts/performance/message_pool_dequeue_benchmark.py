@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+📬 MessagePool Dequeue Benchmark
+===============================
+
+Compares the legacy multi round-trip dequeue (LPOP + HGETALL + HSET per
+message) with the atomic Lua dequeue used by ``MessagePool.get_next_message``.
+
+Requires a running Redis reachable through the GavatCore Engine settings
+(REDIS_URL / REDIS_HOST). The benchmark flushes the selected database, so
+point it at a scratch Redis DB.
+
+Usage:
+    python scripts/performance/message_pool_dequeue_benchmark.py --messages 5000 --workers 4
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from gavatcore_engine.message_pool import (  # noqa: E402
+    Message,
+    MessagePool,
+    MessagePriority,
+    MessageStatus,
+)
+from gavatcore_engine.redis_state import redis_state  # noqa: E402
+
+PRIORITIES = [
+    MessagePriority.URGENT,
+    MessagePriority.HIGH,
+    MessagePriority.NORMAL,
+    MessagePriority.LOW,
+]
+
+
+async def legacy_get_next_message(pool: MessagePool) -> Optional[Message]:
+    """Pre-Lua dequeue path, kept here only as the benchmark baseline."""
+    for prio in PRIORITIES:
+        message_data = await pool.redis.pop_from_message_queue(f"queue:{prio.value}")
+
+        if message_data:
+            message = await pool.get_message(message_data["message_id"])
+
+            if message and message.status == MessageStatus.PENDING:
+                if message.expires_at and message.expires_at < datetime.utcnow():
+                    await pool.cancel_message(message.id)
+                    continue
+
+                message.status = MessageStatus.PROCESSING
+                await pool.update_message(message)
+                return message
+
+    return None
+
+
+async def fill_pool(pool: MessagePool, count: int) -> None:
+    """Queue ``count`` messages spread across all priorities."""
+    for i in range(count):
+        await pool.add_message(Message(
+            priority=PRIORITIES[i % len(PRIORITIES)],
+            content=f"benchmark message {i}",
+            target_chat_id=1000 + i,
+            bot_id="benchmark",
+        ))
+
+
+async def drain(pool: MessagePool, dequeue, workers: int) -> float:
+    """Drain the pool with ``workers`` concurrent consumers, return msgs/sec."""
+    claimed = []
+
+    async def worker() -> None:
+        while True:
+            message = await dequeue()
+            if message is None:
+                return
+            claimed.append(message.id)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    elapsed = time.perf_counter() - start
+
+    duplicates = len(claimed) - len(set(claimed))
+    print(f"   claimed={len(claimed)} duplicates={duplicates} elapsed={elapsed:.3f}s")
+    return len(claimed) / elapsed if elapsed else 0.0
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="MessagePool dequeue benchmark")
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    pool = MessagePool()
+    await pool.initialize()
+
+    async with redis_state.get_connection() as redis:
+        await redis.flushdb()
+
+    print(f"\n📬 Dequeue benchmark: {args.messages} messages, {args.workers} workers")
+    print("-" * 60)
+
+    await fill_pool(pool, args.messages)
+    print("🐢 Legacy (LPOP + HGETALL + HSET):")
+    legacy_rate = await drain(pool, lambda: legacy_get_next_message(pool), args.workers)
+
+    async with redis_state.get_connection() as redis:
+        await redis.flushdb()
+    pool.processing_messages.clear()
+
+    await fill_pool(pool, args.messages)
+    print("⚡ Atomic Lua dequeue:")
+    lua_rate = await drain(pool, pool.get_next_message, args.workers)
+
+    print("-" * 60)
+    print(f"   Legacy : {legacy_rate:,.0f} msg/s")
+    print(f"   Lua    : {lua_rate:,.0f} msg/s")
+    if legacy_rate:
+        print(f"   Speedup: {lua_rate / legacy_rate:.2f}x")
+
+    await redis_state.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -204,6 +204,29 @@ def make_config():
     return _make_config
 
 
+@pytest.fixture
+def make_cache():
+    """Factory fixture for SmartCacheManager instances.
+    
+    Defaults to an LRU, uncompressed, L1-only policy; keyword overrides go to
+    CachePolicy, except the engine's own invalidation_bus/redis/key_prefix/
+    shared_name arguments.
+    """
+    from core.smart_cache_manager import CachePolicy, CacheStrategy, SmartCacheManager
+    
+    def _make_cache(name: str = "test", **overrides):
+        engine_options = {
+            option: overrides.pop(option)
+            for option in ("invalidation_bus", "redis", "key_prefix", "shared_name")
+            if option in overrides
+        }
+        options = dict(strategy=CacheStrategy.LRU, compression=False, persistence=False)
+        options.update(overrides)
+        return SmartCacheManager(name, CachePolicy(**options), **engine_options)
+    
+    return _make_cache
+
+
 # ==================== DATABASE FIXTURES ====================
 
 @pytest.fixture
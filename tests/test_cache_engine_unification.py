@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Cache Engine Unification Tests
+==============================
+
+BehavioralCacheManager, AdvancedBehavioralCacheManager and the shared
+SmartCacheManager engine: shared L2 reads across instances, SCAN-based
+prefix/pattern invalidation, central tuning through CacheManagerFactory and
+legacy L2 payload compatibility.
+"""
+
+import pickle
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from core.advanced_behavioral_cache_manager import (  # noqa: E402
+    AdvancedBehavioralCacheManager,
+    AdvancedCacheConfig,
+)
+from core.behavioral_cache_manager import BehavioralCacheManager  # noqa: E402
+from core.smart_cache_manager import (  # noqa: E402
+    CacheManagerFactory,
+    CachePolicy,
+    CacheStrategy,
+    get_all_cache_stats,
+)
+
+
+@pytest.fixture(autouse=True)
+def registry():
+    instances = dict(CacheManagerFactory._instances)
+    overrides = dict(CacheManagerFactory._overrides)
+    yield
+    CacheManagerFactory._instances = instances
+    CacheManagerFactory._overrides = overrides
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def attach(manager, server):
+    """Point a wrapper and its engine at a shared fakeredis server."""
+    client = fakeredis.FakeAsyncRedis(server=server)
+    manager.redis_client = client
+    manager.engine.redis = client
+    return manager
+
+
+async def test_l2_written_by_one_process_is_read_by_another(server):
+    writer = attach(AdvancedBehavioralCacheManager(), server)
+    reader = attach(AdvancedBehavioralCacheManager(), server)
+    
+    await writer.set("big_five", "42", {"o": 0.7})
+    
+    assert await reader.get("big_five", "42") == {"o": 0.7}
+    assert reader.engine.stats["hits"]["l2"] == 1
+    assert await reader.get("big_five", "42") == {"o": 0.7}
+    assert reader.engine.stats["hits"]["l1"] == 1
+
+
+async def test_prefix_invalidation_scans_shared_l2(server):
+    writer = attach(BehavioralCacheManager(), server)
+    other = attach(BehavioralCacheManager(), server)
+    for user_id in range(5):
+        await writer.engine.set(f"behavioral:big_five:{user_id}", user_id)
+    await writer.engine.set("behavioral:sentiment:1", "keep")
+    
+    assert await other.engine.invalidate_prefix("behavioral:big_five:") == 5
+    assert await writer.redis_client.dbsize() == 1
+    assert await other.engine.get("behavioral:sentiment:1") == "keep"
+
+
+async def test_behavioral_user_invalidation_uses_pattern(server):
+    first = attach(BehavioralCacheManager(), server)
+    second = attach(BehavioralCacheManager(), server)
+    await first.set_big_five_cache(7, ["hi"], {"o": 1})
+    await first.set_predictive_cache(7, {"p": 1}, {"churn": 0.1})
+    await first.set_big_five_cache(8, ["hi"], {"o": 2})
+    
+    assert await second.get_big_five_cache(7, ["hi"]) == {"o": 1}
+    assert await second.invalidate_user_cache(7)
+    
+    fresh = attach(BehavioralCacheManager(), server)
+    assert await second.get_big_five_cache(7, ["hi"]) is None
+    assert await fresh.get_predictive_cache(7, {"p": 1}) is None
+    assert await fresh.get_big_five_cache(8, ["hi"]) == {"o": 2}
+    assert second.metrics.deletes == 2
+
+
+async def test_behavioral_manager_works_without_redis():
+    manager = BehavioralCacheManager()
+    
+    await manager.set_big_five_cache(1, ["a"], {"o": 1})
+    
+    assert await manager.get_big_five_cache(1, ["a"]) == {"o": 1}
+    assert (await manager.get_cache_stats())["memory_cache_size"] == 1
+
+
+async def test_byte_budget_applies_to_wrapped_caches():
+    config = AdvancedCacheConfig(l1_max_bytes=20_000, compression_enabled=False)
+    manager = AdvancedBehavioralCacheManager(config)
+    
+    for index in range(20):
+        await manager.set("blob", str(index), "x" * 2000)
+    
+    assert manager.engine.l1_bytes <= 20_000
+    assert len(manager.l1_cache) < 20
+
+
+async def test_tune_updates_live_engine_and_future_instances():
+    manager = CacheManagerFactory.create("tunable", CachePolicy(strategy=CacheStrategy.LRU, persistence=False))
+    for index in range(10):
+        await manager.set(f"k{index}", index)
+    
+    await CacheManagerFactory.tune("tunable", max_size=4)
+    
+    assert len(manager.l1_cache) == 4
+    assert list(manager.l1_cache) == ["k6", "k7", "k8", "k9"]
+    assert CacheManagerFactory.create("tunable").policy.max_size == 4
+    with pytest.raises(ValueError):
+        await manager.update_policy(strategy=CacheStrategy.LFU)
+
+
+async def test_all_wrapped_caches_report_through_factory():
+    AdvancedBehavioralCacheManager()
+    BehavioralCacheManager()
+    
+    stats = await get_all_cache_stats()
+    
+    assert {"advanced_behavioral", "behavioral"} <= set(stats)
+    assert stats["behavioral"]["policy"]["shared_l2"] is True
+
+
+async def test_second_wrapper_does_not_replace_the_first_registration():
+    first = AdvancedBehavioralCacheManager()
+    second = AdvancedBehavioralCacheManager()
+    
+    assert first.engine.name != second.engine.name
+    assert first.engine._bus_name == second.engine._bus_name == "smart:advanced_behavioral"
+    assert first._generations_bus_name == second._generations_bus_name
+    assert CacheManagerFactory._instances[first.engine.name] is first.engine
+    assert CacheManagerFactory._instances[second.engine.name] is second.engine
+    
+    await first.set("big_five", "1", {"o": 0.1})
+    stats = await get_all_cache_stats()
+    assert stats[first.engine.name]["levels"]["l1_size"] == 1
+    assert stats[second.engine.name]["levels"]["l1_size"] == 0
+    
+    await CacheManagerFactory.tune("advanced_behavioral", max_size=7)
+    assert first.engine.policy.max_size == second.engine.policy.max_size == 7
+    
+    await second.close()
+    assert second.engine.name not in CacheManagerFactory._instances
+    assert CacheManagerFactory._instances[first.engine.name] is first.engine
+
+
+async def test_legacy_uncompressed_l2_payload_is_readable(server):
+    manager = attach(AdvancedBehavioralCacheManager(), server)
+    key = manager._generate_cache_key("timing", "9")
+    await manager.redis_client.set(key, pickle.dumps({"legacy": True}))
+    
+    assert await manager.get("timing", "9") == {"legacy": True}
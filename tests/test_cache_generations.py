@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Cache Generation Tests
+======================
+
+Namespace generations: wildcard invalidation as a single HINCRBY in
+AdvancedBehavioralCacheManager and BabaGAVATRedisManager, and the
+rate-limited SCAN reaper for orphaned keys.
+"""
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from core import cache_generations  # noqa: E402
+from core.advanced_behavioral_cache_manager import AdvancedBehavioralCacheManager  # noqa: E402
+from core.cache_generations import NamespaceGenerations, scan_delete, split_versioned  # noqa: E402
+from core.redis_manager import BabaGAVATRedisManager  # noqa: E402
+from core.smart_cache_manager import CacheManagerFactory  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def registry():
+    instances = dict(CacheManagerFactory._instances)
+    yield
+    CacheManagerFactory._instances = instances
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def behavioral(server):
+    manager = AdvancedBehavioralCacheManager()
+    client = fakeredis.FakeAsyncRedis(server=server)
+    manager.redis_client = client
+    manager.engine.redis = client
+    manager.generations.redis = client
+    return manager
+
+
+def forbid_keyspace_walks(client):
+    async def refuse(*args, **kwargs):
+        raise AssertionError("keyspace walk during invalidation")
+    
+    client.keys = refuse
+    client.scan = refuse
+    client.scan_iter = refuse
+
+
+def test_versioned_segments_round_trip():
+    assert split_versioned("big_five") == ("big_five", 0)
+    assert split_versioned("big_five@12") == ("big_five", 12)
+    assert split_versioned("mail@example") == ("mail@example", 0)
+
+
+async def test_generation_is_cached_until_refresh_or_forget(server):
+    first = NamespaceGenerations("gens", fakeredis.FakeAsyncRedis(server=server), refresh_interval=60)
+    second = NamespaceGenerations("gens", fakeredis.FakeAsyncRedis(server=server), refresh_interval=60)
+    
+    assert await second.current("ns") == 0
+    assert await first.bump("ns") == 1
+    assert await second.current("ns") == 0
+    
+    second.forget(["ns"])
+    assert await second.current("ns") == 1
+    assert await second.snapshot() == {"ns": 1}
+
+
+async def test_namespace_invalidation_is_one_increment(server):
+    manager = behavioral(server)
+    for user_id in range(5):
+        await manager.set("big_five", str(user_id), user_id)
+    await manager.set("sentiment", "1", "keep")
+    forbid_keyspace_walks(manager.redis_client)
+    
+    assert await manager.invalidate("big_five") == 5
+    
+    assert await manager.generations.current("big_five") == 1
+    assert await manager.get("big_five", "1") is None
+    assert await manager.get("sentiment", "1") == "keep"
+    assert await manager.redis_client.dbsize() == 7  # 6 orphaned/live keys + generation hash
+
+
+async def test_other_process_sees_new_generation_after_forget(server):
+    writer, reader = behavioral(server), behavioral(server)
+    await writer.set("timing", "9", "old")
+    assert await reader.get("timing", "9") == "old"
+    reader.engine.l1_cache.clear()
+    
+    await writer.invalidate("timing")
+    reader._apply_remote_generations(set(), {"timing"})
+    
+    assert await reader.get("timing", "9") is None
+    await writer.set("timing", "9", "new")
+    assert await reader.get("timing", "9") == "new"
+
+
+async def test_reaper_removes_only_orphans(server):
+    manager = behavioral(server)
+    for user_id in range(4):
+        await manager.set("big_five", str(user_id), user_id)
+    await manager.set("sentiment", "1", "keep")
+    await manager.redis_client.set("unrelated:key", "x")
+    
+    await manager.invalidate("big_five")
+    await manager.set("big_five", "1", "fresh")
+    
+    assert await manager.reaper.reap_once() == 4
+    assert await manager.reaper.reap_once() == 0
+    assert manager.reaper.stats["passes"] == 1
+    assert await manager.get("big_five", "1") == "fresh"
+    assert await manager.get("sentiment", "1") == "keep"
+    assert await manager.redis_client.get("unrelated:key") == b"x"
+
+
+async def test_scan_delete_is_rate_limited(server, monkeypatch):
+    client = fakeredis.FakeAsyncRedis(server=server)
+    for index in range(50):
+        await client.set(f"junk:{index}", 1)
+    pauses = []
+    
+    async def record(seconds):
+        pauses.append(seconds)
+    
+    monkeypatch.setattr(cache_generations.asyncio, "sleep", record)
+    scanned, deleted = await scan_delete(client, "junk:*", scan_count=10, max_keys_per_second=100)
+    
+    assert (scanned, deleted) == (50, 50)
+    assert pauses and set(pauses) == {0.1}
+
+
+async def test_redis_manager_batch_invalidate_bumps_generation(server):
+    manager = BabaGAVATRedisManager()
+    manager.redis_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    manager.generations.redis = manager.redis_client
+    
+    await manager.set_coin_balance(1, 10.0)
+    assert await manager.redis_client.get("babagavat:coin:balance:1") == "10.0"
+    await manager.increment_counter("hits", 3)
+    
+    forbid_keyspace_walks(manager.redis_client)
+    assert await manager.batch_invalidate("coin") == 0
+    assert await manager.get_coin_balance(1) is None
+    
+    await manager.set_coin_balance(1, 20.0)
+    assert await manager.get_coin_balance(1) == 20.0
+    assert await manager.redis_client.get("babagavat:coin@1:balance:1") == "20.0"
+
+
+async def test_redis_manager_other_patterns_use_scan(server):
+    manager = BabaGAVATRedisManager()
+    manager.redis_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    await manager.increment_counter("hits", 3)
+    await manager.increment_counter("misses", 1)
+    
+    assert await manager.batch_invalidate("analytics") == 2
+    assert await manager.get_counter("hits") == 0
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Cache Invalidation Bus Tests
+============================
+
+Two CacheInvalidationBus instances sharing one fakeredis server stand in for
+two launcher processes: set/delete/invalidate in one drops the other's L1
+copy, bursts are debounced into one message and a node ignores its own
+messages.
+"""
+
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from core.advanced_behavioral_cache_manager import AdvancedBehavioralCacheManager  # noqa: E402
+from core.cache_invalidation_bus import ALL, CacheInvalidationBus  # noqa: E402
+
+
+@pytest.fixture
+async def buses():
+    server = fakeredis.FakeServer()
+    pair = []
+    for _ in range(2):
+        bus = CacheInvalidationBus(flush_interval=0.01)
+        await bus.start(fakeredis.FakeAsyncRedis(server=server))
+        pair.append(bus)
+    yield pair
+    for bus in pair:
+        await bus.stop()
+
+
+async def settle(delay: float = 0.1):
+    await asyncio.sleep(delay)
+
+
+async def test_set_in_one_process_drops_other_l1(buses, make_cache):
+    first, second = (make_cache("shared", invalidation_bus=bus) for bus in buses)
+    await first.start()
+    await second.start()
+    
+    await second.set("user:1", "old")
+    await settle()
+    await first.set("user:1", "new")
+    await settle()
+    
+    assert "user:1" not in second.l1_cache
+    assert first.l1_cache["user:1"].value == "new"
+    assert second.stats["remote_invalidations"] == 1
+    await first.stop()
+    await second.stop()
+
+
+async def test_clear_broadcasts_whole_cache_tombstone(buses, make_cache):
+    first, second = (make_cache("shared", invalidation_bus=bus) for bus in buses)
+    await first.start()
+    await second.start()
+    for index in range(3):
+        await second.set(f"k{index}", index)
+    
+    await first.clear()
+    await settle()
+    
+    assert len(second.l1_cache) == 0
+    await first.stop()
+    await second.stop()
+
+
+async def test_burst_is_debounced_into_one_message(buses):
+    sender, receiver = buses
+    received = []
+    await receiver.register("smart:burst", lambda keys, namespaces: received.append(keys))
+    
+    for index in range(100):
+        sender.publish("smart:burst", keys=(f"k{index}",))
+    await settle()
+    
+    assert sender.stats["published_messages"] == 1
+    assert len(received) == 1 and len(received[0]) == 100
+
+
+async def test_max_batch_flushes_without_waiting(buses):
+    sender, receiver = buses
+    sender.flush_interval = 60
+    sender.max_batch = 10
+    received = []
+    await receiver.register("smart:batch", lambda keys, namespaces: received.append(keys))
+    
+    for index in range(10):
+        sender.publish("smart:batch", keys=(f"k{index}",))
+    await settle()
+    
+    assert len(received) == 1 and len(received[0]) == 10
+
+
+async def test_own_messages_are_ignored(buses):
+    bus = buses[0]
+    calls = []
+    await bus.register("smart:self", lambda keys, namespaces: calls.append(keys))
+    
+    bus.publish("smart:self", keys=("k",))
+    await settle()
+    
+    assert calls == []
+    assert bus.stats["published_messages"] == 1
+
+
+async def test_all_namespace_supersedes_keys(buses):
+    sender, receiver = buses
+    received = []
+    await receiver.register("smart:all", lambda keys, namespaces: received.append((keys, namespaces)))
+    
+    sender.publish("smart:all", keys=("a", "b"))
+    sender.publish("smart:all", namespaces=(ALL,))
+    await settle()
+    
+    assert received == [(set(), {ALL})]
+
+
+async def test_publish_is_noop_when_bus_not_started():
+    bus = CacheInvalidationBus()
+    bus.publish("smart:idle", keys=("k",))
+    assert bus.get_stats()["pending_tombstones"] == 0
+
+
+async def test_behavioral_namespace_invalidation_reaches_other_process(buses):
+    first, second = AdvancedBehavioralCacheManager(), AdvancedBehavioralCacheManager()
+    for manager, bus in zip((first, second), buses):
+        manager.engine.invalidation_bus = bus
+        await manager.engine.start()
+    
+    await second.set("big_five", "42", {"o": 0.5})
+    await second.set("sentiment", "42", {"score": 1})
+    await first.invalidate("big_five")
+    await settle()
+    
+    assert await second.get("big_five", "42") is None
+    assert await second.get("sentiment", "42") == {"score": 1}
+    assert second.engine.stats["remote_invalidations"] == 1
+    for manager in (first, second):
+        await manager.engine.stop()
+
+
+async def test_engines_sharing_a_name_in_one_process_all_receive(buses, make_cache):
+    local = [
+        make_cache(name, invalidation_bus=buses[0], shared_name="shared")
+        for name in ("shared", "shared#2")
+    ]
+    remote = make_cache("shared", invalidation_bus=buses[1])
+    for cache in (*local, remote):
+        await cache.start()
+    
+    for cache in local:
+        await cache.set("k", "old")
+    await remote.delete("k")
+    await settle()
+    
+    assert all("k" not in cache.l1_cache for cache in local)
+    
+    await local[1].stop()
+    assert buses[0].get_stats()["registered_caches"] == ["smart:shared"]
+    for cache in (local[0], remote):
+        await cache.stop()
+
+
+@pytest.mark.parametrize("operation", ["set", "delete", "clear"])
+async def test_tombstone_is_published_after_the_l2_write(buses, monkeypatch, operation, make_cache):
+    redis = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+    cache = make_cache("ordered", persistence=True, shared_l2=True, invalidation_bus=buses[0], redis=redis)
+    await cache.set("k", "old")
+    events = []
+    
+    def after(name, function):
+        async def wrapped(*args, **kwargs):
+            result = await function(*args, **kwargs)
+            events.append(name)
+            return result
+        return wrapped
+    
+    monkeypatch.setattr(cache, "_set_l2", after("l2", cache._set_l2))
+    monkeypatch.setattr(redis, "delete", after("l2", redis.delete))
+    monkeypatch.setattr(cache, "_delete_l2_keys", after("l2", cache._delete_l2_keys))
+    monkeypatch.setattr(buses[0], "publish", lambda *args, **kwargs: events.append("publish"))
+    
+    if operation == "set":
+        await cache.set("k", "new")
+    elif operation == "delete":
+        await cache.delete("k")
+    else:
+        await cache.clear()
+    
+    # A peer that re-reads L2 on the tombstone must already see the write
+    assert "l2" in events
+    assert events[-1] == "publish"
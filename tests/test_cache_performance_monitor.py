@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Cache Performance Monitor Tests
+===============================
+
+Batched writer for CachePerformanceMonitor: no file I/O on the record path,
+single appended flushes, background flushing, bounded queue, reports
+computed from rollups and thread-safe counters/alerts.
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from core.cache_performance_monitor import CachePerformanceMonitor
+
+
+@pytest.fixture
+def monitor(tmp_path):
+    monitor = CachePerformanceMonitor(str(tmp_path / "cache_performance.json"), flush_interval=60,
+                                      raw_log=True)
+    yield monitor
+    monitor.close()
+
+
+def read_log(monitor):
+    if not monitor.log_file.exists():
+        return []
+    return [json.loads(line) for line in monitor.log_file.read_text().splitlines()]
+
+
+def test_record_does_not_touch_the_log_until_flush(monitor):
+    for index in range(50):
+        monitor.record_cache_operation("hit", f"key:{index % 5}", 2.0)
+
+    assert read_log(monitor) == []
+    assert monitor.flush() == 50
+    assert monitor.writer_stats["flushes"] == 1
+
+    entries = read_log(monitor)
+    assert len(entries) == 50
+    assert entries[0]["operation"] == "hit"
+    assert monitor.flush() == 0
+
+
+def test_background_writer_flushes_periodically(tmp_path):
+    monitor = CachePerformanceMonitor(str(tmp_path / "cache_performance.json"), flush_interval=0.05,
+                                      raw_log=True)
+    try:
+        monitor.record_cache_operation("miss", "key", 3.0)
+        deadline = time.monotonic() + 2
+        while not read_log(monitor) and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+        assert len(read_log(monitor)) == 1
+    finally:
+        monitor.close()
+
+    assert monitor._writer_thread is None
+
+
+def test_close_flushes_remaining_metrics(monitor):
+    monitor.record_cache_operation("set", "key", 1.0, ttl_seconds=60)
+    monitor.close()
+
+    assert [entry["ttl_seconds"] for entry in read_log(monitor)] == [60]
+
+
+def test_pending_queue_is_bounded(tmp_path):
+    monitor = CachePerformanceMonitor(str(tmp_path / "perf.json"), flush_interval=60, max_pending=10)
+    try:
+        for _ in range(25):
+            monitor.record_cache_operation("hit", "key", 1.0)
+
+        assert monitor.writer_stats["dropped"] == 15
+        assert monitor.flush() == 10
+    finally:
+        monitor.close()
+
+
+def test_report_reads_rollups(monitor):
+    for index in range(30):
+        monitor.record_cache_operation("hit", "hot", 10.0, cache_size_kb=128.0)
+    for index in range(10):
+        monitor.record_cache_operation("miss", f"cold:{index}", 50.0)
+
+    # Raw ring buffer is not what the report reads
+    monitor.metrics.clear()
+    report = monitor.generate_performance_report("last_hour")
+
+    assert report.total_operations == 40
+    assert report.hit_rate_percentage == pytest.approx(75.0)
+    assert report.avg_response_time_ms == pytest.approx(20.0)
+    assert report.peak_response_time_ms == 50.0
+    assert report.top_accessed_keys[0] == ("hot", 30)
+    assert report.cache_size_trends[-1][1] == 128.0
+    assert monitor.generate_performance_report("last_day").total_operations == 40
+
+
+def test_rollup_key_counters_are_bounded(tmp_path):
+    monitor = CachePerformanceMonitor(str(tmp_path / "perf.json"), flush_interval=60, max_tracked_keys=5, raw_log=False)
+    try:
+        for index in range(100):
+            monitor.record_cache_operation("hit", f"key:{index}", 1.0)
+        monitor.flush()
+
+        assert all(len(rollup["top_keys"]) <= 5 for rollup in monitor.hourly_stats.values())
+        assert not monitor.log_file.exists()
+    finally:
+        monitor.close()
+
+
+def test_hit_rate_alert_is_raised_on_flush(monitor):
+    for _ in range(100):
+        monitor.record_cache_operation("miss", "key", 1.0)
+    assert not monitor.alerts
+
+    monitor.flush()
+    assert [alert.metric_type for alert in monitor.alerts] == ["hit_rate"]
+
+
+def test_raw_log_is_off_by_default(tmp_path):
+    monitor = CachePerformanceMonitor(str(tmp_path / "perf.json"), flush_interval=60)
+    try:
+        monitor.record_cache_operation("hit", "key", 1.0)
+        assert monitor.flush() == 1
+        assert not monitor.log_file.exists()
+        assert monitor.generate_performance_report("last_hour").total_operations == 1
+    finally:
+        monitor.close()
+
+
+def test_counters_and_alerts_are_consistent_across_threads(tmp_path):
+    monitor = CachePerformanceMonitor(str(tmp_path / "perf.json"), flush_interval=0.001)
+    threads, per_thread = 8, 2000
+    start = threading.Barrier(threads)
+
+    def record():
+        start.wait()
+        for index in range(per_thread):
+            monitor.record_cache_operation("miss", f"key:{index % 50}", 600.0)
+            if index % 200 == 0:
+                monitor.export_dashboard_metrics()
+
+    workers = [threading.Thread(target=record) for _ in range(threads)]
+    try:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    finally:
+        monitor.close()
+
+    stats = monitor.writer_stats
+    assert stats["recorded"] == threads * per_thread
+    assert stats["flushed"] == threads * per_thread
+    # Cooldown holds under contention: one alert per key
+    metric_types = sorted(alert.metric_type for alert in monitor.alerts)
+    assert metric_types == ["hit_rate", "response_time"]
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Cache Prefetch Tests
+====================
+
+MarkovPrefetcher namespace model and the SmartCacheManager prefetch hooks:
+a hit warms the likely next keys, get_or_load joins a running prefetch,
+budget limits and useful/wasted accounting.
+"""
+
+import asyncio
+
+import pytest
+
+from core.cache_prefetch import MarkovPrefetcher, PrefetchConfig
+
+
+def train(target, users=range(10), steps=("profile", "persona", "conversation")):
+    for user in users:
+        for namespace in steps:
+            target.observe(f"{namespace}:{user}")
+
+
+class RecordingLoader:
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.keys = []
+
+    async def __call__(self, key):
+        self.keys.append(key)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("backend down")
+        return f"loaded {key}"
+
+
+def test_predicts_next_namespace_for_same_identifier():
+    prefetcher = MarkovPrefetcher(PrefetchConfig(min_observations=5))
+    train(prefetcher)
+
+    assert prefetcher.predict("profile:99") == [("persona:99", 1.0)]
+    assert prefetcher.predict("persona:7") == [("conversation:7", 1.0)]
+    assert prefetcher.predict("conversation:7") == []
+    assert prefetcher.predict("unknown:7") == []
+
+
+def test_needs_enough_observations_and_probability():
+    prefetcher = MarkovPrefetcher(PrefetchConfig(min_observations=5, min_probability=0.3))
+    train(prefetcher, users=range(4))
+    assert prefetcher.predict("profile:1") == []
+
+    train(prefetcher, users=range(4, 10), steps=("profile", "persona"))
+    train(prefetcher, users=range(10, 12), steps=("profile", "settings"))
+    assert prefetcher.predict("profile:1") == [("persona:1", pytest.approx(10 / 12))]
+
+
+def test_session_gap_breaks_the_chain():
+    prefetcher = MarkovPrefetcher(PrefetchConfig(session_gap=30))
+    prefetcher.observe("profile:1", now=0)
+    prefetcher.observe("persona:1", now=100)
+
+    assert prefetcher.stats["transitions"] == 0
+
+
+def test_token_bucket_limits_prefetches():
+    prefetcher = MarkovPrefetcher(PrefetchConfig(budget_per_second=2))
+
+    assert [prefetcher.acquire() for _ in range(3)] == [True, True, False]
+    assert prefetcher.stats["budget_skips"] == 1
+
+
+def test_adapt_raises_threshold_when_prefetches_are_wasted():
+    prefetcher = MarkovPrefetcher(PrefetchConfig(min_probability=0.3))
+    for _ in range(20):
+        prefetcher.record_issued()
+
+    assert prefetcher.adapt() == pytest.approx(0.4)
+
+
+async def test_prefetch_starts_with_the_first_loader(make_cache):
+    cache = make_cache(ttl=60)
+    assert cache.prefetcher is None
+
+    cache.register_prefetch_loader("persona", RecordingLoader())
+    assert cache.prefetcher is not None
+
+    # An explicitly enabled model is kept
+    cache = make_cache(ttl=60)
+    prefetcher = cache.enable_prefetch(PrefetchConfig(min_observations=3))
+    cache.register_prefetch_loader("persona", RecordingLoader())
+    assert cache.prefetcher is prefetcher
+
+
+async def test_hit_warms_next_key(make_cache):
+    cache = make_cache(ttl=60)
+    loader = RecordingLoader()
+    cache.enable_prefetch(PrefetchConfig(min_observations=3))
+    cache.register_prefetch_loader("persona", loader)
+    train(cache.prefetcher, users=range(5), steps=("profile", "persona"))
+
+    await cache.set("profile:42", "p")
+    assert await cache.get("profile:42") == "p"
+    await asyncio.sleep(0.01)
+
+    assert loader.keys == ["persona:42"]
+    assert cache.l1_cache["persona:42"].value == "loaded persona:42"
+
+    assert await cache.get("persona:42") == "loaded persona:42"
+    stats = cache.get_stats()["prefetch"]
+    assert stats["issued"] == 1
+    assert stats["useful"] == 1
+
+
+async def test_get_or_load_joins_running_prefetch(make_cache):
+    cache = make_cache(ttl=60)
+    loader = RecordingLoader(delay=0.05)
+    cache.enable_prefetch(PrefetchConfig(min_observations=3))
+    cache.register_prefetch_loader("persona", loader)
+    train(cache.prefetcher, users=range(5), steps=("profile", "persona"))
+
+    await cache.set("profile:42", "p")
+    await cache.get("profile:42")
+
+    fallback = RecordingLoader()
+    value = await cache.get_or_load("persona:42", lambda: fallback("persona:42"))
+
+    assert value == "loaded persona:42"
+    assert fallback.keys == []
+    assert cache.prefetcher.stats["useful"] == 1
+
+
+async def test_unread_prefetch_counts_as_wasted_and_miss_does_not_prefetch(make_cache):
+    cache = make_cache(ttl=60, max_size=2)
+    loader = RecordingLoader()
+    cache.enable_prefetch(PrefetchConfig(min_observations=3))
+    cache.register_prefetch_loader("persona", loader)
+    train(cache.prefetcher, users=range(5), steps=("profile", "persona"))
+
+    assert await cache.get("profile:1") is None
+    await asyncio.sleep(0.01)
+    assert loader.keys == []
+
+    await cache.set("profile:1", "p")
+    await cache.get("profile:1")
+    await asyncio.sleep(0.01)
+    await cache.set("other:1", "x")
+    await cache.set("other:2", "y")
+
+    assert "persona:1" not in cache.l1_cache
+    assert cache.prefetcher.stats["wasted"] == 1
+
+
+async def test_failed_prefetch_does_not_cache_or_leak(make_cache):
+    cache = make_cache(ttl=60)
+    cache.enable_prefetch(PrefetchConfig(min_observations=3))
+    cache.register_prefetch_loader("persona", RecordingLoader(fail=True))
+    train(cache.prefetcher, users=range(5), steps=("profile", "persona"))
+
+    await cache.set("profile:1", "p")
+    await cache.get("profile:1")
+    await asyncio.sleep(0.01)
+
+    assert "persona:1" not in cache.l1_cache
+    assert cache._loads == {}
+    assert cache._prefetching == set()
+
+
+async def test_max_inflight_bounds_concurrent_prefetches(make_cache):
+    cache = make_cache(ttl=60)
+    loader = RecordingLoader(delay=0.05)
+    cache.enable_prefetch(PrefetchConfig(min_observations=3, max_inflight=2))
+    cache.register_prefetch_loader("persona", loader)
+    train(cache.prefetcher, users=range(5), steps=("profile", "persona"))
+
+    for user in range(100, 104):
+        await cache.set(f"profile:{user}", "p")
+        await cache.get(f"profile:{user}")
+
+    assert len(cache._prefetching) == 2
+    await asyncio.sleep(0.1)
+    assert len(loader.keys) == 2
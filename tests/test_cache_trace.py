@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Cache Trace Tests
+=================
+
+CacheTraceRecorder binary format, key-hash sampling, SmartCacheManager
+recording hooks and the offline TraceSimulator (including parity with the
+engine's own eviction).
+"""
+
+import random
+
+import pytest
+
+from core.cache_trace import (
+    OP_CLEAR,
+    OP_DELETE,
+    OP_HIT,
+    OP_MISS,
+    OP_SET,
+    CacheTraceRecorder,
+    TraceRecord,
+    TraceSimulator,
+    key_hash,
+    observed_hit_ratio,
+    read_trace,
+)
+from core.smart_cache_manager import CacheStrategy
+
+
+def records(*events):
+    """(op, key, size[, priority]) tuples -> TraceRecords one second apart."""
+    return [
+        TraceRecord(float(index), key_hash(key), op, size, rest[0] if rest else 1)
+        for index, (op, key, size, *rest) in enumerate(events)
+    ]
+
+
+def test_recorder_round_trip_and_append(tmp_path):
+    path = tmp_path / "cache.trace"
+    recorder = CacheTraceRecorder(path, buffer_bytes=1)
+    recorder.record(OP_SET, "profile:1", 512, priority=2)
+    recorder.record(OP_HIT, "profile:1", 512)
+    recorder.close()
+
+    recorder = CacheTraceRecorder(path)
+    recorder.record(OP_DELETE, "profile:1")
+    recorder.close()
+
+    trace = list(read_trace(path))
+    assert [(r.op, r.size, r.priority) for r in trace] == [(OP_SET, 512, 2), (OP_HIT, 512, 0), (OP_DELETE, 0, 0)]
+    assert {r.key_hash for r in trace} == {key_hash("profile:1")}
+    assert trace[0].timestamp <= trace[-1].timestamp < 5
+
+
+def test_truncated_tail_and_bad_header(tmp_path):
+    path = tmp_path / "cache.trace"
+    recorder = CacheTraceRecorder(path)
+    recorder.record(OP_MISS, "a")
+    recorder.close()
+    with open(path, "ab") as trace:
+        trace.write(b"\x01\x02\x03")
+
+    assert len(list(read_trace(path))) == 1
+
+    other = tmp_path / "other.trace"
+    other.write_bytes(b"not a trace file at all")
+    with pytest.raises(ValueError):
+        CacheTraceRecorder(other)
+
+
+def test_sampling_keeps_every_access_of_a_sampled_key(tmp_path):
+    recorder = CacheTraceRecorder(tmp_path / "sampled.trace", sample_rate=0.25)
+    keys = [f"user:{index}" for index in range(2000)]
+    for _ in range(3):
+        for key in keys:
+            recorder.record(OP_MISS, key)
+    recorder.close()
+
+    per_key = {}
+    for record in read_trace(recorder.path):
+        per_key[record.key_hash] = per_key.get(record.key_hash, 0) + 1
+
+    assert set(per_key.values()) == {3}
+    assert 0.2 < len(per_key) / len(keys) < 0.3
+
+
+async def test_engine_records_accesses(tmp_path, make_cache):
+    cache = make_cache(ttl=600)
+    cache.start_trace(tmp_path / "engine.trace")
+
+    await cache.get("a")
+    await cache.set("a", "value", priority=2)
+    await cache.get("a")
+    await cache.get_or_load("b", lambda: "loaded")
+    await cache.delete("a")
+    await cache.clear()
+    cache.stop_trace()
+
+    trace = list(read_trace(tmp_path / "engine.trace"))
+    assert [r.op for r in trace] == [OP_MISS, OP_SET, OP_HIT, OP_MISS, OP_SET, OP_DELETE, OP_CLEAR]
+    assert trace[1].priority == 2
+    assert trace[2].size == trace[1].size > 0
+    assert observed_hit_ratio(trace) == pytest.approx(1 / 3)
+
+
+def test_simulator_lru_and_byte_budget():
+    trace = records(
+        (OP_SET, "a", 100), (OP_SET, "b", 100), (OP_HIT, "a", 100),
+        (OP_SET, "c", 100), (OP_MISS, "b", 0), (OP_HIT, "a", 100),
+    )
+
+    result = TraceSimulator("lru", max_size=2).run(trace)
+    assert (result["hits"], result["evictions"]) == (2, 1)
+
+    trace = records(
+        (OP_SET, "a", 100), (OP_SET, "s", 40), (OP_HIT, "a", 100), (OP_HIT, "s", 40),
+        (OP_SET, "big", 120), (OP_MISS, "s", 0), (OP_HIT, "big", 120),
+    )
+    result = TraceSimulator("lru", max_size=10, max_bytes=150).run(trace)
+    assert (result["hits"], result["evictions"]) == (3, 2)
+    assert result["byte_hit_ratio"] == pytest.approx(260 / 300)
+
+
+def test_simulator_ttl_priority_and_promotion():
+    trace = records((OP_SET, "a", 10), (OP_MISS, "a", 0), (OP_MISS, "a", 0), (OP_HIT, "z", 10), (OP_HIT, "z", 10))
+    result = TraceSimulator("lru", max_size=10, ttl=1.5).run(trace)
+    assert (result["hits"], result["expirations"]) == (2, 1)
+
+    trace = records((OP_SET, "low", 10, 0), (OP_SET, "high", 10, 2), (OP_SET, "new", 10, 1), (OP_MISS, "high", 0))
+    assert TraceSimulator("priority", max_size=2).run(trace)["hits"] == 1
+
+    trace = records((OP_SET, "a", 1), (OP_DELETE, "a", 0), (OP_MISS, "a", 0), (OP_SET, "b", 1), (OP_CLEAR, "", 0), (OP_MISS, "b", 0))
+    assert TraceSimulator("lfu", max_size=10).run(trace)["hits"] == 0
+
+
+@pytest.mark.parametrize("strategy", [CacheStrategy.LRU, CacheStrategy.LFU, CacheStrategy.TTL])
+async def test_simulator_matches_engine(tmp_path, strategy, make_cache):
+    cache = make_cache(strategy=strategy, ttl=600, max_size=50)
+    cache.start_trace(tmp_path / "parity.trace")
+
+    rng = random.Random(3)
+    for _ in range(3000):
+        key = f"k:{min(int(rng.paretovariate(1.2)), 400)}"
+        await cache.get_or_load(key, lambda key=key: key * 3, priority=rng.randrange(3))
+    cache.stop_trace()
+
+    trace = list(read_trace(tmp_path / "parity.trace"))
+    simulated = TraceSimulator(
+        "priority" if strategy == CacheStrategy.TTL else strategy.value, max_size=50
+    ).run(trace)
+
+    assert simulated["hit_ratio"] == pytest.approx(observed_hit_ratio(trace))
+    assert simulated["evictions"] == cache.stats["evictions"]
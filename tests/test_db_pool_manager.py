@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+SmartConnectionPool Tests
+=========================
+
+Checkout without per-checkout health queries, LIFO / least-used selection
+by PoolStrategy, FIFO waiter hand-off with timeouts (also past max_size
+on a PostgreSQL driver pool), idle-time health checks and the wait-time
+histogram under 200 concurrent acquirers.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("asyncpg")
+pytest.importorskip("motor")
+
+from core import db_pool_manager  # noqa: E402
+from core.db_pool_manager import (  # noqa: E402
+    DatabaseType,
+    PoolConfig,
+    PoolExhaustedError,
+    PoolStrategy,
+    SmartConnectionPool,
+    WaitTimeHistogram,
+)
+
+
+@pytest.fixture
+async def make_pool(tmp_path):
+    pools = []
+
+    async def factory(**overrides):
+        options = dict(min_size=2, max_size=4, max_overflow=0, pool_timeout=5)
+        options.update(overrides)
+        pool = SmartConnectionPool("test", DatabaseType.SQLITE, PoolConfig(**options), str(tmp_path / "pool.db"))
+        await pool.initialize()
+        pools.append(pool)
+        return pool
+
+    yield factory
+    for pool in pools:
+        await pool.close()
+
+
+class FakeAsyncpgConnection:
+    async def execute(self, query):
+        return "SELECT 1"
+
+
+class FakeAsyncpgPool:
+    """asyncpg pool stand-in whose acquire() blocks once max_size is out."""
+
+    def __init__(self, max_size):
+        self.slots = asyncio.Semaphore(max_size)
+        self.acquire_timeouts = []
+
+    async def acquire(self, timeout=None):
+        self.acquire_timeouts.append(timeout)
+        await asyncio.wait_for(self.slots.acquire(), timeout)
+        return FakeAsyncpgConnection()
+
+    async def release(self, conn):
+        self.slots.release()
+
+    async def close(self):
+        pass
+
+
+async def checkout(pool):
+    async with await pool.acquire_connection() as conn:
+        return conn
+
+
+async def test_checkout_does_not_query(make_pool):
+    pool = await make_pool()
+    for _ in range(100):
+        async with await pool.acquire_connection() as conn:
+            await conn.execute("SELECT 1")
+
+    assert pool.stats["health_checks"] == 0
+    assert pool.stats["pool_misses"] == 0
+    assert pool.get_stats()["connections"]["total"] == 2
+
+
+async def test_lifo_and_least_used_checkout(make_pool):
+    pool = await make_pool(min_size=3)
+    first, second = [await pool._acquire_connection_internal() for _ in range(2)]
+    await pool._release_connection_internal(first[0])
+    await pool._release_connection_internal(second[0])
+    # Most recently released comes back first
+    assert (await pool._acquire_connection_internal())[0] == second[0]
+
+    pool = await make_pool(min_size=3, strategy=PoolStrategy.LOAD_BALANCED)
+    for _ in range(5):
+        connection_id, _ = await pool._acquire_connection_internal()
+        await pool._release_connection_internal(connection_id)
+    usage = sorted(metrics.usage_count for metrics in pool._metrics.values())
+    assert usage == [1, 2, 2]
+
+
+async def test_waiters_are_served_in_order(make_pool):
+    pool = await make_pool(min_size=1, max_size=1)
+    held, _ = await pool._acquire_connection_internal()
+    order = []
+
+    async def acquirer(index):
+        connection_id, _ = await pool._acquire_connection_internal()
+        order.append(index)
+        await asyncio.sleep(0)
+        await pool._release_connection_internal(connection_id)
+
+    tasks = []
+    for index in range(5):
+        tasks.append(asyncio.create_task(acquirer(index)))
+        await asyncio.sleep(0)
+
+    # A late arrival must not jump the queue when the connection frees up
+    await pool._release_connection_internal(held)
+    tasks.append(asyncio.create_task(acquirer(99)))
+    await asyncio.gather(*tasks)
+
+    assert order == [0, 1, 2, 3, 4, 99]
+    assert pool.stats["waits"] == 6
+
+
+async def test_wait_timeout_and_cancelled_waiter(make_pool):
+    pool = await make_pool(min_size=1, max_size=1, pool_timeout=0.05)
+    held, _ = await pool._acquire_connection_internal()
+
+    with pytest.raises(PoolExhaustedError):
+        await pool._acquire_connection_internal()
+    assert pool.stats["timeouts"] == 1
+    assert not pool._waiters
+
+    cancelled = asyncio.create_task(pool._acquire_connection_internal())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await pool._release_connection_internal(held)
+
+    # The connection went back to the pool, not to the cancelled waiter
+    assert len(pool._idle) == 1
+
+
+async def test_static_pool_does_not_overflow(make_pool):
+    pool = await make_pool(min_size=1, max_size=2, max_overflow=5, pool_timeout=0.05, strategy=PoolStrategy.STATIC)
+    held = [await pool._acquire_connection_internal() for _ in range(2)]
+    with pytest.raises(PoolExhaustedError):
+        await pool._acquire_connection_internal()
+    for connection_id, _ in held:
+        await pool._release_connection_internal(connection_id)
+
+    pool = await make_pool(min_size=1, max_size=2, max_overflow=1)
+    held = [await pool._acquire_connection_internal() for _ in range(3)]
+    assert pool.stats["pool_misses"] == 2
+    for connection_id, _ in held:
+        await pool._release_connection_internal(connection_id)
+
+
+async def test_postgresql_overflow_waits_in_fifo_order(monkeypatch):
+    created = {}
+
+    async def create_pool(dsn, min_size, max_size, **kwargs):
+        created["max_size"] = max_size
+        created["pool"] = FakeAsyncpgPool(max_size)
+        return created["pool"]
+
+    monkeypatch.setattr(db_pool_manager.asyncpg, "create_pool", create_pool, raising=False)
+    config = PoolConfig(min_size=1, max_size=2, max_overflow=2, pool_timeout=0.1)
+    pool = SmartConnectionPool("pg", DatabaseType.POSTGRESQL, config, "postgresql://fake")
+    await pool.initialize()
+
+    try:
+        # Overflow connections come from the driver pool without blocking in it
+        assert created["max_size"] == pool.capacity == 4
+        held = [await asyncio.wait_for(pool._acquire_connection_internal(), 1) for _ in range(4)]
+
+        order = []
+
+        async def waiter(index):
+            try:
+                await pool._acquire_connection_internal()
+                order.append(index)
+            except PoolExhaustedError:
+                order.append(("timeout", index))
+
+        tasks = []
+        for index in range(3):
+            tasks.append(asyncio.create_task(waiter(index)))
+            await asyncio.sleep(0)
+        await pool._release_connection_internal(held[0][0])
+        await asyncio.gather(*tasks)
+
+        assert order == [0, ("timeout", 1), ("timeout", 2)]
+        assert pool.stats["timeouts"] == 2
+        assert set(created["pool"].acquire_timeouts) == {0.1}
+
+        # Growing max_size at runtime cannot outgrow the driver pool
+        pool.config.max_size = 10
+        assert pool.capacity == 4
+    finally:
+        await pool.close()
+
+
+async def test_idle_health_check_recycles_broken_connections(make_pool):
+    pool = await make_pool(min_size=2, health_check_interval=60)
+    broken = pool._idle[0]
+    await pool._connections[broken].close()
+    for metrics in pool._metrics.values():
+        metrics.last_checked -= 120
+
+    assert await pool._check_idle_connections() == 2
+    assert broken not in pool._connections
+    assert len(pool._idle) == 2
+    assert pool.stats["recycled"] == 1
+
+    # Stale connections are pinged on checkout only when the idle check missed them
+    connection_id = pool._idle[-1]
+    pool._metrics[connection_id].last_checked -= 120
+    await checkout(pool)
+    assert pool.stats["health_checks"] == 3
+
+
+def test_wait_time_histogram_percentiles():
+    histogram = WaitTimeHistogram()
+    for _ in range(98):
+        histogram.record(0.0002)
+    histogram.record(0.004)
+    histogram.record(0.040)
+
+    assert histogram.percentile(50) == 0.25
+    assert histogram.percentile(99) == 5
+    assert histogram.percentile(100) == pytest.approx(40.0)
+    assert histogram.to_dict()["buckets"] == {"<=0.25ms": 98, "<=5ms": 1, "<=50ms": 1}
+
+
+async def test_200_concurrent_acquirers(make_pool):
+    pool = await make_pool(min_size=5, max_size=10, max_overflow=5, pool_timeout=10)
+
+    async def worker():
+        for _ in range(5):
+            async with await pool.acquire_connection() as conn:
+                await conn.execute("SELECT 1")
+                await asyncio.sleep(0.001)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(200)))
+    elapsed = time.perf_counter() - start
+
+    wait_time = pool.get_stats()["wait_time"]
+    assert wait_time["count"] == 1000
+    assert pool.stats["timeouts"] == 0
+    assert pool.get_stats()["connections"]["total"] == 15
+    assert wait_time["p99_ms"] <= elapsed * 1000
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Message Pool Queue Tests
+========================
+
+MessagePool dequeue, delayed-message promotion and claim semantics against
+an in-memory fakeredis server (Lua enabled).
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from gavatcore_engine.message_pool import (  # noqa: E402
+    Message,
+    MessagePool,
+    MessagePriority,
+    MessageStatus,
+    get_message_codec,
+)
+
+
+@pytest.fixture(params=["json", "msgpack"])
+async def pool(request):
+    server = fakeredis.FakeServer()
+    message_pool = MessagePool()
+    message_pool.codec = get_message_codec(request.param)
+    message_pool.redis.redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    message_pool.redis.raw_redis = fakeredis.FakeAsyncRedis(server=server)
+    message_pool.redis._scripts.clear()
+    yield message_pool
+    await message_pool.redis.redis.flushall()
+
+
+async def test_dequeue_respects_priority_order(pool):
+    low = Message(priority=MessagePriority.LOW, bot_id="bot")
+    urgent = Message(priority=MessagePriority.URGENT, bot_id="bot")
+    await pool.add_message(low)
+    await pool.add_message(urgent)
+
+    first = await pool.get_next_message()
+    second = await pool.get_next_message()
+
+    assert first.id == urgent.id
+    assert second.id == low.id
+    assert first.status == MessageStatus.PROCESSING
+    assert await pool.get_next_message() is None
+
+
+async def test_dequeue_claims_each_message_once(pool):
+    message = Message(bot_id="bot")
+    await pool.add_message(message)
+    await pool.redis.add_to_message_queue("queue:normal", {"message_id": message.id})
+
+    assert (await pool.get_next_message()).id == message.id
+    assert await pool.get_next_message() is None
+
+    stored = await pool.get_message(message.id)
+    assert stored.status == MessageStatus.PROCESSING
+
+
+async def test_expired_message_is_cancelled(pool):
+    message = Message(bot_id="bot", expires_at=datetime.utcnow() - timedelta(minutes=1))
+    await pool.add_message(message)
+
+    assert await pool.get_next_message() is None
+    assert (await pool.get_message(message.id)).status == MessageStatus.CANCELLED
+
+
+async def test_delayed_message_is_promoted_when_due(pool):
+    later = Message(bot_id="bot", scheduled_at=datetime.utcnow() + timedelta(hours=1))
+    await pool.add_message(later)
+
+    assert await pool.get_next_message() is None
+    assert await pool.promote_due_messages() == []
+    assert (await pool.get_queue_stats())["scheduled"] == 1
+
+    await pool.reschedule_message(later.id, datetime.utcnow() - timedelta(seconds=1))
+    assert await pool.promote_due_messages() == [later.id]
+    assert (await pool.get_next_message()).id == later.id
+    assert (await pool.get_queue_stats())["scheduled"] == 0
+
+
+async def test_wait_for_next_message_times_out_when_idle(pool):
+    assert await pool.wait_for_next_message(timeout=0.1) is None
+
+
+async def test_popped_but_unclaimed_message_is_requeued(pool, monkeypatch):
+    orphan = Message(bot_id="bot", priority=MessagePriority.HIGH)
+    queued = Message(bot_id="bot")
+    await pool.add_message(orphan)
+    await pool.add_message(queued)
+
+    # A worker popped the entry, recorded it as claiming and died
+    async def die(*args, **kwargs):
+        raise ConnectionError("worker gone")
+
+    monkeypatch.setattr(pool, "get_next_message", lambda priority=None: asyncio.sleep(0))
+    monkeypatch.setattr(pool.redis, "run_script", die)
+    with pytest.raises(ConnectionError):
+        await pool.wait_for_next_message(timeout=0.1)
+    monkeypatch.undo()
+
+    # Still inside the grace period: a live worker could be claiming it
+    assert await pool.requeue_orphaned_messages() == []
+    assert await pool.requeue_orphaned_messages(batch_size=1, min_age=0) == [orphan.id]
+    assert await pool.requeue_orphaned_messages(min_age=0) == []
+
+    assert (await pool.get_next_message()).id == orphan.id
+    assert (await pool.get_next_message()).id == queued.id
+
+
+async def test_claimed_messages_leave_the_claiming_set(pool, monkeypatch):
+    messages = [Message(bot_id="bot") for _ in range(3)]
+    for message in messages:
+        await pool.add_message(message)
+    # Skip the non-blocking path so every claim goes through the blocking pop
+    monkeypatch.setattr(pool, "get_next_message", lambda priority=None: asyncio.sleep(0))
+    for message in messages:
+        assert (await pool.wait_for_next_message(timeout=0.1)).id == message.id
+
+    assert await pool.redis.zcard(pool.CLAIMING_KEY) == 0
+    assert await pool.requeue_orphaned_messages(min_age=0) == []
+
+
+@pytest.mark.parametrize("claim_runs_first", [True, False])
+async def test_cancelled_claim_hands_the_message_back(pool, monkeypatch, claim_runs_first):
+    message = Message(bot_id="bot")
+    await pool.add_message(message)
+    original = pool.redis.run_script
+    claim_started = asyncio.Event()
+
+    async def run_script(name, *args, **kwargs):
+        if name != "claim_message":
+            return await original(name, *args, **kwargs)
+        if claim_runs_first:
+            # Claimed server-side, reply not yet read when the waiter is cancelled
+            result = await original(name, *args, **kwargs)
+            claim_started.set()
+            await asyncio.sleep(0.05)
+            return result
+        claim_started.set()
+        await asyncio.sleep(0.05)
+        return await original(name, *args, **kwargs)
+
+    monkeypatch.setattr(pool.redis, "run_script", run_script)
+    # Skip the non-blocking attempt so the blocking pop takes the entry
+    monkeypatch.setattr(pool, "get_next_message", lambda priority=None: asyncio.sleep(0))
+
+    waiter = asyncio.create_task(pool.wait_for_next_message(timeout=1))
+    await claim_started.wait()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await asyncio.sleep(0.1)
+
+    monkeypatch.undo()
+    assert (await pool.get_message(message.id)).status == MessageStatus.PENDING
+    assert message.id not in pool.processing_messages
+    assert (await pool.wait_for_next_message(timeout=0.1)).id == message.id
+
+
+async def test_requeue_puts_claimed_message_back_at_head(pool):
+    first = Message(bot_id="bot")
+    second = Message(bot_id="bot")
+    await pool.add_message(first)
+    await pool.add_message(second)
+
+    claimed = await pool.get_next_message()
+    assert await pool.requeue_message(claimed.id)
+
+    assert (await pool.get_message_stats())["processing"] == 0
+    assert (await pool.get_next_message()).id == first.id
+    assert (await pool.get_next_message()).id == second.id
+
+
+async def test_status_counters_follow_transitions(pool):
+    first = Message(bot_id="bot")
+    second = Message(bot_id="bot")
+    await pool.add_message(first)
+    await pool.add_message(second)
+
+    assert (await pool.get_message_stats())["pending"] == 2
+
+    claimed = await pool.get_next_message()
+    await pool.complete_message(claimed.id)
+    await pool.cancel_message(second.id)
+
+    stats = await pool.get_message_stats()
+    assert stats == {
+        "pending": 0,
+        "processing": 0,
+        "completed": 1,
+        "failed": 0,
+        "cancelled": 1,
+    }
+
+    await pool.delete_message(second.id)
+    assert (await pool.get_message_stats())["cancelled"] == 0
+
+
+async def test_reconcile_rebuilds_drifted_counters(pool):
+    for _ in range(3):
+        await pool.add_message(Message(bot_id="bot"))
+    await pool.redis.delete(pool.STATUS_COUNTERS_KEY)
+
+    assert (await pool.get_message_stats())["pending"] == 0
+    assert (await pool.reconcile_message_stats(batch_size=2))["pending"] == 3
+    assert (await pool.get_message_stats())["pending"] == 3
+
+
+async def test_messages_round_trip_through_either_encoding(pool):
+    message = Message(
+        bot_id="bot",
+        content="merhaba 👋",
+        target_chat_id=-1001234567890,
+        expires_at=datetime.utcnow() + timedelta(hours=1),
+        context={"task_id": "t1", "nested": {"n": [1, 2]}},
+    )
+    await pool.add_message(message)
+
+    stored = await pool.get_message(message.id)
+    assert stored.content == message.content
+    assert stored.context == message.context
+    assert stored.target_chat_id == message.target_chat_id
+    assert abs((stored.expires_at - message.expires_at).total_seconds()) < 1e-3
+
+
+async def test_migration_converts_existing_messages(pool):
+    message = Message(bot_id="bot", content="legacy")
+    pool.codec = get_message_codec("json")
+    await pool.add_message(message)
+
+    pool.codec = get_message_codec("msgpack")
+    assert await pool.migrate_message_encoding() == 1
+    assert await pool.migrate_message_encoding() == 0
+
+    fields = await pool.redis.hgetall_raw(f"message:{message.id}")
+    assert set(fields) == {"status", "priority", "expires_at", "data"}
+    assert (await pool.get_next_message()).content == "legacy"
+    assert (await pool.get_message_stats())["processing"] == 1
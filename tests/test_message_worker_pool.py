@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Message Worker Pool Tests
+=========================
+
+MessageWorkerPool concurrency, per-session caps, parking of saturated
+sessions, fetch modes and graceful drain.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from gavatcore_engine.message_pool import Message
+from gavatcore_engine.worker_pool import LatencyHistogram, MessageWorkerPool
+
+
+class FakeMessagePool:
+    """In-memory stand-in for the MessagePool dequeue API."""
+
+    def __init__(self, messages):
+        self.queue = asyncio.Queue()
+        self.requeued = []
+        for message in messages:
+            self.queue.put_nowait(message)
+
+    async def wait_for_next_message(self, timeout: float = 5.0, priority=None):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def get_next_message(self, priority=None):
+        return None if self.queue.empty() else self.queue.get_nowait()
+
+    async def requeue_message(self, message_id):
+        self.requeued.append(message_id)
+        return True
+
+
+def make_messages(count, bot_id="bot"):
+    return [Message(bot_id=bot_id, content=f"m{i}") for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_pool_processes_messages_concurrently():
+    active = 0
+    peak = 0
+    done = []
+
+    async def handler(message):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        done.append(message.id)
+
+    messages = [m for i in range(4) for m in make_messages(2, bot_id=f"bot{i}")]
+    pool = MessageWorkerPool(
+        handler, concurrency=4, per_session_limit=2, block_timeout=0.05,
+        pool=FakeMessagePool(messages),
+    )
+    await pool.start()
+    await asyncio.sleep(0.2)
+    await pool.stop()
+
+    assert len(done) == len(messages)
+    assert 1 < peak <= 4
+    assert pool.get_stats()["processed"] == len(messages)
+
+
+@pytest.mark.asyncio
+async def test_per_session_limit_is_enforced():
+    active = 0
+    peak = 0
+
+    async def handler(message):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+
+    pool = MessageWorkerPool(
+        handler, concurrency=6, per_session_limit=2, block_timeout=0.05,
+        pool=FakeMessagePool(make_messages(10, bot_id="same")),
+    )
+    await pool.start()
+    await asyncio.sleep(0.3)
+    await pool.stop()
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_in_flight_messages():
+    finished = []
+
+    async def handler(message):
+        await asyncio.sleep(0.1)
+        finished.append(message.id)
+
+    pool = MessageWorkerPool(
+        handler, concurrency=2, block_timeout=0.05,
+        pool=FakeMessagePool(make_messages(2)),
+    )
+    await pool.start()
+    await asyncio.sleep(0.02)
+    assert pool.in_flight == 2
+    assert pool.saturated
+
+    await pool.stop()
+    assert len(finished) == 2
+    assert pool.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_flooding_session_does_not_block_other_sessions():
+    finished = {}
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    async def handler(message):
+        await asyncio.sleep(0.1)
+        finished[message.bot_id, message.content] = loop.time() - start
+
+    messages = make_messages(20, bot_id="flood") + [Message(bot_id="quiet", content="q")]
+    pool = MessageWorkerPool(
+        handler, concurrency=4, per_session_limit=2, block_timeout=0.05,
+        pool=FakeMessagePool(messages),
+    )
+    await pool.start()
+    await asyncio.sleep(0.05)
+
+    # Two workers run "flood", the rest parked its backlog and moved on
+    assert pool.session_in_flight == {"flood": 2, "quiet": 1}
+    assert pool.deferred == 18
+
+    await asyncio.sleep(0.1)
+    assert finished["quiet", "q"] < 0.15
+
+    await asyncio.sleep(1.0)
+    await pool.stop()
+
+    assert sum(1 for bot_id, _ in finished if bot_id == "flood") == 20
+    assert pool.get_stats()["deferred"] == 0
+
+
+@pytest.mark.asyncio
+async def test_parking_is_bounded_and_returned_on_stop():
+    release = asyncio.Event()
+
+    async def handler(message):
+        await release.wait()
+
+    messages = make_messages(10, bot_id="same")
+    fake = FakeMessagePool(messages)
+    pool = MessageWorkerPool(
+        handler, concurrency=2, per_session_limit=1, max_deferred=3,
+        block_timeout=0.05, drain_timeout=0.5, pool=fake,
+    )
+    await pool.start()
+    await asyncio.sleep(0.05)
+
+    # One running, three parked, the rest still in the queue
+    assert (pool.in_flight, pool.deferred, fake.queue.qsize()) == (1, 3, 6)
+
+    stop = asyncio.create_task(pool.stop())
+    await asyncio.sleep(0.05)
+    release.set()
+    await stop
+
+    # Pushed to the queue head last-first, so the queue reads m1, m2, m3 again
+    assert fake.requeued == [m.id for m in reversed(messages[1:4])]
+    assert pool.deferred == 0
+
+
+@pytest.mark.asyncio
+async def test_polling_mode_uses_non_blocking_dequeue():
+    done = []
+
+    async def handler(message):
+        done.append(message.id)
+
+    fake = FakeMessagePool(make_messages(3))
+
+    async def no_blocking(timeout=5.0, priority=None):
+        raise AssertionError("blocking pop used in polling mode")
+
+    fake.wait_for_next_message = no_blocking
+    pool = MessageWorkerPool(
+        handler, concurrency=2, blocking_pop=False, poll_interval=0.01, pool=fake,
+    )
+    await pool.start()
+    await asyncio.sleep(0.1)
+    await pool.stop()
+
+    assert len(done) == 3
+    assert pool.get_stats()["failed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_wait_is_recorded():
+    async def handler(message):
+        return True
+
+    message = Message(bot_id="bot")
+    message.created_at = datetime.utcnow() - timedelta(milliseconds=200)
+
+    pool = MessageWorkerPool(
+        handler, concurrency=1, block_timeout=0.05, pool=FakeMessagePool([message]),
+    )
+    await pool.start()
+    await asyncio.sleep(0.05)
+    await pool.stop()
+
+    queue_wait = pool.get_stats()["workers"][0]["queue_wait"]
+    assert queue_wait["count"] == 1
+    assert queue_wait["p50_ms"] == 250.0
+
+
+@pytest.mark.asyncio
+async def test_queue_wait_starts_at_scheduled_time():
+    async def handler(message):
+        return True
+
+    message = Message(bot_id="bot")
+    message.created_at = datetime.utcnow() - timedelta(hours=2)
+    message.scheduled_at = datetime.utcnow() - timedelta(milliseconds=3)
+
+    pool = MessageWorkerPool(
+        handler, concurrency=1, block_timeout=0.05, pool=FakeMessagePool([message]),
+    )
+    await pool.start()
+    await asyncio.sleep(0.05)
+    await pool.stop()
+
+    queue_wait = pool.get_stats()["queue_wait"]
+    assert queue_wait["count"] == 1
+    assert queue_wait["max_ms"] < 1000
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for value in (0.5, 3, 3, 40, 20000):
+        histogram.observe(value)
+
+    assert histogram.percentile(50) == 5.0
+    assert histogram.percentile(100) == 30000.0
+    assert histogram.to_dict()["count"] == 5
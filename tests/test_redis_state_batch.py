@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Redis State Batch Tests
+=======================
+
+RedisStateManager batch()/pipeline() and multi-key helpers against fakeredis.
+"""
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from gavatcore_engine.redis_state import RedisStateManager  # noqa: E402
+from gavatcore_engine.scheduler_engine import SpamProtection  # noqa: E402
+
+
+@pytest.fixture
+async def state():
+    server = fakeredis.FakeServer()
+    manager = RedisStateManager()
+    manager.redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    manager.raw_redis = fakeredis.FakeAsyncRedis(server=server)
+    yield manager
+    await manager.redis.flushall()
+
+
+async def test_batch_sends_commands_and_decodes_results(state):
+    async with state.batch() as batch:
+        batch.set("a", {"x": 1})
+        batch.hset("h", {"n": 5, "s": "text"})
+        batch.hincrby("h", "n", 2)
+        batch.get("a")
+        batch.hgetall("h")
+        batch.get("missing")
+
+    assert batch.results[3] == {"x": 1}
+    assert batch.results[4] == {"n": 7, "s": "text"}
+    assert batch.results[5] is None
+
+
+async def test_pipeline_is_not_applied_when_block_raises(state):
+    with pytest.raises(RuntimeError):
+        async with state.pipeline() as pipe:
+            pipe.set("k", "v")
+            raise RuntimeError("abort")
+
+    assert await state.get("k") is None
+
+
+async def test_multi_key_helpers(state):
+    await state.set("k1", [1, 2])
+    await state.hset("h1", {"a": 1, "b": "x"})
+    await state.hset("h2", "a", 2)
+
+    assert await state.mget("k1", "nope") == [[1, 2], None]
+    assert await state.hmget_many(["h1", "h2"], ["a", "b"]) == [
+        {"a": 1, "b": "x"},
+        {"a": 2, "b": None},
+    ]
+    assert await state.hgetall_many(["h1", "missing"]) == [{"a": 1, "b": "x"}, {}]
+    assert await state.hgetall_many(["h2"], raw=True) == [{"a": b"2"}]
+
+
+async def test_spam_protection_counters_use_one_batch(state, monkeypatch):
+    monkeypatch.setattr("gavatcore_engine.scheduler_engine.redis_state", state)
+    protection = SpamProtection()
+
+    await protection.increment_message_count(-100, "bot")
+    await protection.increment_message_count(-100, "bot")
+
+    group_state, bot_state = await protection._get_states(-100, "bot")
+    assert group_state["recent_messages"] == 2
+    assert bot_state["hourly_messages"] == 2
+    assert "last_message_at" in group_state
+    assert 0 < await state.redis.ttl("scheduler:group_state:-100") <= 3600
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Scheduler Persistence Tests
+===========================
+
+SchedulerEngine dirty-task flushing and the chunked HSCAN task loader.
+"""
+
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from gavatcore_engine.redis_state import RedisStateManager  # noqa: E402
+from gavatcore_engine.scheduler_engine import (  # noqa: E402
+    ScheduledTask,
+    SchedulerEngine,
+    TaskStatus,
+    TaskType,
+)
+
+
+@pytest.fixture
+async def state(monkeypatch):
+    manager = RedisStateManager()
+    manager.redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr("gavatcore_engine.scheduler_engine.redis_state", manager)
+    yield manager
+    await manager.redis.flushall()
+
+
+def make_task(seconds_from_now: float = 60, **kwargs) -> ScheduledTask:
+    return ScheduledTask(
+        id=str(uuid.uuid4()),
+        task_type=TaskType.SCHEDULED_MESSAGE,
+        scheduled_at=datetime.utcnow() + timedelta(seconds=seconds_from_now),
+        **kwargs,
+    )
+
+
+async def test_only_changed_tasks_are_flushed(state):
+    engine = SchedulerEngine()
+    engine.persist_batch_size = 2
+    tasks = [make_task() for _ in range(5)]
+    for task in tasks:
+        await engine.add_task(task)
+    
+    assert await state.redis.hlen("scheduler:tasks") == 0
+    assert await engine._save_tasks_to_redis() == 5
+    assert await state.redis.hlen("scheduler:tasks") == 5
+    
+    await engine.cancel_task(tasks[0].id)
+    assert await engine._save_tasks_to_redis() == 1
+    assert await engine._save_tasks_to_redis() == 0
+    
+    stored = json.loads(await state.redis.hget("scheduler:tasks", tasks[0].id))
+    assert stored["status"] == TaskStatus.CANCELLED.value
+
+
+async def test_cleaned_up_tasks_are_deleted_on_flush(state):
+    engine = SchedulerEngine()
+    old = make_task(-3600)
+    old.status = TaskStatus.COMPLETED
+    old.last_executed_at = datetime.utcnow() - timedelta(days=2)
+    await engine.add_task(old)
+    await engine._save_tasks_to_redis()
+    
+    await engine._cleanup_tasks()
+    assert await engine._save_tasks_to_redis() == 1
+    assert await state.redis.hlen("scheduler:tasks") == 0
+
+
+async def test_failed_flush_is_retried(state):
+    engine = SchedulerEngine()
+    task = make_task()
+    await engine.add_task(task)
+    
+    def broken_batch(*args, **kwargs):
+        raise ConnectionError("redis down")
+
+    state.batch = broken_batch
+    assert await engine._save_tasks_to_redis() == 0
+    assert (await engine.get_stats())["unsaved_tasks"] == 1
+
+    del state.batch
+    assert await engine._save_tasks_to_redis() == 1
+    assert await state.redis.hexists("scheduler:tasks", task.id)
+
+
+async def test_loader_streams_tasks_in_chunks(state):
+    writer = SchedulerEngine()
+    for index in range(1200):
+        await writer.add_task(make_task(60 + index))
+    earliest = make_task(5)
+    await writer.add_task(earliest)
+    await writer._save_tasks_to_redis()
+    await state.redis.hset("scheduler:tasks", "broken", "{not json")
+    
+    chunks = []
+    original = state.hscan_chunks
+    
+    async def spy(name, count=500):
+        async for chunk in original(name, count=count):
+            chunks.append(len(chunk))
+            yield chunk
+    
+    state.hscan_chunks = spy
+    
+    reader = SchedulerEngine()
+    await reader._load_tasks_from_redis(chunk_size=100)
+    
+    assert len(reader.tasks) == 1201
+    assert len(chunks) > 1
+    assert 0 < reader._next_due_in() <= 5
+    assert earliest.id in reader._heap_seq
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Scheduler Ready-Heap Tests
+==========================
+
+SchedulerEngine due-time heap: ordering, lazy deletion of cancelled/paused
+tasks, wake-up when an earlier task is added, and concurrent dispatch with
+global and per-group limits.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from gavatcore_engine.redis_state import RedisStateManager  # noqa: E402
+from gavatcore_engine.scheduler_engine import (  # noqa: E402
+    ScheduledTask,
+    SchedulerEngine,
+    TaskStatus,
+    TaskType,
+)
+
+
+@pytest.fixture
+async def engine(monkeypatch):
+    state = RedisStateManager()
+    state.redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr("gavatcore_engine.scheduler_engine.redis_state", state)
+
+    scheduler = SchedulerEngine()
+    scheduler.executed = []
+
+    async def record(task):
+        scheduler.executed.append(task.id)
+
+    scheduler.task_handlers[TaskType.SCHEDULED_MESSAGE] = record
+    yield scheduler
+    await scheduler.stop()
+    await state.redis.flushall()
+
+
+def make_task(seconds_from_now: float, task_id: str = None, group_id: int = None) -> ScheduledTask:
+    return ScheduledTask(
+        id=task_id or str(uuid.uuid4()),
+        task_type=TaskType.SCHEDULED_MESSAGE,
+        scheduled_at=datetime.utcnow() + timedelta(seconds=seconds_from_now),
+        group_id=group_id,
+    )
+
+
+def track_concurrency(scheduler, delay: float = 0.05):
+    """Replace the handler with one that records peak overall/per-group concurrency."""
+    active = {"all": 0}
+    peaks = {"all": 0}
+
+    async def slow(task):
+        for key in ("all", task.group_id):
+            active[key] = active.get(key, 0) + 1
+            peaks[key] = max(peaks.get(key, 0), active[key])
+        await asyncio.sleep(delay)
+        for key in ("all", task.group_id):
+            active[key] -= 1
+        scheduler.executed.append(task.id)
+
+    scheduler.task_handlers[TaskType.SCHEDULED_MESSAGE] = slow
+    return peaks
+
+
+async def test_due_tasks_run_in_scheduled_order(engine):
+    await engine.add_task(make_task(-1, "second"))
+    await engine.add_task(make_task(-5, "first"))
+    await engine.add_task(make_task(3600, "later"))
+
+    await engine.process_pending_tasks()
+
+    assert engine.executed == ["first", "second"]
+    assert engine.tasks["later"].status == TaskStatus.PENDING
+    assert 3590 < engine._next_due_in() <= 3600
+
+
+async def test_cancelled_and_paused_tasks_are_skipped(engine):
+    await engine.add_task(make_task(-1, "cancelled"))
+    await engine.add_task(make_task(-1, "paused"))
+    await engine.cancel_task("cancelled")
+    await engine.pause_task("paused")
+
+    await engine.process_pending_tasks()
+    assert engine.executed == []
+
+    await engine.resume_task("paused")
+    await engine.process_pending_tasks()
+    assert engine.executed == ["paused"]
+
+
+async def test_loop_wakes_for_an_earlier_task(engine):
+    await engine.add_task(make_task(3600, "later"))
+    await engine.start()
+    await asyncio.sleep(0.05)
+
+    await engine.add_task(make_task(0, "now"))
+    await asyncio.sleep(0.05)
+
+    assert engine.executed == ["now"]
+
+
+async def test_slow_task_does_not_block_other_groups(engine):
+    track_concurrency(engine, delay=0.2)
+    await engine.add_task(make_task(-1, "slow", group_id=-100))
+    for index in range(3):
+        await engine.add_task(make_task(-1, f"other{index}", group_id=-200 - index))
+
+    await engine._process_ready_tasks()
+    await asyncio.sleep(0.05)
+    stats = await engine.get_stats()
+    assert stats["dispatch"]["running"] == 4
+
+    await engine.process_pending_tasks()
+    assert sorted(engine.executed) == ["other0", "other1", "other2", "slow"]
+    assert engine._group_limits == {}
+
+
+async def test_global_and_group_limits(engine):
+    engine.max_concurrency = 3
+    engine._dispatch_limit = asyncio.Semaphore(3)
+    engine.group_concurrency = 1
+    peaks = track_concurrency(engine, delay=0.02)
+
+    for _ in range(4):
+        await engine.add_task(make_task(-1, group_id=-100))
+    for index in range(6):
+        await engine.add_task(make_task(-1, group_id=-200 - index))
+
+    await engine.process_pending_tasks()
+
+    assert len(engine.executed) == 10
+    assert peaks["all"] == 3
+    assert peaks[-100] == 1
+
+
+async def test_cancelled_while_queued_is_not_run(engine):
+    track_concurrency(engine, delay=0.05)
+    await engine.add_task(make_task(-1, "first", group_id=-100))
+    await engine.add_task(make_task(-1, "second", group_id=-100))
+
+    await engine._process_ready_tasks()
+    await asyncio.sleep(0)
+    await engine.cancel_task("second")
+    await engine.process_pending_tasks()
+
+    assert engine.executed == ["first"]
+
+
+async def test_lateness_is_exported(engine):
+    await engine.add_task(make_task(-2))
+    await engine.process_pending_tasks()
+
+    lateness = (await engine.get_stats())["lateness"]
+    assert lateness["count"] == 1
+    assert lateness["p50_ms"] == 2500.0
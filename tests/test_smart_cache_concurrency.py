@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Smart Cache Concurrency Tests
+=============================
+
+SmartCacheManager lock-free L1 hits, Redis I/O outside the L1 lock and
+single-flight coalescing of concurrent L2 misses.
+"""
+
+import asyncio
+import pickle
+
+import pytest
+
+
+class SlowRedis:
+    """Minimal async Redis stand-in whose calls block until released."""
+    
+    def __init__(self):
+        self.data = {}
+        self.calls = {"get": 0, "set": 0}
+        self.release = asyncio.Event()
+    
+    async def get(self, key):
+        self.calls["get"] += 1
+        await self.release.wait()
+        return self.data.get(key)
+    
+    async def set(self, key, value, ex=None):
+        self.calls["set"] += 1
+        await self.release.wait()
+        self.data[key] = value
+    
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = SlowRedis()
+    monkeypatch.setattr("core.smart_cache_manager.redis_client", client)
+    return client
+
+
+def seed_l2(cache, redis, key, value):
+    redis.data[cache._redis_key(key)] = pickle.dumps(value)
+    cache.l2_keys.add(key)
+
+
+async def test_l1_hit_does_not_wait_for_lock(redis, make_cache):
+    cache = make_cache("concurrency", persistence=True)
+    redis.release.set()
+    await cache.set("a", 1)
+    
+    async with cache._lock:
+        assert await asyncio.wait_for(cache.get("a"), 0.1) == 1
+
+
+async def test_redis_write_does_not_block_readers(redis, make_cache):
+    cache = make_cache("concurrency", persistence=True)
+    redis.release.set()
+    await cache.set("a", 1)
+    redis.release.clear()
+    
+    writer = asyncio.create_task(cache.set("b", 2))
+    await asyncio.sleep(0.01)
+    assert not writer.done()
+    
+    # Both the L1 hit and the new L1 value are visible while the write is pending
+    assert await asyncio.wait_for(cache.get("a"), 0.1) == 1
+    assert await asyncio.wait_for(cache.get("b"), 0.1) == 2
+    
+    redis.release.set()
+    await writer
+
+
+async def test_concurrent_misses_share_one_redis_call(redis, make_cache):
+    cache = make_cache("concurrency", persistence=True)
+    seed_l2(cache, redis, "k", {"v": 1})
+    
+    readers = [asyncio.create_task(cache.get("k")) for _ in range(10)]
+    await asyncio.sleep(0.01)
+    redis.release.set()
+    results = await asyncio.gather(*readers)
+    
+    assert results == [{"v": 1}] * 10
+    assert redis.calls["get"] == 1
+    assert cache.stats["coalesced"] == 9
+    assert cache.stats["hits"]["l2"] == 10
+    assert "k" in cache.l1_cache and not cache._inflight
+
+
+async def test_cancelled_reader_does_not_cancel_the_flight(redis, make_cache):
+    cache = make_cache("concurrency", persistence=True)
+    seed_l2(cache, redis, "k", "value")
+    
+    first = asyncio.create_task(cache.get("k"))
+    second = asyncio.create_task(cache.get("k"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    redis.release.set()
+    
+    assert await second == "value"
+
+
+async def test_write_during_flight_is_not_overwritten(redis, make_cache):
+    cache = make_cache("concurrency", persistence=True)
+    seed_l2(cache, redis, "k", "old")
+    
+    reader = asyncio.create_task(cache.get("k"))
+    await asyncio.sleep(0.01)
+    await cache.delete("k")
+    redis.release.set()
+    await reader
+    
+    assert "k" not in cache.l1_cache
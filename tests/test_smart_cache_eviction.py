@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Smart Cache Eviction Tests
+==========================
+
+SmartCacheManager eviction order for the LRU, LFU, ADAPTIVE and priority
+strategies, and consistency of the eviction indexes.
+"""
+
+import pytest
+
+from core.smart_cache_manager import CacheStrategy
+
+
+async def test_lru_evicts_least_recently_used(make_cache):
+    cache = make_cache(strategy=CacheStrategy.LRU, max_size=3)
+    for key in ("a", "b", "c"):
+        await cache.set(key, key)
+    
+    await cache.get("a")
+    await cache.set("d", "d")
+    
+    assert list(cache.l1_cache) == ["c", "a", "d"]
+    assert cache.stats["evictions"] == 1
+
+
+async def test_lfu_evicts_least_frequently_used(make_cache):
+    cache = make_cache(strategy=CacheStrategy.LFU, max_size=3)
+    for key in ("a", "b", "c"):
+        await cache.set(key, key)
+    for _ in range(3):
+        await cache.get("a")
+    await cache.get("b")
+    
+    await cache.set("d", "d")
+    assert set(cache.l1_cache) == {"a", "b", "d"}
+    
+    # The new entry now has the lowest frequency
+    await cache.set("e", "e")
+    assert set(cache.l1_cache) == {"a", "b", "e"}
+
+
+async def test_lfu_back_to_back_evictions_find_next_frequency(make_cache):
+    cache = make_cache(strategy=CacheStrategy.LFU, max_size=3)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    await cache.set("c", 3)
+    await cache.get("b")
+    for _ in range(2):
+        await cache.get("c")
+
+    # Memory-pressure style: several evictions with no insert in between
+    await cache._evict_by_strategy()
+    await cache._evict_by_strategy()
+
+    assert list(cache.l1_cache) == ["c"]
+
+
+async def test_adaptive_keeps_frequently_accessed_entries(make_cache):
+    cache = make_cache(strategy=CacheStrategy.ADAPTIVE, max_size=3)
+    for key in ("a", "b", "c"):
+        await cache.set(key, key)
+    for _ in range(5):
+        await cache.get("b")
+        await cache.get("c")
+    
+    await cache.set("d", "d")
+    assert set(cache.l1_cache) == {"b", "c", "d"}
+    assert len(cache._score_heap) <= 2 * len(cache.l1_cache) + 64
+
+
+async def test_priority_eviction_starts_with_lowest_priority(make_cache):
+    cache = make_cache(strategy=CacheStrategy.TTL, max_size=3)
+    await cache.set("high", 1, priority=2)
+    await cache.set("low", 2, priority=0)
+    await cache.set("mid", 3, priority=1)
+    
+    await cache.set("new", 4, priority=1)
+    assert "low" not in cache.l1_cache
+
+
+@pytest.mark.parametrize("strategy", [CacheStrategy.LRU, CacheStrategy.LFU, CacheStrategy.ADAPTIVE])
+async def test_overwrite_does_not_evict_or_duplicate(strategy, make_cache):
+    cache = make_cache(strategy=strategy, max_size=3)
+    for key in ("a", "b", "c"):
+        await cache.set(key, key)
+    
+    await cache.set("b", "updated")
+    
+    assert len(cache.l1_cache) == 3
+    assert cache.stats["evictions"] == 0
+    assert await cache.get("b") == "updated"
+    assert sum(len(queue) for queue in cache.priority_queues) == 3
+    
+    await cache.clear()
+    assert not cache._freq_buckets and not cache._score_version
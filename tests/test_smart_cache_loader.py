@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Smart Cache Loader Tests
+========================
+
+SmartCacheManager.get_or_load: single-flight loading, stale-while-revalidate,
+bounded background refresh and loader statistics.
+"""
+
+import asyncio
+
+import pytest
+
+
+class CountingLoader:
+    def __init__(self, value="fresh", delay: float = 0.01, fail: bool = False):
+        self.value = value
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+    
+    async def __call__(self):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("backend down")
+            return self.value
+        finally:
+            self.active -= 1
+
+
+def expire(cache, key, seconds):
+    cache.l1_cache[key].timestamp -= seconds
+
+
+async def test_concurrent_misses_call_loader_once(make_cache):
+    cache = make_cache(ttl=60)
+    loader = CountingLoader("value")
+    
+    results = await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(10)))
+    
+    assert results == ["value"] * 10
+    assert loader.calls == 1
+    assert await cache.get("k") == "value"
+    
+    stats = cache.get_stats()
+    assert stats["loader"]["calls"] == 1
+    assert stats["loader"]["max_ms"] >= 10
+    assert stats["operations"]["coalesced"] == 9
+
+
+async def test_sync_loader_is_supported(make_cache):
+    cache = make_cache(ttl=60)
+    assert await cache.get_or_load("k", lambda: 42) == 42
+
+
+async def test_stale_value_is_served_while_one_refresh_runs(make_cache):
+    cache = make_cache(ttl=60)
+    await cache.set("k", "old", ttl=10, stale_ttl=60)
+    expire(cache, "k", 20)
+    loader = CountingLoader("new", delay=0.05)
+    
+    results = await asyncio.gather(*(cache.get_or_load("k", loader, ttl=10, stale_ttl=60) for _ in range(5)))
+    assert results == ["old"] * 5
+    assert cache.stats["stale_hits"] == 5
+    
+    await asyncio.sleep(0.1)
+    assert loader.calls == 1
+    assert cache.stats["refreshes"] == 1
+    assert await cache.get_or_load("k", loader) == "new"
+
+
+async def test_plain_get_misses_on_stale_entry(make_cache):
+    cache = make_cache(ttl=60)
+    await cache.set("k", "old", ttl=10, stale_ttl=60)
+    expire(cache, "k", 20)
+    
+    assert await cache.get("k") is None
+    assert "k" in cache.l1_cache
+
+
+async def test_past_stale_window_loads_synchronously(make_cache):
+    cache = make_cache(ttl=60)
+    await cache.set("k", "old", ttl=10, stale_ttl=5)
+    expire(cache, "k", 20)
+    loader = CountingLoader("new")
+    
+    assert await cache.get_or_load("k", loader) == "new"
+    assert loader.calls == 1
+
+
+async def test_background_refreshes_are_bounded(make_cache):
+    cache = make_cache(ttl=60, refresh_concurrency=2)
+    for index in range(6):
+        await cache.set(f"k{index}", "old", ttl=10, stale_ttl=60)
+        expire(cache, f"k{index}", 20)
+    loader = CountingLoader("new", delay=0.02)
+    
+    for index in range(6):
+        assert await cache.get_or_load(f"k{index}", loader) == "old"
+    await asyncio.sleep(0.15)
+    
+    assert loader.calls == 6
+    assert loader.peak == 2
+
+
+async def test_loader_errors(make_cache):
+    cache = make_cache(ttl=60)
+    failing = CountingLoader(fail=True)
+    
+    with pytest.raises(RuntimeError):
+        await cache.get_or_load("missing", failing)
+    assert cache.get_stats()["loader"]["errors"] == 1
+    
+    # A failed background refresh keeps serving the stale value
+    await cache.set("k", "old", ttl=10, stale_ttl=60)
+    expire(cache, "k", 20)
+    assert await cache.get_or_load("k", failing) == "old"
+    await asyncio.sleep(0.05)
+    assert await cache.get_or_load("k", failing) == "old"
+
+
+async def test_compressed_l1_values_are_returned_decoded(make_cache):
+    cache = make_cache(ttl=60, compression=True)
+    value = "merhaba " * 1000
+    
+    await cache.set("big", value)
+    assert cache.l1_cache["big"].compressed
+    assert await cache.get("big") == value
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Smart Cache Memory Tests
+========================
+
+deep_sizeof estimates and SmartCacheManager byte-budget eviction and memory
+statistics.
+"""
+
+import sys
+
+from core.smart_cache_manager import (
+    CacheManagerFactory,
+    CachePolicy,
+    deep_sizeof,
+    get_all_cache_stats,
+)
+
+
+def profile(index: int) -> dict:
+    return {"id": index, "bio": "x" * 500, "tags": [f"tag{i}" for i in range(20)]}
+
+
+class Slotted:
+    __slots__ = ("payload",)
+    
+    def __init__(self, payload):
+        self.payload = payload
+
+
+def test_deep_sizeof_counts_nested_contents():
+    value = profile(1)
+    assert deep_sizeof(value) > sys.getsizeof(value) + 500
+    
+    shared = "y" * 1000
+    assert deep_sizeof([shared, shared]) < deep_sizeof([shared, "z" * 1000])
+    
+    cyclic = {"name": "loop"}
+    cyclic["self"] = cyclic
+    assert deep_sizeof(cyclic) > 0
+    
+    assert deep_sizeof(Slotted("p" * 1000)) > 1000
+
+
+async def test_eviction_keeps_l1_within_byte_budget(make_cache):
+    entry_size = deep_sizeof(profile(0))
+    cache = make_cache(max_bytes=entry_size * 3 + entry_size // 2)
+    
+    for index in range(6):
+        await cache.set(f"p{index}", profile(index))
+    
+    assert list(cache.l1_cache) == ["p3", "p4", "p5"]
+    assert cache._l1_bytes <= cache.policy.max_bytes
+    assert cache.stats["evictions"] == 3
+
+
+async def test_oversized_value_is_not_cached_in_l1(make_cache):
+    cache = make_cache(max_bytes=1000)
+    await cache.set("big", "x" * 5000)
+    
+    assert "big" not in cache.l1_cache
+    assert cache.stats["oversize_rejects"] == 1
+
+
+async def test_byte_total_tracks_overwrite_delete_and_clear(make_cache):
+    cache = make_cache(compression=True)
+    await cache.set("a", profile(1))
+    await cache.set("b", "merhaba " * 1000)
+    await cache.set("a", {"small": True})
+    await cache.delete("b")
+    
+    assert cache._l1_bytes == sum(entry.size for entry in cache.l1_cache.values())
+    
+    await cache.clear()
+    assert cache._l1_bytes == 0
+
+
+async def test_memory_is_reported_per_cache():
+    await CacheManagerFactory.get_cache_manager("mem_a", CachePolicy(persistence=False, max_bytes=1 << 20))
+    manager = await CacheManagerFactory.get_cache_manager("mem_b", CachePolicy(persistence=False))
+    await manager.set("k", profile(1))
+    
+    try:
+        stats = await get_all_cache_stats()
+        assert stats["mem_a"]["memory"]["max_bytes"] == 1 << 20
+        assert stats["mem_a"]["memory"]["budget_used"] == 0
+        assert stats["mem_b"]["memory"]["l1_bytes"] == manager.l1_cache["k"].size
+    finally:
+        await CacheManagerFactory.shutdown_all()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+SQLite Pool Tests
+=================
+
+Long-lived writer/reader connections for DatabaseManager: pragmas, reuse,
+commit/rollback semantics of the writer, WAL readers and the in-memory
+fallback; group-commit batching, ordering and backpressure of the
+write-behind queue.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import aiosqlite
+import pytest
+
+from core.database_manager import BroadcastStatus, BroadcastTarget, DatabaseManager, UserInteractionType
+from core.sqlite_pool import SQLitePool, WriteBehindQueue
+
+
+@pytest.fixture
+async def pool(tmp_path):
+    pool = SQLitePool(str(tmp_path / "pool.db"), readers=2)
+    async with pool.writer() as db:
+        await db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    yield pool
+    await pool.close()
+
+
+@pytest.fixture
+async def make_queue(pool):
+    """WriteBehindQueue factory on ``pool``; every queue is closed on teardown."""
+    queues = []
+
+    def _make_queue(**options) -> WriteBehindQueue:
+        queue = WriteBehindQueue(pool, **options)
+        queues.append(queue)
+        return queue
+
+    yield _make_queue
+    for queue in queues:
+        await queue.close()
+
+
+@pytest.fixture
+async def make_manager(tmp_path):
+    """DatabaseManager factory on one file; every manager is closed on teardown."""
+    managers = []
+
+    def _make_manager(**options) -> DatabaseManager:
+        manager = DatabaseManager(str(tmp_path / "gavatcore.db"), **options)
+        managers.append(manager)
+        return manager
+
+    yield _make_manager
+    for manager in managers:
+        await manager.close()
+
+
+async def fetch_one(db, sql):
+    async with db.execute(sql) as cursor:
+        return await cursor.fetchone()
+
+
+async def test_connections_are_configured_and_reused(pool):
+    async with pool.reader() as db:
+        assert await fetch_one(db, "PRAGMA journal_mode") == ("wal",)
+        assert await fetch_one(db, "PRAGMA synchronous") == (1,)
+        assert await fetch_one(db, "PRAGMA temp_store") == (2,)
+
+    for index in range(20):
+        async with pool.writer() as db:
+            await db.execute("INSERT INTO items (name) VALUES (?)", (f"item-{index}",))
+        async with pool.reader() as db:
+            await fetch_one(db, "SELECT COUNT(*) FROM items")
+
+    stats = pool.get_stats()
+    assert stats["opened"] == 3
+    assert stats["idle_readers"] == 2
+
+
+async def test_writer_commits_on_success_and_rolls_back_on_error(pool):
+    async with pool.writer() as db:
+        await db.execute("INSERT INTO items (name) VALUES ('kept')")
+
+    with pytest.raises(RuntimeError):
+        async with pool.writer() as db:
+            await db.execute("INSERT INTO items (name) VALUES ('dropped')")
+            raise RuntimeError("boom")
+
+    async with pool.reader() as db:
+        assert await fetch_one(db, "SELECT group_concat(name) FROM items") == ("kept",)
+    assert pool.stats["rollbacks"] == 1
+
+
+async def test_readers_do_not_wait_for_the_writer(pool):
+    async with pool.writer() as db:
+        await db.execute("INSERT INTO items (name) VALUES ('committed')")
+
+    async with pool.writer() as db:
+        await db.execute("INSERT INTO items (name) VALUES ('pending')")
+        async with pool.reader() as reader:
+            rows = await asyncio.wait_for(fetch_one(reader, "SELECT COUNT(*) FROM items"), 1)
+
+    assert rows == (1,)
+
+
+async def test_memory_database_reads_through_the_writer():
+    pool = SQLitePool(":memory:", readers=4)
+    try:
+        async with pool.writer() as db:
+            await db.execute("CREATE TABLE t (v INTEGER)")
+            await db.execute("INSERT INTO t VALUES (1)")
+        async with pool.reader() as db:
+            assert await fetch_one(db, "SELECT v FROM t") == (1,)
+        assert pool.get_stats()["opened"] == 1
+    finally:
+        await pool.close()
+
+
+async def test_database_manager_round_trip(make_manager):
+    manager = make_manager()
+    await manager.initialize()
+    for _ in range(3):
+        await manager.log_user_interaction("42", UserInteractionType.MESSAGE, character_id="geisha")
+        await manager.flush_writes()
+        await manager.update_user_analytics("42", "tester", {"message_count": 1})
+
+    async with manager._get_connection(readonly=True) as db:
+        row = await fetch_one(db, "SELECT total_messages, activity_score FROM user_analytics WHERE user_id = '42'")
+
+    # Activity score is written after the analytics update and must be committed too
+    assert row == (3, 6.0)
+    assert manager.pool.get_stats()["opened"] == 5
+
+
+async def test_queue_coalesces_rows_into_one_flush(pool, make_queue):
+    queue = make_queue(flush_interval=60)
+    for index in range(500):
+        await queue.put("items", "INSERT INTO items (name) VALUES (?)", (f"item-{index}",))
+
+    async with pool.reader() as db:
+        assert await fetch_one(db, "SELECT COUNT(*) FROM items") == (0,)
+
+    assert await queue.flush() == 500
+    assert queue.stats["flushes"] == 1
+    async with pool.reader() as db:
+        assert await fetch_one(db, "SELECT COUNT(*), MAX(name) FROM items") == (500, "item-99")
+
+
+async def test_queue_flushes_on_row_count_and_interval(pool, make_queue):
+    queue = make_queue(flush_interval=60, max_batch=10)
+    for index in range(10):
+        await queue.put("items", "INSERT INTO items (name) VALUES (?)", ("batch",))
+    await asyncio.sleep(0.1)
+    assert queue.pending == 0
+    await queue.close()
+
+    queue = make_queue(flush_interval=0.02)
+    await queue.put("items", "INSERT INTO items (name) VALUES (?)", ("timer",))
+    await asyncio.sleep(0.2)
+    assert queue.stats["written"] == 1
+
+
+async def test_queue_keeps_order_within_a_table(pool, make_queue):
+    queue = make_queue(flush_interval=60)
+    await queue.put("items", "INSERT INTO items (id, name) VALUES (?, ?)", (1, "new"))
+    await queue.put("items", "UPDATE items SET name = name || ? WHERE id = ?", ("-sent", 1))
+    await queue.put("items", "UPDATE items SET name = ? WHERE id = ?", ("failed", 1))
+    await queue.put("items", "UPDATE items SET name = name || ? WHERE id = ?", ("-sent", 1))
+    await queue.close()
+
+    async with pool.reader() as db:
+        assert await fetch_one(db, "SELECT name FROM items WHERE id = 1") == ("failed-sent",)
+
+
+async def test_queue_backpressure_and_bad_rows(pool, make_queue):
+    queue = make_queue(flush_interval=60, max_batch=5, max_pending=5)
+    for index in range(12):
+        # id 3 is inserted twice; only that row may be lost
+        row_id = 3 if index == 4 else index
+        await queue.put("items", "INSERT INTO items (id, name) VALUES (?, ?)", (row_id, "x"))
+        assert queue.pending <= 5
+
+    await queue.close()
+    assert queue.stats["backpressure_flushes"] >= 1
+    assert (queue.stats["written"], queue.stats["failed"]) == (11, 1)
+    async with pool.reader() as db:
+        assert await fetch_one(db, "SELECT COUNT(*) FROM items") == (11,)
+
+
+def fail_writer(pool, monkeypatch):
+    """Make pool.writer() fail like a locked / full database until undone."""
+
+    @asynccontextmanager
+    async def writer():
+        raise aiosqlite.OperationalError("database is locked")
+        yield
+
+    monkeypatch.setattr(pool, "writer", writer)
+
+
+async def test_queue_keeps_rows_when_transaction_cannot_open(pool, monkeypatch, make_queue):
+    queue = make_queue(flush_interval=60)
+    for index in range(3):
+        await queue.put("items", "INSERT INTO items (id, name) VALUES (?, ?)", (index, "old"))
+
+    fail_writer(pool, monkeypatch)
+    assert await queue.flush() == 0
+    assert queue.pending == 3
+    assert (queue.stats["requeued"], queue.stats["failed"]) == (3, 0)
+
+    monkeypatch.undo()
+    await queue.put("items", "INSERT INTO items (id, name) VALUES (?, ?)", (3, "new"))
+    assert await queue.flush() == 4
+    assert queue.get_stats()["pending"] == 0
+
+    async with pool.reader() as db:
+        assert await fetch_one(db, "SELECT group_concat(name) FROM items ORDER BY id") == ("old,old,old,new",)
+
+
+async def test_requeued_rows_are_bounded_by_max_pending(pool, monkeypatch, make_queue):
+    queue = make_queue(flush_interval=60, max_batch=5, max_pending=5)
+    fail_writer(pool, monkeypatch)
+    for index in range(12):
+        await queue.put("items", "INSERT INTO items (id, name) VALUES (?, ?)", (index, "x"))
+        assert queue.pending <= 6
+
+    monkeypatch.undo()
+    await queue.close()
+
+    # The oldest rows were dropped, the newest survived
+    assert queue.stats["failed"] == 6
+    async with pool.reader() as db:
+        assert await fetch_one(db, "SELECT MIN(id), COUNT(*) FROM items") == (6, 6)
+
+
+async def test_database_manager_queues_log_writes(make_manager):
+    manager = make_manager(write_batch_ms=60000)
+    await manager.initialize()
+    await manager.add_broadcast_target(BroadcastTarget("g1", "group", "bot"))
+    await manager.log_broadcast_attempt("b1", "g1", "group", "bot", "text", "hi", BroadcastStatus.FAILED)
+    await manager.log_broadcast_attempt("b2", "g1", "group", "bot", "text", "hi", BroadcastStatus.FAILED)
+    for _ in range(5):
+        await manager.log_user_interaction("7", UserInteractionType.MESSAGE)
+    assert manager.write_queue.pending == 9
+
+    stats = await manager.get_broadcast_stats()
+    assert stats["status_breakdown"] == {"failed": 2}
+    # Closing flushes the queued rows for the next manager on the same file
+    await manager.close()
+
+    manager = make_manager()
+    async with manager._get_connection(readonly=True) as db:
+        assert await fetch_one(db, "SELECT COUNT(*) FROM user_interactions") == (5,)
+        assert await fetch_one(db, "SELECT failure_count FROM broadcast_targets") == (2,)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+User Activity Rollup Tests
+==========================
+
+user_activity_daily buckets maintained by triggers on user_interactions,
+activity score computed from the buckets, backfill of existing databases
+and the nightly trim.
+"""
+
+import pytest
+
+from core.database_manager import DatabaseManager, UserInteractionType
+
+
+@pytest.fixture
+async def manager(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "gavatcore.db"))
+    await manager.initialize()
+    yield manager
+    await manager.close()
+
+
+async def fetch_all(manager, sql, params=()):
+    async with manager._get_connection(readonly=True) as db:
+        async with db.execute(sql, params) as cursor:
+            return await cursor.fetchall()
+
+
+async def insert_interaction(manager, user_id, days_ago, duration=None):
+    async with manager._get_connection() as db:
+        await db.execute(
+            "INSERT INTO user_interactions (user_id, interaction_type, duration_seconds, created_at) "
+            "VALUES (?, 'message', ?, datetime('now', ?))",
+            (user_id, duration, f"-{days_ago} days"),
+        )
+
+
+async def test_buckets_follow_queued_interactions(manager):
+    for duration in (60, None, 120):
+        await manager.log_user_interaction("u1", UserInteractionType.MESSAGE, duration_seconds=duration)
+    await manager.log_user_interaction("u2", UserInteractionType.VOICE_CHAT)
+    await manager.flush_writes()
+
+    rows = await fetch_all(manager, "SELECT user_id, interactions, duration_seconds FROM user_activity_daily ORDER BY user_id")
+    assert rows == [("u1", 3, 180), ("u2", 1, 0)]
+
+    await manager.update_user_analytics("u1", "one")
+    rows = await fetch_all(manager, "SELECT activity_score FROM user_analytics WHERE user_id = 'u1'")
+    # 3 interactions * 2 + 180s / 60
+    assert rows == [(9.0,)]
+
+
+async def test_score_window_delete_trigger_and_trim(manager):
+    await insert_interaction(manager, "u1", 0, duration=600)
+    await insert_interaction(manager, "u1", 29)
+    await insert_interaction(manager, "u1", 45)
+    await insert_interaction(manager, "u2", 40)
+
+    await manager.update_user_analytics("u1")
+    assert await fetch_all(manager, "SELECT activity_score FROM user_analytics") == [(14.0,)]
+
+    async with manager._get_connection() as db:
+        await db.execute("DELETE FROM user_interactions WHERE duration_seconds = 600")
+    assert await fetch_all(manager, "SELECT SUM(interactions), SUM(duration_seconds) FROM user_activity_daily") == [(3, 0)]
+
+    # Emptied bucket (today) and the two outside the window go away
+    assert await manager.trim_activity_buckets() == 3
+    assert await fetch_all(manager, "SELECT user_id, interactions FROM user_activity_daily") == [("u1", 1)]
+
+
+async def test_initialize_backfills_existing_interactions(manager):
+    for days_ago in (1, 1, 2, 60):
+        await insert_interaction(manager, "u1", days_ago, duration=30)
+    async with manager._get_connection() as db:
+        await db.execute("DELETE FROM user_activity_daily")
+
+    await manager.initialize()
+    rows = await fetch_all(manager, "SELECT interactions, duration_seconds FROM user_activity_daily ORDER BY day")
+    assert rows == [(1, 30), (2, 60)]
+
+    # A populated rollup is left alone
+    await manager.initialize()
+    assert len(await fetch_all(manager, "SELECT * FROM user_activity_daily")) == 2
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+User Analytics UPSERT Tests
+===========================
+
+update_user_analytics as a single INSERT ... ON CONFLICT DO UPDATE and the
+batched update_user_analytics_many.
+"""
+
+import asyncio
+
+import pytest
+
+from core.database_manager import DatabaseManager, UserInteractionType
+
+COLUMNS = "username, total_messages, voice_minutes, quests_completed, events_joined, favorite_character"
+
+
+@pytest.fixture
+async def manager(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "gavatcore.db"))
+    await manager.initialize()
+    yield manager
+    await manager.close()
+
+
+async def fetch_user(manager, user_id):
+    async with manager._get_connection(readonly=True) as db:
+        async with db.execute(f"SELECT {COLUMNS} FROM user_analytics WHERE user_id = ?", (user_id,)) as cursor:
+            return await cursor.fetchone()
+
+
+async def test_insert_then_increment(manager):
+    await manager.update_user_analytics("1", interaction_data={"message_count": 2, "quest_completed": True})
+    assert await fetch_user(manager, "1") == ("user_1", 2, 0, 1, 0, None)
+
+    await manager.update_user_analytics("1", "alice", {"message_count": 3, "voice_minutes": 4, "favorite_character": "geisha"})
+    await manager.update_user_analytics("1", interaction_data={"event_joined": True})
+    assert await fetch_user(manager, "1") == ("alice", 5, 4, 1, 1, "geisha")
+
+
+async def test_updates_from_two_connections_accumulate(tmp_path):
+    # Two managers = two processes' worth of connections on one file
+    managers = [DatabaseManager(str(tmp_path / "shared.db")) for _ in range(2)]
+    try:
+        await managers[0].initialize()
+        await asyncio.gather(*(
+            manager.update_user_analytics("new", interaction_data={"message_count": 1})
+            for manager in managers
+            for _ in range(10)
+        ))
+        assert (await fetch_user(managers[0], "new"))[1] == 20
+    finally:
+        for manager in managers:
+            await manager.close()
+
+
+async def test_update_many(manager):
+    await manager.log_user_interaction("a", UserInteractionType.MESSAGE)
+    await manager.flush_writes()
+
+    applied = await manager.update_user_analytics_many([
+        {"user_id": "a", "username": "ann", "interaction_data": {"message_count": 1}},
+        {"user_id": "b", "interaction_data": {"voice_minutes": 5}},
+        {"user_id": "a", "interaction_data": {"message_count": 2, "favorite_character": "lara"}},
+    ])
+
+    assert applied == 3
+    assert await fetch_user(manager, "a") == ("ann", 3, 0, 0, 0, "lara")
+    assert await fetch_user(manager, "b") == ("user_b", 0, 5, 0, 0, None)
+    async with manager._get_connection(readonly=True) as db:
+        async with db.execute("SELECT user_id, activity_score FROM user_analytics ORDER BY user_id") as cursor:
+            assert await cursor.fetchall() == [("a", 2.0), ("b", 0.0)]
+    assert await manager.update_user_analytics_many([]) == 0
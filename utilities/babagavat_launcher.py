@@ -200,6 +200,9 @@ class BabaGAVATLauncher:
             asyncio.create_task(self._babagavat_daily_report_generator())
             asyncio.create_task(self._babagavat_intelligence_coordinator())
             
+            # Gece bakımı: eski activity bucket'larını temizle
+            asyncio.create_task(database_manager.run_nightly_maintenance())
+            
             logger.info("✅ BabaGAVAT Background tasks başlatıldı - Sokak görevleri aktif! 🎯")
             
         except Exception as e:
@@ -379,7 +382,7 @@ class BabaGAVATLauncher:
         """BabaGAVAT'ın özel istihbarat analizi"""
         try:
             # Yüksek potansiyelli kullanıcıları tespit et
-            async with database_manager._get_connection() as db:
+            async with database_manager._get_connection(readonly=True) as db:
                 cursor = await db.execute("""
                     SELECT COUNT(*) as total_users,
                            SUM(CASE WHEN trust_level = 'trusted' THEN 1 ELSE 0 END) as trusted_users,
@@ -494,6 +497,9 @@ class BabaGAVATLauncher:
                 except Exception as e:
                     logger.warning(f"⚠️ {bot_name} kapatma hatası: {e}")
             
+            # Kuyruktaki DB yazımlarını boşalt, bağlantıları kapat
+            await database_manager.close()
+            
             logger.info("✅ BabaGAVAT sistemi kapatıldı - Sokak zekası devre dışı!")
             
         except Exception as e:
@@ -590,6 +590,9 @@ class BabaGAVATUltimateFullThrottleLauncher:
             # Final metrics
             await self._update_performance_metrics()
             
+            # Flush queued database writes and close connections
+            await database_manager.close()
+            
             uptime_minutes = (datetime.now() - self.start_time).total_seconds() / 60
             
             print(f"""
@@ -518,6 +518,9 @@ class UltimateTelegramBotLauncher:
                 except Exception as e:
                     logger.error(f"{username} shutdown error: {e}")
             
+            # Flush queued database writes and close connections
+            await database_manager.close()
+            
             uptime_minutes = (datetime.now() - self.start_time).total_seconds() / 60
             
             print(f"""